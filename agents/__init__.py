@@ -14,13 +14,22 @@ class Agent(Generic[TContext]):
 
 
 class Runner:
-    """Minimal async runner shim used in tests."""
+    """Minimal runner shim mirroring the SDK's class-level entry points."""
 
+    @classmethod
     async def run(
-        self, agent: Agent[Any], input: list[Any], **_: Any
+        cls, agent: Agent[Any], input: list[Any], **_: Any
     ) -> Any:  # pragma: no cover - monkeypatched in tests
         raise NotImplementedError
 
+    @classmethod
+    def run_streamed(
+        cls, agent: Agent[Any], input: list[Any], **_: Any
+    ) -> Any:  # pragma: no cover - monkeypatched in tests
+        """Return a streaming run whose ``stream_events()`` yields run events."""
+
+        raise NotImplementedError
+
 
 @dataclass
 class FileSearchTool:
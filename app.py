@@ -55,8 +55,8 @@ from config import (  # noqa: E402
     OPENAI_ORGANIZATION,
     OPENAI_PROJECT,
 )
-from llm.model_router import pick_model_for_tier  # noqa: E402
-from utils.telemetry import setup_tracing  # noqa: E402
+from llm.model_router import pick_model_for_tier, prefetch_available_models  # noqa: E402
+from utils.telemetry import setup_metrics, setup_tracing  # noqa: E402
 from utils.i18n import tr  # noqa: E402
 from constants.keys import StateKeys  # noqa: E402
 from state import ensure_state  # noqa: E402
@@ -86,6 +86,7 @@ APP_VERSION = "1.2.0"
 WIZARD_ID = "guidedflow"
 USE_FORM_PANEL_FADE = False
 setup_tracing()
+setup_metrics()
 
 # --- Page config early (keine doppelten Titel/Icon-Resets) ---
 st.set_page_config(
@@ -104,18 +105,26 @@ st.session_state[StateKeys.WIZARD_STEP_FORM_FADE] = USE_FORM_PANEL_FADE
 
 MODEL_MAP = cast(dict[str, str] | None, st.session_state.get("model_map"))
 MODEL_TIERS = ("FAST", "QUALITY", "LONG_CONTEXT")
+
+
+def _build_router_client() -> OpenAI:
+    return OpenAI(
+        api_key=OPENAI_API_KEY or None,
+        base_url=OPENAI_BASE_URL or None,
+        organization=OPENAI_ORGANIZATION or None,
+        project=OPENAI_PROJECT or None,
+    )
+
+
 if LLM_ENABLED:
+    # Runs once per worker process; sessions then read the cached model list.
+    prefetch_available_models(_build_router_client)
     if MODEL_MAP is None:
         MODEL_MAP = {}
         st.session_state["model_map"] = MODEL_MAP
     if not MODEL_MAP or any(tier not in MODEL_MAP for tier in MODEL_TIERS):
         try:
-            router_client = OpenAI(
-                api_key=OPENAI_API_KEY or None,
-                base_url=OPENAI_BASE_URL or None,
-                organization=OPENAI_ORGANIZATION or None,
-                project=OPENAI_PROJECT or None,
-            )
+            router_client = _build_router_client()
             for tier in MODEL_TIERS:
                 if tier in MODEL_MAP:
                     continue
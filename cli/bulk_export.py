@@ -0,0 +1,77 @@
+"""Stream many saved profiles or snapshots into one NDJSON, CSV or Parquet file.
+
+Inputs are JSON files (one profile or autosave snapshot each), NDJSON files
+(``.jsonl``/``.ndjson``, one per line) or directories containing them. Items
+are read and exported one at a time, so memory stays flat regardless of the
+number of vacancies::
+
+    python -m cli.bulk_export --format parquet --out vacancies.parquet exports/
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+_NDJSON_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+def _iter_files(paths: Iterable[str]) -> Iterator[Path]:
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            yield from sorted(
+                child for child in path.rglob("*") if child.suffix in _NDJSON_SUFFIXES | {".json"} and child.is_file()
+            )
+        elif path.exists():
+            yield path
+        else:
+            raise SystemExit(f"Input not found: {path}")
+
+
+def iter_items(paths: Iterable[str]) -> Iterator[Any]:
+    """Yield profiles and snapshots from ``paths`` lazily."""
+
+    for path in _iter_files(paths):
+        if path.suffix in _NDJSON_SUFFIXES:
+            with path.open(encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            yield json.loads(path.read_text(encoding="utf-8"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="JSON/NDJSON files or directories")
+    parser.add_argument("--out", required=True, help="Destination file")
+    parser.add_argument("--format", choices=["ndjson", "csv", "parquet"], default="ndjson")
+    parser.add_argument("--artifact", default=None, help="Artifact key used to evaluate open decisions")
+    parser.add_argument("--warnings", action="store_true", help="Add a column with export warnings")
+    parser.add_argument("--skip-invalid", action="store_true", help="Skip items that fail validation")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per Parquet record batch")
+    args = parser.parse_args(argv)
+
+    from exports.bulk import export_profiles
+
+    options: dict[str, Any] = {
+        "artifact_key": args.artifact,
+        "include_warnings": args.warnings,
+        "on_error": "skip" if args.skip_invalid else "raise",
+    }
+    if args.format == "parquet":
+        options["batch_size"] = args.batch_size
+    stats = export_profiles(iter_items(args.inputs), args.out, args.format, **options)
+    print(f"Wrote {stats.written} record(s) to {args.out}; skipped {stats.skipped}.", file=sys.stderr)
+    for error in stats.errors:
+        print(f"  {error}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -583,6 +583,34 @@ def _render_summary(
             )
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _stored_skill_demand(skills: tuple[str, ...], country: str | None) -> tuple[int, dict[str, float]]:
+    from pipelines.vacancy_store import get_vacancy_store
+
+    store = get_vacancy_store()
+    if store is None:
+        return 0, {}
+    try:
+        return store.skill_demand(skills, country=country)
+    except Exception:  # noqa: BLE001 - the store is optional analytics
+        return 0, {}
+
+
+def _render_stored_demand(skills: Sequence[str], *, lang: str, location: Mapping[str, object] | None) -> None:
+    country = str(location.get("country", "") or "").strip() if isinstance(location, Mapping) else ""
+    total, shares = _stored_skill_demand(tuple(skills), country or None)
+    if not total or not shares:
+        return
+    ranked = sorted(shares.items(), key=lambda item: item[1], reverse=True)
+    st.caption(
+        tr(
+            "Nachfrage in {total} gespeicherten Stellen: {skills}",
+            "Demand across {total} stored vacancies: {skills}",
+            lang=lang,
+        ).format(total=total, skills=", ".join(f"{skill} {share:.0%}" for skill, share in ranked))
+    )
+
+
 def render_skill_market_insights(
     skills: Mapping[str, Sequence[str]] | Sequence[str],
     *,
@@ -701,3 +729,4 @@ def render_skill_market_insights(
         lang=lang_code,
         location=location,
     )
+    _render_stored_demand(selected_skills, lang=lang_code, location=location)
@@ -67,6 +67,8 @@ class UIKeys:
     DEBUG_PANEL = "ui.debug.panel"
     DEBUG_DETAILS = "ui.debug.details"
     DEBUG_API_MODE = "ui.debug.api_mode"
+    DEBUG_PROFILE_RERUN = "ui.debug.profile_rerun"
+    DEBUG_PROFILE_PIPELINES = "ui.debug.profile_pipelines"
     SUMMARY_POSITION_REPORTING_MANAGER_NAME = "ui.summary.position.reporting_manager_name"
     CONTACT_POSITION_REPORTING_MANAGER_NAME = "ui.contact.position.reporting_manager_name"
     SOURCE_CONTEXT = "ui.source.context"
@@ -313,6 +315,9 @@ class StateKeys:
     WIZARD_NAVIGATION_WARNING = "wizard.navigation_warning"
     WIZARD_STEP_UI_KEYS = "wizard.step_ui_keys"
     WIZARD_LAST_STEP = "wizard.last_step"
+    WIZARD_PREFETCH_STEP = "wizard.prefetch_step"
+    SUMMARY_ARTIFACT_RUN = "wizard.summary_artifact_run"
+    VACANCY_STORE_REVISION = "wizard.vacancy_store_revision"
     WIZARD_LAST_COMPONENT = "wizard.last_component"
     WIZARD_LAST_ERROR = "wizard.last_error"
     STEP_FAILURES = "wizard.step_failures"
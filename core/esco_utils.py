@@ -25,6 +25,7 @@ from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
 import requests
 
 from config_loader import load_json
+from utils.circuit_breaker import CallOutcome, CircuitOpenError, get_breaker
 
 try:  # pragma: no cover - optional Streamlit caching
     import streamlit as st
@@ -100,6 +101,16 @@ def _is_transient_request_error(exc: requests.RequestException) -> bool:
     return False
 
 
+def _classify_esco_outcome(exc: BaseException) -> CallOutcome:
+    """Map ESCO request errors to circuit breaker outcomes."""
+
+    if isinstance(exc, requests.HTTPError) and exc.response is not None and exc.response.status_code == 429:
+        return CallOutcome.OVERLOAD
+    if isinstance(exc, requests.RequestException):
+        return CallOutcome.FAILURE if _is_transient_request_error(exc) else CallOutcome.SUCCESS
+    return CallOutcome.IGNORED
+
+
 def _mark_local_fallback_used() -> None:
     """Record that ESCO network data was unavailable and offline data was used."""
 
@@ -120,14 +131,20 @@ def _fetch_json(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
     """Execute a GET request and return the parsed JSON payload."""
 
     endpoint = url.rsplit("/", 1)[-1]
+    breaker = get_breaker("esco")
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            response = _SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            with breaker.guard(classify=_classify_esco_outcome):
+                response = _SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
             try:
                 return response.json()
             except json.JSONDecodeError as exc:  # pragma: no cover - defensive
                 raise EscoServiceError("Invalid JSON from ESCO API") from exc
+        except CircuitOpenError as exc:
+            # Another session already found ESCO down; use offline data at once.
+            log.warning("ESCO GET skipped endpoint=%s circuit=%s", endpoint, exc.reason)
+            raise EscoServiceError(f"ESCO unavailable endpoint={endpoint}") from exc
         except requests.RequestException as exc:
             transient = _is_transient_request_error(exc)
             status_code = exc.response.status_code if isinstance(exc, requests.HTTPError) and exc.response else None
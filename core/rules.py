@@ -349,12 +349,13 @@ def apply_rules(
     missing_optional = sorted(field for field in _OPTIONAL_RULE_FIELDS if field not in matches)
     if existing_profile is not None:
         missing_optional = [field for field in missing_optional if not _path_exists(existing_profile, field)]
-    for field in missing_optional:
-        LOGGER.info(
-            "apply_rules: optional field not found: %s",
-            field,
-            extra={"field": field, "required": False},
-        )
+    if missing_optional and LOGGER.isEnabledFor(logging.DEBUG):
+        for field in missing_optional:
+            LOGGER.debug(
+                "apply_rules: optional field not found: %s",
+                field,
+                extra={"field": field, "required": False},
+            )
     return matches
 
 
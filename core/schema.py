@@ -58,6 +58,9 @@ from core.esco_utils import lookup_esco_skill
 
 from .validators import deduplicate_preserve_order, ensure_canonical_keys
 from llm.json_repair import repair_profile_payload
+from utils.metrics import record_cache_lookup
+
+from .schema_repair import repair_validation_errors
 
 
 ALLOWED_STRING_FORMATS: set[str] = {"email", "date-time", "date", "time", "uuid"}
@@ -1752,11 +1755,48 @@ def merge_profile_with_defaults(data: Mapping[str, Any] | None) -> dict[str, Any
     return skeleton
 
 
+_LOCAL_REPAIR_PASSES = 3
+
+
+@lru_cache(maxsize=1)
+def _profile_validation_schema() -> dict[str, Any]:
+    return NeedAnalysisProfile.model_json_schema()
+
+
+def _repair_profile_locally(
+    payload: dict[str, Any], error: ValidationError
+) -> tuple[dict[str, Any], NeedAnalysisProfile | None, ValidationError]:
+    """Fix mechanical validation errors without a model call.
+
+    Each pass can surface new errors (a string wrapped into an object is
+    validated field by field on the next pass), so a few passes are made.
+    Returns the repaired payload, the profile when it now validates, and the
+    last validation error otherwise.
+    """
+
+    schema = _profile_validation_schema()
+    for _ in range(_LOCAL_REPAIR_PASSES):
+        repair = repair_validation_errors(payload, error.errors(), schema)
+        if not repair.changed:
+            break
+        payload = repair.payload
+        try:
+            profile = NeedAnalysisProfile.model_validate(payload)
+        except ValidationError as exc:
+            error = exc
+            continue
+        logger.info("Repaired %d NeedAnalysisProfile validation error(s) locally.", len(repair.applied))
+        return payload, profile, error
+    return payload, None, error
+
+
 def coerce_and_fill(data: Mapping[str, Any] | None) -> NeedAnalysisProfile:
     """Validate ``data`` and ensure required fields are present.
 
     Incoming payloads are canonicalised so that alias keys, obvious type
     mismatches and stray fields are handled in a single place before validation.
+    Remaining mechanical errors are repaired locally against the JSON schema;
+    only what is left after that goes to the LLM repair fallback.
     """
 
     payload = canonicalize_profile_payload(data)
@@ -1766,16 +1806,17 @@ def coerce_and_fill(data: Mapping[str, Any] | None) -> NeedAnalysisProfile:
     try:
         profile = NeedAnalysisProfile.model_validate(payload)
     except ValidationError as exc:
-        repaired_payload = repair_profile_payload(payload, errors=exc.errors())
-        if not repaired_payload:
-            raise
-        canonical_repaired = canonicalize_profile_payload(repaired_payload)
-        try:
+        payload, local_profile, remaining = _repair_profile_locally(payload, exc)
+        record_cache_lookup("json_repair", hit=local_profile is not None)
+        if local_profile is not None:
+            profile = local_profile
+        else:
+            repaired_payload = repair_profile_payload(payload, errors=remaining.errors())
+            if not repaired_payload:
+                raise remaining from exc
+            canonical_repaired = canonicalize_profile_payload(repaired_payload)
             profile = NeedAnalysisProfile.model_validate(canonical_repaired)
-        except ValidationError:
-            raise
-        logger.info("Repaired NeedAnalysisProfile payload via JSON repair fallback.")
-        payload = canonical_repaired
+            logger.info("Repaired NeedAnalysisProfile payload via JSON repair fallback.")
 
     normalized_payload: NormalizedProfilePayload = normalize_profile(profile)
     normalized_payload = _ensure_placeholder_strings(normalized_payload)
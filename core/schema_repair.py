@@ -0,0 +1,526 @@
+"""Deterministic, schema-guided repair of pydantic validation errors.
+
+Most validation failures of extracted profiles are mechanical: a number
+where a string is expected, a comma separated string instead of a list, a
+malformed e-mail address or an enum value in the wrong case. The LLM repair
+fallback fixes those too, but costs a full model round-trip per profile.
+
+:func:`repair_validation_errors` walks the JSON schema of the model along the
+``loc`` of every pydantic error and applies a typed coercion or a pruning
+rule in place. Errors it cannot resolve are returned unchanged so callers can
+hand only those to the LLM.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Mapping, Sequence
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+_TRUE_TOKENS = frozenset({"true", "yes", "y", "ja", "j", "1", "x", "on", "wahr"})
+_FALSE_TOKENS = frozenset({"false", "no", "n", "nein", "0", "off", "falsch", "-"})
+_LIST_SEPARATORS = ("\n", ";", "•", ",")
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s*")
+_NUMBER_RE = re.compile(r"[-+]?\d[\d.,' ]*")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}")
+_DOMAIN_RE = re.compile(r"^(?:www\.)?[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}(?:[/?#]\S*)?$")
+_ENUM_KEY_RE = re.compile(r"[\s_-]+")
+
+_TYPE_ERRORS = frozenset(
+    {
+        "string_type",
+        "int_type",
+        "int_parsing",
+        "int_from_float",
+        "float_type",
+        "float_parsing",
+        "bool_type",
+        "bool_parsing",
+        "list_type",
+    }
+)
+_OBJECT_ERRORS = frozenset({"model_type", "model_attributes_type", "dict_type"})
+_ENUM_ERRORS = frozenset({"literal_error", "enum"})
+_BOUND_ERRORS = frozenset({"greater_than", "greater_than_equal", "less_than", "less_than_equal"})
+_URL_ERRORS = frozenset({"url_parsing", "url_scheme", "url_type", "url_syntax_violation", "url_too_long"})
+
+
+@dataclass
+class SchemaRepairResult:
+    """Outcome of a local repair pass."""
+
+    payload: dict[str, Any]
+    applied: list[str] = field(default_factory=list)
+    unresolved: list[Mapping[str, Any]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.applied)
+
+
+def repair_validation_errors(
+    payload: Mapping[str, Any],
+    errors: Sequence[Mapping[str, Any]],
+    schema: Mapping[str, Any],
+) -> SchemaRepairResult:
+    """Return a copy of ``payload`` with the mechanical ``errors`` fixed.
+
+    ``errors`` are pydantic ``ValidationError.errors()`` entries and
+    ``schema`` is the model's JSON schema. List items scheduled for removal
+    are pruned after all other fixes, highest index first, so the locations
+    of the remaining errors stay valid during the pass.
+    """
+
+    result = SchemaRepairResult(payload=deepcopy(dict(payload)))
+    prune: dict[int, tuple[list[Any], set[int]]] = {}
+    for error in errors:
+        loc = tuple(error.get("loc") or ())
+        action = _repair_one(result.payload, loc, error, schema)
+        if action is None:
+            result.unresolved.append(error)
+            continue
+        if isinstance(action, _Prune):
+            _, indices = prune.setdefault(id(action.items), (action.items, set()))
+            indices.add(action.index)
+        result.applied.append(f"{_format_loc(loc)}: {action}")
+    for items, indices in prune.values():
+        for index in sorted(indices, reverse=True):
+            del items[index]
+    if result.applied:
+        logger.debug("Locally repaired %d validation error(s): %s", len(result.applied), "; ".join(result.applied))
+    return result
+
+
+@dataclass(frozen=True)
+class _Prune:
+    items: list[Any]
+    index: int
+
+    def __str__(self) -> str:
+        return "dropped list item"
+
+
+def _format_loc(loc: tuple[Any, ...]) -> str:
+    return ".".join(str(part) for part in loc) or "<root>"
+
+
+def _repair_one(
+    payload: dict[str, Any],
+    loc: tuple[Any, ...],
+    error: Mapping[str, Any],
+    root_schema: Mapping[str, Any],
+) -> str | _Prune | None:
+    error_type = str(error.get("type") or "")
+    located = _locate(payload, loc, root_schema)
+    if located is None:
+        return None
+    container, key, node = located
+
+    if error_type == "extra_forbidden":
+        if isinstance(container, dict) and key in container:
+            del container[key]
+            return "removed unknown field"
+        return None
+
+    if error_type == "missing":
+        if not isinstance(container, dict) or key in container:
+            return None
+        filler = _empty_value(node, root_schema)
+        if filler is _MISSING:
+            return None
+        container[key] = filler
+        return "filled required field"
+
+    current = _get(container, key)
+    if current is _MISSING:
+        return None
+
+    if error_type in _TYPE_ERRORS or error_type in _ENUM_ERRORS or error_type in _URL_ERRORS:
+        value = _coerce(current, node, root_schema)
+    elif error_type in _OBJECT_ERRORS:
+        value = _coerce_object(current, node, root_schema)
+    elif error_type in _BOUND_ERRORS:
+        value = _clamp(current, error.get("ctx") or {}, error_type)
+    elif error_type == "value_error" and "email" in _formats(node, root_schema):
+        value = _coerce_email(current, node, root_schema)
+    else:
+        # Validator errors may need context the schema does not carry.
+        return None
+
+    if value is not _MISSING and value != current:
+        _set(container, key, value)
+        return f"coerced to {type(value).__name__}"
+    return _drop(container, key, node, root_schema)
+
+
+def _drop(container: Any, key: Any, node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> str | _Prune | None:
+    """Remove a value that cannot be coerced, if the schema allows it."""
+
+    if isinstance(container, list):
+        return _Prune(container, key)
+    resolved = _resolve(node, root_schema)
+    if "null" in _types(resolved, root_schema):
+        container[key] = None
+        return "reset to null"
+    if "default" in resolved:
+        container[key] = deepcopy(resolved["default"])
+        return "reset to default"
+    return None
+
+
+# -- schema navigation -----------------------------------------------------
+
+
+def _resolve(node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> Mapping[str, Any]:
+    seen = 0
+    while "$ref" in node and seen < 32:
+        ref = str(node["$ref"])
+        target: Any = root_schema
+        for part in ref.lstrip("#/").split("/"):
+            target = target.get(part, {}) if isinstance(target, Mapping) else {}
+        merged = {k: v for k, v in node.items() if k != "$ref"}
+        node = {**target, **merged}
+        seen += 1
+    return node
+
+
+def _branches(node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+    node = _resolve(node, root_schema)
+    options = node.get("anyOf") or node.get("oneOf")
+    if not options:
+        return [node]
+    branches: list[Mapping[str, Any]] = []
+    for option in options:
+        branches.extend(_branches(option, root_schema))
+    return branches
+
+
+def _types(node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> list[str]:
+    types: list[str] = []
+    for branch in _branches(node, root_schema):
+        declared = branch.get("type")
+        if isinstance(declared, list):
+            types.extend(str(item) for item in declared)
+        elif declared:
+            types.append(str(declared))
+        elif "const" in branch:
+            types.append("const")
+        elif "properties" in branch:
+            types.append("object")
+        elif "enum" in branch:
+            types.append("enum")
+    return types
+
+
+def _formats(node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> set[str]:
+    return {str(branch["format"]) for branch in _branches(node, root_schema) if "format" in branch}
+
+
+def _child(node: Mapping[str, Any], part: Any, root_schema: Mapping[str, Any]) -> Mapping[str, Any] | None:
+    for branch in _branches(node, root_schema):
+        if isinstance(part, int) and "items" in branch:
+            return branch["items"]
+        properties = branch.get("properties")
+        if isinstance(part, str) and isinstance(properties, Mapping) and part in properties:
+            return properties[part]
+        extra = branch.get("additionalProperties")
+        if isinstance(part, str) and isinstance(extra, Mapping):
+            return extra
+    return None
+
+
+def _locate(
+    payload: dict[str, Any], loc: tuple[Any, ...], root_schema: Mapping[str, Any]
+) -> tuple[Any, Any, Mapping[str, Any]] | None:
+    """Return ``(container, key, schema)`` of the value addressed by ``loc``.
+
+    Union errors carry the tag of the failed branch (``"str"``,
+    ``"list[str]"`` …) as extra ``loc`` parts; those are ignored because
+    they have no counterpart in the payload or the schema.
+    """
+
+    if not loc:
+        return None
+    node: Mapping[str, Any] = root_schema
+    container: Any = None
+    key: Any = None
+    current: Any = payload
+    for part in loc:
+        child = _child(node, part, root_schema)
+        if child is None:
+            break
+        in_object = isinstance(current, dict) and isinstance(part, str)
+        if not in_object and _get(current, part) is _MISSING:
+            return None
+        container, key, node = current, part, child
+        current = _get(container, key)
+        if current is _MISSING:
+            break
+    if container is None:
+        return None
+    return container, key, node
+
+
+def _get(container: Any, key: Any) -> Any:
+    if isinstance(container, dict):
+        return container.get(key, _MISSING)
+    if isinstance(container, list) and isinstance(key, int) and 0 <= key < len(container):
+        return container[key]
+    return _MISSING
+
+
+def _set(container: Any, key: Any, value: Any) -> None:
+    container[key] = value
+
+
+# -- coercions -------------------------------------------------------------
+
+
+def _empty_value(node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> Any:
+    types = _types(node, root_schema)
+    if "null" in types:
+        return None
+    if "string" in types:
+        return ""
+    if "array" in types:
+        return []
+    if "boolean" in types:
+        return False
+    return _MISSING
+
+
+def _coerce(value: Any, node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> Any:
+    """Return ``value`` converted to the first schema branch that accepts it."""
+
+    for branch in _branches(node, root_schema):
+        if branch.get("type") == "null":
+            continue
+        converted = _coerce_branch(value, branch, root_schema)
+        if converted is not _MISSING:
+            return converted
+    return _MISSING
+
+
+def _coerce_branch(value: Any, branch: Mapping[str, Any], root_schema: Mapping[str, Any]) -> Any:
+    if "enum" in branch or "const" in branch:
+        options = list(branch.get("enum") or [branch.get("const")])
+        return _match_enum(value, options)
+    declared = branch.get("type")
+    if declared == "string":
+        text = _to_text(value)
+        if text is _MISSING:
+            return _MISSING
+        fmt = branch.get("format")
+        if fmt == "email":
+            return _extract_email(text)
+        if fmt == "uri":
+            return _to_url(text)
+        return text
+    if declared == "integer":
+        number = _to_number(value)
+        if number is _MISSING or number != int(number):
+            return _MISSING
+        return int(number)
+    if declared == "number":
+        return _to_number(value)
+    if declared == "boolean":
+        return _to_bool(value)
+    if declared == "array":
+        items = _to_list(value)
+        if items is _MISSING:
+            return _MISSING
+        item_schema = branch.get("items") or {}
+        coerced: list[Any] = []
+        for item in items:
+            converted = (
+                _coerce(item, item_schema, root_schema) if _needs_coercion(item, item_schema, root_schema) else item
+            )
+            if converted is not _MISSING:
+                coerced.append(converted)
+        return coerced
+    if declared == "object" or "properties" in branch:
+        return _coerce_object(value, branch, root_schema)
+    return _MISSING
+
+
+def _needs_coercion(value: Any, node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> bool:
+    types = _types(node, root_schema)
+    checks = {
+        "string": isinstance(value, str),
+        "integer": isinstance(value, int) and not isinstance(value, bool),
+        "number": isinstance(value, (int, float)) and not isinstance(value, bool),
+        "boolean": isinstance(value, bool),
+        "array": isinstance(value, list),
+        "object": isinstance(value, dict),
+        "null": value is None,
+    }
+    return not any(checks.get(kind, False) for kind in types)
+
+
+def _coerce_object(value: Any, node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> Any:
+    """Wrap a bare string into the object's single required text field."""
+
+    if not isinstance(value, str) or not value.strip():
+        return _MISSING
+    for branch in _branches(node, root_schema):
+        properties = branch.get("properties")
+        required = branch.get("required") or []
+        if not isinstance(properties, Mapping):
+            continue
+        candidates = list(required) or [name for name in ("name", "title", "label") if name in properties]
+        if len(candidates) == 1 and "string" in _types(properties.get(candidates[0], {}), root_schema):
+            return {candidates[0]: value.strip()}
+    return _MISSING
+
+
+def _to_text(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+    if isinstance(value, (list, tuple)):
+        parts = [_to_text(item) for item in value]
+        texts = [part for part in parts if isinstance(part, str) and part]
+        if len(texts) != len(parts):
+            return _MISSING
+        return ", ".join(texts)
+    if isinstance(value, dict):
+        for name in ("name", "title", "label", "value", "text"):
+            if isinstance(value.get(name), str):
+                return value[name].strip()
+    return _MISSING
+
+
+def _to_number(value: Any) -> Any:
+    if isinstance(value, bool):
+        return _MISSING
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, (list, tuple)) and len(value) == 1:
+        return _to_number(value[0])
+    if not isinstance(value, str):
+        return _MISSING
+    text = value.strip().lower()
+    match = _NUMBER_RE.search(text)
+    if match is None:
+        return _MISSING
+    digits = match.group(0).strip().replace("'", "").replace(" ", "")
+    multiplier = 1000 if re.match(r"\s*k\b", text[match.end() :]) else 1
+    if "," in digits and "." in digits:
+        # The separator that comes last is the decimal separator.
+        if digits.rfind(",") > digits.rfind("."):
+            digits = digits.replace(".", "").replace(",", ".")
+        else:
+            digits = digits.replace(",", "")
+    elif "," in digits or "." in digits:
+        separator = "," if "," in digits else "."
+        head, _, tail = digits.rpartition(separator)
+        if len(tail) == 3 and (digits.count(separator) > 1 or multiplier == 1):
+            digits = digits.replace(separator, "")  # thousands separator: 50.000 / 50,000
+        else:
+            digits = head.replace(separator, "") + "." + tail
+    try:
+        number = float(digits) * multiplier
+    except ValueError:
+        return _MISSING
+    return int(number) if number.is_integer() else number
+
+
+def _to_bool(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        token = value.strip().lower().rstrip(".!")
+        if token in _TRUE_TOKENS:
+            return True
+        if token in _FALSE_TOKENS:
+            return False
+    return _MISSING
+
+
+def _to_list(value: Any) -> Any:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (tuple, set, frozenset)):
+        return list(value)
+    if isinstance(value, dict):
+        return [item for item in value.values() if item not in (None, "")]
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return []
+        for separator in _LIST_SEPARATORS:
+            if separator in text:
+                parts = [_BULLET_RE.sub("", part).strip() for part in text.split(separator)]
+                return [part for part in parts if part]
+        return [_BULLET_RE.sub("", text).strip()]
+    if value is None:
+        return []
+    return [value]
+
+
+def _match_enum(value: Any, options: list[Any]) -> Any:
+    if value in options:
+        return value
+    if not isinstance(value, str):
+        return _MISSING
+    key = _ENUM_KEY_RE.sub("_", value.strip().lower())
+    for option in options:
+        if isinstance(option, str) and _ENUM_KEY_RE.sub("_", option.lower()) == key:
+            return option
+    return _MISSING
+
+
+def _extract_email(text: str) -> Any:
+    match = _EMAIL_RE.search(text.replace("mailto:", ""))
+    return match.group(0) if match else _MISSING
+
+
+def _coerce_email(value: Any, node: Mapping[str, Any], root_schema: Mapping[str, Any]) -> Any:
+    text = _to_text(value)
+    if isinstance(text, str):
+        email = _extract_email(text)
+        if email is not _MISSING and email != value:
+            return email
+    # ``Company.contact_email`` accepts the empty string instead of null.
+    for branch in _branches(node, root_schema):
+        if branch.get("const") == "":
+            return ""
+    return _MISSING
+
+
+def _to_url(text: str) -> Any:
+    candidate = text.strip().strip("<>").split()[0] if text.strip() else ""
+    if candidate.lower().startswith(("http://", "https://")):
+        return candidate
+    if _DOMAIN_RE.match(candidate):
+        return f"https://{candidate}"
+    return _MISSING
+
+
+def _clamp(value: Any, ctx: Mapping[str, Any], error_type: str) -> Any:
+    number = _to_number(value)
+    if number is _MISSING:
+        return _MISSING
+    if error_type.startswith("less_than"):
+        limit = ctx.get("lt", ctx.get("le"))
+        # Percentages on a 0..1 scale: 85 -> 0.85.
+        if isinstance(limit, (int, float)) and limit == 1 and 1 < number <= 100:
+            return number / 100
+        return limit if error_type == "less_than_equal" else _MISSING
+    limit = ctx.get("gt", ctx.get("ge"))
+    return limit if error_type == "greater_than_equal" else _MISSING
+
+
+__all__ = ["SchemaRepairResult", "repair_validation_errors"]
@@ -64,6 +64,7 @@ __all__ = [
     "get_responsibility_suggestions",
     "get_benefit_suggestions",
     "get_onboarding_suggestions",
+    "get_missing_esco_skills_from_state",
     "get_static_benefit_shortlist",
 ]
 
@@ -198,7 +199,9 @@ _CERTIFICATE_KEYWORDS = (
 )
 
 
-def _fetch_missing_esco_skills_from_state() -> List[str]:
+def get_missing_esco_skills_from_state() -> List[str]:
+    """Return the ESCO skills flagged as missing in the current session."""
+
     try:
         import streamlit as st  # type: ignore
         from constants.keys import StateKeys
@@ -323,7 +326,7 @@ def get_skill_suggestions(
 
         missing_pool = [
             str(term).strip() for term in (missing_skills or []) if str(term).strip()
-        ] or _fetch_missing_esco_skills_from_state()
+        ] or get_missing_esco_skills_from_state()
         for item in missing_pool:
             _process_esco_skill(item, is_missing=True)
 
@@ -0,0 +1,305 @@
+"""Streaming bulk export of many profiles to NDJSON, CSV or Parquet.
+
+The per-session exports in :mod:`utils.export` build one document in memory.
+For analytics pulls across thousands of vacancies the helpers here consume an
+iterator of profiles or autosave snapshots, convert one item at a time with
+:func:`~exports.transform.build_v2_export_payload` and
+:func:`~exports.transform.ensure_export_payload`, and write it straight to the
+destination. NDJSON and CSV keep a single record in memory; Parquet buffers at
+most ``batch_size`` rows per Arrow record batch.
+
+CSV and Parquet columns are the canonical paths from
+:func:`~exports.transform.iter_export_fields`. Parquet requires the optional
+``pyarrow`` package.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from core.schema import RecruitingWizard
+
+from .transform import WizardExportField, build_v2_export_payload, ensure_export_payload, iter_export_fields
+
+logger = logging.getLogger(__name__)
+
+OnError = Literal["raise", "skip"]
+
+WARNINGS_COLUMN = "warnings"
+_MAX_RECORDED_ERRORS = 20
+
+
+class BulkExportFormat(StrEnum):
+    """Supported bulk export formats."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+@dataclass
+class BulkExportStats:
+    """Counts of a bulk export; ``errors`` keeps the first few failure messages."""
+
+    written: int = 0
+    skipped: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def _profile_of(item: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Return the profile of an autosave snapshot, or ``item`` itself."""
+
+    candidate = item.get("profile")
+    if "profile" in item and isinstance(candidate, Mapping):
+        return candidate
+    return item
+
+
+def iter_export_records(
+    items: Iterable[Mapping[str, Any] | RecruitingWizard],
+    *,
+    artifact_key: str | None = None,
+    include_warnings: bool = False,
+    on_error: OnError = "raise",
+    stats: BulkExportStats | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Lazily yield canonical export payloads for ``items``.
+
+    Items may be profiles, autosave snapshots or ``RecruitingWizard`` models.
+    With ``on_error="skip"`` items that fail validation are counted in
+    ``stats`` and skipped instead of aborting the export.
+    """
+
+    stats = stats if stats is not None else BulkExportStats()
+    for index, item in enumerate(items):
+        warnings: list[Any]
+        try:
+            if isinstance(item, RecruitingWizard):
+                record, warnings = ensure_export_payload(item), []
+            elif not isinstance(item, Mapping):
+                raise TypeError(f"expected a profile mapping, got {type(item).__name__}")
+            else:
+                prepared = build_v2_export_payload(_profile_of(item), artifact_key=artifact_key)
+                warnings = prepared.get("warnings") or []
+                record = ensure_export_payload(prepared)
+        except Exception as exc:
+            if on_error == "raise":
+                raise
+            stats.skipped += 1
+            if len(stats.errors) < _MAX_RECORDED_ERRORS:
+                stats.errors.append(f"item {index}: {exc}")
+            logger.debug("Skipping bulk export item %s", index, exc_info=True)
+            continue
+        if include_warnings:
+            record[WARNINGS_COLUMN] = list(warnings)
+        stats.written += 1
+        yield record
+
+
+def export_columns(*, include_warnings: bool = False) -> list[str]:
+    """Return the CSV/Parquet column names."""
+
+    columns = [export_field.path for export_field in iter_export_fields()]
+    if include_warnings:
+        columns.append(WARNINGS_COLUMN)
+    return columns
+
+
+def _get_path(record: Mapping[str, Any], path: str) -> Any:
+    current: Any = record
+    for part in path.split("."):
+        if not isinstance(current, Mapping):
+            return None
+        current = current.get(part)
+    return current
+
+
+def _cell(value: Any, *, is_collection: bool) -> Any:
+    """Return ``value`` as a flat cell: scalars unchanged, lists kept, objects as JSON."""
+
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if is_collection and isinstance(value, list):
+        return [item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in value]
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def flatten_export_record(
+    record: Mapping[str, Any],
+    fields: Iterable[WizardExportField] | None = None,
+    *,
+    include_warnings: bool = False,
+) -> dict[str, Any]:
+    """Flatten a canonical export payload to one value per export field path."""
+
+    row = {
+        export_field.path: _cell(_get_path(record, export_field.path), is_collection=export_field.is_collection)
+        for export_field in (fields if fields is not None else iter_export_fields())
+    }
+    if include_warnings:
+        row[WARNINGS_COLUMN] = list(record.get(WARNINGS_COLUMN) or [])
+    return row
+
+
+def write_ndjson(
+    items: Iterable[Mapping[str, Any] | RecruitingWizard],
+    out: IO[str],
+    *,
+    artifact_key: str | None = None,
+    include_warnings: bool = False,
+    on_error: OnError = "raise",
+) -> BulkExportStats:
+    """Write one compact JSON document per line to ``out``."""
+
+    stats = BulkExportStats()
+    records = iter_export_records(
+        items, artifact_key=artifact_key, include_warnings=include_warnings, on_error=on_error, stats=stats
+    )
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+    return stats
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else value
+
+
+def write_csv(
+    items: Iterable[Mapping[str, Any] | RecruitingWizard],
+    out: IO[str],
+    *,
+    artifact_key: str | None = None,
+    include_warnings: bool = False,
+    on_error: OnError = "raise",
+) -> BulkExportStats:
+    """Write a flattened CSV with one column per export field path.
+
+    List cells are JSON arrays so they can be parsed back without ambiguity.
+    """
+
+    stats = BulkExportStats()
+    fields = tuple(iter_export_fields())
+    writer = csv.writer(out)
+    writer.writerow(export_columns(include_warnings=include_warnings))
+    records = iter_export_records(
+        items, artifact_key=artifact_key, include_warnings=include_warnings, on_error=on_error, stats=stats
+    )
+    for record in records:
+        row = flatten_export_record(record, fields, include_warnings=include_warnings)
+        writer.writerow([_csv_value(value) for value in row.values()])
+    return stats
+
+
+def _arrow_type(export_field: WizardExportField) -> Any:
+    import pyarrow as pa
+
+    if export_field.is_collection:
+        return pa.list_(pa.string())
+    python_type = export_field.python_type
+    if python_type == "bool | None":
+        return pa.bool_()
+    if python_type == "int | None":
+        return pa.int64()
+    if python_type == "float | None":
+        return pa.float64()
+    return pa.string()
+
+
+def parquet_schema(*, include_warnings: bool = False) -> Any:
+    """Return the Arrow schema used for Parquet exports."""
+
+    try:
+        import pyarrow as pa
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("Parquet export requires the optional 'pyarrow' package") from exc
+
+    columns = [pa.field(export_field.path, _arrow_type(export_field)) for export_field in iter_export_fields()]
+    if include_warnings:
+        columns.append(pa.field(WARNINGS_COLUMN, pa.list_(pa.string())))
+    return pa.schema(columns)
+
+
+def _arrow_value(value: Any, arrow_type: Any) -> Any:
+    import pyarrow as pa
+
+    if value is None or pa.types.is_list(arrow_type):
+        return value
+    if pa.types.is_string(arrow_type) and not isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else str(value)
+    return value
+
+
+def write_parquet(
+    items: Iterable[Mapping[str, Any] | RecruitingWizard],
+    destination: str | Path | IO[bytes],
+    *,
+    artifact_key: str | None = None,
+    include_warnings: bool = False,
+    on_error: OnError = "raise",
+    batch_size: int = 1000,
+) -> BulkExportStats:
+    """Write a Parquet file, converting at most ``batch_size`` rows per record batch."""
+
+    schema = parquet_schema(include_warnings=include_warnings)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    stats = BulkExportStats()
+    fields = tuple(iter_export_fields())
+    types = [(schema_field.name, schema_field.type) for schema_field in schema]
+    batch_size = max(1, batch_size)
+    records = iter_export_records(
+        items, artifact_key=artifact_key, include_warnings=include_warnings, on_error=on_error, stats=stats
+    )
+    with pq.ParquetWriter(destination, schema) as writer:
+        rows: list[dict[str, Any]] = []
+        for record in records:
+            row = flatten_export_record(record, fields, include_warnings=include_warnings)
+            rows.append({name: _arrow_value(row.get(name), arrow_type) for name, arrow_type in types})
+            if len(rows) >= batch_size:
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                rows = []
+        if rows:
+            writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+    return stats
+
+
+def export_profiles(
+    items: Iterable[Mapping[str, Any] | RecruitingWizard],
+    destination: str | Path,
+    fmt: BulkExportFormat | str,
+    **options: Any,
+) -> BulkExportStats:
+    """Stream ``items`` to ``destination`` in ``fmt``; see the ``write_*`` helpers for ``options``."""
+
+    export_format = BulkExportFormat(fmt)
+    if export_format is BulkExportFormat.PARQUET:
+        return write_parquet(items, destination, **options)
+    with Path(destination).open("w", encoding="utf-8", newline="") as handle:
+        if export_format is BulkExportFormat.CSV:
+            return write_csv(items, handle, **options)
+        return write_ndjson(items, handle, **options)
+
+
+__all__ = [
+    "BulkExportFormat",
+    "BulkExportStats",
+    "export_columns",
+    "export_profiles",
+    "flatten_export_record",
+    "iter_export_records",
+    "parquet_schema",
+    "write_csv",
+    "write_ndjson",
+    "write_parquet",
+]
@@ -6,48 +6,38 @@ from typing import Any, Mapping
 
 from config import get_active_verbosity
 from config.models import ModelTask, get_model_for
-from exports.transform import build_v2_export_payload
 from openai_utils import call_chat_api
 from prompts import prompt_registry
 from schemas import INTERVIEW_GUIDE_SCHEMA
 
-__all__ = ["generate_interview_guide"]
+from .payload import prepare_generation_payloads
 
+__all__ = ["INTERVIEW_GUIDE_ARTIFACT_KEY", "build_interview_guide_request", "generate_interview_guide"]
 
-def _inject_esco_references(payload: dict[str, Any]) -> dict[str, Any]:
-    """Attach optional machine-readable ESCO references for downstream tooling."""
-
-    position_raw = payload.get("position")
-    requirements_raw = payload.get("requirements")
-    position: Mapping[str, Any] = position_raw if isinstance(position_raw, Mapping) else {}
-    requirements: Mapping[str, Any] = requirements_raw if isinstance(requirements_raw, Mapping) else {}
-    refs = {
-        "occupation": {
-            "label": position.get("occupation_label"),
-            "uri": position.get("occupation_uri"),
-            "group": position.get("occupation_group"),
-        },
-        "skill_mappings": requirements.get("skill_mappings"),
-    }
-    meta_raw = payload.get("meta")
-    meta: dict[str, Any] = dict(meta_raw) if isinstance(meta_raw, Mapping) else {}
-    meta["esco_references"] = refs
-    payload["meta"] = meta
-    return payload
+# Export artifact key used for decision filtering.
+INTERVIEW_GUIDE_ARTIFACT_KEY = "interview_guide"
 
 
 def _prepare_interview_payload(vacancy_json: Mapping[str, Any]) -> dict[str, Any]:
     """Apply V2 export decision filtering before prompting the model."""
 
-    prepared = build_v2_export_payload(vacancy_json, artifact_key="interview_guide")
-    return _inject_esco_references(prepared)
+    return prepare_generation_payloads(vacancy_json, [INTERVIEW_GUIDE_ARTIFACT_KEY])[INTERVIEW_GUIDE_ARTIFACT_KEY]
 
 
-def generate_interview_guide(vacancy_json: Mapping[str, Any], lang: str) -> Any:
-    """Generate an interview guide JSON payload for a vacancy."""
+def build_interview_guide_request(
+    vacancy_json: Mapping[str, Any],
+    lang: str,
+    *,
+    prepared_payload: Mapping[str, Any] | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Return the messages and ``call_chat_api`` options for an interview guide.
+
+    ``prepared_payload`` skips the export preparation when the caller already
+    ran :func:`generators.payload.prepare_generation_payloads`.
+    """
 
     locale = str(lang or "de")
-    export_payload = _prepare_interview_payload(vacancy_json)
+    export_payload = prepared_payload if prepared_payload is not None else _prepare_interview_payload(vacancy_json)
     system = {
         "role": "system",
         "content": prompt_registry.get(
@@ -60,11 +50,23 @@ def generate_interview_guide(vacancy_json: Mapping[str, Any], lang: str) -> Any:
         "role": "user",
         "content": f"Sprache: {lang}\nProfil:\n{export_payload}",
     }
-    return call_chat_api(
-        messages=[system, user],
-        model=get_model_for(ModelTask.INTERVIEW_GUIDE),
-        temperature=0.3,
-        json_schema={"name": "InterviewGuide", "schema": INTERVIEW_GUIDE_SCHEMA},
-        task=ModelTask.INTERVIEW_GUIDE,
-        verbosity=get_active_verbosity(),
-    )
+    options: dict[str, Any] = {
+        "model": get_model_for(ModelTask.INTERVIEW_GUIDE),
+        "temperature": 0.3,
+        "json_schema": {"name": "InterviewGuide", "schema": INTERVIEW_GUIDE_SCHEMA},
+        "task": ModelTask.INTERVIEW_GUIDE,
+        "verbosity": get_active_verbosity(),
+    }
+    return [system, user], options
+
+
+def generate_interview_guide(
+    vacancy_json: Mapping[str, Any],
+    lang: str,
+    *,
+    prepared_payload: Mapping[str, Any] | None = None,
+) -> Any:
+    """Generate an interview guide JSON payload for a vacancy."""
+
+    messages, options = build_interview_guide_request(vacancy_json, lang, prepared_payload=prepared_payload)
+    return call_chat_api(messages=messages, **options)
@@ -7,13 +7,17 @@ from typing import Any, Mapping, Sequence
 
 from config import get_active_verbosity
 from config.models import ModelTask, get_model_for
-from exports.transform import build_v2_export_payload
 from openai_utils import call_chat_api
 from openai_utils.api import ChatCallResult
 from prompts import prompt_registry
 from schemas import JOB_AD_SCHEMA
 
-__all__ = ["generate_job_ad"]
+from .payload import prepare_generation_payloads
+
+__all__ = ["JOB_AD_ARTIFACT_KEY", "build_job_ad_request", "finalize_job_ad", "generate_job_ad"]
+
+# Export artifact key used for decision filtering.
+JOB_AD_ARTIFACT_KEY = "job_ad_markdown"
 
 
 def _normalized_text(value: Any) -> str:
@@ -28,33 +32,10 @@ def _sequence_has_content(values: Any) -> bool:
     return any(_normalized_text(item) for item in values)
 
 
-def _inject_esco_references(payload: dict[str, Any]) -> dict[str, Any]:
-    """Attach optional machine-readable ESCO references for downstream tooling."""
-
-    position_raw = payload.get("position")
-    requirements_raw = payload.get("requirements")
-    position: Mapping[str, Any] = position_raw if isinstance(position_raw, Mapping) else {}
-    requirements: Mapping[str, Any] = requirements_raw if isinstance(requirements_raw, Mapping) else {}
-    refs = {
-        "occupation": {
-            "label": position.get("occupation_label"),
-            "uri": position.get("occupation_uri"),
-            "group": position.get("occupation_group"),
-        },
-        "skill_mappings": requirements.get("skill_mappings"),
-    }
-    meta_raw = payload.get("meta")
-    meta: dict[str, Any] = dict(meta_raw) if isinstance(meta_raw, Mapping) else {}
-    meta["esco_references"] = refs
-    payload["meta"] = meta
-    return payload
-
-
 def _prepare_job_ad_payload(vacancy_json: Mapping[str, Any]) -> dict[str, Any]:
     """Apply V2 export decision filtering before prompting the model."""
 
-    prepared = build_v2_export_payload(vacancy_json, artifact_key="job_ad_markdown")
-    return _inject_esco_references(prepared)
+    return prepare_generation_payloads(vacancy_json, [JOB_AD_ARTIFACT_KEY])[JOB_AD_ARTIFACT_KEY]
 
 
 def _validate_job_ad_sections(payload: Mapping[str, Any]) -> None:
@@ -110,11 +91,21 @@ def _validate_job_ad_response(result: ChatCallResult) -> None:
     _validate_job_ad_sections(payload)
 
 
-def generate_job_ad(vacancy_json: Mapping[str, Any], lang: str, tone: str = "professional") -> Any:
-    """Generate a structured job ad JSON payload."""
+def build_job_ad_request(
+    vacancy_json: Mapping[str, Any],
+    lang: str,
+    tone: str = "professional",
+    *,
+    prepared_payload: Mapping[str, Any] | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Return the messages and ``call_chat_api`` options for a job ad request.
+
+    ``prepared_payload`` skips the export preparation when the caller already
+    ran :func:`generators.payload.prepare_generation_payloads`.
+    """
 
     locale = str(lang or "de")
-    export_payload = _prepare_job_ad_payload(vacancy_json)
+    export_payload = prepared_payload if prepared_payload is not None else _prepare_job_ad_payload(vacancy_json)
     system = {
         "role": "system",
         "content": prompt_registry.get("generators.job_ad.system", locale=locale),
@@ -123,14 +114,32 @@ def generate_job_ad(vacancy_json: Mapping[str, Any], lang: str, tone: str = "pro
         "role": "user",
         "content": f"Sprache: {lang}\nTon: {tone}\nProfil:\n{export_payload}",
     }
-    result = call_chat_api(
-        messages=[system, user],
-        model=get_model_for(ModelTask.JOB_AD),
-        temperature=0.4,
-        json_schema={"name": "JobAd", "schema": JOB_AD_SCHEMA},
-        task=ModelTask.JOB_AD,
-        reasoning_effort="low",
-        verbosity=get_active_verbosity(),
-    )
+    options: dict[str, Any] = {
+        "model": get_model_for(ModelTask.JOB_AD),
+        "temperature": 0.4,
+        "json_schema": {"name": "JobAd", "schema": JOB_AD_SCHEMA},
+        "task": ModelTask.JOB_AD,
+        "reasoning_effort": "low",
+        "verbosity": get_active_verbosity(),
+    }
+    return [system, user], options
+
+
+def finalize_job_ad(result: ChatCallResult) -> ChatCallResult:
+    """Validate a job ad response and return it unchanged."""
+
     _validate_job_ad_response(result)
     return result
+
+
+def generate_job_ad(
+    vacancy_json: Mapping[str, Any],
+    lang: str,
+    tone: str = "professional",
+    *,
+    prepared_payload: Mapping[str, Any] | None = None,
+) -> Any:
+    """Generate a structured job ad JSON payload."""
+
+    messages, options = build_job_ad_request(vacancy_json, lang, tone, prepared_payload=prepared_payload)
+    return finalize_job_ad(call_chat_api(messages=messages, **options))
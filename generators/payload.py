@@ -0,0 +1,56 @@
+"""Shared payload preparation for the structured generators."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from exports.transform import build_v2_export_payload
+
+__all__ = ["build_esco_references", "inject_esco_references", "prepare_generation_payloads"]
+
+
+def build_esco_references(payload: Mapping[str, Any]) -> dict[str, Any]:
+    """Return machine-readable ESCO references for downstream tooling."""
+
+    position_raw = payload.get("position")
+    requirements_raw = payload.get("requirements")
+    position: Mapping[str, Any] = position_raw if isinstance(position_raw, Mapping) else {}
+    requirements: Mapping[str, Any] = requirements_raw if isinstance(requirements_raw, Mapping) else {}
+    return {
+        "occupation": {
+            "label": position.get("occupation_label"),
+            "uri": position.get("occupation_uri"),
+            "group": position.get("occupation_group"),
+        },
+        "skill_mappings": requirements.get("skill_mappings"),
+    }
+
+
+def inject_esco_references(payload: dict[str, Any], references: Mapping[str, Any] | None = None) -> dict[str, Any]:
+    """Attach ESCO references to ``payload['meta']`` and return ``payload``."""
+
+    meta_raw = payload.get("meta")
+    meta: dict[str, Any] = dict(meta_raw) if isinstance(meta_raw, Mapping) else {}
+    meta["esco_references"] = dict(references) if references is not None else build_esco_references(payload)
+    payload["meta"] = meta
+    return payload
+
+
+def prepare_generation_payloads(
+    vacancy_json: Mapping[str, Any], artifact_keys: Iterable[str]
+) -> dict[str, dict[str, Any]]:
+    """Return the prompt payload for each artifact key.
+
+    Export decisions are applied per artifact because unconfirmed decisions
+    only produce warnings for the artifacts they block. The ESCO references
+    do not depend on the artifact and are computed once.
+    """
+
+    payloads = {key: build_v2_export_payload(vacancy_json, artifact_key=key) for key in artifact_keys}
+    references: dict[str, Any] | None = None
+    for payload in payloads.values():
+        if references is None:
+            references = build_esco_references(payload)
+        inject_esco_references(payload, references)
+    return payloads
@@ -11,7 +11,8 @@ from typing import Any
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+
+from .html_tree import HtmlElement, class_tokens, element_text, iter_elements, parse_html
 
 _PILImage: Any
 try:  # pragma: no cover - optional dependency guard
@@ -100,13 +101,14 @@ def _resolve_url(base_url: str | None, asset_url: str | Sequence[Any] | None) ->
     return candidate
 
 
-def _score_image(tag) -> int:
+def _score_image(tag: HtmlElement) -> int:
     score = 0
     alt = tag.get("alt") or ""
     src = tag.get("src") or ""
     tag_id = tag.get("id") or ""
-    classes = " ".join(tag.get("class") or [])
-    wrapper_classes = " ".join(tag.parent.get("class") or []) if tag.parent else ""
+    classes = " ".join(class_tokens(tag))
+    parent = tag.getparent()
+    wrapper_classes = " ".join(class_tokens(parent)) if parent is not None else ""
     text_blob = " ".join((alt, src, tag_id, classes, wrapper_classes))
     if _LOGO_HINT_RE.search(text_blob):
         score += 5
@@ -124,7 +126,7 @@ def _score_image(tag) -> int:
     return score
 
 
-def _select_logo_url(soup: BeautifulSoup, base_url: str | None) -> str | None:
+def _select_logo_url(root: HtmlElement, base_url: str | None) -> str | None:
     candidates: dict[str, int] = {}
 
     def _add_candidate(raw_url: str | Sequence[Any] | None, score: int) -> None:
@@ -135,24 +137,22 @@ def _select_logo_url(soup: BeautifulSoup, base_url: str | None) -> str | None:
         if existing is None or score > existing:
             candidates[resolved] = score
 
+    metas = list(root.iter("meta"))
     for score, attr, pattern in _META_LOGO_ATTRS:
-        for tag in soup.find_all("meta", attrs={attr: pattern}):
-            content = tag.get("content")
-            _add_candidate(content, score)
+        for tag in metas:
+            value = tag.get(attr)
+            if value and pattern.search(value):
+                _add_candidate(tag.get("content"), score)
 
-    for link in soup.find_all("link"):
+    for link in root.iter("link"):
         rel = link.get("rel")
         href = link.get("href")
         if not href or not rel:
             continue
-        if isinstance(rel, Sequence) and not isinstance(rel, str):
-            rel_tokens = " ".join(str(token) for token in rel)
-        else:
-            rel_tokens = str(rel)
-        if _LOGO_HINT_RE.search(rel_tokens):
+        if _LOGO_HINT_RE.search(rel):
             _add_candidate(href, 11)
 
-    for img in soup.find_all("img"):
+    for img in root.iter("img"):
         src = img.get("src") or img.get("data-src") or img.get("data-original")
         score = _score_image(img)
         if score:
@@ -164,10 +164,11 @@ def _select_logo_url(soup: BeautifulSoup, base_url: str | None) -> str | None:
     return max(candidates.items(), key=lambda item: (item[1], item[0]))[0]
 
 
-def _extract_icon_url(soup: BeautifulSoup, base_url: str | None) -> str | None:
+def _extract_icon_url(root: HtmlElement, base_url: str | None) -> str | None:
+    links = list(root.iter("link"))
     for rel in ("apple-touch-icon", "icon", "shortcut icon"):
-        link = soup.find("link", rel=lambda value: value and rel in value.lower())
-        if link and link.get("href"):
+        link = next((item for item in links if rel in (item.get("rel") or "").lower()), None)
+        if link is not None and link.get("href"):
             resolved = _resolve_url(base_url, link.get("href"))
             if resolved:
                 return resolved
@@ -215,19 +216,24 @@ def _dominant_color(image_bytes: bytes) -> str | None:
     return f"#{r:02X}{g:02X}{b:02X}"
 
 
-def _extract_theme_color(soup: BeautifulSoup) -> str | None:
-    meta = soup.find("meta", attrs={"name": re.compile("theme-color", re.IGNORECASE)})
-    if meta and meta.get("content"):
+def _extract_theme_color(root: HtmlElement) -> str | None:
+    meta = next(
+        (tag for tag in root.iter("meta") if re.search("theme-color", tag.get("name") or "", re.IGNORECASE)),
+        None,
+    )
+    if meta is not None and meta.get("content"):
         candidate = _clean_text(meta.get("content"))
         if re.fullmatch(r"#?[0-9A-Fa-f]{6}", candidate):
             return candidate.upper() if candidate.startswith("#") else f"#{candidate.upper()}"
     return None
 
 
-def _extract_claim(soup: BeautifulSoup) -> str | None:
+def _extract_claim(root: HtmlElement) -> str | None:
     candidates: list[str] = []
-    for element in soup.find_all(["h1", "h2", "h3", "p"], limit=25):
-        text = _clean_text(element.get_text(" "))
+    for index, element in enumerate(iter_elements(root, ("h1", "h2", "h3", "p"))):
+        if index >= 25:
+            break
+        text = _clean_text(element_text(element))
         if not text:
             continue
         lowered = text.lower()
@@ -242,14 +248,21 @@ def _extract_claim(soup: BeautifulSoup) -> str | None:
 
 
 def extract_brand_assets(html: str, *, base_url: str | None = None) -> BrandAssets:
-    """Return detected branding assets from ``html``."""
+    """Return detected branding assets from ``html``.
+
+    The parse tree is shared with :func:`ingest.extractors.extract_text_from_url`
+    through :func:`ingest.html_tree.parse_html`, so detecting branding for a
+    page that was just extracted does not parse it again.
+    """
 
     if not html or not html.strip():
         return BrandAssets()
-    soup = BeautifulSoup(html, "html.parser")
-    logo_url = _select_logo_url(soup, base_url)
-    icon_url = _extract_icon_url(soup, base_url)
-    theme_color = _extract_theme_color(soup)
+    root = parse_html(html)
+    if root is None:
+        return BrandAssets()
+    logo_url = _select_logo_url(root, base_url)
+    icon_url = _extract_icon_url(root, base_url)
+    theme_color = _extract_theme_color(root)
     brand_color = theme_color
 
     if not brand_color and logo_url:
@@ -261,7 +274,7 @@ def extract_brand_assets(html: str, *, base_url: str | None = None) -> BrandAsse
         if icon_bytes:
             brand_color = _dominant_color(icon_bytes)
 
-    claim = _extract_claim(soup)
+    claim = _extract_claim(root)
 
     return BrandAssets(
         logo_url=logo_url,
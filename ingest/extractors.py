@@ -1,9 +1,17 @@
+import copy
+import hashlib
 import io
 import logging
+import os
 import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 
 import chardet
 import requests
@@ -12,6 +20,21 @@ from docx.table import Table
 from docx.text.paragraph import Paragraph
 from requests import Response
 
+from utils.circuit_breaker import CallOutcome, CircuitOpenError, get_breaker
+from utils.env import env_int
+from utils.metrics import record_cache_lookup, record_ingestion
+from utils.url_utils import check_public_url
+
+from .html_tree import (
+    HtmlElement,
+    class_tokens,
+    element_text,
+    find_first,
+    iter_elements,
+    parse_html,
+    select_first,
+    tag_name,
+)
 from .types import ContentBlock, StructuredDocument, build_plain_text_document
 
 
@@ -33,12 +56,23 @@ class _DocConversionFailedError(_DocConversionError):
     """Raised when a converter is available but the conversion failed."""
 
 
-def _fetch_url(url: str, timeout: float = 15.0) -> str:
+def _classify_fetch_outcome(exc: BaseException) -> CallOutcome:
+    """Count only transport failures against the host's circuit breaker."""
+
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return CallOutcome.FAILURE
+    return CallOutcome.IGNORED
+
+
+def _fetch_url(url: str, timeout: float = 15.0, *, public_only: bool = False) -> str:
     """Fetch raw HTML from ``url`` with timeout and custom user agent.
 
     Args:
         url: HTTP(S) URL to download.
         timeout: Timeout in seconds for the request.
+        public_only: Refuse ``url`` and every redirect target unless the host
+            resolves to public addresses only (see
+            :func:`utils.url_utils.check_public_url`).
 
     Returns:
         The response body as text.
@@ -81,12 +115,24 @@ def _fetch_url(url: str, timeout: float = 15.0) -> str:
         session.headers.update(user_agent_header)
 
         while True:
+            if public_only:
+                check_public_url(current_url, resolve=True)
+            host = urlparse(current_url).netloc.lower()
             try:
-                resp: Response = session.get(
-                    current_url,
-                    timeout=timeout,
-                    allow_redirects=False,
-                )
+                with get_breaker(f"url_fetch:{host}").guard(classify=_classify_fetch_outcome) as permit:
+                    resp: Response = session.get(
+                        current_url,
+                        timeout=timeout,
+                        allow_redirects=False,
+                    )
+                    status = getattr(resp, "status_code", None)
+                    if status == 429:
+                        permit.overload()
+                    elif isinstance(status, int) and status >= 500:
+                        permit.failure()
+            except CircuitOpenError as exc:
+                logger.warning("Skipping fetch of %s: host circuit is %s", current_url, exc.reason)
+                raise ValueError("failed to fetch URL (host temporarily unavailable)") from exc
             except requests.RequestException as exc:  # pragma: no cover - network
                 response = getattr(exc, "response", None)
                 status = getattr(response, "status_code", None)
@@ -118,11 +164,13 @@ def _fetch_url(url: str, timeout: float = 15.0) -> str:
             return resp.text
 
 
-def extract_text_from_url(url: str) -> StructuredDocument:
+def extract_text_from_url(url: str, *, public_only: bool = False) -> StructuredDocument:
     """Extract readable text content from ``url``.
 
     Args:
         url: HTTP(S) URL.
+        public_only: Only fetch from public hosts, including every redirect
+            hop. Set it for URLs supplied by untrusted API clients.
 
     Returns:
         Extracted text without markup.
@@ -130,8 +178,27 @@ def extract_text_from_url(url: str) -> StructuredDocument:
     Raises:
         ValueError: If no text could be extracted.
     """
-    html = _fetch_url(url)
-    blocks = _parse_html_blocks(html, source_url=url)
+    started = time.perf_counter()
+    html = _fetch_url(url, public_only=True) if public_only else _fetch_url(url)
+    success = False
+    try:
+        document = _document_from_html(html, url)
+        success = True
+        return document
+    finally:
+        record_ingestion(
+            "url",
+            size_bytes=len(html.encode("utf-8")),
+            seconds=time.perf_counter() - started,
+            success=success,
+        )
+
+
+def _document_from_html(html: str, url: str) -> StructuredDocument:
+    """Build the structured document for fetched ``html``."""
+
+    tree = parse_html(html)
+    blocks = _parse_html_blocks(html, source_url=url, tree=tree)
 
     doc: StructuredDocument | None = None
     text = ""
@@ -151,9 +218,11 @@ def extract_text_from_url(url: str) -> StructuredDocument:
         else:
             extractor = getattr(trafilatura, "extract", None)
             if callable(extractor):
+                # trafilatura rewrites the tree in place, so hand it a copy of
+                # the shared parse instead of making it parse ``html`` again.
                 recovered_text = (
                     extractor(
-                        html,
+                        copy.deepcopy(tree) if tree is not None else html,
                         include_comments=False,
                         include_tables=True,
                     )
@@ -176,6 +245,16 @@ def extract_text_from_url(url: str) -> StructuredDocument:
     return doc
 
 
+# Metric label per upload suffix; anything else is reported as "other".
+_INGESTION_SOURCE_TYPES = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".doc": "doc",
+    "": "text",
+    **dict.fromkeys((".txt", ".md", ".rtf", ".csv", ".json", ".yaml", ".yml"), "text"),
+}
+
+
 def extract_text_from_file(file) -> StructuredDocument:
     """Extract text from an uploaded file.
 
@@ -202,6 +281,24 @@ def extract_text_from_file(file) -> StructuredDocument:
         raise ValueError("file too large")
 
     suffix = Path(name).suffix.lower()
+    started = time.perf_counter()
+    success = False
+    try:
+        document = _extract_file_data(data, name, suffix)
+        success = True
+        return document
+    finally:
+        record_ingestion(
+            _INGESTION_SOURCE_TYPES.get(suffix, "other"),
+            size_bytes=len(data),
+            seconds=time.perf_counter() - started,
+            success=success,
+        )
+
+
+def _extract_file_data(data: bytes, name: str, suffix: str) -> StructuredDocument:
+    """Extract the document contained in uploaded ``data``."""
+
     try:
         if suffix == ".pdf":
             return _extract_pdf(io.BytesIO(data), name)
@@ -411,10 +508,182 @@ def _extract_docx(buf: io.BytesIO, name: str) -> StructuredDocument:
     return StructuredDocument.from_blocks(blocks, source=name)
 
 
+_OCR_HELP = (
+    "scanned PDF extraction requires OCR support. Install pdf2image, "
+    "pytesseract, and the Tesseract OCR engine, then retry."
+)
+
+
+PDF_OCR_DPI = env_int("PDF_OCR_DPI", 200, minimum=1)
+"""Resolution used when rasterising scanned PDF pages for OCR."""
+
+PDF_EXTRACTION_WORKERS = env_int("PDF_EXTRACTION_WORKERS", 0, minimum=0)
+"""Process pool size for page-parallel OCR (``0`` = auto, ``1`` = serial)."""
+
+PDF_PARALLEL_MIN_PAGES = env_int("PDF_PARALLEL_MIN_PAGES", 4, minimum=0)
+"""Minimum number of pages needing OCR before the process pool is used."""
+
+_PDF_PAGE_CACHE_SIZE = 512
+
+
+class _PdfPageCache:
+    """Thread-safe LRU cache of extracted page text keyed by ``(file hash, page)``."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, int], str] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: tuple[str, int]) -> str | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        record_cache_lookup("pdf_page", hit=value is not None)
+        return value
+
+    def set(self, key: tuple[str, int], value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_PDF_PAGE_CACHE = _PdfPageCache(_PDF_PAGE_CACHE_SIZE)
+
+
+_OCR_POOL: ProcessPoolExecutor | None = None
+_OCR_POOL_LOCK = Lock()
+
+
+def _pdf_worker_limit() -> int:
+    return PDF_EXTRACTION_WORKERS or min(4, os.cpu_count() or 1)
+
+
+def _pdf_worker_count(pending_pages: int) -> int:
+    """Return the number of worker processes to use for ``pending_pages``."""
+
+    if pending_pages < max(PDF_PARALLEL_MIN_PAGES, 2):
+        return 1
+    return max(1, min(_pdf_worker_limit(), pending_pages))
+
+
+def _ocr_pool() -> ProcessPoolExecutor:
+    """Return the process pool for OCR, starting it on first use.
+
+    The pool lives for the whole process so its worker start-up cost is paid
+    once rather than per document.
+    """
+
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is None:
+            import multiprocessing
+
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _OCR_POOL = ProcessPoolExecutor(
+                max_workers=_pdf_worker_limit(), mp_context=multiprocessing.get_context(method)
+            )
+        return _OCR_POOL
+
+
+def _discard_ocr_pool() -> None:
+    """Shut down a broken OCR pool so the next document starts a fresh one."""
+
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        pool, _OCR_POOL = _OCR_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _chunk_pages(pages: Sequence[int], chunks: int) -> list[list[int]]:
+    """Split ``pages`` into at most ``chunks`` contiguous, evenly sized groups."""
+
+    if not pages:
+        return []
+    chunks = max(1, min(chunks, len(pages)))
+    size, remainder = divmod(len(pages), chunks)
+    groups: list[list[int]] = []
+    start = 0
+    for index in range(chunks):
+        end = start + size + (1 if index < remainder else 0)
+        groups.append(list(pages[start:end]))
+        start = end
+    return groups
+
+
+def _contiguous_runs(pages: Sequence[int]) -> list[tuple[int, int]]:
+    """Collapse sorted page numbers into inclusive ``(first, last)`` ranges."""
+
+    runs: list[tuple[int, int]] = []
+    for page in sorted(pages):
+        if runs and runs[-1][1] == page - 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def _read_pdf_page_text(reader: Any, idx: int, name: str) -> str:
+    """Return the embedded text layer of page ``idx`` (1-based)."""
+
+    try:
+        return reader.pages[idx - 1].extract_text() or ""
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.exception("PyPDF failed to extract text from page %s of %s", idx, name)
+        raise ValueError("file could not be read") from exc
+
+
+def _ocr_pdf_pages(data: bytes, pages: Sequence[int], dpi: int) -> dict[int, str]:
+    """Rasterise and OCR ``pages`` of ``data``.
+
+    Contiguous pages are rendered with a single ``pdf2image`` call so a fully
+    scanned document is parsed once instead of once per page.
+    """
+
+    try:
+        from pdf2image import convert_from_bytes
+        import pytesseract
+    except ImportError as err:  # pragma: no cover - optional OCR
+        raise ValueError(_OCR_HELP) from err
+
+    results: dict[int, str] = {}
+    for first, last in _contiguous_runs(pages):
+        try:
+            images = convert_from_bytes(data, dpi=dpi, fmt="png", first_page=first, last_page=last)
+            for page, img in zip(range(first, last + 1), images):
+                results[page] = pytesseract.image_to_string(img)
+        except Exception as err:  # pragma: no cover - OCR failure
+            raise ValueError(f"{_OCR_HELP} ({err!s})") from err
+    return results
+
+
+def _ocr_pdf_pages_parallel(data: bytes, pages: Sequence[int], workers: int) -> dict[int, str]:
+    """Fan OCR of ``pages`` out over the shared process pool in contiguous chunks."""
+
+    pool = _ocr_pool()
+    futures = [pool.submit(_ocr_pdf_pages, data, chunk, PDF_OCR_DPI) for chunk in _chunk_pages(pages, workers)]
+    texts: dict[int, str] = {}
+    for future in futures:
+        texts.update(future.result())
+    return texts
+
+
 def _extract_pdf(buf: io.BytesIO, name: str) -> StructuredDocument:
     from pypdf import PdfReader
     from pypdf.errors import PdfReadError
 
+    data = buf.getvalue()
     try:
         reader = PdfReader(buf)
     except PdfReadError as exc:  # pragma: no cover - invalid PDFs
@@ -423,32 +692,40 @@ def _extract_pdf(buf: io.BytesIO, name: str) -> StructuredDocument:
         logger.exception("PyPDF failed to open %s", name)
         raise ValueError("file could not be read") from exc
 
-    blocks: list[ContentBlock] = []
-    page_count = 0
-    ocr_help = (
-        "scanned PDF extraction requires OCR support. Install pdf2image, "
-        "pytesseract, and the Tesseract OCR engine, then retry."
-    )
-    for idx, page in enumerate(reader.pages, start=1):
-        page_count += 1
-        try:
-            page_text = page.extract_text() or ""
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.exception("PyPDF failed to extract text from page %s of %s", idx, name)
-            raise ValueError("file could not be read") from exc
-        if not page_text.strip():
-            try:
-                from pdf2image import convert_from_bytes
-                import pytesseract
-            except ImportError as err:  # pragma: no cover - optional OCR
-                raise ValueError(ocr_help) from err
+    page_count = len(reader.pages)
+    digest = hashlib.sha256(data).hexdigest()
+    page_texts: dict[int, str] = {}
+    pending: list[int] = []
+    for idx in range(1, page_count + 1):
+        cached = _PDF_PAGE_CACHE.get((digest, idx))
+        if cached is None:
+            pending.append(idx)
+        else:
+            page_texts[idx] = cached
+
+    # Reading the text layer is cheap; only pages without one are worth another process.
+    extracted = {idx: _read_pdf_page_text(reader, idx, name) for idx in pending}
+    scanned = [idx for idx in pending if not extracted[idx].strip()]
+    if scanned:
+        ocr_texts: dict[int, str] | None = None
+        workers = _pdf_worker_count(len(scanned))
+        if workers > 1:
             try:
-                images = convert_from_bytes(buf.getvalue(), fmt="png", first_page=idx, last_page=idx)
-                ocr_text = "\n".join(pytesseract.image_to_string(img) for img in images)
-                page_text = (page_text + "\n" + ocr_text).strip()
-            except Exception as err:  # pragma: no cover - OCR failure
-                raise ValueError(f"{ocr_help} ({err!s})") from err
-        page_text = page_text.strip()
+                ocr_texts = _ocr_pdf_pages_parallel(data, scanned, workers)
+            except (OSError, NotImplementedError, BrokenProcessPool) as exc:
+                logger.warning("Parallel OCR unavailable for %s (%s); falling back to serial", name, exc)
+                _discard_ocr_pool()
+        if ocr_texts is None:
+            ocr_texts = _ocr_pdf_pages(data, scanned, PDF_OCR_DPI)
+        for idx, ocr_text in ocr_texts.items():
+            extracted[idx] = (extracted[idx] + "\n" + ocr_text).strip()
+    for idx, text in extracted.items():
+        _PDF_PAGE_CACHE.set((digest, idx), text)
+    page_texts.update(extracted)
+
+    blocks: list[ContentBlock] = []
+    for idx in range(1, page_count + 1):
+        page_text = page_texts.get(idx, "").strip()
         if not page_text:
             continue
         segments = [seg.strip() for seg in re.split(r"\n{2,}", page_text) if seg.strip()]
@@ -488,53 +765,81 @@ _DOMAIN_SELECTORS: dict[str, tuple[str, ...]] = {
 _BOILERPLATE_TAGS = {"header", "footer", "nav", "aside"}
 
 
-def _parse_html_blocks(html: str, *, source_url: str | None = None) -> list[ContentBlock]:
-    from bs4 import BeautifulSoup
-    from bs4.element import Tag
+_BOILERPLATE_CLASSES = {"site-header", "global-header", "global-footer"}
+_BLOCK_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "table")
+
 
-    soup = BeautifulSoup(html, "lxml")
-    for tag in soup(["script", "style", "noscript", "template"]):
-        tag.decompose()
-    body: Tag | None = None
-    domain = None
+def _select_content_root(root: HtmlElement, source_url: str | None) -> HtmlElement:
+    """Return the element holding the job content.
+
+    Known job boards jump straight to their content container via
+    ``_DOMAIN_SELECTORS``; other pages fall back to ``main``/``article``/``body``.
+    """
+
+    body: HtmlElement | None = None
     if source_url:
         netloc = urlparse(source_url).netloc.lower()
         domain = next((name for name in _DOMAIN_SELECTORS if name in netloc), None)
         if domain:
-            selectors = _DOMAIN_SELECTORS[domain]
-            for selector in selectors:
-                candidate = soup.select_one(selector)
-                if isinstance(candidate, Tag):
-                    body = candidate
+            for selector in _DOMAIN_SELECTORS[domain]:
+                body = select_first(root, selector)
+                if body is not None:
                     break
     if body is None:
-        body = soup.find("main") or soup.find("article") or soup.body or soup
-    main_like = None
-    if body.name not in {"main", "article"}:
-        main_like = body.find(["main", "article"])
-    if isinstance(main_like, Tag):
-        body = main_like
-    boilerplate_classes = {"site-header", "global-header", "global-footer"}
-    for child in list(body.children):
-        if not isinstance(child, Tag):
-            continue
-        classes = child.get("class") or []
-        if child.name in _BOILERPLATE_TAGS or any(cls in boilerplate_classes for cls in classes):
-            child.decompose()
+        body = find_first(root, "main")
+    if body is None:
+        body = find_first(root, "article")
+    if body is None:
+        body = root.find("body")
+    if body is None:
+        body = root
+    if tag_name(body) not in {"main", "article"}:
+        main_like = find_first(body, "main", "article")
+        if main_like is not None:
+            body = main_like
+    return body
+
+
+def _parse_html_blocks(
+    html: str,
+    *,
+    source_url: str | None = None,
+    tree: HtmlElement | None = None,
+) -> list[ContentBlock]:
+    """Convert ``html`` into content blocks.
+
+    Args:
+        html: Raw HTML markup.
+        source_url: Optional page URL used to select a domain fast-path.
+        tree: Pre-parsed document from :func:`ingest.html_tree.parse_html`.
+            The tree is never mutated so it can be shared with other consumers.
+    """
+
+    root = tree if tree is not None else parse_html(html)
+    if root is None:
+        return []
+    body = _select_content_root(root, source_url)
+    # lxml hands out the same proxy object for a node while a reference to it
+    # is alive, so holding the children in a set keeps identity checks valid.
+    boilerplate_children = {
+        child
+        for child in body
+        if tag_name(child) in _BOILERPLATE_TAGS or any(cls in _BOILERPLATE_CLASSES for cls in class_tokens(child))
+    }
+
+    def _skip(element: HtmlElement) -> bool:
+        return element in boilerplate_children
+
     blocks: list[ContentBlock] = []
     position = 0
-    for element in body.find_all(
-        ["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "table"],
-        recursive=True,
-    ):
-        if not isinstance(element, Tag):
+    for element in iter_elements(body, _BLOCK_TAGS, skip=_skip):
+        name = tag_name(element)
+        text = element_text(element)
+        if not text:
             continue
-        text = element.get_text(" ", strip=True)
-        if not text or not element.name:
-            continue
-        if element.name.startswith("h"):
+        if name.startswith("h"):
             try:
-                level = int(element.name[1])
+                level = int(name[1])
             except (ValueError, IndexError):  # pragma: no cover - defensive
                 level = None
             blocks.append(
@@ -542,15 +847,13 @@ def _parse_html_blocks(html: str, *, source_url: str | None = None) -> list[Cont
                     type="heading",
                     text=text,
                     level=level,
-                    metadata={"tag": element.name, "position": position},
+                    metadata={"tag": name, "position": position},
                 )
             )
-        elif element.name == "li":
-            ancestors = [
-                ancestor for ancestor in element.parents if isinstance(ancestor, Tag) and ancestor.name in {"ul", "ol"}
-            ]
+        elif name == "li":
+            ancestors = list(element.iterancestors("ul", "ol"))
             list_level = max(len(ancestors) - 1, 0)
-            list_type = "ordered" if ancestors and ancestors[0].name == "ol" else "unordered"
+            list_type = "ordered" if ancestors and tag_name(ancestors[0]) == "ol" else "unordered"
             marker = "-" if list_type == "unordered" else str(position + 1)
             blocks.append(
                 ContentBlock(
@@ -565,12 +868,10 @@ def _parse_html_blocks(html: str, *, source_url: str | None = None) -> list[Cont
                     },
                 )
             )
-        elif element.name == "table":
+        elif name == "table":
             rows: list[list[str]] = []
-            for tr in element.find_all("tr"):
-                if not isinstance(tr, Tag):
-                    continue
-                cells = [cell.get_text(" ", strip=True) for cell in tr.find_all(["td", "th"]) if isinstance(cell, Tag)]
+            for tr in element.iterdescendants("tr"):
+                cells = [element_text(cell) for cell in tr.iterdescendants("td", "th")]
                 if any(cells):
                     rows.append(cells)
             if rows:
@@ -587,7 +888,7 @@ def _parse_html_blocks(html: str, *, source_url: str | None = None) -> list[Cont
                 ContentBlock(
                     type="paragraph",
                     text=text,
-                    metadata={"tag": element.name, "position": position},
+                    metadata={"tag": name, "position": position},
                 )
             )
         position += 1
@@ -11,6 +11,7 @@ from core.regexes import CITY_REGEX_IN_PATTERN, FOOTER_CONTACT_PARSE
 from llm.openai_responses import build_json_schema_format, call_responses_safe
 from models.need_analysis import NeedAnalysisProfile, Requirements
 from nlp.entities import extract_location_entities
+from utils.metrics import timed_stage
 from utils.normalization import (
     NormalizedProfilePayload,
     categorize_bullet,
@@ -22,6 +23,7 @@ from utils.normalization import (
     normalize_profile,
 )
 from utils.patterns import GENDER_SUFFIX_INLINE_RE, GENDER_SUFFIX_TRAILING_RE
+from utils.profiling import profiled
 
 
 HEURISTICS_LOGGER = logging.getLogger("cognitive_needs.heuristics")
@@ -30,6 +32,8 @@ HEURISTICS_LOGGER = logging.getLogger("cognitive_needs.heuristics")
 def _log_heuristic_fill(field: str, rule: str, *, detail: str | None = None) -> None:
     """Emit a structured log entry describing a heuristic patch."""
 
+    if not HEURISTICS_LOGGER.isEnabledFor(logging.DEBUG):
+        return
     message = f"Heuristic filled {field}"
     if detail:
         message = f"{message} {detail}"
@@ -40,7 +44,7 @@ def _log_heuristic_fill(field: str, rule: str, *, detail: str | None = None) ->
     }
     if detail:
         extra["heuristic_detail"] = detail
-    HEURISTICS_LOGGER.info(message, extra=extra)
+    HEURISTICS_LOGGER.debug(message, extra=extra)
 
 
 # Captures phrases such as "Brand, ein Unternehmen der ParentGmbH" to pull both the
@@ -2415,6 +2419,7 @@ def _harvest_skills_from_responsibilities(
                 _merge_unique(soft_sink, [phrase])
 
 
+@timed_stage("refine_requirements")
 def refine_requirements(profile: NeedAnalysisProfile, text: str) -> NeedAnalysisProfile:
     """Enrich ``profile.requirements`` using heuristics from ``text``."""
 
@@ -2505,6 +2510,7 @@ def refine_requirements(profile: NeedAnalysisProfile, text: str) -> NeedAnalysis
     return NeedAnalysisProfile.model_validate(normalized_payload)
 
 
+@timed_stage("extract_responsibilities")
 def extract_responsibilities(text: str) -> List[str]:
     """Extract responsibility bullet points from ``text``.
 
@@ -3032,6 +3038,8 @@ def guess_start_date(text: str) -> str:
     return ""
 
 
+@profiled("apply_basic_fallbacks")
+@timed_stage("apply_basic_fallbacks")
 def apply_basic_fallbacks(
     profile: NeedAnalysisProfile,
     text: str,
@@ -0,0 +1,198 @@
+"""Shared, read-only lxml parse trees for fetched HTML pages.
+
+Career pages are parsed once with ``lxml.html`` and the resulting tree is
+reused by block extraction (:mod:`ingest.extractors`), trafilatura recovery and
+branding detection (:mod:`ingest.branding`). Consumers must treat trees
+returned by :func:`parse_html` as immutable; helpers in this module skip
+unwanted subtrees during traversal instead of deleting them.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from functools import lru_cache
+from threading import Lock
+
+from lxml import etree, html as lxml_html
+
+logger = logging.getLogger(__name__)
+
+HtmlElement = lxml_html.HtmlElement
+
+NON_CONTENT_TAGS: frozenset[str] = frozenset({"script", "style", "noscript", "template"})
+"""Tags whose text never contributes to visible content."""
+
+_TREE_CACHE_SIZE = 8
+_TREE_CACHE: OrderedDict[str, HtmlElement | None] = OrderedDict()
+_TREE_CACHE_LOCK = Lock()
+
+_SIMPLE_SELECTOR_RE = re.compile(
+    r"^(?P<tag>[a-zA-Z][a-zA-Z0-9-]*)?"
+    r"(?:#(?P<id>[\w-]+))?"
+    r"(?:\[(?P<attr>[\w-]+)=['\"](?P<value>[^'\"]*)['\"]\])?$"
+)
+
+
+def _parse_uncached(markup: str) -> HtmlElement | None:
+    if not markup or not markup.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(markup)
+    except ValueError:
+        # ``lxml`` rejects str input that carries an XML encoding declaration.
+        return lxml_html.document_fromstring(markup.encode("utf-8"))
+    except etree.ParserError:
+        logger.debug("lxml could not parse HTML payload (%s chars)", len(markup))
+        return None
+
+
+def parse_html(markup: str) -> HtmlElement | None:
+    """Return the shared lxml document tree for ``markup``.
+
+    Recently parsed documents are memoised so that the URL extractor and the
+    branding detector operate on the same tree without re-parsing. Returns
+    ``None`` for empty or unparsable input.
+    """
+
+    with _TREE_CACHE_LOCK:
+        if markup in _TREE_CACHE:
+            _TREE_CACHE.move_to_end(markup)
+            return _TREE_CACHE[markup]
+    tree = _parse_uncached(markup)
+    with _TREE_CACHE_LOCK:
+        _TREE_CACHE[markup] = tree
+        _TREE_CACHE.move_to_end(markup)
+        while len(_TREE_CACHE) > _TREE_CACHE_SIZE:
+            _TREE_CACHE.popitem(last=False)
+    return tree
+
+
+def clear_tree_cache() -> None:
+    """Drop all memoised parse trees."""
+
+    with _TREE_CACHE_LOCK:
+        _TREE_CACHE.clear()
+
+
+def tag_name(element: object) -> str:
+    """Return the lower-cased tag of ``element`` or ``""`` for comments/PIs."""
+
+    tag = getattr(element, "tag", None)
+    return tag.lower() if isinstance(tag, str) else ""
+
+
+def class_tokens(element: HtmlElement) -> list[str]:
+    """Return the whitespace separated ``class`` tokens of ``element``."""
+
+    return (element.get("class") or "").split()
+
+
+@lru_cache(maxsize=64)
+def css_to_xpath(selector: str) -> str | None:
+    """Translate a simple CSS selector (``tag#id[attr='value']``) to XPath.
+
+    Only the selector shapes used by the domain fast-path are supported;
+    anything else returns ``None`` so callers can fall back gracefully.
+    """
+
+    match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+    if not match or not any(match.group("tag", "id", "attr")):
+        return None
+    predicates: list[str] = []
+    if match.group("id"):
+        predicates.append(f"@id='{match.group('id')}'")
+    if match.group("attr"):
+        predicates.append(f"@{match.group('attr')}='{match.group('value')}'")
+    path = f".//{(match.group('tag') or '*').lower()}"
+    return path + "".join(f"[{predicate}]" for predicate in predicates)
+
+
+def select_first(root: HtmlElement, selector: str) -> HtmlElement | None:
+    """Return the first element below ``root`` matching ``selector``."""
+
+    xpath = css_to_xpath(selector)
+    if xpath is None:
+        return None
+    matches = root.xpath(xpath)
+    return matches[0] if matches else None
+
+
+def find_first(root: HtmlElement, *tags: str) -> HtmlElement | None:
+    """Return the first descendant of ``root`` (document order) with one of ``tags``."""
+
+    for element in root.iterdescendants(*tags):
+        return element
+    return None
+
+
+def iter_elements(
+    root: HtmlElement,
+    tags: Iterable[str],
+    *,
+    skip: Callable[[HtmlElement], bool] | None = None,
+) -> Iterator[HtmlElement]:
+    """Yield descendants of ``root`` whose tag is in ``tags`` in document order.
+
+    Subtrees of non-content tags and elements for which ``skip`` returns
+    ``True`` are never entered.
+    """
+
+    wanted = frozenset(tags)
+    stack: list[HtmlElement] = list(reversed(root))
+    while stack:
+        element = stack.pop()
+        name = tag_name(element)
+        if not name or name in NON_CONTENT_TAGS:
+            continue
+        if skip is not None and skip(element):
+            continue
+        if name in wanted:
+            yield element
+        stack.extend(reversed(element))
+
+
+def element_text(element: HtmlElement) -> str:
+    """Return visible text of ``element`` like ``BeautifulSoup.get_text(" ", strip=True)``.
+
+    Text inside non-content tags and comments is ignored, while their tails
+    (text following the closing tag) are kept.
+    """
+
+    parts: list[str] = []
+
+    def _add(value: str | None) -> None:
+        if value:
+            stripped = value.strip()
+            if stripped:
+                parts.append(stripped)
+
+    def _walk(node: HtmlElement) -> None:
+        name = tag_name(node)
+        if name and name not in NON_CONTENT_TAGS:
+            _add(node.text)
+            for child in node:
+                _walk(child)
+                _add(child.tail)
+        # comments, processing instructions and non-content tags contribute
+        # only their tail, which the parent loop adds.
+
+    _walk(element)
+    return " ".join(parts)
+
+
+__all__ = [
+    "HtmlElement",
+    "NON_CONTENT_TAGS",
+    "class_tokens",
+    "clear_tree_cache",
+    "css_to_xpath",
+    "element_text",
+    "find_first",
+    "iter_elements",
+    "parse_html",
+    "select_first",
+    "tag_name",
+]
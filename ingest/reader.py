@@ -308,43 +308,41 @@ def _clean_table_block(block: ContentBlock) -> ContentBlock | None:
 
 
 def clean_structured_document(doc: StructuredDocument) -> StructuredDocument:
-    """Apply :func:`clean_job_text` rules to a structured document."""
+    """Apply :func:`clean_job_text` rules to a structured document.
+
+    Cleaning produces a keep-mask plus replacements for changed blocks, so an
+    already clean document shares its text buffer with the result.
+    """
 
     if not doc.text and not doc.blocks:
-        return StructuredDocument(text="", blocks=[], source=doc.source, raw_html=doc.raw_html)
+        return doc.select([])
 
     cleaned_text = clean_job_text(doc.text)
-    cleaned_blocks: list[ContentBlock] = []
-    for block in doc.blocks:
+    mask: list[bool] = []
+    replacements: dict[int, ContentBlock] = {}
+    for index, block in enumerate(doc.blocks):
         if block.type == "table":
             cleaned = _clean_table_block(block)
-            if cleaned:
-                cleaned_blocks.append(cleaned)
+            mask.append(cleaned is not None)
+            if cleaned is not None and cleaned != block:
+                replacements[index] = cleaned
             continue
         normalized = _normalize_block_text(block.text)
-        if not normalized:
-            continue
-        metadata = dict(block.metadata) if block.metadata else None
-        cleaned_blocks.append(
-            ContentBlock(
+        mask.append(bool(normalized))
+        if normalized and normalized != block.text:
+            replacements[index] = ContentBlock(
                 type=block.type,
                 text=normalized,
                 level=block.level,
-                metadata=metadata,
+                metadata=dict(block.metadata) if block.metadata else None,
             )
-        )
 
-    if not cleaned_blocks:
-        return StructuredDocument(text=cleaned_text, blocks=[], source=doc.source, raw_html=doc.raw_html)
+    if not any(mask):
+        return doc.select([]).with_text(cleaned_text)
 
-    combined = StructuredDocument.from_blocks(cleaned_blocks, source=doc.source, raw_html=doc.raw_html)
+    combined = doc.select(mask, replacements)
     if cleaned_text and cleaned_text != combined.text:
-        return StructuredDocument(
-            text=cleaned_text,
-            blocks=combined.blocks,
-            source=doc.source,
-            raw_html=doc.raw_html,
-        )
+        return combined.with_text(cleaned_text)
     return combined
 
 
@@ -411,9 +409,5 @@ def read_job_text(
     if ordered:
         combined_text = "\n\n".join(doc.text for doc in ordered).strip()
         if combined_text and combined_text != combined.text:
-            combined = StructuredDocument(
-                text=combined_text,
-                blocks=combined.blocks,
-                source="merged",
-            )
+            combined = combined.with_text(combined_text)
     return combined
@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Iterable, List
 import re
+import weakref
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from itertools import count
+from threading import Lock
+from typing import Any, List, overload
+
+_BLOCK_SEPARATOR = "\n\n"
 
 
 @dataclass(slots=True)
@@ -37,20 +45,355 @@ class ContentBlock:
         return self.text
 
 
-@dataclass(slots=True)
+_NO_LEVEL = -(2**31)
+_BLOCK_TYPE_CODES: dict[str, int] = {}
+_BLOCK_TYPE_NAMES: list[str] = []
+_TYPE_LOCK = Lock()
+
+
+def _type_code(block_type: str) -> int:
+    """Return the compact code for ``block_type``, registering new types lazily."""
+
+    code = _BLOCK_TYPE_CODES.get(block_type)
+    if code is None:
+        with _TYPE_LOCK:
+            code = _BLOCK_TYPE_CODES.get(block_type)
+            if code is None:
+                code = len(_BLOCK_TYPE_NAMES)
+                _BLOCK_TYPE_NAMES.append(block_type)
+                _BLOCK_TYPE_CODES[block_type] = code
+    return code
+
+
+class _RawHtmlStore:
+    """Reference-counted, size-capped storage for raw HTML kept out of documents.
+
+    Documents only hold an integer key, so raw markup never ends up in
+    ``st.session_state``. Entries are released once every document sharing
+    the key has been garbage collected. At most ``maxsize`` pages are held:
+    storing another one evicts the oldest, even while documents still
+    reference it, and their ``raw_html`` becomes ``None``.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[int, list[Any]] = OrderedDict()
+        self._counter = count(1)
+        self._lock = Lock()
+
+    def put(self, html: str) -> int:
+        key = next(self._counter)
+        with self._lock:
+            self._entries[key] = [html, 0]
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def get(self, key: int | None) -> str | None:
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def retain(self, key: int) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry[1] += 1
+
+    def release(self, key: int) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_RAW_HTML_STORE = _RawHtmlStore(maxsize=32)
+
+
+class BlockList(Sequence[ContentBlock]):
+    """Read-only sequence view over the blocks of a :class:`StructuredDocument`.
+
+    :class:`ContentBlock` objects are materialised on access from the
+    document's span arrays, so holding the view (e.g. in session state) does
+    not duplicate block text.
+    """
+
+    __slots__ = ("_doc",)
+
+    def __init__(self, doc: "StructuredDocument") -> None:
+        self._doc = doc
+
+    def __len__(self) -> int:
+        return len(self._doc._types)
+
+    @overload
+    def __getitem__(self, index: int) -> ContentBlock: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ContentBlock]: ...
+
+    def __getitem__(self, index: int | slice) -> ContentBlock | list[ContentBlock]:
+        if isinstance(index, slice):
+            return [self._doc._block(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("block index out of range")
+        return self._doc._block(index)
+
+    def __iter__(self) -> Iterator[ContentBlock]:
+        for index in range(len(self)):
+            yield self._doc._block(index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (BlockList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:  # pragma: no cover - convenience
+        return f"BlockList({list(self)!r})"
+
+
 class StructuredDocument:
-    """Representation of extracted content with semantic blocks."""
+    """Representation of extracted content with semantic blocks.
 
-    text: str
-    blocks: list[ContentBlock]
-    source: str | None = None
-    raw_html: str | None = None
+    The document keeps a single text buffer (``text``). Blocks are stored as
+    compact ``(start, end, type, level, metadata)`` columns pointing into that
+    buffer; block text that does not occur verbatim in ``text`` is kept in a
+    small side table. Raw HTML is held out-of-band in a bounded store and is
+    dropped once no document references it anymore.
+    """
+
+    __slots__ = (
+        "_text",
+        "_starts",
+        "_ends",
+        "_types",
+        "_levels",
+        "_metadata",
+        "_detached",
+        "_raw_html_key",
+        "source",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        blocks: Iterable[ContentBlock],
+        source: str | None = None,
+        raw_html: str | None = None,
+    ) -> None:
+        self._text = text
+        self.source = source
+        self._starts = array("q")
+        self._ends = array("q")
+        self._types = array("H")
+        self._levels = array("l")
+        self._metadata: list[dict[str, Any] | None] = []
+        self._detached: dict[int, str] = {}
+        cursor = 0
+        for block in blocks:
+            block_text = block.text or ""
+            start = text.find(block_text, cursor) if block_text else -1
+            if start < 0:
+                cursor = self._append(block, -1, -1, cursor)
+            else:
+                cursor = self._append(block, start, start + len(block_text), cursor)
+        self._raw_html_key: int | None = None
+        if raw_html is not None:
+            self._attach_raw_html(_RAW_HTML_STORE.put(raw_html))
+
+    def _append(self, block: ContentBlock, start: int, end: int, cursor: int) -> int:
+        index = len(self._types)
+        if start < 0:
+            self._detached[index] = block.text
+            start = end = 0
+        self._starts.append(start)
+        self._ends.append(end)
+        self._types.append(_type_code(block.type))
+        self._levels.append(_NO_LEVEL if block.level is None else block.level)
+        self._metadata.append(block.metadata)
+        return max(cursor, end)
+
+    def _attach_raw_html(self, key: int | None) -> None:
+        self._raw_html_key = key
+        if key is not None:
+            _RAW_HTML_STORE.retain(key)
+            weakref.finalize(self, _RAW_HTML_STORE.release, key)
+
+    @classmethod
+    def _from_columns(
+        cls,
+        text: str,
+        columns: tuple[array, array, array, array, list[dict[str, Any] | None], dict[int, str]],
+        *,
+        source: str | None,
+        raw_html_key: int | None,
+    ) -> "StructuredDocument":
+        doc = cls.__new__(cls)
+        doc._text = text
+        doc.source = source
+        doc._starts, doc._ends, doc._types, doc._levels, doc._metadata, doc._detached = columns
+        doc._raw_html_key = None
+        doc._attach_raw_html(raw_html_key)
+        return doc
+
+    @property
+    def text(self) -> str:
+        """Joined document text (the backing buffer of all block spans)."""
+
+        return self._text
+
+    @property
+    def blocks(self) -> BlockList:
+        """Blocks of the document as a lazily materialised sequence."""
+
+        return BlockList(self)
+
+    @property
+    def raw_html(self) -> str | None:
+        """Original HTML if it is still held by the out-of-band store."""
+
+        return _RAW_HTML_STORE.get(self._raw_html_key)
+
+    def _block_text(self, index: int) -> str:
+        detached = self._detached.get(index)
+        if detached is not None:
+            return detached
+        return self._text[self._starts[index] : self._ends[index]]
+
+    def _block(self, index: int) -> ContentBlock:
+        level = self._levels[index]
+        return ContentBlock(
+            type=_BLOCK_TYPE_NAMES[self._types[index]],
+            text=self._block_text(index),
+            level=None if level == _NO_LEVEL else level,
+            metadata=self._metadata[index],
+        )
+
+    def select(
+        self,
+        mask: Sequence[bool],
+        replacements: Mapping[int, ContentBlock] | None = None,
+    ) -> "StructuredDocument":
+        """Return a document keeping blocks where ``mask`` is true.
+
+        ``replacements`` maps block indices to changed blocks. When every block
+        is kept unchanged the new document shares this document's buffer and
+        span columns instead of copying them.
+        """
+
+        replacements = replacements or {}
+        if all(mask) and len(mask) == len(self._types) and not replacements:
+            columns = (self._starts, self._ends, self._types, self._levels, self._metadata, self._detached)
+            return self._from_columns(self._text, columns, source=self.source, raw_html_key=self._raw_html_key)
+        kept = (replacements.get(index) or self._block(index) for index, keep in enumerate(mask) if keep)
+        return self._join(kept, source=self.source, raw_html_key=self._raw_html_key)
+
+    def with_text(self, text: str) -> "StructuredDocument":
+        """Return a document with ``text`` as buffer and the same blocks."""
+
+        doc = StructuredDocument(text, self.blocks, source=self.source)
+        doc._attach_raw_html(self._raw_html_key)
+        return doc
+
+    @classmethod
+    def _join(
+        cls,
+        blocks: Iterable[ContentBlock],
+        *,
+        source: str | None,
+        raw_html_key: int | None,
+    ) -> "StructuredDocument":
+        doc = cls.__new__(cls)
+        doc.source = source
+        doc._starts, doc._ends = array("q"), array("q")
+        doc._types, doc._levels = array("H"), array("l")
+        doc._metadata, doc._detached = [], {}
+        parts: list[str] = []
+        offset = 0
+        for block in blocks:
+            if not block.text or not block.text.strip():
+                continue
+            rendered = block.render()
+            if parts:
+                offset += len(_BLOCK_SEPARATOR)
+            position = rendered.find(block.text)
+            if position < 0:
+                doc._append(block, -1, -1, 0)
+            else:
+                start = offset + position
+                doc._append(block, start, start + len(block.text), 0)
+            parts.append(rendered)
+            offset += len(rendered)
+        joined = _BLOCK_SEPARATOR.join(parts)
+        text = joined.strip()
+        lead = len(joined) - len(joined.lstrip())
+        if lead or len(text) != len(joined):
+            for index in range(len(doc._types)):
+                if index in doc._detached:
+                    continue
+                start, end = doc._starts[index] - lead, doc._ends[index] - lead
+                if start < 0 or end > len(text):
+                    doc._detached[index] = joined[doc._starts[index] : doc._ends[index]]
+                    continue
+                doc._starts[index], doc._ends[index] = start, end
+        doc._text = text
+        doc._raw_html_key = None
+        doc._attach_raw_html(raw_html_key)
+        return doc
+
+    def __len__(self) -> int:
+        return len(self._types)
 
     def __bool__(self) -> bool:  # pragma: no cover - convenience
-        return bool(self.text)
+        return bool(self._text)
 
     def __str__(self) -> str:  # pragma: no cover - convenience
-        return self.text
+        return self._text
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StructuredDocument):
+            return NotImplemented
+        return (
+            self._text == other._text
+            and self.source == other.source
+            and self.raw_html == other.raw_html
+            and self.blocks == other.blocks
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:  # pragma: no cover - convenience
+        return f"StructuredDocument(text={self._text[:40]!r}..., blocks={len(self)}, source={self.source!r})"
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "text": self._text,
+            "blocks": list(self.blocks),
+            "source": self.source,
+            "raw_html": self.raw_html,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        StructuredDocument.__init__(
+            self,
+            state["text"],
+            state["blocks"],
+            source=state.get("source"),
+            raw_html=state.get("raw_html"),
+        )
 
     @classmethod
     def from_blocks(
@@ -63,13 +406,12 @@ class StructuredDocument:
         """Create a structured document from ``blocks``.
 
         Empty blocks are filtered and the resulting text is joined with blank
-        lines to mimic the previous plain-text behaviour.
+        lines to mimic the previous plain-text behaviour. Each block is
+        rendered once and its span recorded in the joined buffer.
         """
 
-        block_list = [block for block in blocks if block.text and block.text.strip()]
-        text_parts = [block.render() for block in block_list if block.render().strip()]
-        text = "\n\n".join(text_parts).strip()
-        return cls(text=text, blocks=block_list, source=source, raw_html=raw_html)
+        key = _RAW_HTML_STORE.put(raw_html) if raw_html is not None else None
+        return cls._join(blocks, source=source, raw_html_key=key)
 
 
 _BULLET_RE = re.compile(r"^([*\u2022\-\u2013\u2023])\s+(.*)")
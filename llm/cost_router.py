@@ -17,9 +17,11 @@ from config.models import (
     QUALITY,
     REASONING_MODEL,
     STRICT_NANO_ONLY,
+    get_model_fallbacks_for,
     is_model_available,
     normalise_model_name,
 )
+from llm.model_telemetry import TELEMETRY_ROUTING_ENABLED, estimate_cost, get_telemetry_router
 
 _WORD_PATTERN = re.compile(r"[\w\-]+", flags=re.UNICODE)
 _LONG_CONTEXT_TOKEN_THRESHOLD = 300_000
@@ -116,8 +118,14 @@ def route_model_for_messages(
     tool_choice: Any | None = None,
     cost_saver_enabled: bool = False,
     task: ModelTask | str | None = None,
+    expected_output_tokens: int | None = None,
 ) -> tuple[str, PromptCostEstimate]:
-    """Return the preferred model for ``messages`` with the accompanying estimate."""
+    """Return the preferred model for ``messages`` with the accompanying estimate.
+
+    With ``MODEL_ROUTING_STRATEGY=telemetry`` the heuristic choice is refined
+    against live latency statistics: among the task's fallback chain the
+    cheapest model meeting the task's latency SLO wins.
+    """
 
     estimate = estimate_prompt_complexity(messages)
     if estimate.total_tokens > _LONG_CONTEXT_TOKEN_THRESHOLD:
@@ -160,12 +168,52 @@ def route_model_for_messages(
         if chosen_normalised == quality_normalised and is_model_available(FAST):
             chosen = FAST
 
+    if TELEMETRY_ROUTING_ENABLED:
+        chosen = _route_with_telemetry(
+            chosen,
+            task_key or ModelTask.DEFAULT.value,
+            estimate,
+            gpt5_only=_requires_gpt5_tools(tools, tool_choice),
+            expected_output_tokens=expected_output_tokens,
+        )
+
     if STRICT_NANO_ONLY and chosen != GPT51_NANO and is_model_available(GPT51_NANO):
         chosen = GPT51_NANO
 
     return chosen, estimate
 
 
+def _route_with_telemetry(
+    chosen: str,
+    task_key: str,
+    estimate: PromptCostEstimate,
+    *,
+    gpt5_only: bool,
+    expected_output_tokens: int | None,
+) -> str:
+    candidates = [
+        model
+        for model in [chosen, *get_model_fallbacks_for(task_key)]
+        if is_model_available(model) and (not gpt5_only or _is_gpt5_model(model))
+    ]
+    if estimate.complexity is PromptComplexity.COMPLEX:
+        # Never trade a complex prompt down to a cheaper tier than the heuristic picked.
+        floor = estimate_cost(chosen, input_tokens=1, output_tokens=1)
+        if floor is not None:
+            candidates = [
+                model
+                for model in candidates
+                if (estimate_cost(model, input_tokens=1, output_tokens=1) or floor) >= floor
+            ]
+    routed = get_telemetry_router().choose(
+        task_key,
+        candidates,
+        input_tokens=estimate.total_tokens,
+        output_tokens=expected_output_tokens,
+    )
+    return routed or chosen
+
+
 def _is_gpt5_model(model: str) -> bool:
     normalised = normalise_model_name(model).lower()
     return normalised.startswith("gpt-5")
@@ -95,16 +95,16 @@ def repair_profile_payload(
     serializable_payload = _coerce_json_serializable(payload)
 
     try:
-        payload_text = json.dumps(serializable_payload, ensure_ascii=False, indent=2, sort_keys=True)
+        payload_text = json.dumps(serializable_payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
     except TypeError:
         fallback_payload = _coerce_json_serializable(dict(payload))
         try:
-            payload_text = json.dumps(fallback_payload, ensure_ascii=False, indent=2, sort_keys=True)
+            payload_text = json.dumps(fallback_payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
         except TypeError:
             payload_text = json.dumps(
                 fallback_payload,
                 ensure_ascii=False,
-                indent=2,
+                separators=(",", ":"),
                 sort_keys=True,
                 default=str,
             )
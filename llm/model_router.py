@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
+import json
+import logging
 import os
+import tempfile
+import threading
 import time
 from dataclasses import dataclass
-from typing import Mapping, Sequence, Set
+from pathlib import Path
+from typing import Callable, Mapping, Sequence, Set
 
 from openai import OpenAI
 
 from config import models as model_config
 
+logger = logging.getLogger(__name__)
+
 PREF_ENV = "COGNITIVE_PREFERRED_MODEL"
 FB_ENV = "COGNITIVE_MODEL_FALLBACKS"
+MODEL_CACHE_PATH_ENV = "OPENAI_MODEL_CACHE_PATH"
 
 DEFAULT_CANDIDATES = [model_config.GPT51_NANO]
 
@@ -30,7 +38,10 @@ class _ModelCacheEntry:
 
 
 _MODEL_CACHE_TTL_SECONDS = 60 * 60
+_PREFETCH_WAIT_SECONDS = 10.0
 _MODEL_CACHE: dict[str, _ModelCacheEntry] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+_PREFETCHES: dict[str, threading.Event] = {}
 
 
 def _model_cache_key(client: OpenAI) -> str:
@@ -40,19 +51,119 @@ def _model_cache_key(client: OpenAI) -> str:
     return "|".join([base_url, organization, project])
 
 
+def _model_cache_path() -> Path:
+    configured = os.getenv(MODEL_CACHE_PATH_ENV, "").strip()
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / "cognitive_needs" / "openai_models.json"
+
+
+def _load_persisted(cache_key: str) -> _ModelCacheEntry | None:
+    try:
+        payload = json.loads(_model_cache_path().read_text(encoding="utf-8"))
+        entry = payload[cache_key]
+        return _ModelCacheEntry(fetched_at=float(entry["fetched_at"]), models=set(entry["models"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _persist(cache_key: str, entry: _ModelCacheEntry) -> None:
+    path = _model_cache_path()
+    try:
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            payload = {}
+        if not isinstance(payload, dict):
+            payload = {}
+        payload[cache_key] = {"fetched_at": entry.fetched_at, "models": sorted(entry.models)}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False, suffix=".tmp", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+            temp_name = handle.name
+        os.replace(temp_name, path)
+    except OSError:
+        logger.warning("Could not persist the OpenAI model list to %s", path, exc_info=True)
+
+
+def _fetch_models(client: OpenAI, cache_key: str) -> _ModelCacheEntry:
+    entry = _ModelCacheEntry(fetched_at=time.time(), models={model.id for model in client.models.list()})
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE[cache_key] = entry
+    _persist(cache_key, entry)
+    return entry
+
+
 def _available_models(client: OpenAI) -> Set[str]:
+    """Return the model IDs visible to ``client``.
+
+    Lookups are served from memory, then from the list persisted by an earlier
+    worker, and only then from ``client.models.list()``. A running
+    :func:`prefetch_available_models` for the same account is awaited instead
+    of listing the models a second time.
+    """
+
     cache_key = _model_cache_key(client)
-    cached = _MODEL_CACHE.get(cache_key)
     now = time.time()
+    with _MODEL_CACHE_LOCK:
+        cached = _MODEL_CACHE.get(cache_key)
+        prefetch = _PREFETCHES.get(cache_key)
     if cached and now - cached.fetched_at < _MODEL_CACHE_TTL_SECONDS:
         return cached.models
-    models = {model.id for model in client.models.list()}
-    _MODEL_CACHE[cache_key] = _ModelCacheEntry(fetched_at=now, models=models)
-    return models
+    persisted = _load_persisted(cache_key)
+    if persisted and now - persisted.fetched_at < _MODEL_CACHE_TTL_SECONDS:
+        with _MODEL_CACHE_LOCK:
+            _MODEL_CACHE[cache_key] = persisted
+        return persisted.models
+    if prefetch is not None and prefetch.wait(_PREFETCH_WAIT_SECONDS):
+        with _MODEL_CACHE_LOCK:
+            cached = _MODEL_CACHE.get(cache_key)
+        if cached and time.time() - cached.fetched_at < _MODEL_CACHE_TTL_SECONDS:
+            return cached.models
+    return _fetch_models(client, cache_key).models
+
+
+def prefetch_available_models(client_factory: Callable[[], OpenAI]) -> bool:
+    """List the available models in a background thread, once per process.
+
+    Call this at worker start so the first user request finds the model list
+    in memory (or on disk from a previous worker). Returns ``True`` when a
+    prefetch was started by this call.
+    """
+
+    try:
+        client = client_factory()
+    except Exception:  # noqa: BLE001 - routing falls back to a synchronous lookup
+        logger.warning("Cannot create an OpenAI client for model prefetch", exc_info=True)
+        return False
+    cache_key = _model_cache_key(client)
+    with _MODEL_CACHE_LOCK:
+        if cache_key in _PREFETCHES:
+            return False
+        done = _PREFETCHES[cache_key] = threading.Event()
+
+    def _run() -> None:
+        try:
+            persisted = _load_persisted(cache_key)
+            if persisted and time.time() - persisted.fetched_at < _MODEL_CACHE_TTL_SECONDS:
+                with _MODEL_CACHE_LOCK:
+                    _MODEL_CACHE[cache_key] = persisted
+            else:
+                _fetch_models(client, cache_key)
+        except Exception:  # noqa: BLE001 - routing falls back to a synchronous lookup
+            logger.warning("Prefetching the OpenAI model list failed", exc_info=True)
+        finally:
+            done.set()
+
+    threading.Thread(target=_run, name="openai-model-prefetch", daemon=True).start()
+    return True
 
 
 def _clear_model_cache() -> None:
-    _MODEL_CACHE.clear()
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+        _PREFETCHES.clear()
+    _model_cache_path().unlink(missing_ok=True)
 
 
 _available_models.cache_clear = _clear_model_cache  # type: ignore[attr-defined]
@@ -0,0 +1,377 @@
+"""Live latency, error-rate and throughput statistics for model routing.
+
+Every OpenAI call reports its latency (total and, for streams, time to first
+token), output token count and whether it failed. :class:`TelemetryRouter`
+uses the rolling statistics to pick, for each task, the cheapest candidate
+model whose observed tail latency meets the task's latency SLO.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from config.models import (
+    GPT4,
+    GPT4O,
+    GPT4O_MINI,
+    GPT35,
+    GPT41_MINI,
+    GPT41_NANO,
+    GPT51,
+    GPT51_MINI,
+    GPT51_NANO,
+    GPT52,
+    GPT52_MINI,
+    GPT52_NANO,
+    GPT52_PRO,
+    O3,
+    O3_MINI,
+    O4_MINI,
+    ModelTask,
+    normalise_model_name,
+)
+from utils.circuit_breaker import CircuitState, get_breaker
+from utils.env import env_float
+from utils.metrics import record_llm_call
+
+logger = logging.getLogger(__name__)
+
+# Approximate list prices in USD per 1M (input, output) tokens. Only the
+# relative order matters for routing; override via OPENAI_MODEL_PRICES.
+_DEFAULT_PRICES: dict[str, tuple[float, float]] = {
+    GPT52_PRO: (21.0, 168.0),
+    GPT52: (1.75, 14.0),
+    GPT52_MINI: (0.25, 2.0),
+    GPT52_NANO: (0.05, 0.4),
+    GPT51: (1.25, 10.0),
+    GPT51_MINI: (0.25, 2.0),
+    GPT51_NANO: (0.05, 0.4),
+    GPT41_MINI: (0.4, 1.6),
+    GPT41_NANO: (0.1, 0.4),
+    GPT4O: (2.5, 10.0),
+    GPT4O_MINI: (0.15, 0.6),
+    GPT4: (30.0, 60.0),
+    GPT35: (0.5, 1.5),
+    O3: (2.0, 8.0),
+    O3_MINI: (1.1, 4.4),
+    O4_MINI: (1.1, 4.4),
+}
+
+# Tasks the user actively waits on get tighter p95 latency targets (seconds).
+_DEFAULT_TASK_SLOS: dict[str, float] = {
+    ModelTask.EXTRACTION.value: 30.0,
+    ModelTask.FOLLOW_UP_QUESTIONS.value: 8.0,
+    ModelTask.SALARY_ESTIMATE.value: 10.0,
+    ModelTask.JSON_REPAIR.value: 10.0,
+    ModelTask.PROGRESS_INBOX.value: 5.0,
+}
+
+
+def _env_json_mapping(name: str) -> dict[str, object]:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return {}
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        logger.warning("Invalid %s (expected a JSON object); ignoring it", name)
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _load_prices() -> dict[str, tuple[float, float]]:
+    prices = dict(_DEFAULT_PRICES)
+    for model, value in _env_json_mapping("OPENAI_MODEL_PRICES").items():
+        pair: tuple[float, float] | None = None
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            try:
+                pair = (float(value[0]), float(value[1]))
+            except (TypeError, ValueError):
+                pair = None
+        if pair is None:
+            logger.warning("Invalid OPENAI_MODEL_PRICES entry for %s; expected [input, output]", model)
+            continue
+        prices[normalise_model_name(model)] = pair
+    return prices
+
+
+def _load_slos() -> dict[str, float]:
+    slos = dict(_DEFAULT_TASK_SLOS)
+    for task, value in _env_json_mapping("MODEL_ROUTING_SLOS").items():
+        try:
+            slos[str(task).strip().lower()] = float(value)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            logger.warning("Invalid MODEL_ROUTING_SLOS entry for %s; expected seconds", task)
+    return slos
+
+
+TELEMETRY_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_STRATEGY", "").strip().lower() == "telemetry"
+DEFAULT_SLO_SECONDS = env_float("MODEL_ROUTING_DEFAULT_SLO", 20.0, positive=True)
+MAX_ERROR_RATE = env_float("MODEL_ROUTING_MAX_ERROR_RATE", 0.2, positive=True)
+TELEMETRY_WINDOW_SECONDS = env_float("MODEL_TELEMETRY_WINDOW", 900.0, positive=True)
+MODEL_PRICES = _load_prices()
+TASK_SLOS = _load_slos()
+
+_WINDOW_SIZE = 200
+# Below this many samples a task falls back to the model-wide statistics.
+_MIN_TASK_SAMPLES = 5
+# Token counts used to compare prices when the caller cannot estimate them.
+_NOMINAL_TOKENS = 1000
+
+
+@dataclass(frozen=True)
+class _Sample:
+    at: float
+    latency: float
+    ttft: float | None
+    output_tokens: int | None
+    error: bool
+
+
+@dataclass(frozen=True)
+class ModelStats:
+    """Rolling statistics for one model (optionally scoped to a task)."""
+
+    samples: int
+    error_rate: float
+    latency_p50: float | None
+    latency_p95: float | None
+    ttft_p95: float | None
+    tokens_per_second: float | None
+
+    def predicted_latency(self, output_tokens: int | None = None) -> float | None:
+        """Estimate the p95 latency for a call producing ``output_tokens``."""
+
+        if output_tokens and self.ttft_p95 is not None and self.tokens_per_second:
+            return self.ttft_p95 + output_tokens / self.tokens_per_second
+        return self.latency_p95
+
+
+def _percentile(values: Sequence[float], percentile: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percentile * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summarise(samples: Sequence[_Sample]) -> ModelStats:
+    successes = [sample for sample in samples if not sample.error]
+    latencies = [sample.latency for sample in successes]
+    ttfts = [sample.ttft for sample in successes if sample.ttft is not None]
+    throughput = [
+        sample.output_tokens / (sample.latency - (sample.ttft or 0.0))
+        for sample in successes
+        if sample.output_tokens and sample.latency - (sample.ttft or 0.0) > 0
+    ]
+    return ModelStats(
+        samples=len(samples),
+        error_rate=(len(samples) - len(successes)) / len(samples) if samples else 0.0,
+        latency_p50=_percentile(latencies, 0.5),
+        latency_p95=_percentile(latencies, 0.95),
+        ttft_p95=_percentile(ttfts, 0.95),
+        tokens_per_second=_percentile(throughput, 0.5),
+    )
+
+
+class ModelTelemetry:
+    """Thread-safe rolling call statistics keyed by ``(task, model)``."""
+
+    def __init__(
+        self,
+        *,
+        window: int = _WINDOW_SIZE,
+        max_age: float = TELEMETRY_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window = window
+        self._max_age = max_age
+        self._clock = clock
+        self._samples: dict[tuple[str, str], deque[_Sample]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        task: str,
+        model: str,
+        *,
+        latency: float,
+        ttft: float | None = None,
+        output_tokens: int | None = None,
+        error: bool = False,
+    ) -> None:
+        """Add one observed call to the statistics of ``task`` and ``model``."""
+
+        sample = _Sample(self._clock(), max(0.0, latency), ttft, output_tokens, error)
+        key = (task, normalise_model_name(model))
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._window)
+            samples.append(sample)
+
+    def _recent(self, key: tuple[str, str], cutoff: float) -> list[_Sample]:
+        samples = self._samples.get(key)
+        if not samples:
+            return []
+        while samples and samples[0].at < cutoff:
+            samples.popleft()
+        return list(samples)
+
+    def stats(self, task: str, model: str) -> ModelStats:
+        """Return statistics for ``model`` on ``task``, or model-wide when sparse."""
+
+        model = normalise_model_name(model)
+        cutoff = self._clock() - self._max_age
+        with self._lock:
+            scoped = self._recent((task, model), cutoff)
+            if len(scoped) < _MIN_TASK_SAMPLES:
+                scoped = [
+                    sample for key in list(self._samples) if key[1] == model for sample in self._recent(key, cutoff)
+                ]
+        return _summarise(scoped)
+
+    def snapshot(self) -> dict[str, dict[str, ModelStats]]:
+        """Return per-task statistics for dashboards and logs."""
+
+        with self._lock:
+            keys = list(self._samples)
+        snapshot: dict[str, dict[str, ModelStats]] = {}
+        cutoff = self._clock() - self._max_age
+        for task, model in keys:
+            with self._lock:
+                samples = self._recent((task, model), cutoff)
+            if samples:
+                snapshot.setdefault(task, {})[model] = _summarise(samples)
+        return snapshot
+
+
+def estimate_cost(model: str, *, input_tokens: int, output_tokens: int) -> float | None:
+    """Return the approximate USD cost of a call, or ``None`` for unknown models."""
+
+    prices = MODEL_PRICES.get(normalise_model_name(model))
+    if prices is None:
+        return None
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+class TelemetryRouter:
+    """Pick the cheapest model that meets a task's latency SLO."""
+
+    def __init__(self, telemetry: ModelTelemetry) -> None:
+        self._telemetry = telemetry
+
+    @staticmethod
+    def slo_for(task: str) -> float:
+        return TASK_SLOS.get(task, DEFAULT_SLO_SECONDS)
+
+    @staticmethod
+    def _circuit_open(model: str) -> bool:
+        breaker = get_breaker(f"openai:{model}")
+        state = breaker.current_state()
+        if state.state is not CircuitState.OPEN:
+            return False
+        opened_at = state.last_failure_ts or 0.0
+        return time.time() - opened_at < breaker.recovery_timeout
+
+    def choose(
+        self,
+        task: str,
+        candidates: Sequence[str],
+        *,
+        input_tokens: int = 0,
+        output_tokens: int | None = None,
+    ) -> str | None:
+        """Return the preferred model among ``candidates`` for ``task``.
+
+        Models without enough samples are assumed to meet the SLO so they get
+        traffic and therefore statistics. When no candidate meets the SLO the
+        reliable one with the lowest predicted latency wins. Returns ``None`` when
+        ``candidates`` is empty.
+        """
+
+        unique = list(dict.fromkeys(candidate for candidate in candidates if candidate))
+        healthy = [model for model in unique if not self._circuit_open(model)] or unique
+        if not healthy:
+            return None
+        slo = self.slo_for(task)
+        cost_input = input_tokens or _NOMINAL_TOKENS
+        cost_output = output_tokens or _NOMINAL_TOKENS
+        scored: list[tuple[bool, float, float, int, str]] = []
+        within_slo: list[tuple[float, int, str]] = []
+        for index, model in enumerate(healthy):
+            stats = self._telemetry.stats(task, model)
+            sampled = stats.samples >= _MIN_TASK_SAMPLES
+            predicted = stats.predicted_latency(output_tokens) if sampled else None
+            cost = estimate_cost(model, input_tokens=cost_input, output_tokens=cost_output)
+            cost_key = math.inf if cost is None else cost
+            unreliable = sampled and stats.error_rate > MAX_ERROR_RATE
+            scored.append((unreliable, math.inf if predicted is None else predicted, cost_key, index, model))
+            if not unreliable and (predicted is None or predicted <= slo):
+                within_slo.append((cost_key, index, model))
+        choice = min(within_slo)[2] if within_slo else min(scored)[4]
+        logger.debug("Telemetry routing for %s chose %s (SLO %.1fs)", task, choice, slo)
+        return choice
+
+
+_TELEMETRY = ModelTelemetry()
+_ROUTER = TelemetryRouter(_TELEMETRY)
+
+
+def get_model_telemetry() -> ModelTelemetry:
+    """Return the process-wide telemetry store."""
+
+    return _TELEMETRY
+
+
+def get_telemetry_router() -> TelemetryRouter:
+    """Return the router backed by the process-wide telemetry store."""
+
+    return _ROUTER
+
+
+def record_model_call(
+    task: ModelTask | str | None,
+    model: str | None,
+    *,
+    latency: float,
+    ttft: float | None = None,
+    output_tokens: int | None = None,
+    error: bool = False,
+) -> None:
+    """Record one OpenAI call in the process-wide telemetry store and the metrics."""
+
+    if not model:
+        return
+    task_key = task.value if isinstance(task, ModelTask) else str(task or ModelTask.DEFAULT.value).strip().lower()
+    _TELEMETRY.record(task_key, model, latency=latency, ttft=ttft, output_tokens=output_tokens, error=error)
+    record_llm_call(task_key, model, latency=latency, ttft=ttft, output_tokens=output_tokens, error=error)
+
+
+def reset_model_telemetry() -> None:
+    """Drop all recorded samples (used by tests)."""
+
+    global _TELEMETRY, _ROUTER
+    _TELEMETRY = ModelTelemetry()
+    _ROUTER = TelemetryRouter(_TELEMETRY)
+
+
+__all__ = [
+    "ModelStats",
+    "ModelTelemetry",
+    "TELEMETRY_ROUTING_ENABLED",
+    "TelemetryRouter",
+    "estimate_cost",
+    "get_model_telemetry",
+    "get_telemetry_router",
+    "record_model_call",
+    "reset_model_telemetry",
+]
@@ -21,6 +21,7 @@ from core.schema import canonicalize_profile_payload
 from llm.json_repair import repair_profile_payload
 from llm.profile_normalization import normalize_interview_stages_field
 from models.need_analysis import NeedAnalysisProfile
+from utils.json_salvage import salvage_json_object
 
 logger = logging.getLogger(__name__)
 
@@ -264,12 +265,17 @@ class NeedAnalysisOutputParser:
         try:
             data = json.loads(candidate)
         except json.JSONDecodeError as err:
-            raise NeedAnalysisParserError(
-                "Structured extraction did not return valid JSON.",
-                raw_text=candidate,
-                data=None,
-                original=err,
-            ) from err
+            salvaged = salvage_json_object(candidate, try_strict=False)
+            if salvaged.value is None:
+                raise NeedAnalysisParserError(
+                    "Structured extraction did not return valid JSON.",
+                    raw_text=candidate,
+                    data=None,
+                    original=err,
+                ) from err
+            logger.info("Salvaged malformed NeedAnalysis JSON: %s", "; ".join(salvaged.repairs))
+            data = salvaged.value
+            candidate = json.dumps(data)
 
         if isinstance(data, dict):
             normalize_interview_stages_field(data)
@@ -564,6 +564,10 @@ def build_job_ad_prompt(payload: Mapping[str, Any]) -> list[dict[str, str]]:
     if manual_lines:
         label = tr("Kuratiere diese Zusatzabschnitte unverändert", "Include these curated sections verbatim", lang)
         parts.append(f"{label}:\n" + "\n".join(manual_lines))
+    passages = [str(passage).strip() for passage in payload.get("retrieved_passages") or [] if str(passage).strip()]
+    if passages:
+        label = prompt_registry.get("generators.job_ad.retrieval.context", locale=lang)
+        parts.append(f"{label}\n" + "\n".join(f"- {passage}" for passage in passages))
 
     user_msg = "\n\n".join(part for part in parts if part).strip()
 
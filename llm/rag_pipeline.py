@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from threading import Lock
@@ -13,14 +14,24 @@ from opentelemetry import trace
 
 from config import VECTOR_STORE_ID, ModelTask, get_model_for
 
-from openai_utils.api import call_chat_api
+from openai_utils.api import call_chat_api, get_client
 from openai_utils.tools import build_file_search_tool
 from prompts import prompt_registry
+from utils.cancellation import remaining_time
+from utils.env import env_float, env_int
 from utils.logging_context import wrap_with_current_context
+from utils.metrics import record_cache_lookup, record_retrieval
 
 
 logger = logging.getLogger("cognitive_needs.rag")
 
+RAG_PASSAGE_CACHE_SIZE = env_int("RAG_PASSAGE_CACHE_SIZE", 128, minimum=0)
+# Passage lookups sit in front of a streamed generation; give up quickly.
+RAG_SEARCH_TIMEOUT = env_float("RAG_SEARCH_TIMEOUT", 5.0, positive=True)
+
+_PASSAGE_CACHE: OrderedDict[tuple[str, str, int], tuple[RetrievedChunk, ...]] = OrderedDict()
+_PASSAGE_CACHE_LOCK = Lock()
+
 
 @dataclass(slots=True)
 class FieldSpec:
@@ -249,6 +260,7 @@ class RAGPipeline:
         if start_time is None:
             return
         elapsed_ms = max(0.0, (time.perf_counter() - start_time) * 1000)
+        record_retrieval(elapsed_ms / 1000, fallback=fallback)
         logger.info(
             "Vector-store retrieval for field '%s' took %.2f ms (fallback=%s)",
             field,
@@ -379,6 +391,79 @@ def collect_field_contexts(
     return pipeline.run(specs)
 
 
+def retrieve_passages(
+    query: str,
+    *,
+    vector_store_id: str | None = None,
+    top_k: int = 4,
+    model: str | None = None,
+) -> list[RetrievedChunk]:
+    """Return the best vector store passages for ``query``.
+
+    The passages come from the vector store search endpoint directly, without a
+    model turn. Results are cached in process memory per vector store, query
+    and ``top_k`` (``RAG_PASSAGE_CACHE_SIZE`` entries). The search gets
+    ``RAG_SEARCH_TIMEOUT`` seconds without retries; failed or timed-out lookups
+    return an empty list and are not cached.
+    """
+
+    pipeline = RAGPipeline(vector_store_id=vector_store_id, top_k=top_k, model=model)
+    query = query.strip()
+    if not pipeline.vector_store_id or not query:
+        return []
+
+    cache_key = (pipeline.vector_store_id, query, pipeline.top_k)
+    with _PASSAGE_CACHE_LOCK:
+        cached = _PASSAGE_CACHE.get(cache_key)
+        if cached is not None:
+            _PASSAGE_CACHE.move_to_end(cache_key)
+    record_cache_lookup("rag_passages", hit=cached is not None)
+    if cached is not None:
+        return list(cached)
+
+    start_time = time.perf_counter()
+    try:
+        client = get_client().with_options(timeout=remaining_time(RAG_SEARCH_TIMEOUT), max_retries=0)
+        page = client.vector_stores.search(
+            pipeline.vector_store_id,
+            query=query,
+            max_num_results=pipeline.top_k,
+        )
+        results = [_search_result_entry(item) for item in page.data]
+    except Exception as err:
+        logger.warning("Vector store search failed for passage query: %s", err)
+        pipeline._record_retrieval_timing(field="passages", start_time=start_time, fallback=True)
+        return []
+
+    chunks = pipeline._collect_results(results)
+    pipeline._record_retrieval_timing(field="passages", start_time=start_time, fallback=not chunks)
+    if chunks and RAG_PASSAGE_CACHE_SIZE:
+        with _PASSAGE_CACHE_LOCK:
+            _PASSAGE_CACHE[cache_key] = tuple(chunks)
+            while len(_PASSAGE_CACHE) > RAG_PASSAGE_CACHE_SIZE:
+                _PASSAGE_CACHE.popitem(last=False)
+    return chunks
+
+
+def _search_result_entry(item: Any) -> dict[str, Any]:
+    """Map a vector store search result onto the shape of a file-search result."""
+
+    attributes = getattr(item, "attributes", None) or {}
+    return {
+        "file_id": getattr(item, "file_id", None),
+        "score": getattr(item, "score", 0.0),
+        "content": getattr(item, "content", None) or [],
+        "metadata": {"filename": getattr(item, "filename", None), **attributes},
+    }
+
+
+def clear_passage_cache() -> None:
+    """Drop all cached passage lookups."""
+
+    with _PASSAGE_CACHE_LOCK:
+        _PASSAGE_CACHE.clear()
+
+
 def build_global_context(
     text: str,
     *,
@@ -475,5 +560,7 @@ __all__ = [
     "RAGPipeline",
     "build_field_queries",
     "collect_field_contexts",
+    "retrieve_passages",
+    "clear_passage_cache",
     "build_global_context",
 ]
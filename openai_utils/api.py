@@ -29,6 +29,7 @@ from openai import (
     APITimeoutError,
     AuthenticationError,
     BadRequestError,
+    InternalServerError,
     OpenAI,
     OpenAIError,
     RateLimitError,
@@ -54,12 +55,16 @@ from config import (
     resolve_api_mode,
 )
 from constants.keys import StateKeys
+from llm.model_telemetry import record_model_call
+from utils.cancellation import OperationCancelled, raise_if_cancelled, remaining_time
+from utils.circuit_breaker import CircuitOpenError
 from utils.errors import display_error, resolve_message
 from utils.i18n import tr
 from utils.json_repair import JsonRepairStatus, parse_json_with_repair
 from utils.llm_state import llm_disabled_message
-from utils.logging_context import log_context, set_model, wrap_with_current_context
+from utils.logging_context import get_model, get_session_id, log_context, set_model, wrap_with_current_context
 from utils.retry import retry_with_backoff
+from utils.usage_ledger import current_tenant, get_usage_accountant
 from .client import (
     FileSearchKey,
     FileSearchResult,
@@ -91,6 +96,8 @@ from .payloads import (
     _convert_responses_payload_to_chat,
     _prepare_payload,
 )
+from .hedging import is_hedging_enabled, plan_hedge, run_hedged
+from .rate_limiter import RateLimitQueueTimeout, Reservation, admit_request, response_total_tokens
 from .schemas import (
     SchemaFormatBundle,
     build_need_analysis_json_schema_payload,  # noqa: F401
@@ -104,8 +111,9 @@ openai_client = OpenAIClient()
 client = openai_client
 _create_response_with_timeout = openai_client._create_response_with_timeout
 
-_USAGE_LOCK = Lock()
-_FALLBACK_USAGE_COUNTERS: dict[str, int] = {"input_tokens": 0, "output_tokens": 0}
+_HEDGE_USAGE_LOCK = Lock()
+_HEDGE_USAGE_COUNTERS: dict[str, int] = {"discarded_requests": 0, "input_tokens": 0, "output_tokens": 0}
+_HEDGE_USAGE_BY_TASK: dict[str, dict[str, int]] = {}
 _BUDGET_GUARD_ALERT_STATE_KEY = "system.openai.budget_guard_alert"
 _BUDGET_EXCEEDED_MESSAGE: Final[tuple[str, str]] = (
     "Budget-Limit erreicht ({limit} Token pro Sitzung). Bitte Eingaben prüfen oder Budget erhöhen.",
@@ -115,7 +123,10 @@ _CURRENT_USAGE_MESSAGE: Final[tuple[str, str]] = (
     "Aktuelle Nutzung: {total} Token.",
     "Current usage: {total} tokens.",
 )
-_budget_exceeded_flag = False
+_TENANT_BUDGET_EXCEEDED_MESSAGE: Final[tuple[str, str]] = (
+    "Tages-Budget erreicht ({limit} Token). Bitte morgen erneut versuchen oder Budget erhöhen.",
+    "Daily budget reached ({limit} tokens). Please try again tomorrow or raise the budget.",
+)
 
 DEFAULT_TEMPERATURE: Final[float] = 0.1
 
@@ -163,6 +174,10 @@ _NETWORK_ERROR_MESSAGE: Final[tuple[str, str]] = (
     "Netzwerkfehler bei der Kommunikation mit OpenAI. Bitte Verbindung prüfen und erneut versuchen.",
     "Network error communicating with OpenAI. Please check your connection and retry.",
 )
+_SERVICE_UNAVAILABLE_MESSAGE: Final[tuple[str, str]] = (
+    "OpenAI ist vorübergehend nicht erreichbar. Bitte in Kürze erneut versuchen oder die Felder manuell ausfüllen.",
+    "OpenAI is temporarily unavailable. Please retry shortly or continue filling the fields manually.",
+)
 _TIMEOUT_ERROR_MESSAGE: Final[tuple[str, str]] = (
     "⏳ Die Anfrage dauert länger als erwartet. Bitte erneut versuchen oder die Felder manuell ausfüllen.",
     "⏳ This is taking longer than usual. Please try again or continue filling the fields manually.",
@@ -501,6 +516,25 @@ def _execute_response(
     )
 
 
+def _create_chat_fallback(fallback_payload: Mapping[str, Any]) -> Any:
+    """Send a legacy Chat Completions fallback through the rate limiter and circuit breaker."""
+
+    request_kwargs = dict(fallback_payload)
+    raw_timeout = request_kwargs.pop("timeout", OPENAI_REQUEST_TIMEOUT)
+    timeout_value = float(raw_timeout) if isinstance(raw_timeout, (int, float)) else float(OPENAI_REQUEST_TIMEOUT)
+    raise_if_cancelled()
+    timeout = remaining_time(min(timeout_value, USER_FRIENDLY_TIMEOUT_SECONDS))
+    client = get_client()
+    model_value = request_kwargs.get("model")
+    return openai_client.send_guarded(
+        client,
+        client.chat.completions,
+        request_kwargs,
+        model=model_value if isinstance(model_value, str) else None,
+        timeout=timeout,
+    )
+
+
 def _to_mapping(item: Any) -> dict[str, Any] | None:
     """Best-effort conversion of SDK dataclasses to Python dictionaries."""
 
@@ -794,31 +828,42 @@ def _budget_guard_message(limit: int, total: int | None = None) -> str:
     return f"{base} {tr(*_CURRENT_USAGE_MESSAGE).format(total=total)}"
 
 
-def _current_usage_total_locked(usage_state: Mapping[str, Any] | None = None) -> int:
-    """Return the total token count using session or fallback counters."""
+def _usage_session_id() -> str:
+    """Return the identifier usage of the current context is accounted to."""
 
-    fallback_total = _coerce_token_count(_FALLBACK_USAGE_COUNTERS.get("input_tokens")) + _coerce_token_count(
-        _FALLBACK_USAGE_COUNTERS.get("output_tokens")
-    )
+    return get_session_id()
+
+
+def _current_usage_total(usage_state: Mapping[str, Any] | None = None) -> int:
+    """Return the session's token total from Streamlit state or the usage accountant."""
+
+    accounted_total = get_usage_accountant().session_total(_usage_session_id())
     if not _allow_streamlit_access():
-        return fallback_total
+        return accounted_total
     if usage_state is None:
         try:
             usage_state = st.session_state.get(StateKeys.USAGE)
         except Exception:  # pragma: no cover - Streamlit session not initialised
             usage_state = None
     if not isinstance(usage_state, Mapping):
-        return fallback_total
+        return accounted_total
     input_tokens = _coerce_token_count(usage_state.get("input_tokens"))
     output_tokens = _coerce_token_count(usage_state.get("output_tokens"))
     return input_tokens + output_tokens
 
 
-def _mark_budget_exceeded_locked() -> None:
+def _session_budget_exceeded() -> bool:
+    """Return ``True`` when the current session already crossed its budget."""
+
+    if _allow_streamlit_access() and st.session_state.get(StateKeys.USAGE_BUDGET_EXCEEDED):
+        return True
+    return get_usage_accountant().session_exceeded(_usage_session_id())
+
+
+def _mark_budget_exceeded() -> None:
     """Record that the session has crossed the configured budget limit."""
 
-    global _budget_exceeded_flag
-    _budget_exceeded_flag = True
+    get_usage_accountant().mark_session_exceeded(_usage_session_id())
     if not _allow_streamlit_access():
         return
     try:
@@ -861,23 +906,26 @@ def _show_budget_guard_warning(limit: int, total: int) -> None:
 
 
 def _enforce_usage_budget_guard() -> None:
-    """Raise when the configured token budget has already been exhausted."""
+    """Raise when the session or tenant token budget has already been exhausted."""
+
+    accountant = get_usage_accountant()
+    tenant_limit = accountant.tenant_daily_limit
+    if tenant_limit is not None and accountant.tenant_exceeded():
+        logger.warning("Tenant token budget reached (tenant=%s, limit=%s)", current_tenant(), tenant_limit)
+        raise RuntimeError(tr(*_TENANT_BUDGET_EXCEEDED_MESSAGE).format(limit=tenant_limit))
 
     limit = _token_budget_limit()
     if limit is None:
         return
 
-    exceeded = False
-    total = 0
-    with _USAGE_LOCK:
-        total = _current_usage_total_locked()
-        exceeded = _budget_exceeded_flag or total >= limit
-        if exceeded and not _budget_exceeded_flag:
-            _mark_budget_exceeded_locked()
-
-    if exceeded:
-        _show_budget_guard_warning(limit, total)
-        raise RuntimeError(_budget_guard_message(limit, total))
+    already_exceeded = _session_budget_exceeded()
+    total = _current_usage_total()
+    if not already_exceeded and total < limit:
+        return
+    if not already_exceeded:
+        _mark_budget_exceeded()
+    _show_budget_guard_warning(limit, total)
+    raise RuntimeError(_budget_guard_message(limit, total))
 
 
 def _normalise_task(task: ModelTask | str | None) -> str:
@@ -890,62 +938,90 @@ def _normalise_task(task: ModelTask | str | None) -> str:
     return ModelTask.DEFAULT.value
 
 
-def _update_usage_counters(usage: Mapping[str, Any], *, task: ModelTask | str | None) -> None:
-    """Accumulate token usage in the Streamlit session state."""
-
-    limit = _token_budget_limit()
-    crossed_threshold = False
-    total_after_update = 0
+def _update_usage_counters(
+    usage: Mapping[str, Any],
+    *,
+    task: ModelTask | str | None,
+    model: str | None = None,
+) -> None:
+    """Accumulate token usage for the current session.
 
-    with _USAGE_LOCK:
-        input_tokens = _coerce_token_count(usage.get("input_tokens"))
-        output_tokens = _coerce_token_count(usage.get("output_tokens"))
+    The usage accountant keeps per-thread counters (and feeds the usage
+    ledger); the Streamlit ``StateKeys.USAGE`` block is only touched on the
+    script thread, which owns the session state.
+    """
 
-        _FALLBACK_USAGE_COUNTERS["input_tokens"] = (
-            _coerce_token_count(_FALLBACK_USAGE_COUNTERS.get("input_tokens", 0)) + input_tokens
-        )
-        _FALLBACK_USAGE_COUNTERS["output_tokens"] = (
-            _coerce_token_count(_FALLBACK_USAGE_COUNTERS.get("output_tokens", 0)) + output_tokens
-        )
+    input_tokens = _coerce_token_count(usage.get("input_tokens"))
+    output_tokens = _coerce_token_count(usage.get("output_tokens"))
+    task_key = _normalise_task(task)
+    get_usage_accountant().record(
+        session=_usage_session_id(),
+        task=task_key,
+        model=model or get_model(),
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+    )
 
-        usage_state: MutableMapping[str, Any] | None = None
-        if _allow_streamlit_access():
-            try:
-                usage_candidate = st.session_state.get(StateKeys.USAGE)
-            except Exception:  # pragma: no cover - Streamlit session not initialised
-                usage_candidate = None
-        else:
+    usage_state: MutableMapping[str, Any] | None = None
+    if _allow_streamlit_access():
+        try:
+            usage_candidate = st.session_state.get(StateKeys.USAGE)
+        except Exception:  # pragma: no cover - Streamlit session not initialised
             usage_candidate = None
-
         if isinstance(usage_candidate, MutableMapping):
             usage_state = usage_candidate
         elif isinstance(usage_candidate, Mapping):
             usage_state = dict(usage_candidate)
-            if _allow_streamlit_access():
-                try:
-                    st.session_state[StateKeys.USAGE] = usage_state
-                except Exception:  # pragma: no cover - Streamlit session not initialised
-                    pass
-
-        if usage_state is not None:
-            usage_state["input_tokens"] = _coerce_token_count(usage_state.get("input_tokens", 0)) + input_tokens
-            usage_state["output_tokens"] = _coerce_token_count(usage_state.get("output_tokens", 0)) + output_tokens
-
-            task_key = _normalise_task(task)
-            task_map = usage_state.setdefault("by_task", {})
-            task_totals = task_map.setdefault(task_key, {"input": 0, "output": 0})
-            task_totals["input"] = _coerce_token_count(task_totals.get("input", 0)) + input_tokens
-            task_totals["output"] = _coerce_token_count(task_totals.get("output", 0)) + output_tokens
-
-        total_after_update = _current_usage_total_locked(usage_state)
-        if limit is not None and not _budget_exceeded_flag and total_after_update >= limit:
-            crossed_threshold = True
-            _mark_budget_exceeded_locked()
-
-    if crossed_threshold and limit is not None:
+            try:
+                st.session_state[StateKeys.USAGE] = usage_state
+            except Exception:  # pragma: no cover - Streamlit session not initialised
+                pass
+
+    if usage_state is not None:
+        usage_state["input_tokens"] = _coerce_token_count(usage_state.get("input_tokens", 0)) + input_tokens
+        usage_state["output_tokens"] = _coerce_token_count(usage_state.get("output_tokens", 0)) + output_tokens
+        task_map = usage_state.setdefault("by_task", {})
+        task_totals = task_map.setdefault(task_key, {"input": 0, "output": 0})
+        task_totals["input"] = _coerce_token_count(task_totals.get("input", 0)) + input_tokens
+        task_totals["output"] = _coerce_token_count(task_totals.get("output", 0)) + output_tokens
+
+    limit = _token_budget_limit()
+    if limit is None or _session_budget_exceeded():
+        return
+    total_after_update = _current_usage_total(usage_state)
+    if total_after_update >= limit:
+        _mark_budget_exceeded()
         _show_budget_guard_warning(limit, total_after_update)
 
 
+def _record_hedge_usage(usage: Mapping[str, Any], *, task: ModelTask | str | None) -> None:
+    """Track tokens spent on hedge attempts whose response was discarded.
+
+    The tokens themselves are already part of the regular usage counters;
+    this keeps the hedging overhead visible per task.
+    """
+
+    input_tokens = _coerce_token_count(usage.get("input_tokens"))
+    output_tokens = _coerce_token_count(usage.get("output_tokens"))
+    with _HEDGE_USAGE_LOCK:
+        _HEDGE_USAGE_COUNTERS["discarded_requests"] += 1
+        _HEDGE_USAGE_COUNTERS["input_tokens"] += input_tokens
+        _HEDGE_USAGE_COUNTERS["output_tokens"] += output_tokens
+        by_task = _HEDGE_USAGE_BY_TASK.setdefault(_normalise_task(task), {"input": 0, "output": 0})
+        by_task["input"] += input_tokens
+        by_task["output"] += output_tokens
+
+
+def get_hedge_usage() -> dict[str, Any]:
+    """Return token usage of discarded hedge attempts (totals and per task)."""
+
+    with _HEDGE_USAGE_LOCK:
+        return {
+            **_HEDGE_USAGE_COUNTERS,
+            "by_task": {task: dict(totals) for task, totals in _HEDGE_USAGE_BY_TASK.items()},
+        }
+
+
 def _accumulate_usage(state: RetryState, latest: UsageDict) -> None:
     """Add ``latest`` token counts to ``state``."""
 
@@ -1307,7 +1383,7 @@ class ChatStream(Iterable[str]):
         allow_legacy_fallback: bool = ALLOW_LEGACY_FALLBACKS,
     ):
         prepared_payload = dict(payload)
-        prepared_payload.setdefault("timeout", OPENAI_REQUEST_TIMEOUT)
+        prepared_payload.setdefault("timeout", remaining_time(OPENAI_REQUEST_TIMEOUT))
         self._payload = prepared_payload
         self._model = model
         self._task = task
@@ -1354,12 +1430,18 @@ class ChatStream(Iterable[str]):
 
             final_response: Any | None = None
             missing_completion_event = False
+            reservation: Reservation | None = None
+            stream_started = time.monotonic()
+            first_chunk_at: float | None = None
             try:
+                reservation = admit_request(self._payload)
                 if self._api_mode.is_classic:
                     with client.chat.completions.stream(**self._payload) as stream:
                         for chat_event in stream:
                             for chunk in _stream_event_chunks(chat_event):
                                 if chunk:
+                                    if first_chunk_at is None:
+                                        first_chunk_at = time.monotonic()
                                     self._buffer.append(chunk)
                                     yield chunk
                         final_response = stream.get_final_completion()
@@ -1368,6 +1450,8 @@ class ChatStream(Iterable[str]):
                         for responses_event in stream:
                             for chunk in _stream_event_chunks(responses_event):
                                 if chunk:
+                                    if first_chunk_at is None:
+                                        first_chunk_at = time.monotonic()
                                     self._buffer.append(chunk)
                                     yield chunk
                         try:
@@ -1387,6 +1471,13 @@ class ChatStream(Iterable[str]):
                             else:
                                 raise
             except (OpenAIError, RuntimeError) as error:
+                if isinstance(error, (APIConnectionError, RateLimitError, InternalServerError)):
+                    record_model_call(
+                        self._task,
+                        context_model,
+                        latency=time.monotonic() - stream_started,
+                        error=True,
+                    )
                 if _is_missing_completion_event_error(error) or missing_completion_event:
                     logger.warning("Streaming failure detected; attempting fallback via API retries.", exc_info=error)
                     recovered = self._recover_stream_response(client)
@@ -1430,6 +1521,17 @@ class ChatStream(Iterable[str]):
             if final_response is None:
                 self._finalise_partial()
             else:
+                if reservation is not None:
+                    reservation.settle(response_total_tokens(final_response))
+                record_model_call(
+                    self._task,
+                    context_model,
+                    latency=time.monotonic() - stream_started,
+                    ttft=first_chunk_at - stream_started if first_chunk_at is not None else None,
+                    output_tokens=_numeric_usage(_normalise_usage(_extract_usage_block(final_response) or {})).get(
+                        "output_tokens"
+                    ),
+                )
                 self._finalise(final_response)
 
             if (self._result is None or not (self._result.content or "").strip()) and not self._api_mode.is_classic:
@@ -1513,7 +1615,7 @@ class ChatStream(Iterable[str]):
             usage.get("output_tokens"),
             usage.get("total_tokens"),
         )
-        _update_usage_counters(usage, task=self._task)
+        _update_usage_counters(usage, task=self._task, model=self._payload.get("model"))
         response_id = _extract_response_id(response)
         self._result = ChatCallResult(
             content,
@@ -2038,9 +2140,67 @@ def _call_chat_api_single(
 
         while True:
             with log_context(model=current_model):
+                call_started = time.monotonic()
                 try:
                     response = _execute_response(payload, current_model, api_mode=api_mode_override)
+                except (CircuitOpenError, RateLimitQueueTimeout) as err:
+                    reason = err.reason if isinstance(err, CircuitOpenError) else "rate_limited"
+                    next_model = context.register_failure(current_model)
+                    if next_model is None:
+                        raise ExternalServiceError(
+                            resolve_message(_SERVICE_UNAVAILABLE_MESSAGE),
+                            step=step_label,
+                            model=current_model,
+                            details={
+                                "api_mode": active_mode.value,
+                                "schema": schema_name,
+                                "error_type": err.__class__.__name__,
+                                "reason": reason,
+                            },
+                            service="openai",
+                            original=err,
+                        ) from err
+                    logger.warning(
+                        "Model '%s' is unavailable (%s); retrying with fallback '%s'.",
+                        current_model,
+                        reason,
+                        next_model,
+                    )
+                    payload["model"] = next_model
+                    current_model = next_model
+                    set_model(current_model)
+                    _, use_response_format = _apply_schema_capability_fallback(
+                        model=current_model,
+                        json_schema=None,
+                        use_response_format=use_response_format,
+                        context="_call_chat_api_single(circuit-fallback)",
+                    )
+                    if not use_response_format:
+                        payload.pop("response_format", None)
+                    continue
+                except OperationCancelled as err:
+                    # The caller's deadline passed or the run was cancelled;
+                    # another model would not get any further.
+                    raise ExternalServiceError(
+                        resolve_message(_SERVICE_UNAVAILABLE_MESSAGE),
+                        step=step_label,
+                        model=current_model,
+                        details={
+                            "api_mode": active_mode.value,
+                            "schema": schema_name,
+                            "error_type": err.__class__.__name__,
+                            "reason": str(err) or "cancelled",
+                        },
+                        service="openai",
+                        original=err,
+                    ) from err
                 except OpenAIError as err:
+                    record_model_call(
+                        task,
+                        current_model,
+                        latency=time.monotonic() - call_started,
+                        error=isinstance(err, (APIConnectionError, RateLimitError, InternalServerError)),
+                    )
                     schema_error = isinstance(err, BadRequestError) and is_unrecoverable_schema_error(err)
                     non_retryable_config_error = is_non_retryable_configuration_error(err)
                     log_level = logger.warning if not non_retryable_config_error else logger.error
@@ -2129,8 +2289,8 @@ def _call_chat_api_single(
                                 current_model,
                             )
                             try:
-                                response = get_client().chat.completions.create(**fallback_payload)
-                            except OpenAIError as chat_error:
+                                response = _create_chat_fallback(fallback_payload)
+                            except (OpenAIError, CircuitOpenError, OperationCancelled) as chat_error:
                                 logger.error(
                                     "Chat Completions fallback failed: %s",
                                     getattr(chat_error, "message", str(chat_error)),
@@ -2242,6 +2402,12 @@ def _call_chat_api_single(
             numeric_usage = _numeric_usage(usage_block)
             tool_calls = _collect_tool_calls(response)
             result_tool_calls = tool_calls
+            record_model_call(
+                task,
+                current_model,
+                latency=time.monotonic() - call_started,
+                output_tokens=numeric_usage.get("output_tokens"),
+            )
 
             if schema_bundle is not None and normalised_content:
                 repair_attempt = parse_json_with_repair(normalised_content)
@@ -2261,7 +2427,7 @@ def _call_chat_api_single(
                     if fallback_payload:
                         fallback_to_chat_attempted = True
                         try:
-                            fallback_response = get_client().chat.completions.create(**fallback_payload)
+                            fallback_response = _create_chat_fallback(fallback_payload)
                             fallback_content = _normalise_content_payload(_extract_output_text(fallback_response))
                             repair_attempt = parse_json_with_repair(fallback_content or "")
                             repair_status = repair_attempt.status
@@ -2316,7 +2482,7 @@ def _call_chat_api_single(
                 secondary_usage = comparison_result.usage
 
             merged_usage = _usage_snapshot(retry_state, numeric_usage)
-            _update_usage_counters(merged_usage, task=task)
+            _update_usage_counters(merged_usage, task=task, model=current_model)
             return ChatCallResult(
                 normalised_content,
                 result_tool_calls,
@@ -2345,7 +2511,7 @@ def _call_chat_api_single(
 
         if not executed:
             merged_usage = _usage_snapshot(retry_state, numeric_usage)
-            _update_usage_counters(merged_usage, task=task)
+            _update_usage_counters(merged_usage, task=task, model=current_model)
             result_tool_calls = tool_calls or retry_state.last_tool_calls
             return ChatCallResult(
                 normalised_content,
@@ -2359,6 +2525,31 @@ def _call_chat_api_single(
             )
 
 
+def _call_chat_api_hedged(messages: Sequence[dict], single_kwargs: Mapping[str, Any]) -> ChatCallResult | None:
+    """Run :func:`_call_chat_api_single` with a delayed duplicate request.
+
+    Returns ``None`` when no hedge plan applies so the caller can issue a plain
+    request instead.
+    """
+
+    task = single_kwargs.get("task")
+    requested_model = single_kwargs.get("model")
+    plan = plan_hedge(task, requested_model)
+    if plan is None:
+        return None
+
+    def _attempt(model: str) -> ChatCallResult:
+        kwargs = dict(single_kwargs)
+        if model != plan.primary_model or requested_model is not None:
+            kwargs["model"] = model
+        return _call_chat_api_single(messages, **kwargs)
+
+    def _discarded(_model: str, result: ChatCallResult) -> None:
+        _record_hedge_usage(result.usage, task=task)
+
+    return run_hedged(plan, _attempt, on_discarded=_discarded).value
+
+
 @retry_with_backoff(
     giveup=lambda exc: isinstance(exc, (BadRequestError, SchemaValidationError, LLMResponseFormatError))
     or is_unrecoverable_schema_error(exc),
@@ -2387,6 +2578,7 @@ def call_chat_api(
     comparison_label: str | None = None,
     use_response_format: bool = True,
     allow_legacy_fallback: bool = ALLOW_LEGACY_FALLBACKS,
+    hedge: bool | None = None,
 ) -> ChatCallResult:
     """Call the OpenAI chat endpoint and return a :class:`ChatCallResult`.
 
@@ -2398,6 +2590,10 @@ def call_chat_api(
     parallel (unless ``comparison_options['dispatch']`` is set to
     ``"sequential"``). Both responses are returned along with basic similarity
     metadata so callers can decide which variant to keep.
+
+    ``hedge`` enables request hedging (see :mod:`openai_utils.hedging`); the
+    default follows ``OPENAI_HEDGED_TASKS`` for ``task``. Calls with tools are
+    never hedged because tool functions may have side effects.
     """
 
     if _llm_disabled():
@@ -2405,6 +2601,7 @@ def call_chat_api(
         raise RuntimeError(llm_disabled_message())
 
     _enforce_usage_budget_guard()
+    raise_if_cancelled()
 
     task_config = None
     if task is not None:
@@ -2449,6 +2646,11 @@ def call_chat_api(
     }
 
     if comparison_messages is None:
+        hedge_enabled = is_hedging_enabled(task) if hedge is None else hedge
+        if hedge_enabled and not tools and not tool_functions:
+            hedged_result = _call_chat_api_hedged(messages, single_kwargs)
+            if hedged_result is not None:
+                return hedged_result
         return _call_chat_api_single(messages, **single_kwargs)
 
     options = dict(comparison_options or {})
@@ -2607,7 +2809,7 @@ def stream_chat_api(
     )
 
 
-def _chat_content(res: Any) -> str:
+def chat_content(res: Any) -> str:
     """Return the textual content from a chat API result."""
 
     if hasattr(res, "content"):
@@ -2628,6 +2830,10 @@ def _chat_content(res: Any) -> str:
     return ""
 
 
+# Older private name, still used inside the package.
+_chat_content = chat_content
+
+
 __all__ = [
     "ChatCallResult",
     "call_chat_api",
@@ -2638,6 +2844,7 @@ __all__ = [
     "build_chat_payload",
     "model_supports_reasoning",
     "model_supports_temperature",
+    "chat_content",
     "_chat_content",
     "build_need_analysis_json_schema_payload",
     "SchemaFormatBundle",
@@ -0,0 +1,287 @@
+"""Offline execution of prepared requests through a Batch-API-style backend.
+
+Requests are rendered with :func:`openai_utils.api.build_chat_payload` (the
+same payload ``call_chat_api`` would send), written as JSONL and handed to a
+:class:`BatchBackend`. :class:`OpenAIBatchBackend` uses the OpenAI Batch API,
+which bills at about half the interactive price and does not count against
+the interactive rate limits; :class:`LocalBatchBackend` runs the same file
+in-process for tests and offline use.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Protocol
+
+from openai import OpenAI
+
+from .api import (
+    ChatCallResult,
+    _extract_output_text,
+    _extract_response_id,
+    _normalise_content_payload,
+    _normalise_usage,
+    _numeric_usage,
+    build_chat_payload,
+    get_client,
+)
+
+logger = logging.getLogger(__name__)
+
+RESPONSES_ENDPOINT = "/v1/responses"
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+TERMINAL_STATES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    """One request of a batch: messages plus ``call_chat_api`` options."""
+
+    custom_id: str
+    messages: list[dict[str, Any]]
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BatchStatus:
+    """Progress of a submitted batch."""
+
+    batch_id: str
+    state: str
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+
+@dataclass(frozen=True)
+class BatchOutcome:
+    """Result of one batch request; exactly one of ``result``/``error`` is set."""
+
+    custom_id: str
+    result: ChatCallResult | None
+    error: str | None = None
+
+
+class BatchBackend(Protocol):
+    """Submission and retrieval of JSONL request files."""
+
+    def submit(self, path: Path, *, endpoint: str, metadata: Mapping[str, str] | None = None) -> str:
+        """Upload ``path`` and return the batch identifier."""
+
+    def status(self, batch_id: str) -> BatchStatus:
+        """Return the current progress of ``batch_id``."""
+
+    def results(self, batch_id: str) -> Iterator[dict[str, Any]]:
+        """Yield the raw output lines that are available for ``batch_id``."""
+
+
+def render_batch_line(request: BatchRequest) -> tuple[str, dict[str, Any]]:
+    """Return ``(endpoint, line)`` for ``request`` in Batch API input format."""
+
+    options = {"include_analysis_tools": False, **request.options}
+    prepared = build_chat_payload(request.messages, **options)
+    body = dict(prepared.payload)
+    body.pop("stream", None)
+    endpoint = CHAT_COMPLETIONS_ENDPOINT if "messages" in body else RESPONSES_ENDPOINT
+    return endpoint, {"custom_id": request.custom_id, "method": "POST", "url": endpoint, "body": body}
+
+
+def write_batch_file(requests: Iterable[BatchRequest], path: Path) -> tuple[str, int]:
+    """Write ``requests`` to ``path`` as JSONL and return ``(endpoint, count)``.
+
+    The Batch API accepts a single endpoint per file, so mixing Responses and
+    Chat Completions payloads raises :class:`ValueError`.
+    """
+
+    endpoint: str | None = None
+    count = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        for request in requests:
+            line_endpoint, line = render_batch_line(request)
+            if endpoint is not None and line_endpoint != endpoint:
+                raise ValueError(f"batch mixes {endpoint} and {line_endpoint} requests")
+            endpoint = line_endpoint
+            handle.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+            count += 1
+    tmp_path.replace(path)
+    return endpoint or RESPONSES_ENDPOINT, count
+
+
+def parse_batch_output(line: Mapping[str, Any]) -> BatchOutcome:
+    """Convert one Batch API output line into a :class:`BatchOutcome`."""
+
+    custom_id = str(line.get("custom_id") or "")
+    error = line.get("error")
+    response = line.get("response")
+    if error or not isinstance(response, Mapping):
+        message = error.get("message") if isinstance(error, Mapping) else error
+        return BatchOutcome(custom_id, None, str(message or "missing response"))
+    status_code = int(response.get("status_code") or 0)
+    body = response.get("body")
+    if status_code >= 400 or not isinstance(body, Mapping):
+        message = body.get("error", {}).get("message") if isinstance(body, Mapping) else None
+        return BatchOutcome(custom_id, None, f"HTTP {status_code}: {message or 'request failed'}")
+    body_view = SimpleNamespace(**body)
+    usage = _numeric_usage(_normalise_usage(body.get("usage") or {}))
+    result = ChatCallResult(
+        _normalise_content_payload(_extract_output_text(body_view)),
+        [],
+        usage,
+        response_id=_extract_response_id(body_view),
+        raw_response=dict(body),
+    )
+    return BatchOutcome(custom_id, result)
+
+
+class OpenAIBatchBackend:
+    """Backend submitting files to the OpenAI Batch API."""
+
+    def __init__(self, client: OpenAI | None = None, *, completion_window: str = COMPLETION_WINDOW) -> None:
+        self._client = client
+        self._completion_window = completion_window
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def submit(self, path: Path, *, endpoint: str, metadata: Mapping[str, str] | None = None) -> str:
+        with path.open("rb") as handle:
+            uploaded = self.client.files.create(file=handle, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=endpoint,  # type: ignore[arg-type]
+            completion_window=self._completion_window,  # type: ignore[arg-type]
+            metadata=dict(metadata or {}),
+        )
+        return str(batch.id)
+
+    def status(self, batch_id: str) -> BatchStatus:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = getattr(batch, "request_counts", None)
+        return BatchStatus(
+            batch_id=batch_id,
+            state=str(batch.status),
+            total=int(getattr(counts, "total", 0) or 0),
+            completed=int(getattr(counts, "completed", 0) or 0),
+            failed=int(getattr(counts, "failed", 0) or 0),
+        )
+
+    def results(self, batch_id: str) -> Iterator[dict[str, Any]]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = self.client.files.content(file_id)
+            for raw in content.text.splitlines():
+                if raw.strip():
+                    yield json.loads(raw)
+
+
+def _default_local_executor(endpoint: str, body: dict[str, Any]) -> Any:
+    client = get_client()
+    if endpoint == CHAT_COMPLETIONS_ENDPOINT:
+        return client.chat.completions.create(**body)
+    return client.responses.create(**body)
+
+
+class LocalBatchBackend:
+    """In-process stand-in for the Batch API.
+
+    Batches run when their status is first polled; inputs, outputs and state
+    live in ``directory`` so a new instance can pick up earlier batches.
+    ``execute(endpoint, body)`` returns the response (a mapping or an SDK
+    object with ``model_dump``); it defaults to the configured OpenAI client.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        execute: Callable[[str, dict[str, Any]], Any] | None = None,
+    ) -> None:
+        self._directory = Path(directory)
+        self._execute = execute or _default_local_executor
+
+    def _paths(self, batch_id: str) -> tuple[Path, Path, Path]:
+        base = self._directory / batch_id
+        return base.with_suffix(".input.jsonl"), base.with_suffix(".output.jsonl"), base.with_suffix(".json")
+
+    def submit(self, path: Path, *, endpoint: str, metadata: Mapping[str, str] | None = None) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex}"
+        input_path, _, state_path = self._paths(batch_id)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        input_path.write_bytes(Path(path).read_bytes())
+        state = {"state": "validating", "endpoint": endpoint, "metadata": dict(metadata or {})}
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+        return batch_id
+
+    def _run(self, batch_id: str, state: dict[str, Any]) -> dict[str, Any]:
+        input_path, output_path, state_path = self._paths(batch_id)
+        completed = failed = 0
+        with input_path.open(encoding="utf-8") as source, output_path.open("w", encoding="utf-8") as sink:
+            for raw in source:
+                if not raw.strip():
+                    continue
+                line = json.loads(raw)
+                output: dict[str, Any] = {"id": uuid.uuid4().hex, "custom_id": line["custom_id"]}
+                try:
+                    response = self._execute(line["url"], line["body"])
+                except Exception as exc:  # noqa: BLE001 - recorded per request like the Batch API does
+                    output.update(response=None, error={"code": type(exc).__name__, "message": str(exc)})
+                    failed += 1
+                else:
+                    dump = getattr(response, "model_dump", None)
+                    body = dump() if callable(dump) else dict(response)
+                    output.update(response={"status_code": 200, "body": body}, error=None)
+                    completed += 1
+                sink.write(json.dumps(output, ensure_ascii=False, default=str) + "\n")
+        state.update(state="completed", completed=completed, failed=failed)
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+        return state
+
+    def status(self, batch_id: str) -> BatchStatus:
+        _, _, state_path = self._paths(batch_id)
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        if state.get("state") not in TERMINAL_STATES:
+            state = self._run(batch_id, state)
+        completed = int(state.get("completed", 0))
+        failed = int(state.get("failed", 0))
+        return BatchStatus(batch_id, str(state["state"]), completed + failed, completed, failed)
+
+    def results(self, batch_id: str) -> Iterator[dict[str, Any]]:
+        _, output_path, _ = self._paths(batch_id)
+        if not output_path.exists():
+            return
+        with output_path.open(encoding="utf-8") as handle:
+            for raw in handle:
+                if raw.strip():
+                    yield json.loads(raw)
+
+
+__all__ = [
+    "CHAT_COMPLETIONS_ENDPOINT",
+    "RESPONSES_ENDPOINT",
+    "BatchBackend",
+    "BatchOutcome",
+    "BatchRequest",
+    "BatchStatus",
+    "LocalBatchBackend",
+    "OpenAIBatchBackend",
+    "parse_batch_output",
+    "render_batch_line",
+    "write_batch_file",
+]
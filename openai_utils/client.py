@@ -8,7 +8,15 @@ from typing import Any, Callable, Iterator, Mapping, Sequence, TypedDict, TypeAl
 
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
-from openai import BadRequestError, OpenAI, OpenAIError
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    BadRequestError,
+    InternalServerError,
+    OpenAI,
+    OpenAIError,
+    RateLimitError,
+)
 import streamlit as st
 
 from config import (
@@ -19,8 +27,11 @@ from config import (
     OPENAI_REQUEST_TIMEOUT,
     mark_model_unavailable,
 )
+from utils.cancellation import current_token, raise_if_cancelled, remaining_time
+from utils.circuit_breaker import CallOutcome, CircuitOpenError, get_breaker
 from utils.errors import display_error, resolve_message
 from utils.retry import retry_with_backoff
+from .rate_limiter import Reservation, admit_request, response_total_tokens
 from .schemas import sanitize_response_format_payload
 
 logger = logging.getLogger("cognitive_needs.openai")
@@ -356,7 +367,10 @@ class OpenAIClient:
             timeout_value = float(raw_timeout)
         except (TypeError, ValueError):  # pragma: no cover - defensive parsing
             timeout_value = float(OPENAI_REQUEST_TIMEOUT)
-        timeout = min(timeout_value, USER_FRIENDLY_TIMEOUT_SECONDS)
+        # Cap the request at the caller's deadline so workflow timeouts and
+        # cancellations do not leave requests running in the background.
+        raise_if_cancelled()
+        timeout = remaining_time(min(timeout_value, USER_FRIENDLY_TIMEOUT_SECONDS))
         response_format_payload = request_kwargs.get("response_format")
         if isinstance(response_format_payload, Mapping):
             request_kwargs["response_format"] = sanitize_response_format_payload(response_format_payload)
@@ -364,11 +378,76 @@ class OpenAIClient:
         mode = mode_override or api_mode
         cleaned_payload = _prune_payload_for_api_mode(request_kwargs, mode)
         client = self.get_client()
+        endpoint: Any
         if mode == "responses":
-            return client.responses.create(timeout=timeout, **cleaned_payload)
-        if mode == "chat":
-            return client.chat.completions.create(timeout=timeout, **cleaned_payload)
-        raise ValueError(f"Unsupported API mode: {mode}")
+            endpoint = client.responses
+        elif mode == "chat":
+            endpoint = client.chat.completions
+        else:
+            raise ValueError(f"Unsupported API mode: {mode}")
+        return self.send_guarded(client, endpoint, cleaned_payload, model=model_name, timeout=timeout)
+
+    def send_guarded(
+        self,
+        client: Any,
+        endpoint: Any,
+        cleaned_payload: dict[str, Any],
+        *,
+        model: str | None,
+        timeout: float | None,
+    ) -> Any:
+        """Send ``cleaned_payload`` through the rate limiter and the model's circuit breaker.
+
+        Raises:
+            RateLimitQueueTimeout: when no rate-limit capacity frees up in time.
+            CircuitOpenError: when the model's circuit rejects the request.
+        """
+
+        # Queue for rate-limit capacity before taking a circuit breaker permit,
+        # so a half-open probe slot is never held while waiting in the queue.
+        reservation = admit_request(cleaned_payload, model=model)
+        if reservation is not None:
+            # Queueing may have consumed part of the caller's deadline.
+            timeout = remaining_time(timeout)
+        if not model:
+            return self._send_request(client, endpoint, cleaned_payload, reservation, timeout)
+        # Fail fast while the model's shared circuit is open instead of letting
+        # every session wait for its own timeouts.
+        breaker = get_breaker(f"openai:{model}")
+        try:
+            with breaker.guard(classify=_classify_openai_outcome, timeout=timeout):
+                return self._send_request(client, endpoint, cleaned_payload, reservation, timeout)
+        except CircuitOpenError:
+            # The request was never sent; hand the reserved tokens back.
+            if reservation is not None:
+                reservation.settle(0)
+            raise
+
+    @staticmethod
+    def _send_request(
+        client: Any,
+        endpoint: Any,
+        cleaned_payload: dict[str, Any],
+        reservation: Reservation | None,
+        timeout: float | None,
+    ) -> Any:
+        if reservation is None:
+            return endpoint.create(timeout=timeout, **cleaned_payload)
+        limiter = reservation.limiter
+        try:
+            if isinstance(client, OpenAI):
+                raw_response = endpoint.with_raw_response.create(timeout=timeout, **cleaned_payload)
+                if limiter is not None:
+                    limiter.observe_headers(reservation.model, raw_response.headers)
+                response = raw_response.parse()
+            else:
+                response = endpoint.create(timeout=timeout, **cleaned_payload)
+        except RateLimitError as err:
+            if limiter is not None:
+                limiter.penalize(reservation.model, getattr(getattr(err, "response", None), "headers", None))
+            raise
+        reservation.settle(response_total_tokens(response))
+        return response
 
     def _execute_once(
         self,
@@ -428,6 +507,9 @@ class OpenAIClient:
         on_known_error: Callable[..., None] | None = None,
     ) -> Any:
         def _should_give_up(exc: Exception) -> bool:
+            token = current_token()
+            if token is not None and token.cancelled:
+                return True
             return isinstance(exc, BadRequestError) or (giveup(exc) if giveup else False)
 
         @retry_with_backoff(giveup=_should_give_up, on_giveup=on_giveup)
@@ -437,6 +519,19 @@ class OpenAIClient:
         return _run()
 
 
+def _classify_openai_outcome(error: BaseException) -> CallOutcome:
+    """Map request errors to circuit breaker outcomes."""
+
+    if isinstance(error, RateLimitError):
+        return CallOutcome.OVERLOAD
+    if isinstance(error, (APIConnectionError, InternalServerError)):
+        return CallOutcome.FAILURE
+    if isinstance(error, APIStatusError):
+        # Any other status code means the API answered; the model is healthy.
+        return CallOutcome.SUCCESS
+    return CallOutcome.IGNORED
+
+
 def _message_indicates_parameter_unsupported(message: str, parameter: str) -> bool:
     lowered = message.lower()
     if parameter not in lowered:
@@ -31,6 +31,7 @@ from llm.rag_pipeline import (
     FieldExtractionContext,
     RetrievedChunk,
     build_global_context as default_global_context,
+    retrieve_passages,
 )
 from models.interview_guide import (
     InterviewGuide,
@@ -40,6 +41,7 @@ from models.interview_guide import (
 )
 from pydantic import ValidationError
 
+from utils.env import env_int
 from utils.i18n import tr
 from utils.json_repair import JsonRepairStatus
 from utils.normalization import extract_company_size
@@ -187,6 +189,9 @@ def _style_display_label(tone_style: str | None, lang: str | None) -> str:
     return tr(*variant.label, lang=_style_lang(lang))
 
 
+JOB_AD_RETRIEVAL_TOP_K = env_int("JOB_AD_RETRIEVAL_TOP_K", 4, minimum=1)
+JOB_AD_RETRIEVAL_MAX_CHARS = env_int("JOB_AD_RETRIEVAL_MAX_CHARS", 600, minimum=120)
+
 _HEURISTIC_FIELD_PREFIXES: tuple[str, ...] = (
     "business_context.",
     "company.",
@@ -1974,7 +1979,7 @@ def generate_interview_guide(
         return fallback
 
 
-def _prepare_job_ad_payload(
+def prepare_job_ad_payload(
     session_data: Mapping[str, Any],
     selected_fields: Sequence[str],
     *,
@@ -2362,8 +2367,8 @@ def _prepare_job_ad_payload(
         if not section_entries:
             continue
         section_payload: list[dict[str, Any]] = []
-        for _key, label, value in section_entries:
-            entry_payload: dict[str, Any] = {"label": label}
+        for key, label, value in section_entries:
+            entry_payload: dict[str, Any] = {"key": key, "label": label}
             if isinstance(value, list):
                 items = [str(item).strip() for item in value if str(item).strip()]
                 if not items:
@@ -2511,6 +2516,10 @@ def _prepare_job_ad_payload(
     return structured_payload, document
 
 
+# Older private name, still used inside the package and by tests.
+_prepare_job_ad_payload = prepare_job_ad_payload
+
+
 def generate_job_ad(
     session_data: Mapping[str, Any],
     selected_fields: Sequence[str],
@@ -2568,6 +2577,25 @@ def generate_job_ad(
     return llm_output or document
 
 
+def _retrieve_job_ad_passages(structured_payload: Mapping[str, Any], store_id: str) -> list[str]:
+    """Return file-search passages to inline into a streamed job ad prompt.
+
+    Streaming responses cannot run the file-search tool before the first
+    token, so retrieval happens up front in one capped lookup that is cached
+    per query. Passages are trimmed to keep the prompt small.
+    """
+
+    lang = str(structured_payload.get("language") or "de")
+    query = prompt_registry.format(
+        "generators.job_ad.retrieval.query",
+        locale=lang,
+        heading=str(structured_payload.get("heading") or structured_payload.get("job_title") or "").strip(),
+        audience=str(structured_payload.get("audience") or "").strip(),
+    )
+    chunks = retrieve_passages(query, vector_store_id=store_id, top_k=JOB_AD_RETRIEVAL_TOP_K)
+    return [chunk.to_payload(max_chars=JOB_AD_RETRIEVAL_MAX_CHARS)["text"] for chunk in chunks]
+
+
 def stream_job_ad(
     session_data: Mapping[str, Any],
     selected_fields: Sequence[str],
@@ -2581,7 +2609,12 @@ def stream_job_ad(
     selected_values: Mapping[str, Any] | None = None,
     vector_store_id: str | None = None,
 ) -> tuple[api.ChatStream, str]:
-    """Return a streaming iterator and fallback document for job ad generation."""
+    """Return a streaming iterator and fallback document for job ad generation.
+
+    With a vector store, the retrieved passages are inlined into the prompt; a
+    :class:`RuntimeError` is raised when none are found so callers can fall back
+    to :func:`generate_job_ad` and its file-search tool.
+    """
 
     structured_payload, document = _prepare_job_ad_payload(
         session_data,
@@ -2603,7 +2636,11 @@ def stream_job_ad(
 
     store_id = _resolve_vector_store_id(vector_store_id)
     if store_id:
-        raise RuntimeError("Job ad streaming with retrieval is not supported.")
+        passages = _retrieve_job_ad_passages(structured_payload, store_id)
+        if not passages:
+            # Callers fall back to generate_job_ad(), which runs the file-search tool itself.
+            raise RuntimeError("No vector store passages found for job ad streaming.")
+        structured_payload = {**structured_payload, "retrieved_passages": passages}
 
     messages = build_job_ad_prompt(structured_payload)
     stream = api.stream_chat_api(
@@ -2783,6 +2820,7 @@ __all__ = [
     "generate_interview_guide",
     "generate_job_ad",
     "stream_job_ad",
+    "prepare_job_ad_payload",
     "summarize_company_page",
     "refine_document",
     "what_happened",
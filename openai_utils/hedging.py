@@ -0,0 +1,370 @@
+"""Hedged requests for latency-sensitive OpenAI tasks.
+
+A hedged call starts the primary request and, if it has not answered after
+the task's observed tail latency (``OPENAI_HEDGE_PERCENTILE`` of recent calls
+for the same task and model), fires a duplicate – optionally against the next
+model in :func:`config.models.get_model_fallbacks_for`. The first successful
+response wins and the other attempt's cancellation token is cancelled so it
+stops before any further retry or network call.
+
+Hedging is opt-in per :class:`~config.models.ModelTask` via
+``OPENAI_HEDGED_TASKS``. Duplicates are paid for from a :class:`HedgeBudget`
+that earns ``OPENAI_HEDGE_BUDGET`` hedges per eligible call, which bounds the
+extra token spend to roughly that fraction of the task's traffic.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+try:
+    from streamlit.runtime.scriptruncontext import add_script_run_ctx, get_script_run_ctx
+except (ModuleNotFoundError, RuntimeError):  # pragma: no cover - Streamlit not installed
+    add_script_run_ctx = None
+    get_script_run_ctx = None
+
+from config.models import ModelTask, get_model_fallbacks_for, select_model
+from utils.cancellation import CancellationToken, bind_token, current_token
+from utils.env import env_float
+from utils.logging_context import wrap_with_current_context
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_SAMPLE_SIZE = 200
+_MIN_SAMPLES = 20
+_POLL_SECONDS = 0.25
+_MAX_WORKERS = 16
+
+
+def _env_tasks(name: str) -> frozenset[str]:
+    raw = os.getenv(name, "")
+    return frozenset(part.strip().lower() for part in raw.split(",") if part.strip())
+
+
+HEDGED_TASKS = _env_tasks("OPENAI_HEDGED_TASKS")
+HEDGE_PERCENTILE = min(env_float("OPENAI_HEDGE_PERCENTILE", 0.95, positive=True), 0.999)
+HEDGE_INITIAL_DELAY = env_float("OPENAI_HEDGE_DELAY", 8.0, positive=True)
+HEDGE_MIN_DELAY = env_float("OPENAI_HEDGE_MIN_DELAY", 0.5, positive=True)
+HEDGE_BUDGET_RATIO = min(env_float("OPENAI_HEDGE_BUDGET", 0.05, positive=True), 1.0)
+HEDGE_TO_FALLBACK = os.getenv("OPENAI_HEDGE_TO_FALLBACK", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per task and model."""
+
+    def __init__(self, sample_size: int = _SAMPLE_SIZE) -> None:
+        self._sample_size = sample_size
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, task: str, model: str, seconds: float) -> None:
+        with self._lock:
+            window = self._samples.get((task, model))
+            if window is None:
+                window = self._samples[(task, model)] = deque(maxlen=self._sample_size)
+            window.append(seconds)
+
+    def percentile(self, task: str, model: str, quantile: float) -> float | None:
+        """Return the ``quantile`` latency, or ``None`` with too few samples."""
+
+        with self._lock:
+            samples = sorted(self._samples.get((task, model), ()))
+        if len(samples) < _MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(quantile * len(samples)))
+        return samples[index]
+
+
+class HedgeBudget:
+    """Token bucket that earns ``ratio`` hedges per eligible call."""
+
+    def __init__(self, ratio: float = HEDGE_BUDGET_RATIO, *, burst: float = 10.0) -> None:
+        self._ratio = ratio
+        self._burst = burst
+        # Start with one credit so the first slow call can already be hedged.
+        self._credits = min(1.0, burst)
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._credits = min(self._burst, self._credits + self._ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._credits < 1.0:
+                return False
+            self._credits -= 1.0
+            return True
+
+
+@dataclass(frozen=True)
+class HedgePlan:
+    """Resolved hedging decision for one call."""
+
+    task: str
+    primary_model: str
+    hedge_model: str
+    delay: float
+
+
+@dataclass
+class HedgeOutcome:
+    """Result of :func:`run_hedged` together with bookkeeping details."""
+
+    value: Any
+    model: str
+    hedged: bool
+    hedge_won: bool
+
+
+_TRACKER = LatencyTracker()
+_STATS: dict[str, int] = {"calls": 0, "hedged": 0, "hedge_wins": 0, "budget_exhausted": 0}
+_STATS_LOCK = threading.Lock()
+_BUDGETS: dict[str, HedgeBudget] = {}
+_BUDGETS_LOCK = threading.Lock()
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _task_key(task: ModelTask | str | None) -> str | None:
+    if isinstance(task, ModelTask):
+        return task.value
+    if isinstance(task, str) and task.strip():
+        return task.strip().lower()
+    return None
+
+
+def is_hedging_enabled(task: ModelTask | str | None) -> bool:
+    """Return ``True`` when ``task`` opted into hedging."""
+
+    key = _task_key(task)
+    return key is not None and key in HEDGED_TASKS
+
+
+def _budget(task: str) -> HedgeBudget:
+    with _BUDGETS_LOCK:
+        budget = _BUDGETS.get(task)
+        if budget is None:
+            budget = _BUDGETS[task] = HedgeBudget()
+        return budget
+
+
+def _next_fallback(model: str, fallbacks: Sequence[str]) -> str:
+    candidates = list(fallbacks)
+    if model in candidates:
+        candidates = candidates[candidates.index(model) + 1 :]
+    return next((candidate for candidate in candidates if candidate != model), model)
+
+
+def plan_hedge(
+    task: ModelTask | str | None,
+    model: str | None = None,
+    *,
+    to_fallback: bool | None = None,
+) -> HedgePlan | None:
+    """Return the hedge plan for a call of ``task`` on ``model``.
+
+    ``model`` defaults to the task's configured model. The hedge delay is the
+    configured latency percentile for the task/model pair, or
+    ``OPENAI_HEDGE_DELAY`` until enough samples were observed.
+    """
+
+    key = _task_key(task)
+    if key is None:
+        return None
+    model = model or select_model(key)
+    use_fallback = HEDGE_TO_FALLBACK if to_fallback is None else to_fallback
+    hedge_model = _next_fallback(model, get_model_fallbacks_for(key)) if use_fallback else model
+    observed = _TRACKER.percentile(key, model, HEDGE_PERCENTILE)
+    delay = max(HEDGE_MIN_DELAY, observed if observed is not None else HEDGE_INITIAL_DELAY)
+    return HedgePlan(task=key, primary_model=model, hedge_model=hedge_model, delay=delay)
+
+
+def record_latency(task: ModelTask | str | None, model: str, seconds: float) -> None:
+    """Feed a successful call's latency into the hedge delay estimate."""
+
+    key = _task_key(task)
+    if key is not None:
+        _TRACKER.record(key, model, seconds)
+
+
+def _count(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def hedge_stats() -> dict[str, int]:
+    """Return process-wide counters of hedged calls, hedges fired and wins."""
+
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="openai-hedge")
+        return _EXECUTOR
+
+
+def run_hedged(
+    plan: HedgePlan,
+    attempt: Callable[[str], _T],
+    *,
+    on_discarded: Callable[[str, _T], None] | None = None,
+) -> HedgeOutcome:
+    """Run ``attempt(model)`` and hedge it according to ``plan``.
+
+    ``attempt`` runs on a worker thread under its own child cancellation
+    token. Results of an attempt that completes after the other one won are
+    handed to ``on_discarded`` (so their token usage can still be recorded).
+    Exceptions of the primary are raised once no attempt can succeed anymore.
+    """
+
+    parent = current_token()
+    script_run_ctx = get_script_run_ctx() if get_script_run_ctx else None
+    budget = _budget(plan.task)
+    budget.earn()
+    _count("calls")
+    lock = threading.Lock()
+    # Successful attempts that finished before a winner was chosen; the
+    # losers among them are reported once the decision is made.
+    decision: dict[str, Any] = {"decided": False, "winner": None, "finished": []}
+
+    def _discard(model: str, future: Future[_T]) -> None:
+        if on_discarded is None:
+            return
+        try:
+            on_discarded(model, future.result())
+        except Exception:  # noqa: BLE001 - bookkeeping must not fail the caller
+            logger.debug("Recording discarded hedge result failed", exc_info=True)
+
+    def _launch(model: str) -> tuple[Future[_T], CancellationToken]:
+        token = CancellationToken(parent=parent)
+        started = time.monotonic()
+
+        def _run() -> _T:
+            thread = threading.current_thread()
+            previous_ctx = get_script_run_ctx() if get_script_run_ctx else None
+            if add_script_run_ctx and script_run_ctx:
+                add_script_run_ctx(thread, script_run_ctx)
+            try:
+                with bind_token(token):
+                    return attempt(model)
+            finally:
+                if add_script_run_ctx and script_run_ctx:
+                    # Pool threads serve many sessions; never leak a script context.
+                    add_script_run_ctx(thread, previous_ctx)
+
+        def _finished(done: Future[_T]) -> None:
+            if done.cancelled() or done.exception() is not None:
+                return
+            record_latency(plan.task, model, time.monotonic() - started)
+            with lock:
+                if not decision["decided"]:
+                    decision["finished"].append((model, done))
+                    return
+                late = done is not decision["winner"]
+            if late:
+                _discard(model, done)
+
+        future = _get_executor().submit(wrap_with_current_context(_run))
+        future.add_done_callback(_finished)
+        return future, token
+
+    def _decide(winner: Future[Any] | None) -> None:
+        with lock:
+            decision["decided"] = True
+            decision["winner"] = winner
+            early = [(model, future) for model, future in decision["finished"] if future is not winner]
+        for model, future in early:
+            _discard(model, future)
+
+    primary, primary_token = _launch(plan.primary_model)
+    attempts: dict[Future[Any], tuple[str, CancellationToken]] = {primary: (plan.primary_model, primary_token)}
+    hedge_at = time.monotonic() + plan.delay
+    hedged = False
+    pending: set[Future[Any]] = {primary}
+    first_error: BaseException | None = None
+
+    while pending:
+        if parent is not None and parent.cancelled:
+            for _, token in attempts.values():
+                token.cancel(parent.reason)
+            _decide(None)
+            parent.raise_if_cancelled()
+        if hedged:
+            timeout = _POLL_SECONDS
+        else:
+            timeout = min(_POLL_SECONDS, max(0.0, hedge_at - time.monotonic()))
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                if first_error is None or future is primary:
+                    first_error = error
+                continue
+            model, _ = attempts[future]
+            for other, (_, token) in attempts.items():
+                if other is not future:
+                    token.cancel("hedge lost")
+            _decide(future)
+            hedge_won = future is not primary
+            if hedge_won:
+                _count("hedge_wins")
+                logger.info("Hedged %s request on %s answered before %s", plan.task, model, plan.primary_model)
+            return HedgeOutcome(value=future.result(), model=model, hedged=hedged, hedge_won=hedge_won)
+        if hedged or not pending:
+            continue
+        if time.monotonic() >= hedge_at:
+            hedged = True
+            if budget.try_spend():
+                _count("hedged")
+                logger.debug("Hedging %s request after %.2fs on %s", plan.task, plan.delay, plan.hedge_model)
+                hedge, hedge_token = _launch(plan.hedge_model)
+                attempts[hedge] = (plan.hedge_model, hedge_token)
+                pending.add(hedge)
+            else:
+                _count("budget_exhausted")
+                logger.debug("Hedge budget for %s exhausted; waiting for the primary", plan.task)
+
+    _decide(None)
+    assert first_error is not None
+    raise first_error
+
+
+def reset_hedging() -> None:
+    """Forget latency samples and budgets (used by tests)."""
+
+    global _TRACKER
+    _TRACKER = LatencyTracker()
+    with _BUDGETS_LOCK:
+        _BUDGETS.clear()
+    with _STATS_LOCK:
+        _STATS.update(dict.fromkeys(_STATS, 0))
+
+
+__all__ = [
+    "HEDGED_TASKS",
+    "HedgeBudget",
+    "HedgeOutcome",
+    "HedgePlan",
+    "LatencyTracker",
+    "hedge_stats",
+    "is_hedging_enabled",
+    "plan_hedge",
+    "record_latency",
+    "reset_hedging",
+    "run_hedged",
+]
@@ -431,6 +431,7 @@ def _prepare_payload(
             tool_choice=tool_choice,
             cost_saver_enabled=cost_saver_enabled,
             task=selected_task,
+            expected_output_tokens=max_completion_tokens,
         )
         if chosen_model != base_model:
             candidate_override = chosen_model
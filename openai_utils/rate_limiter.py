@@ -0,0 +1,426 @@
+"""Process-wide request scheduler enforcing OpenAI rate limits.
+
+Every OpenAI request passes :meth:`RateLimiter.acquire` before it is sent.
+Each model has two token buckets – requests per minute and tokens per
+minute – that refill continuously and are re-synchronised from the
+``x-ratelimit-*`` response headers. A ``RateLimitError`` pauses the model for
+the advertised ``retry-after`` so concurrent sessions back off together
+instead of retrying in lockstep.
+
+Waiting requests are served by :class:`~utils.priority.Priority` (interactive
+before background) and then FIFO. A queued request gives up with
+:class:`RateLimitQueueTimeout` once its deadline passes; the deadline
+defaults to the active cancellation token's remaining time or
+``OPENAI_MAX_QUEUE_WAIT`` seconds.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from llm.cost_router import estimate_prompt_complexity
+from utils.cancellation import DeadlineExceeded, current_token, remaining_time
+from utils.env import env_float
+from utils.priority import Priority, current_priority
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART_RE = re.compile(r"(?P<value>\d+(?:\.\d+)?)(?P<unit>ms|h|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+_DEFAULT_OUTPUT_TOKENS = 512
+_TOKENS_PER_WORD = 4 / 3
+_WAIT_SAMPLE_SIZE = 256
+_CANCELLATION_POLL_SECONDS = 0.25
+
+
+def _env_enabled(name: str) -> bool:
+    return os.getenv(name, "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+DEFAULT_RPM = env_float("OPENAI_RPM_LIMIT", 500.0, positive=True)
+DEFAULT_TPM = env_float("OPENAI_TPM_LIMIT", 200_000.0, positive=True)
+MAX_QUEUE_WAIT_SECONDS = env_float("OPENAI_MAX_QUEUE_WAIT", 30.0, positive=True)
+RATE_LIMITER_ENABLED = _env_enabled("OPENAI_RATE_LIMITER")
+
+
+class RateLimitQueueTimeout(DeadlineExceeded):
+    """Raised when a request could not be admitted before its deadline."""
+
+
+def parse_reset_duration(value: str | None) -> float | None:
+    """Parse OpenAI reset durations such as ``"1s"``, ``"6m0s"`` or ``"20ms"``."""
+
+    if not value:
+        return None
+    text = value.strip().lower()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for part in _DURATION_PART_RE.finditer(text):
+        matched = True
+        total += float(part.group("value")) * _UNIT_SECONDS[part.group("unit")]
+    return total if matched else None
+
+
+def _header_number(headers: Mapping[str, Any], name: str) -> float | None:
+    raw = headers.get(name)
+    if raw is None:
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_request_tokens(payload: Mapping[str, Any]) -> int:
+    """Return a conservative token estimate (prompt plus output budget) for ``payload``."""
+
+    messages: Sequence[Mapping[str, object]] = ()
+    for key in ("messages", "input"):
+        value = payload.get(key)
+        if isinstance(value, str):
+            messages = ({"content": value},)
+            break
+        if isinstance(value, Sequence):
+            messages = [item for item in value if isinstance(item, Mapping)]
+            break
+    instructions = payload.get("instructions")
+    if isinstance(instructions, str) and instructions:
+        messages = [*messages, {"content": instructions}]
+    prompt_words = estimate_prompt_complexity(messages).total_tokens if messages else 0
+    output_budget = payload.get("max_output_tokens") or payload.get("max_completion_tokens")
+    if not isinstance(output_budget, int) or output_budget <= 0:
+        output_budget = _DEFAULT_OUTPUT_TOKENS
+    return int(prompt_words * _TOKENS_PER_WORD) + output_budget
+
+
+@dataclass
+class _Bucket:
+    capacity: float
+    level: float
+    updated: float
+
+    @property
+    def rate(self) -> float:
+        """Refill rate per second (capacity per minute)."""
+
+        return self.capacity / 60.0
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        missing = amount - self.level
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def resize(self, capacity: float) -> None:
+        if capacity > 0 and capacity != self.capacity:
+            self.level = min(self.level, capacity)
+            self.capacity = capacity
+
+
+@dataclass
+class _ModelState:
+    requests: _Bucket
+    tokens: _Bucket
+    paused_until: float = 0.0
+    waiters: list[tuple[int, int]] = field(default_factory=list)
+    admitted: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+    rate_limited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    recent_waits: deque[float] = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLE_SIZE))
+
+    def refill(self, now: float) -> None:
+        self.requests.refill(now)
+        self.tokens.refill(now)
+
+
+@dataclass
+class Reservation:
+    """Capacity granted to one request; call :meth:`settle` with real usage."""
+
+    limiter: RateLimiter | None
+    model: str
+    estimated_tokens: int
+    waited: float = 0.0
+
+    def settle(self, actual_tokens: int | None) -> None:
+        """Refund or charge the difference between estimated and actual tokens."""
+
+        if self.limiter is None or actual_tokens is None:
+            return
+        self.limiter._adjust_tokens(self.model, self.estimated_tokens - actual_tokens)
+        self.limiter = None
+
+
+class RateLimiter:
+    """Shared per-model token-bucket scheduler with priority admission."""
+
+    def __init__(
+        self,
+        *,
+        default_rpm: float = DEFAULT_RPM,
+        default_tpm: float = DEFAULT_TPM,
+        max_queue_wait: float = MAX_QUEUE_WAIT_SECONDS,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self._default_rpm = default_rpm
+        self._default_tpm = default_tpm
+        self._max_queue_wait = max_queue_wait
+        self._clock = clock or time.monotonic
+        self._condition = threading.Condition()
+        self._models: dict[str, _ModelState] = {}
+        self._limits: dict[str, tuple[float, float]] = {}
+        self._sequence = itertools.count()
+
+    def configure(self, model: str, *, rpm: float | None = None, tpm: float | None = None) -> None:
+        """Override the request/token limits for ``model``."""
+
+        with self._condition:
+            current_rpm, current_tpm = self._limits.get(model, (self._default_rpm, self._default_tpm))
+            limits = (rpm or current_rpm, tpm or current_tpm)
+            self._limits[model] = limits
+            state = self._models.get(model)
+            if state is not None:
+                state.requests.resize(limits[0])
+                state.tokens.resize(limits[1])
+            self._condition.notify_all()
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            rpm, tpm = self._limits.get(model, (self._default_rpm, self._default_tpm))
+            now = self._clock()
+            state = _ModelState(requests=_Bucket(rpm, rpm, now), tokens=_Bucket(tpm, tpm, now))
+            self._models[model] = state
+        return state
+
+    def acquire(
+        self,
+        model: str,
+        tokens: int,
+        *,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+    ) -> Reservation:
+        """Block until ``model`` has capacity for one request of ``tokens``.
+
+        Raises:
+            RateLimitQueueTimeout: when the request is not admitted in time.
+        """
+
+        lane = current_priority() if priority is None else priority
+        wait_budget = remaining_time(self._max_queue_wait) if timeout is None else timeout
+        token = current_token()
+        started = self._clock()
+        deadline = started + (wait_budget or 0.0)
+        with self._condition:
+            state = self._state(model)
+            # Oversized requests are admitted once the bucket is full.
+            needed = float(min(tokens, state.tokens.capacity))
+            ticket = (int(lane), next(self._sequence))
+            heapq.heappush(state.waiters, ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    state.refill(now)
+                    delay = self._admission_delay(state, ticket, needed, now)
+                    if delay == 0.0:
+                        heapq.heappop(state.waiters)
+                        state.requests.level -= 1
+                        state.tokens.level -= needed
+                        waited = now - started
+                        self._record_wait(state, waited)
+                        self._condition.notify_all()
+                        return Reservation(limiter=self, model=model, estimated_tokens=int(needed), waited=waited)
+                    remaining = deadline - now
+                    if remaining <= 0 or (token is not None and token.cancelled):
+                        state.timeouts += 1
+                        raise RateLimitQueueTimeout(
+                            f"Request for model '{model}' not admitted within {now - started:.2f}s"
+                        )
+                    wait_for = remaining if delay is None else min(delay, remaining)
+                    if token is not None:
+                        wait_for = min(wait_for, _CANCELLATION_POLL_SECONDS)
+                    self._condition.wait(wait_for)
+            except BaseException:
+                if ticket in state.waiters:
+                    state.waiters.remove(ticket)
+                    heapq.heapify(state.waiters)
+                    self._condition.notify_all()
+                raise
+
+    @staticmethod
+    def _admission_delay(state: _ModelState, ticket: tuple[int, int], needed: float, now: float) -> float | None:
+        """Return ``0`` when ``ticket`` may proceed, seconds to wait, or ``None`` if not at the head."""
+
+        if state.waiters[0] != ticket:
+            return None
+        delay = max(
+            state.paused_until - now,
+            state.requests.time_until(1.0),
+            state.tokens.time_until(needed),
+        )
+        return 0.0 if delay <= 0 else delay
+
+    @staticmethod
+    def _record_wait(state: _ModelState, waited: float) -> None:
+        state.admitted += 1
+        if waited > 0.001:
+            state.throttled += 1
+        state.total_wait += waited
+        state.max_wait = max(state.max_wait, waited)
+        state.recent_waits.append(waited)
+
+    def _adjust_tokens(self, model: str, delta: float) -> None:
+        with self._condition:
+            state = self._state(model)
+            state.tokens.level = min(state.tokens.capacity, state.tokens.level + delta)
+            if delta > 0:
+                self._condition.notify_all()
+
+    def observe_headers(self, model: str, headers: Mapping[str, Any] | None) -> None:
+        """Synchronise the buckets of ``model`` with ``x-ratelimit-*`` headers."""
+
+        if not headers:
+            return
+        limit_requests = _header_number(headers, "x-ratelimit-limit-requests")
+        limit_tokens = _header_number(headers, "x-ratelimit-limit-tokens")
+        remaining_requests = _header_number(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _header_number(headers, "x-ratelimit-remaining-tokens")
+        if all(value is None for value in (limit_requests, limit_tokens, remaining_requests, remaining_tokens)):
+            return
+        with self._condition:
+            state = self._state(model)
+            state.refill(self._clock())
+            if limit_requests:
+                state.requests.resize(limit_requests)
+            if limit_tokens:
+                state.tokens.resize(limit_tokens)
+            if remaining_requests is not None:
+                state.requests.level = min(state.requests.capacity, remaining_requests)
+            if remaining_tokens is not None:
+                state.tokens.level = min(state.tokens.capacity, remaining_tokens)
+            self._condition.notify_all()
+
+    def penalize(self, model: str, headers: Mapping[str, Any] | None = None, *, default_delay: float = 1.0) -> None:
+        """Pause ``model`` after a 429 using ``retry-after``/reset headers."""
+
+        delay: float | None = None
+        if headers:
+            retry_after_ms = _header_number(headers, "retry-after-ms")
+            if retry_after_ms is not None:
+                delay = retry_after_ms / 1000.0
+            else:
+                delay = parse_reset_duration(str(headers.get("retry-after") or "")) or max(
+                    parse_reset_duration(headers.get("x-ratelimit-reset-requests")) or 0.0,
+                    parse_reset_duration(headers.get("x-ratelimit-reset-tokens")) or 0.0,
+                )
+        delay = delay or default_delay
+        with self._condition:
+            state = self._state(model)
+            state.rate_limited += 1
+            state.paused_until = max(state.paused_until, self._clock() + delay)
+            self._condition.notify_all()
+        logger.warning("OpenAI rate limit hit for model %s; pausing admissions for %.2fs", model, delay)
+
+    def metrics(self) -> dict[str, dict[str, float | int]]:
+        """Return queue depth and wait-time statistics per model."""
+
+        snapshot: dict[str, dict[str, float | int]] = {}
+        with self._condition:
+            for model, state in self._models.items():
+                waits = sorted(state.recent_waits)
+                p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+                snapshot[model] = {
+                    "queue_depth": len(state.waiters),
+                    "admitted": state.admitted,
+                    "throttled": state.throttled,
+                    "timeouts": state.timeouts,
+                    "rate_limited": state.rate_limited,
+                    "wait_seconds_total": round(state.total_wait, 6),
+                    "wait_seconds_max": round(state.max_wait, 6),
+                    "wait_seconds_p95": round(p95, 6),
+                    "requests_available": round(state.requests.level, 3),
+                    "tokens_available": round(state.tokens.level, 1),
+                }
+        return snapshot
+
+    def queue_depth(self) -> int:
+        """Total number of requests currently waiting for admission."""
+
+        with self._condition:
+            return sum(len(state.waiters) for state in self._models.values())
+
+
+_LIMITER: RateLimiter | None = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    """Return the process-wide limiter (``None`` when ``OPENAI_RATE_LIMITER=0``)."""
+
+    global _LIMITER
+    if not RATE_LIMITER_ENABLED:
+        return None
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = RateLimiter()
+        return _LIMITER
+
+
+def admit_request(payload: Mapping[str, Any], *, model: str | None = None) -> Reservation | None:
+    """Reserve capacity for ``payload`` on the shared limiter, if enabled."""
+
+    limiter = get_rate_limiter()
+    model_name = model or payload.get("model")
+    if limiter is None or not isinstance(model_name, str) or not model_name:
+        return None
+    return limiter.acquire(model_name, estimate_request_tokens(payload))
+
+
+def response_total_tokens(response: Any) -> int | None:
+    """Return ``usage.total_tokens`` from an SDK response or mapping."""
+
+    usage = response.get("usage") if isinstance(response, Mapping) else getattr(response, "usage", None)
+    total = usage.get("total_tokens") if isinstance(usage, Mapping) else getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def reset_rate_limiter() -> None:
+    """Drop the process-wide limiter state (used by tests)."""
+
+    global _LIMITER
+    with _LIMITER_LOCK:
+        _LIMITER = None
+
+
+__all__ = [
+    "RateLimitQueueTimeout",
+    "RateLimiter",
+    "Reservation",
+    "admit_request",
+    "estimate_request_tokens",
+    "get_rate_limiter",
+    "parse_reset_duration",
+    "reset_rate_limiter",
+    "response_total_tokens",
+]
@@ -1,20 +1,49 @@
-"""Minimal FastAPI server that bridges ChatKit webhook events to the Agents SDK."""
+"""Minimal FastAPI server that bridges ChatKit webhook events to the Agents SDK.
+
+Events are answered either as one JSON body or, when the client sends
+``Accept: text/event-stream`` (or ``"stream": true``), as server-sent events
+from a streamed agent run, so the ChatKit widget renders text as it arrives.
+
+Runs are admitted by :class:`RunScheduler`: events of one conversation are
+processed strictly in arrival order, and at most
+``CHATKIT_MAX_CONCURRENT_RUNS`` runs execute at once. Requests that cannot
+get a slot within ``CHATKIT_ADMISSION_TIMEOUT_SECONDS`` or exceed
+``CHATKIT_MAX_QUEUED_PER_CONVERSATION`` are rejected with 503/429 and a
+``Retry-After`` header instead of piling up; streamed requests wait for their
+slot inside the stream and receive an ``error`` event instead.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, Iterable, Mapping, MutableMapping, Sequence
 
-import config
-from agents import Agent, Runner
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from openai.types.responses import ResponseOutputItem, ResponseOutputMessage, ResponseOutputRefusal, ResponseOutputText
-from openai.types.responses.response_input_item_param import FunctionCallOutput, Message as ResponseMessage
+from openai.types.responses.response_input_item_param import FunctionCallOutput
+from openai.types.responses.response_input_item_param import Message as ResponseMessage
+
+import config
+from agents import Agent, Runner
+from utils.env import env_float, env_int
+
+from .service import router as headless_router
 
 app = FastAPI()
+app.include_router(headless_router)
 logger = logging.getLogger(__name__)
 
+CHATKIT_MAX_CONCURRENT_RUNS = env_int("CHATKIT_MAX_CONCURRENT_RUNS", 8, minimum=1)
+CHATKIT_MAX_QUEUED_PER_CONVERSATION = env_int("CHATKIT_MAX_QUEUED_PER_CONVERSATION", 8, minimum=1)
+CHATKIT_ADMISSION_TIMEOUT_SECONDS = env_float("CHATKIT_ADMISSION_TIMEOUT_SECONDS", 10.0)
+
 _agent: Agent[Any] | None = None
 
 
@@ -25,10 +54,127 @@ def _get_agent() -> Agent[Any]:
     if _agent is None:
         from agent_setup import build_wizard_agent
 
-        _agent = build_wizard_agent(vector_store_ids=["VS_123"])
+        vector_store_id = (config.VECTOR_STORE_ID or "").strip()
+        _agent = build_wizard_agent(vector_store_ids=[vector_store_id] if vector_store_id else None)
     return _agent
 
 
+@lru_cache(maxsize=1)
+def _run_config() -> dict[str, Any]:
+    """Return the run settings (model and reasoning effort) shared by all requests."""
+
+    return {"model": config.REASONING_MODEL, "reasoning": {"effort": "minimal"}}
+
+
+class RunRejected(Exception):
+    """Raised when a run cannot be admitted; carries the HTTP status to return."""
+
+    def __init__(self, status_code: int, reason: str) -> None:
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+
+
+@dataclass
+class _Conversation:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    queued: int = 0
+
+
+class Admission:
+    """A granted run slot; :meth:`release` must be called exactly once."""
+
+    def __init__(self, scheduler: RunScheduler, key: str, conversation: _Conversation) -> None:
+        self._scheduler = scheduler
+        self._key = key
+        self._conversation = conversation
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._scheduler._release(self._key, self._conversation)
+
+
+class RunScheduler:
+    """Per-conversation FIFO ordering plus a global limit on concurrent runs.
+
+    An event first waits for its conversation's lock (``asyncio.Lock`` wakes
+    waiters in FIFO order) and only then for a global slot, so queued events
+    of a busy conversation never hold slots other conversations could use.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = CHATKIT_MAX_CONCURRENT_RUNS,
+        *,
+        max_queued_per_conversation: int = CHATKIT_MAX_QUEUED_PER_CONVERSATION,
+        admission_timeout: float = CHATKIT_ADMISSION_TIMEOUT_SECONDS,
+    ) -> None:
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._max_concurrent = max_concurrent
+        self._max_queued = max_queued_per_conversation
+        self._timeout = admission_timeout
+        self._conversations: dict[str, _Conversation] = {}
+        self._active = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of running and waiting events."""
+
+        queued = sum(conversation.queued for conversation in self._conversations.values())
+        return {"active": self._active, "waiting": queued - self._active, "limit": self._max_concurrent}
+
+    async def acquire(self, conversation_id: str | None) -> Admission:
+        """Wait for this conversation's turn and a free slot."""
+
+        key = conversation_id or f"anonymous-{uuid.uuid4().hex}"
+        conversation = self._conversations.setdefault(key, _Conversation())
+        if conversation.queued >= self._max_queued:
+            raise RunRejected(429, "conversation_queue_full")
+        conversation.queued += 1
+        try:
+            await conversation.lock.acquire()
+        except BaseException:
+            self._forget(key, conversation)
+            raise
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._timeout)
+        except BaseException as exc:
+            conversation.lock.release()
+            self._forget(key, conversation)
+            if isinstance(exc, TimeoutError):
+                raise RunRejected(503, "server_busy") from None
+            raise
+        self._active += 1
+        return Admission(self, key, conversation)
+
+    def _release(self, key: str, conversation: _Conversation) -> None:
+        self._active -= 1
+        self._slots.release()
+        conversation.lock.release()
+        self._forget(key, conversation)
+
+    def _forget(self, key: str, conversation: _Conversation) -> None:
+        conversation.queued -= 1
+        if conversation.queued <= 0 and self._conversations.get(key) is conversation:
+            del self._conversations[key]
+
+
+_scheduler: RunScheduler | None = None
+_scheduler_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_scheduler() -> RunScheduler:
+    """Return the scheduler of the running event loop (asyncio primitives are loop-bound)."""
+
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = RunScheduler()
+        _scheduler_loop = loop
+    return _scheduler
+
+
 def _user_message_input(text: str) -> list[ResponseMessage]:
     """Build a structured Responses input item for a user utterance."""
 
@@ -106,36 +252,126 @@ def _serialise_messages(items: Iterable[Any]) -> list[MutableMapping[str, Any]]:
     return serialised
 
 
-@app.post("/chatkit/respond")
-async def respond(req: Request) -> MutableMapping[str, Any]:
+def _event_input(event: Mapping[str, Any]) -> list[Any] | None:
+    """Return the run input for ``event``; ``None`` for events that need no run."""
+
+    event_type = event.get("type")
+    if event_type == "action_invoked":
+        return _action_invocation_input(event["action"])
+    if event_type == "user_message":
+        return _user_message_input(str(event["text"]))
+    if event_type in {"conversation_ended", "session_ended"}:
+        return None
+    raise ValueError(f"Unsupported event type: {event_type}")
+
+
+def _wants_stream(req: Request, event: Mapping[str, Any]) -> bool:
+    return bool(event.get("stream")) or "text/event-stream" in req.headers.get("accept", "")
+
+
+def _sse(event: str, data: Mapping[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_from_run_event(event: Any) -> list[str]:
+    """Translate one streamed run event into SSE frames for the widget."""
+
+    event_type = getattr(event, "type", None)
+    if event_type == "raw_response_event":
+        data = getattr(event, "data", None)
+        if getattr(data, "type", None) == "response.output_text.delta":
+            delta = getattr(data, "delta", "")
+            return [_sse("delta", {"text": delta})] if delta else []
+        return []
+    if event_type == "run_item_stream_event":
+        return [_sse("message", message) for message in _serialise_messages([getattr(event, "item", None)])]
+    return []
+
+
+async def _stream_run(input_items: list[Any], conversation_id: str | None) -> AsyncIterator[str]:
+    """Wait for a run slot, then yield SSE frames of the streamed run.
+
+    The slot is acquired inside the generator, so a client that disconnects
+    before streaming starts never holds one; a rejected run ends the stream
+    with an ``error`` event instead of an HTTP status.
+    """
+
+    try:
+        admission = await _get_scheduler().acquire(conversation_id)
+    except RunRejected as exc:
+        yield _sse("error", {"ok": False, "error": exc.reason, "conversation_id": conversation_id, "retry_after": 1})
+        return
+    result: Any = None
+    finished = False
+    try:
+        result = Runner.run_streamed(
+            _get_agent(),
+            input=input_items,
+            conversation_id=conversation_id,
+            run_config=_run_config(),
+        )
+        async for event in result.stream_events():
+            for frame in _sse_from_run_event(event):
+                yield frame
+        finished = True
+        yield _sse("done", {"ok": True, "conversation_id": conversation_id})
+    except Exception:
+        finished = True
+        logger.exception("Failed to stream ChatKit event", extra={"conversation_id": conversation_id})
+        yield _sse("error", {"ok": False, "error": "internal_error"})
+    finally:
+        if not finished and result is not None and callable(getattr(result, "cancel", None)):
+            # The client went away mid-stream; stop the model call.
+            result.cancel()
+        admission.release()
+
+
+@app.post("/chatkit/respond", response_model=None)
+async def respond(req: Request) -> MutableMapping[str, Any] | JSONResponse | StreamingResponse:
     """Handle ChatKit events and drive the Agents event loop directly."""
 
     event = await req.json()
     event_type = event.get("type")
     conversation_id = event.get("conversation_id")
-    run_config = {"model": config.REASONING_MODEL, "reasoning": {"effort": "minimal"}}
 
-    input_items: list[Any] = []
     try:
-        if event_type == "action_invoked":
-            input_items = _action_invocation_input(event["action"])
-        elif event_type == "user_message":
-            input_items = _user_message_input(str(event["text"]))
-        elif event_type in {"conversation_ended", "session_ended"}:
-            return {"ok": True, "messages": []}
-        else:
-            return {"ok": False, "error": f"Unsupported event type: {event_type}"}
+        input_items = _event_input(event)
+    except ValueError as exc:
+        return {"ok": False, "error": str(exc)}
+    except Exception:
+        logger.exception("Failed to process ChatKit event", extra={"event_type": event_type})
+        return {"ok": False, "error": "internal_error"}
+    if input_items is None:
+        return {"ok": True, "messages": []}
+
+    if _wants_stream(req, event):
+        return StreamingResponse(
+            _stream_run(input_items, conversation_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-        runner = Runner()
-        result = await runner.run(
+    try:
+        admission = await _get_scheduler().acquire(conversation_id)
+    except RunRejected as exc:
+        return JSONResponse(
+            {"ok": False, "error": exc.reason, "conversation_id": conversation_id},
+            status_code=exc.status_code,
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        result = await Runner.run(
             _get_agent(),
             input=input_items,
             conversation_id=conversation_id,
-            run_config=run_config,
+            run_config=_run_config(),
         )
     except Exception:
         logger.exception("Failed to process ChatKit event", extra={"event_type": event_type})
         return {"ok": False, "error": "internal_error"}
+    finally:
+        admission.release()
 
     messages = _serialise_messages(result.new_items)
     return {"ok": True, "messages": messages, "conversation_id": conversation_id}
@@ -0,0 +1,414 @@
+"""Headless HTTP API for extraction and generation.
+
+The router is mounted on the ChatKit FastAPI app (:mod:`openai_utils.server`)
+and exposes the vacancy pipelines without Streamlit so integrations such as
+an ATS can call them directly:
+
+* ``POST /v1/extract`` – profile extraction from text, a URL or a base64 file,
+* ``POST /v1/followups``, ``/v1/job-ad``, ``/v1/interview-guide`` – generation
+  from a profile,
+* ``POST /v1/match`` – rule-based candidate matching,
+* ``GET /v1/jobs/{id}`` and ``GET /v1/jobs/{id}/events`` – polling and
+  server-sent status events.
+
+Every ``POST`` queues a job on :class:`pipelines.jobs.JobQueue` and answers
+``202`` with the job document; ``?wait=<seconds>`` returns ``200`` with the
+result when the job finishes in time. An ``Idempotency-Key`` header makes
+retries safe, ``webhook_url`` receives the finished job, and
+``Accept: text/event-stream`` streams the job's status events instead.
+
+Every route requires one of the ``API_KEYS`` as ``Authorization: Bearer <key>``
+or ``X-API-Key``; without configured keys the API answers ``503``. Model usage
+of a job is billed to the key's tenant: ``<tenant>:<key>`` entries name it,
+plain keys get a stable ``key-<hash>`` tenant. URLs to extract from must point
+to public hosts, on every redirect hop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import threading
+from collections.abc import AsyncIterator, Callable, Mapping
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from pipelines.jobs import IdempotencyConflict, Job, JobQueue, check_webhook_url
+from pipelines.result_store import stable_digest
+from utils.env import env_int
+from utils.url_utils import check_public_url
+
+logger = logging.getLogger(__name__)
+
+API_EXTRACT_WORKERS = env_int("API_EXTRACT_WORKERS", 4, minimum=1)
+API_GENERATE_WORKERS = env_int("API_GENERATE_WORKERS", 4, minimum=1)
+API_MAX_FINISHED_JOBS = env_int("API_MAX_FINISHED_JOBS", 1000, minimum=1)
+API_MAX_WAIT_SECONDS = 60.0
+API_KEYS = tuple(key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip())
+# Interval of SSE keep-alive comments while a job makes no progress.
+_EVENT_HEARTBEAT_SECONDS = 15.0
+
+_AUTHORIZATION = Header(None)
+_API_KEY = Header(None, alias="X-API-Key")
+
+
+def _api_key_tenants() -> list[tuple[str, str]]:
+    """Return ``(key, tenant)`` for every ``API_KEYS`` entry."""
+
+    entries: list[tuple[str, str]] = []
+    for entry in API_KEYS:
+        tenant, separator, key = entry.partition(":")
+        if separator and tenant.strip() and key.strip():
+            entries.append((key.strip(), tenant.strip()))
+        else:
+            entries.append((entry, f"key-{hashlib.sha256(entry.encode()).hexdigest()[:12]}"))
+    return entries
+
+
+def require_api_key(authorization: str | None = _AUTHORIZATION, x_api_key: str | None = _API_KEY) -> str:
+    """Reject requests without one of the configured ``API_KEYS`` and return the key's tenant."""
+
+    if not API_KEYS:
+        raise HTTPException(status_code=503, detail="Headless API is disabled; configure API_KEYS")
+    scheme, _, token = (authorization or "").partition(" ")
+    presented = x_api_key or (token.strip() if scheme.lower() == "bearer" else "")
+    tenant = None
+    for key, key_tenant in _api_key_tenants():
+        # Every key is compared so the response time does not reveal which one matched.
+        if hmac.compare_digest(presented, key):
+            tenant = key_tenant
+    if not presented or tenant is None:
+        raise HTTPException(status_code=401, detail="Invalid API key", headers={"WWW-Authenticate": "Bearer"})
+    return tenant
+
+
+router = APIRouter(prefix="/v1", tags=["headless"], dependencies=[Depends(require_api_key)])
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating its worker pools on first use."""
+
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                {"extract": API_EXTRACT_WORKERS, "generate": API_GENERATE_WORKERS},
+                max_finished_jobs=API_MAX_FINISHED_JOBS,
+            )
+        return _queue
+
+
+class _JobRequest(BaseModel):
+    webhook_url: str | None = Field(default=None, description="URL that receives the finished job document.")
+
+    @field_validator("webhook_url")
+    @classmethod
+    def _safe_webhook(cls, value: str | None) -> str | None:
+        return check_webhook_url(value) if value else None
+
+
+class UploadedFile(BaseModel):
+    name: str = Field(..., description="File name; its extension selects the parser.")
+    content_base64: str
+
+
+class ExtractRequest(_JobRequest):
+    text: str | None = None
+    url: str | None = None
+    file: UploadedFile | None = None
+    title: str | None = None
+    company: str | None = None
+
+    @field_validator("url")
+    @classmethod
+    def _public_url(cls, value: str | None) -> str | None:
+        return check_public_url(value) if value else None
+
+    @model_validator(mode="after")
+    def _one_source(self) -> ExtractRequest:
+        sources = [source for source in (self.text, self.url, self.file) if source]
+        if len(sources) != 1:
+            raise ValueError("provide exactly one of text, url or file")
+        return self
+
+
+class ProfileRequest(_JobRequest):
+    profile: dict[str, Any]
+    lang: str = "de"
+
+
+class JobAdRequest(ProfileRequest):
+    tone: str = "professional"
+
+
+class MatchRequest(_JobRequest):
+    profile: dict[str, Any]
+    candidates: list[dict[str, Any]]
+
+
+def _chat_content(result: Any) -> Any:
+    content = getattr(result, "content", result)
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return content
+    return content
+
+
+def _source_text(request: ExtractRequest) -> str:
+    from ingest.extractors import extract_text_from_file, extract_text_from_url
+    from ingest.reader import clean_job_text, clean_structured_document
+
+    if request.text:
+        return clean_job_text(request.text)
+    if request.url:
+        return clean_structured_document(extract_text_from_url(request.url, public_only=True)).text
+    assert request.file is not None
+    try:
+        data = base64.b64decode(request.file.content_base64, validate=True)
+    except binascii.Error as exc:
+        raise ValueError("file content is not valid base64") from exc
+    buffer = io.BytesIO(data)
+    buffer.name = request.file.name
+    return clean_structured_document(extract_text_from_file(buffer)).text
+
+
+def _extract(request: ExtractRequest, progress: Callable[[str], None]) -> dict[str, Any]:
+    from pipelines.need_analysis import extract_need_analysis_profile
+
+    progress("ingest")
+    text = _source_text(request)
+    if not text.strip():
+        raise ValueError("no text could be extracted")
+    progress("extract")
+    result = extract_need_analysis_profile(
+        text,
+        title_hint=request.title,
+        company_hint=request.company,
+        url_hint=request.url,
+    )
+    return {
+        "profile": result.data,
+        "issues": result.issues,
+        "recovered": result.recovered,
+        "low_confidence": result.low_confidence,
+        "degraded": result.degraded,
+        "degraded_reasons": result.degraded_reasons or [],
+        "near_duplicate": result.near_duplicate.to_dict() if result.near_duplicate else None,
+    }
+
+
+def _followups(request: ProfileRequest, progress: Callable[[str], None]) -> Any:
+    from pipelines.followups import generate_followups
+
+    progress("generate")
+    return generate_followups(request.profile, request.lang)
+
+
+def _job_ad(request: JobAdRequest, progress: Callable[[str], None]) -> Any:
+    from generators.job_ad import generate_job_ad
+
+    progress("generate")
+    return _chat_content(generate_job_ad(request.profile, request.lang, request.tone))
+
+
+def _interview_guide(request: ProfileRequest, progress: Callable[[str], None]) -> Any:
+    from generators.interview_guide import generate_interview_guide
+
+    progress("generate")
+    return _chat_content(generate_interview_guide(request.profile, request.lang))
+
+
+def _match(request: MatchRequest, progress: Callable[[str], None]) -> Any:
+    from pipelines.matching import match_candidates
+
+    progress("score")
+    return match_candidates(request.profile, request.candidates)
+
+
+def _sse(event: str, data: Mapping[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _job_events(queue: JobQueue, job: Job) -> AsyncIterator[str]:
+    """Yield a ``status`` event per job change, then ``result`` or ``error``."""
+
+    version = -1
+    while True:
+        current = job.version
+        if current != version:
+            version = current
+            document = job.to_dict()
+            if job.finished:
+                yield _sse("result" if job.error is None else "error", document)
+                return
+            yield _sse("status", document)
+        elif await asyncio.to_thread(queue.wait_for_change, job, version, _EVENT_HEARTBEAT_SECONDS) == version:
+            yield ": keep-alive\n\n"
+
+
+async def _respond(
+    request: Request,
+    kind: str,
+    body: _JobRequest,
+    fn: Callable[[Any, Callable[[str], None]], Any],
+    *,
+    pool: str,
+    wait: float,
+    idempotency_key: str | None,
+    tenant: str,
+) -> JSONResponse | StreamingResponse:
+    queue = get_job_queue()
+    fingerprint = stable_digest([kind, body.model_dump(exclude={"webhook_url"})])
+    try:
+        job, created = queue.submit(
+            kind,
+            lambda progress: fn(body, progress),
+            pool=pool,
+            fingerprint=fingerprint,
+            idempotency_key=idempotency_key,
+            webhook_url=body.webhook_url,
+            tenant=tenant,
+        )
+    except IdempotencyConflict:
+        raise HTTPException(status_code=409, detail="Idempotency-Key was used for a different request") from None
+    headers = {"Location": str(request.url_for("get_job", job_id=job.id))}
+    if not created:
+        headers["Idempotent-Replay"] = "true"
+
+    if "text/event-stream" in request.headers.get("accept", ""):
+        headers.update({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        return StreamingResponse(_job_events(queue, job), media_type="text/event-stream", headers=headers)
+    if wait > 0 and not job.finished:
+        await asyncio.to_thread(queue.wait, job.id, min(wait, API_MAX_WAIT_SECONDS))
+    return JSONResponse(job.to_dict(), status_code=200 if job.finished else 202, headers=headers)
+
+
+_WAIT = Query(0.0, ge=0.0, description="Seconds to wait for the result before answering 202.")
+_IDEMPOTENCY_KEY = Header(None, alias="Idempotency-Key")
+_TENANT = Depends(require_api_key)
+
+
+@router.post("/extract", response_model=None)
+async def extract(
+    request: Request,
+    body: ExtractRequest,
+    wait: float = _WAIT,
+    idempotency_key: str | None = _IDEMPOTENCY_KEY,
+    tenant: str = _TENANT,
+) -> JSONResponse | StreamingResponse:
+    return await _respond(
+        request, "extract", body, _extract, pool="extract", wait=wait, idempotency_key=idempotency_key, tenant=tenant
+    )
+
+
+@router.post("/followups", response_model=None)
+async def followups(
+    request: Request,
+    body: ProfileRequest,
+    wait: float = _WAIT,
+    idempotency_key: str | None = _IDEMPOTENCY_KEY,
+    tenant: str = _TENANT,
+) -> JSONResponse | StreamingResponse:
+    return await _respond(
+        request,
+        "followups",
+        body,
+        _followups,
+        pool="generate",
+        wait=wait,
+        idempotency_key=idempotency_key,
+        tenant=tenant,
+    )
+
+
+@router.post("/job-ad", response_model=None)
+async def job_ad(
+    request: Request,
+    body: JobAdRequest,
+    wait: float = _WAIT,
+    idempotency_key: str | None = _IDEMPOTENCY_KEY,
+    tenant: str = _TENANT,
+) -> JSONResponse | StreamingResponse:
+    return await _respond(
+        request, "job_ad", body, _job_ad, pool="generate", wait=wait, idempotency_key=idempotency_key, tenant=tenant
+    )
+
+
+@router.post("/interview-guide", response_model=None)
+async def interview_guide(
+    request: Request,
+    body: ProfileRequest,
+    wait: float = _WAIT,
+    idempotency_key: str | None = _IDEMPOTENCY_KEY,
+    tenant: str = _TENANT,
+) -> JSONResponse | StreamingResponse:
+    return await _respond(
+        request,
+        "interview_guide",
+        body,
+        _interview_guide,
+        pool="generate",
+        wait=wait,
+        idempotency_key=idempotency_key,
+        tenant=tenant,
+    )
+
+
+@router.post("/match", response_model=None)
+async def match(
+    request: Request,
+    body: MatchRequest,
+    wait: float = _WAIT,
+    idempotency_key: str | None = _IDEMPOTENCY_KEY,
+    tenant: str = _TENANT,
+) -> JSONResponse | StreamingResponse:
+    return await _respond(
+        request, "match", body, _match, pool="generate", wait=wait, idempotency_key=idempotency_key, tenant=tenant
+    )
+
+
+@router.get("/jobs/{job_id}", name="get_job")
+async def get_job(job_id: str, wait: float = _WAIT) -> dict[str, Any]:
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if wait > 0 and not job.finished:
+        await asyncio.to_thread(queue.wait, job_id, min(wait, API_MAX_WAIT_SECONDS))
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str) -> StreamingResponse:
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return StreamingResponse(
+        _job_events(queue, job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/health")
+async def health() -> dict[str, Any]:
+    return {"ok": True, "jobs": get_job_queue().stats()}
+
+
+__all__ = ["get_job_queue", "router"]
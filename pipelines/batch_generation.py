@@ -0,0 +1,280 @@
+"""Bulk generation of job ads, interview guides and follow-ups via batches.
+
+Each :class:`BatchGenerationJob` owns a directory:
+
+* ``requests.jsonl`` – rendered requests, written once,
+* ``manifest.json`` – request index, endpoint and submitted batch id,
+* ``results.jsonl`` – results already handed to the caller.
+
+Opening a job on an existing directory resumes it after a crash: nothing is
+re-rendered or re-submitted and only undelivered results are yielded.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import asdict, dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+from generators.interview_guide import build_interview_guide_request
+from generators.job_ad import build_job_ad_request, finalize_job_ad
+from openai_utils.api import ChatCallResult
+from openai_utils.batch import BatchBackend, BatchRequest, BatchStatus, parse_batch_output, write_batch_file
+
+from .followups import build_followups_request, finalize_followups
+from .vacancy_store import VacancyStore
+
+logger = logging.getLogger(__name__)
+
+
+class BatchArtifact(StrEnum):
+    """Artifacts that can be generated in bulk."""
+
+    JOB_AD = "job_ad"
+    INTERVIEW_GUIDE = "interview_guide"
+    FOLLOWUPS = "followups"
+
+
+_RequestBuilder = Callable[[Mapping[str, Any], str, str], tuple[list[dict[str, Any]], dict[str, Any]]]
+
+_BUILDERS: dict[BatchArtifact, _RequestBuilder] = {
+    BatchArtifact.JOB_AD: lambda profile, lang, tone: build_job_ad_request(profile, lang, tone),
+    BatchArtifact.INTERVIEW_GUIDE: lambda profile, lang, _tone: build_interview_guide_request(profile, lang),
+    BatchArtifact.FOLLOWUPS: lambda profile, lang, _tone: build_followups_request(dict(profile), lang),
+}
+
+
+@dataclass(frozen=True)
+class BatchGenerationResult:
+    """Generated artifact for one vacancy, or the reason it is missing."""
+
+    vacancy_id: str
+    artifact: BatchArtifact
+    value: Any = None
+    error: str | None = None
+
+
+def _custom_id(artifact: BatchArtifact, vacancy_id: str) -> str:
+    return f"{artifact.value}:{vacancy_id}"
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class BatchGenerationJob:
+    """Render, submit, poll and collect one bulk generation run.
+
+    Example::
+
+        job = BatchGenerationJob(Path("batches/2026-10-ads"), OpenAIBatchBackend())
+        for result in job.run(profiles, [BatchArtifact.JOB_AD], lang="de"):
+            profiles[result.vacancy_id]["job_ad"] = result.value
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        backend: BatchBackend,
+        *,
+        poll_interval: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.directory = Path(directory)
+        self._backend = backend
+        self._poll_interval = poll_interval
+        self._sleep = sleep
+        self._clock = clock
+        self._manifest_path = self.directory / "manifest.json"
+        self._requests_path = self.directory / "requests.jsonl"
+        self._results_path = self.directory / "results.jsonl"
+        self._manifest: dict[str, Any] = self._load_manifest()
+
+    def _load_manifest(self) -> dict[str, Any]:
+        try:
+            return json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    @property
+    def batch_id(self) -> str | None:
+        return self._manifest.get("batch_id")
+
+    @property
+    def prepared(self) -> bool:
+        return bool(self._manifest.get("requests"))
+
+    def prepare(
+        self,
+        profiles: Mapping[str, Mapping[str, Any]],
+        artifacts: Iterable[BatchArtifact] = tuple(BatchArtifact),
+        *,
+        lang: str = "de",
+        tone: str = "professional",
+        vacancy_store: VacancyStore | None = None,
+    ) -> int:
+        """Render one request per vacancy and artifact; return the request count.
+
+        A job that was already prepared keeps its original requests. With
+        ``vacancy_store`` the profiles are also appended to that store.
+        """
+
+        if self.prepared:
+            return len(self._manifest["requests"])
+        index: dict[str, dict[str, str]] = {}
+        requests: list[BatchRequest] = []
+        for artifact in map(BatchArtifact, artifacts):
+            builder = _BUILDERS[artifact]
+            for vacancy_id, profile in profiles.items():
+                custom_id = _custom_id(artifact, str(vacancy_id))
+                messages, options = builder(profile, lang, tone)
+                requests.append(BatchRequest(custom_id, messages, options))
+                index[custom_id] = {"vacancy_id": str(vacancy_id), "artifact": artifact.value, "lang": lang}
+        endpoint, count = write_batch_file(requests, self._requests_path)
+        if vacancy_store is not None:
+            vacancy_store.append(profiles)
+        self._manifest = {"endpoint": endpoint, "requests": index, "batch_id": None}
+        _write_json_atomic(self._manifest_path, self._manifest)
+        logger.info("Prepared %d batch requests in %s", count, self.directory)
+        return count
+
+    def submit(self, metadata: Mapping[str, str] | None = None) -> str:
+        """Submit the prepared requests once; later calls return the same batch id."""
+
+        if not self.prepared:
+            raise RuntimeError("prepare() must run before submit()")
+        if self.batch_id:
+            return self.batch_id
+        batch_id = self._backend.submit(self._requests_path, endpoint=self._manifest["endpoint"], metadata=metadata)
+        self._manifest["batch_id"] = batch_id
+        _write_json_atomic(self._manifest_path, self._manifest)
+        logger.info("Submitted batch %s with %d requests", batch_id, len(self._manifest["requests"]))
+        return batch_id
+
+    def delivered(self) -> list[BatchGenerationResult]:
+        """Return the results already handed out by :meth:`results`."""
+
+        if not self._results_path.exists():
+            return []
+        delivered: list[BatchGenerationResult] = []
+        with self._results_path.open(encoding="utf-8") as handle:
+            for raw in handle:
+                if raw.strip():
+                    record = json.loads(raw)
+                    record["artifact"] = BatchArtifact(record["artifact"])
+                    delivered.append(BatchGenerationResult(**record))
+        return delivered
+
+    def _mark_delivered(self, result: BatchGenerationResult) -> None:
+        record = asdict(result)
+        record["artifact"] = result.artifact.value
+        with self._results_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _finalise(
+        self,
+        entry: Mapping[str, str],
+        result: ChatCallResult,
+        profiles: Mapping[str, Mapping[str, Any]],
+    ) -> Any:
+        artifact = BatchArtifact(entry["artifact"])
+        if artifact is BatchArtifact.FOLLOWUPS:
+            profile = profiles.get(entry["vacancy_id"], {})
+            return finalize_followups(result, dict(profile), entry["lang"])
+        if artifact is BatchArtifact.JOB_AD:
+            finalize_job_ad(result)
+        try:
+            return json.loads(result.content or "")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{artifact.value} generation returned invalid JSON.") from exc
+
+    def _to_result(
+        self,
+        line: Mapping[str, Any],
+        profiles: Mapping[str, Mapping[str, Any]],
+    ) -> BatchGenerationResult | None:
+        outcome = parse_batch_output(line)
+        entry = self._manifest["requests"].get(outcome.custom_id)
+        if entry is None:
+            logger.warning("Ignoring batch output for unknown request %s", outcome.custom_id)
+            return None
+        artifact = BatchArtifact(entry["artifact"])
+        if outcome.result is None:
+            return BatchGenerationResult(entry["vacancy_id"], artifact, error=outcome.error)
+        try:
+            value = self._finalise(entry, outcome.result, profiles)
+        except ValueError as exc:
+            return BatchGenerationResult(entry["vacancy_id"], artifact, error=str(exc))
+        return BatchGenerationResult(entry["vacancy_id"], artifact, value=value)
+
+    def results(
+        self,
+        profiles: Mapping[str, Mapping[str, Any]],
+        *,
+        timeout: float | None = None,
+    ) -> Iterator[BatchGenerationResult]:
+        """Poll the batch and yield each undelivered result as soon as it is available.
+
+        A result counts as delivered once the consumer asks for the next one,
+        so a crash while handling a result replays it on resume. Requests left
+        over when the batch fails, expires or is cancelled are yielded with an
+        error. Raises :class:`TimeoutError` after ``timeout`` seconds.
+        """
+
+        batch_id = self.submit()
+        delivered = {_custom_id(result.artifact, result.vacancy_id) for result in self.delivered()}
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            status: BatchStatus = self._backend.status(batch_id)
+            for line in self._backend.results(batch_id):
+                if str(line.get("custom_id")) in delivered:
+                    continue
+                result = self._to_result(line, profiles)
+                if result is None:
+                    continue
+                yield result
+                self._mark_delivered(result)
+                delivered.add(_custom_id(result.artifact, result.vacancy_id))
+            if status.done:
+                break
+            if deadline is not None and self._clock() >= deadline:
+                raise TimeoutError(f"batch {batch_id} still {status.state} after {timeout} seconds")
+            self._sleep(self._poll_interval)
+        for custom_id, entry in self._manifest["requests"].items():
+            if custom_id in delivered:
+                continue
+            result = BatchGenerationResult(
+                entry["vacancy_id"],
+                BatchArtifact(entry["artifact"]),
+                error=f"batch {status.state} without a result",
+            )
+            yield result
+            self._mark_delivered(result)
+
+    def run(
+        self,
+        profiles: Mapping[str, Mapping[str, Any]],
+        artifacts: Iterable[BatchArtifact] = tuple(BatchArtifact),
+        *,
+        lang: str = "de",
+        tone: str = "professional",
+        timeout: float | None = None,
+        vacancy_store: VacancyStore | None = None,
+    ) -> Iterator[BatchGenerationResult]:
+        """Prepare, submit and stream results in one call (resuming if possible)."""
+
+        self.prepare(profiles, artifacts, lang=lang, tone=tone, vacancy_store=vacancy_store)
+        self.submit()
+        yield from self.results(profiles, timeout=timeout)
+
+
+__all__ = ["BatchArtifact", "BatchGenerationJob", "BatchGenerationResult"]
@@ -0,0 +1,152 @@
+"""Process-wide bounded executor with priority lanes for workflow tasks.
+
+All :class:`~pipelines.workflow.WorkflowRunner` instances share one pool of
+worker threads instead of creating a ``ThreadPoolExecutor`` per run. Work is
+queued by lane so interactive requests (the user is waiting on a rerun) are
+always dequeued before background work such as prefetching.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from queue import PriorityQueue
+from typing import Any, TypeVar
+
+from utils.env import env_int
+from utils.priority import Priority
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Workflow tasks mostly wait on model and HTTP calls, so the pool is sized for
+# concurrent I/O rather than for the number of CPUs.
+_DEFAULT_MAX_WORKERS = 32
+
+
+class SharedExecutor:
+    """Bounded thread pool that dequeues work by :class:`Priority` then FIFO."""
+
+    def __init__(self, max_workers: int, *, name: str = "workflow") -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self._max_workers = max_workers
+        self._name = name
+        self._queue: PriorityQueue[tuple[int, int, Any]] = PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shutdown = False
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def in_worker(self) -> bool:
+        """Return ``True`` when called from one of this executor's threads."""
+
+        return getattr(self._local, "active", False)
+
+    def queue_depth(self) -> int:
+        """Approximate number of queued, not yet started work items."""
+
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        fn: Callable[..., _T],
+        /,
+        *args: Any,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs: Any,
+    ) -> Future[_T]:
+        """Schedule ``fn(*args, **kwargs)`` in the given ``priority`` lane."""
+
+        future: Future[_T] = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new work after shutdown")
+            self._queue.put((int(priority), next(self._sequence), (future, fn, args, kwargs)))
+            self._pending += 1
+            if self._pending > self._idle and len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self._name}-{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def _worker(self) -> None:
+        self._local.active = True
+        while True:
+            with self._lock:
+                self._idle += 1
+            _, _, item = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+                self._pending -= 1
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:  # noqa: BLE001 - forwarded to the future
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            del item, future, fn, args, kwargs
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        """Stop accepting work and let workers exit once the queue drains."""
+
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            threads = list(self._threads)
+        for _ in threads:
+            # Sentinels sort after every real work item.
+            with self._lock:
+                self._pending += 1
+            self._queue.put((len(Priority), next(self._sequence), None))
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+_SHARED: SharedExecutor | None = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_shared_executor() -> SharedExecutor:
+    """Return the lazily created process-wide executor."""
+
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = SharedExecutor(env_int("WORKFLOW_EXECUTOR_WORKERS", _DEFAULT_MAX_WORKERS, minimum=1))
+        return _SHARED
+
+
+def reset_shared_executor() -> None:
+    """Shut down the process-wide executor (used by tests and reloads)."""
+
+    global _SHARED
+    with _SHARED_LOCK:
+        executor, _SHARED = _SHARED, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+__all__ = ["Priority", "SharedExecutor", "get_shared_executor", "reset_shared_executor"]
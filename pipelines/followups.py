@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from typing import Any
 
+from wizard.services.followups import build_followup_request as _build_followup_request
+from wizard.services.followups import finalize_followups as _finalize_followups
 from wizard.services.followups import generate_followups as _generate_followups
 
-__all__ = ["generate_followups"]
+__all__ = ["build_followups_request", "finalize_followups", "generate_followups"]
 
 
 def generate_followups(
@@ -22,3 +24,15 @@ def generate_followups(
         locale=lang,
         vector_store_id=vector_store_id,
     )
+
+
+def build_followups_request(vacancy_json: dict, lang: str) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Return the messages and ``call_chat_api`` options for a follow-up request."""
+
+    return _build_followup_request(vacancy_json, mode="fast", locale=lang)
+
+
+def finalize_followups(response: Any, vacancy_json: dict, lang: str) -> dict[str, Any]:
+    """Turn a follow-up response for ``vacancy_json`` into prioritised questions."""
+
+    return _finalize_followups(response, profile=vacancy_json, locale=lang)
@@ -0,0 +1,398 @@
+"""Section-parallel job ad generation with per-section caching.
+
+:func:`openai_utils.generate_job_ad` writes the whole advertisement in one
+call, so changing a single selected field, the tone or a manual section
+regenerates everything. This module splits the ad into
+:class:`JobAdSection` parts that are generated concurrently on the shared
+workflow executor. Each section is cached under a digest of only its own
+inputs plus tone, audience, language and model, so editing one part of the
+profile regenerates only the sections that show it.
+
+Manual sections are inserted verbatim and never sent to the model.
+:func:`stream_job_ad_sections` yields a :class:`JobAdDraft` every time a
+section completes, so the UI can render the ad as it fills in.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+from config.models import ModelTask, get_model_for
+from openai_utils import api
+from openai_utils.api import chat_content
+from openai_utils.extraction import prepare_job_ad_payload
+from prompts import prompt_registry
+from utils.env import env_int
+from utils.i18n import tr
+from utils.llm_state import is_llm_available
+from utils.logging_context import wrap_with_current_context
+from utils.metrics import record_cache_lookup
+
+from .executor import Priority, SharedExecutor, get_shared_executor
+from .result_store import MemoryResultStore, ResultStore, stable_digest
+
+logger = logging.getLogger(__name__)
+
+JOB_AD_SECTIONED = os.getenv("JOB_AD_SECTIONED", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class JobAdSection(StrEnum):
+    """Parts of a sectioned job ad, in document order."""
+
+    INTRO = "intro"
+    RESPONSIBILITIES = "responsibilities"
+    REQUIREMENTS = "requirements"
+    BENEFITS = "benefits"
+    PROCESS = "process"
+    CTA = "cta"
+
+
+@dataclass(frozen=True)
+class _SectionSpec:
+    groups: frozenset[str] = frozenset()
+    keys: frozenset[str] = frozenset()
+    exclude: frozenset[str] = frozenset()
+    max_tokens: int = 300
+    always: bool = False
+
+
+_RESPONSIBILITY_KEYS = frozenset({"responsibilities.items", "position.key_projects"})
+
+_SPECS: dict[JobAdSection, _SectionSpec] = {
+    JobAdSection.INTRO: _SectionSpec(
+        groups=frozenset({"basic", "company"}), exclude=_RESPONSIBILITY_KEYS, max_tokens=260, always=True
+    ),
+    JobAdSection.RESPONSIBILITIES: _SectionSpec(keys=_RESPONSIBILITY_KEYS, max_tokens=320),
+    JobAdSection.REQUIREMENTS: _SectionSpec(
+        groups=frozenset({"requirements"}), exclude=_RESPONSIBILITY_KEYS, max_tokens=320
+    ),
+    JobAdSection.BENEFITS: _SectionSpec(groups=frozenset({"employment", "compensation"}), max_tokens=280),
+    JobAdSection.PROCESS: _SectionSpec(groups=frozenset({"process"}), max_tokens=180),
+    JobAdSection.CTA: _SectionSpec(max_tokens=120, always=True),
+}
+
+_FALLBACK_HEADINGS: dict[JobAdSection, tuple[str, str]] = {
+    JobAdSection.RESPONSIBILITIES: ("Deine Aufgaben", "Your responsibilities"),
+    JobAdSection.REQUIREMENTS: ("Dein Profil", "Your profile"),
+    JobAdSection.BENEFITS: ("Was wir bieten", "What we offer"),
+    JobAdSection.PROCESS: ("Bewerbungsprozess", "Application process"),
+}
+
+_SECTION_STORE = MemoryResultStore(maxsize=env_int("JOB_AD_SECTION_CACHE_SIZE", 256, minimum=1))
+
+
+@dataclass(frozen=True)
+class SectionResult:
+    """Generated Markdown of one section."""
+
+    section: JobAdSection
+    text: str
+    fallback: bool = False
+
+
+@dataclass(frozen=True)
+class JobAdDraft:
+    """Snapshot of a sectioned job ad while sections complete."""
+
+    markdown: str
+    completed: tuple[JobAdSection, ...]
+    pending: tuple[JobAdSection, ...]
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+
+def _entries(structured_payload: Mapping[str, Any], spec: _SectionSpec) -> list[dict[str, Any]]:
+    entries: list[dict[str, Any]] = []
+    for group in structured_payload.get("sections") or []:
+        group_name = group.get("group")
+        for entry in group.get("entries") or []:
+            key = entry.get("key")
+            if key in spec.exclude:
+                continue
+            if group_name in spec.groups or key in spec.keys:
+                entries.append({name: value for name, value in entry.items() if name != "key"})
+    return entries
+
+
+def build_section_inputs(structured_payload: Mapping[str, Any]) -> dict[JobAdSection, dict[str, Any]]:
+    """Return the model inputs of every section that has content.
+
+    Only what a section shows goes into its inputs, so the inputs double as
+    the cache key material.
+    """
+
+    inputs: dict[JobAdSection, dict[str, Any]] = {}
+    company = structured_payload.get("company") or {}
+    for section, spec in _SPECS.items():
+        entries = _entries(structured_payload, spec)
+        if not entries and not spec.always:
+            continue
+        payload: dict[str, Any] = {"entries": entries}
+        if section is JobAdSection.INTRO:
+            payload.update(
+                heading=structured_payload.get("heading"),
+                job_title=structured_payload.get("job_title"),
+                company=company,
+                location=structured_payload.get("location"),
+                summary=structured_payload.get("summary"),
+                brand_keywords=structured_payload.get("brand_keywords"),
+            )
+        elif section is JobAdSection.CTA:
+            payload = {
+                "job_title": structured_payload.get("job_title"),
+                "company": company.get("display_name"),
+                "cta_hint": structured_payload.get("cta_hint"),
+            }
+        inputs[section] = payload
+    return inputs
+
+
+def section_cache_key(
+    section: JobAdSection,
+    inputs: Mapping[str, Any],
+    *,
+    tone: str,
+    audience: str,
+    style_reference: str,
+    lang: str,
+    model: str,
+) -> str:
+    """Return the cache key of ``section`` for the given inputs and style."""
+
+    return stable_digest(
+        {
+            "section": section.value,
+            "inputs": inputs,
+            "tone": tone,
+            "audience": audience,
+            "style_reference": style_reference,
+            "lang": lang,
+            "model": model,
+        }
+    )
+
+
+def _section_messages(
+    section: JobAdSection, inputs: Mapping[str, Any], structured_payload: Mapping[str, Any]
+) -> list[dict[str, str]]:
+    lang = str(structured_payload.get("language") or "de")
+    context = {
+        "language": lang,
+        "tone": structured_payload.get("tone"),
+        "audience": structured_payload.get("audience"),
+        "style_reference": structured_payload.get("style_reference"),
+    }
+    user = "\n\n".join(
+        [
+            prompt_registry.get(f"generators.job_ad.section.{section.value}", locale=lang),
+            json.dumps({"context": context, "data": inputs}, ensure_ascii=False),
+        ]
+    )
+    return [
+        {"role": "system", "content": prompt_registry.get("generators.job_ad.section.system", locale=lang)},
+        {"role": "user", "content": user},
+    ]
+
+
+def _fallback_markdown(
+    section: JobAdSection, inputs: Mapping[str, Any], structured_payload: Mapping[str, Any], lang: str
+) -> str:
+    """Return deterministic Markdown for ``section`` when the model is unavailable."""
+
+    if section is JobAdSection.INTRO:
+        lines = [str(structured_payload.get("heading") or "").strip()]
+        summary = str(inputs.get("summary") or "").strip()
+        if summary:
+            lines.append(summary)
+    elif section is JobAdSection.CTA:
+        lines = [str(inputs.get("cta_hint") or "").strip()]
+    else:
+        de_heading, en_heading = _FALLBACK_HEADINGS[section]
+        lines = [f"## {tr(de_heading, en_heading, lang)}"]
+    for entry in inputs.get("entries") or []:
+        label = str(entry.get("label") or "").strip()
+        if entry.get("items"):
+            if label:
+                lines.append(f"**{label}:**")
+            lines.extend(f"- {item}" for item in entry["items"])
+        elif entry.get("text"):
+            lines.append(f"**{label}:** {entry['text']}" if label else str(entry["text"]))
+    return "\n".join(lines).strip()
+
+
+def _generate_section(
+    section: JobAdSection,
+    inputs: Mapping[str, Any],
+    structured_payload: Mapping[str, Any],
+    *,
+    model: str,
+    lang: str,
+) -> SectionResult:
+    messages = _section_messages(section, inputs, structured_payload)
+    try:
+        response = api.call_chat_api(
+            messages,
+            model=model,
+            temperature=0.7,
+            max_completion_tokens=_SPECS[section].max_tokens,
+            task=ModelTask.JOB_AD,
+        )
+        text = chat_content(response).strip()
+    except Exception:
+        logger.warning("Job ad section %s failed; using the structured fallback", section.value, exc_info=True)
+        text = ""
+    if not text:
+        return SectionResult(section, _fallback_markdown(section, inputs, structured_payload, lang), fallback=True)
+    return SectionResult(section, text)
+
+
+def _manual_markdown(structured_payload: Mapping[str, Any]) -> str:
+    blocks: list[str] = []
+    for entry in structured_payload.get("manual_sections") or []:
+        content = str(entry.get("content") or "").strip()
+        if not content:
+            continue
+        title = str(entry.get("title") or "").strip()
+        blocks.append(f"## {title}\n{content}" if title else content)
+    return "\n\n".join(blocks)
+
+
+def assemble_job_ad(
+    results: Mapping[JobAdSection, str], manual_markdown: str = "", *, order: Sequence[JobAdSection] | None = None
+) -> str:
+    """Join the available section texts in document order.
+
+    Manual sections are placed right before the call to action.
+    """
+
+    sections = list(order) if order is not None else list(JobAdSection)
+    blocks = [(results.get(section) or "").strip() for section in sections if section is not JobAdSection.CTA]
+    blocks.append(manual_markdown.strip())
+    if JobAdSection.CTA in sections:
+        blocks.append((results.get(JobAdSection.CTA) or "").strip())
+    return "\n\n".join(block for block in blocks if block)
+
+
+def stream_job_ad_sections(
+    session_data: Mapping[str, Any],
+    selected_fields: Sequence[str],
+    *,
+    target_audience: str,
+    manual_sections: Sequence[Mapping[str, str]] | None = None,
+    style_reference: str | None = None,
+    tone: str | None = None,
+    lang: str | None = None,
+    model: str | None = None,
+    selected_values: Mapping[str, Any] | None = None,
+    store: ResultStore | None = None,
+    executor: SharedExecutor | None = None,
+) -> Iterator[JobAdDraft]:
+    """Yield job ad drafts while sections are generated concurrently.
+
+    The first draft contains every cached section; each following draft adds
+    one more. The last draft has no pending sections. Without an available
+    LLM a single draft with the deterministic fallback document is yielded.
+    """
+
+    structured_payload, document = prepare_job_ad_payload(
+        session_data,
+        selected_fields,
+        target_audience=target_audience,
+        manual_sections=manual_sections,
+        style_reference=style_reference,
+        tone=tone,
+        lang=lang,
+        selected_values=selected_values,
+    )
+    if not is_llm_available():
+        yield JobAdDraft(document, tuple(JobAdSection), ())
+        return
+
+    lang_code = str(structured_payload.get("language") or "de")
+    model_name = model or get_model_for(ModelTask.JOB_AD)
+    section_store = store if store is not None else _SECTION_STORE
+    section_inputs = build_section_inputs(structured_payload)
+    order = list(section_inputs)
+    manual_markdown = _manual_markdown(structured_payload)
+
+    texts: dict[JobAdSection, str] = {}
+    futures: dict[Future[SectionResult], tuple[JobAdSection, str]] = {}
+    pool = executor or get_shared_executor()
+    for section, inputs in section_inputs.items():
+        key = section_cache_key(
+            section,
+            inputs,
+            tone=str(structured_payload.get("tone") or ""),
+            audience=str(structured_payload.get("audience") or ""),
+            style_reference=str(structured_payload.get("style_reference") or ""),
+            lang=lang_code,
+            model=model_name,
+        )
+        hit, cached = section_store.load(key)
+        record_cache_lookup("job_ad_section", hit=hit)
+        if hit:
+            texts[section] = cached
+            continue
+        future = pool.submit(
+            wrap_with_current_context(
+                _generate_section, section, inputs, structured_payload, model=model_name, lang=lang_code
+            ),
+            priority=Priority.INTERACTIVE,
+        )
+        futures[future] = (section, key)
+
+    def _draft() -> JobAdDraft:
+        completed = tuple(section for section in order if section in texts)
+        pending = tuple(section for section in order if section not in texts)
+        return JobAdDraft(assemble_job_ad(texts, manual_markdown, order=order), completed, pending)
+
+    yield _draft()
+    for future in as_completed(futures):
+        section, key = futures[future]
+        result = future.result()
+        texts[section] = result.text
+        if not result.fallback:
+            section_store.save(key, result.text)
+        yield _draft()
+
+
+def generate_job_ad_sections(
+    session_data: Mapping[str, Any],
+    selected_fields: Sequence[str],
+    **kwargs: Any,
+) -> str:
+    """Return the complete sectioned job ad (see :func:`stream_job_ad_sections`)."""
+
+    draft: JobAdDraft | None = None
+    for draft in stream_job_ad_sections(session_data, selected_fields, **kwargs):
+        pass
+    return draft.markdown if draft is not None else ""
+
+
+def clear_section_cache() -> None:
+    """Drop all cached job ad sections (used by tests)."""
+
+    _SECTION_STORE.clear()
+
+
+__all__ = [
+    "JOB_AD_SECTIONED",
+    "JobAdDraft",
+    "JobAdSection",
+    "SectionResult",
+    "assemble_job_ad",
+    "build_section_inputs",
+    "clear_section_cache",
+    "generate_job_ad_sections",
+    "section_cache_key",
+    "stream_job_ad_sections",
+]
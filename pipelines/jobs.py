@@ -0,0 +1,291 @@
+"""In-process job queue for the headless extraction and generation API.
+
+Jobs run on named worker pools (one :class:`~pipelines.executor.SharedExecutor`
+each) so a burst of slow extractions cannot starve short generation calls.
+Each job records its status, the current progress stage and its result;
+callers poll :meth:`JobQueue.get`, block on :meth:`JobQueue.wait` or register
+a webhook that receives the final job document.
+
+Submissions may carry an idempotency key. Repeating a submission with the
+same key and the same request fingerprint returns the original job; reusing
+the key for a different request raises :class:`IdempotencyConflict`.
+
+Each job runs under its own session id (the job id), so per-session token
+budgets apply to one job instead of the whole API, and bills its usage to the
+tenant it was submitted for. Idempotency keys are scoped per tenant. Webhook URLs must use
+``https`` and point to a public host, or to one of ``API_WEBHOOK_HOSTS``.
+
+Job state lives in process memory: scale out by running more processes and
+route status lookups for a job to the process that accepted it, or rely on
+webhooks.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+from urllib.parse import urlsplit
+
+from utils.logging_context import log_context, wrap_with_current_context
+from utils.url_utils import check_public_url
+from utils.usage_ledger import get_usage_accountant, tenant_scope
+
+from .executor import SharedExecutor
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_ALLOWED_HOSTS = tuple(
+    host.strip().lower().lstrip(".") for host in os.getenv("API_WEBHOOK_HOSTS", "").split(",") if host.strip()
+)
+
+JobFunction = Callable[[Callable[[str], None]], Any]
+WebhookSender = Callable[[str, Mapping[str, Any]], None]
+
+
+class JobStatus(StrEnum):
+    """Lifecycle states of a queued job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+_FINISHED = frozenset({JobStatus.SUCCEEDED, JobStatus.FAILED})
+
+
+class IdempotencyConflict(ValueError):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+class UnknownPool(KeyError):
+    """Raised when a job targets a worker pool the queue does not have."""
+
+
+@dataclass
+class Job:
+    """A unit of work and everything a client may poll about it."""
+
+    id: str
+    kind: str
+    fingerprint: str
+    idempotency_key: str | None = None
+    webhook_url: str | None = None
+    tenant: str | None = None
+    status: JobStatus = JobStatus.QUEUED
+    stage: str | None = None
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    version: int = 0
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the JSON document returned to clients and webhooks."""
+
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "stage": self.stage,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def check_webhook_url(url: str, *, resolve: bool = False) -> str:
+    """Return ``url`` if jobs may deliver to it, else raise :class:`ValueError`.
+
+    The URL must use ``https`` without credentials. Its host must be one of
+    ``WEBHOOK_ALLOWED_HOSTS`` (or a subdomain) when that list is configured,
+    and otherwise pass :func:`utils.url_utils.check_public_url`. With
+    ``resolve`` the host name is looked up and every address must be public.
+    """
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme != "https" or not host or parts.username or parts.password:
+        raise ValueError("webhook_url must be an https URL without credentials")
+    if WEBHOOK_ALLOWED_HOSTS:
+        if not any(host == allowed or host.endswith(f".{allowed}") for allowed in WEBHOOK_ALLOWED_HOSTS):
+            raise ValueError("webhook_url host is not allowed")
+        return url
+    return check_public_url(url, resolve=resolve, name="webhook_url")
+
+
+def post_webhook(url: str, payload: Mapping[str, Any], *, attempts: int = 3, timeout: float = 10.0) -> None:
+    """POST ``payload`` to ``url``, retrying with exponential backoff."""
+
+    import httpx
+
+    try:
+        check_webhook_url(url, resolve=True)
+    except ValueError as exc:
+        logger.warning("Refusing webhook delivery to %s: %s", url, exc)
+        return
+
+    for attempt in range(1, attempts + 1):
+        try:
+            response = httpx.post(url, json=dict(payload), timeout=timeout)
+            response.raise_for_status()
+            return
+        except httpx.HTTPError as exc:
+            if attempt == attempts:
+                logger.warning("Webhook delivery to %s failed after %s attempts: %s", url, attempts, exc)
+                return
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+
+class JobQueue:
+    """Run jobs on named worker pools and keep their state for polling."""
+
+    def __init__(
+        self,
+        pools: Mapping[str, int],
+        *,
+        max_finished_jobs: int = 1000,
+        webhook_sender: WebhookSender = post_webhook,
+    ) -> None:
+        if not pools:
+            raise ValueError("at least one worker pool is required")
+        self._executors = {name: SharedExecutor(workers, name=f"api-{name}") for name, workers in pools.items()}
+        self._max_finished = max(1, max_finished_jobs)
+        self._send_webhook = webhook_sender
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._keys: dict[tuple[str | None, str], str] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(
+        self,
+        kind: str,
+        fn: JobFunction,
+        *,
+        pool: str,
+        fingerprint: str,
+        idempotency_key: str | None = None,
+        webhook_url: str | None = None,
+        tenant: str | None = None,
+    ) -> tuple[Job, bool]:
+        """Queue ``fn`` and return the job plus whether it was newly created.
+
+        ``fn`` receives a callback that records the current progress stage and
+        runs with its model usage billed to ``tenant``.
+        """
+
+        executor = self._executors.get(pool)
+        if executor is None:
+            raise UnknownPool(pool)
+        with self._lock:
+            if idempotency_key:
+                existing = self._jobs.get(self._keys.get((tenant, idempotency_key), ""))
+                if existing is not None:
+                    if existing.fingerprint != fingerprint or existing.kind != kind:
+                        raise IdempotencyConflict(idempotency_key)
+                    return existing, False
+            job = Job(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                fingerprint=fingerprint,
+                idempotency_key=idempotency_key or None,
+                webhook_url=webhook_url or None,
+                tenant=tenant,
+            )
+            self._jobs[job.id] = job
+            if job.idempotency_key:
+                self._keys[(tenant, job.idempotency_key)] = job.id
+            self._evict_locked()
+        executor.submit(wrap_with_current_context(self._run, job, fn))
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float | None = None) -> Job | None:
+        """Block until the job finished or ``timeout`` expired and return it."""
+
+        job = self.get(job_id)
+        if job is not None:
+            job._done.wait(timeout)
+        return job
+
+    def wait_for_change(self, job: Job, version: int, timeout: float) -> int:
+        """Block until ``job`` changes after ``version`` or ``timeout`` expires."""
+
+        with self._changed:
+            self._changed.wait_for(lambda: job.version != version, timeout=timeout)
+            return job.version
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counts = {status.value: 0 for status in JobStatus}
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+            return counts
+
+    def shutdown(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown()
+
+    def _update(self, job: Job, **changes: Any) -> None:
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.version += 1
+            self._changed.notify_all()
+
+    def _run(self, job: Job, fn: JobFunction) -> None:
+        self._update(job, status=JobStatus.RUNNING, started_at=time.time())
+        try:
+            with log_context(session_id=job.id), tenant_scope(job.tenant):
+                result = fn(lambda stage: self._update(job, stage=stage))
+        except Exception as exc:
+            logger.warning("Job %s (%s) failed", job.id, job.kind, exc_info=True)
+            self._update(job, status=JobStatus.FAILED, error=str(exc) or type(exc).__name__, finished_at=time.time())
+        else:
+            self._update(job, status=JobStatus.SUCCEEDED, result=result, finished_at=time.time())
+        finally:
+            get_usage_accountant().forget_session(job.id)
+        job._done.set()
+        if job.webhook_url:
+            try:
+                self._send_webhook(job.webhook_url, job.to_dict())
+            except Exception:  # pragma: no cover - delivery must not break the worker
+                logger.warning("Webhook delivery for job %s failed", job.id, exc_info=True)
+
+    def _evict_locked(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[: max(0, len(finished) - self._max_finished)]:
+            del self._jobs[job.id]
+            key = (job.tenant, job.idempotency_key or "")
+            if job.idempotency_key and self._keys.get(key) == job.id:
+                del self._keys[key]
+
+
+__all__ = [
+    "IdempotencyConflict",
+    "Job",
+    "JobQueue",
+    "JobStatus",
+    "UnknownPool",
+    "check_webhook_url",
+    "post_webhook",
+]
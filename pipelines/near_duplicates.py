@@ -0,0 +1,360 @@
+"""Near-duplicate detection for job postings to reuse earlier extractions.
+
+Employers repost a job with small edits and agencies syndicate one posting to
+many boards. :class:`NearDuplicateIndex` keeps a MinHash signature of every
+successfully extracted posting together with its profile in a SQLite file.
+Postings are tokenised into word shingles; the signature is split into
+``BANDS`` locality-sensitive hashing bands, so a lookup only compares the
+postings that share at least one band bucket instead of scanning the index.
+
+A match at or above ``NEAR_DUPLICATE_THRESHOLD`` estimated Jaccard similarity
+carries the stored profile, the blocks (paragraphs) of the new posting that
+do not occur in the indexed one and the number of indexed blocks it dropped. :func:`pipelines.need_analysis.extract_need_analysis_profile`
+then extracts only those blocks and merges the result into the stored profile,
+or skips the model entirely when both postings have the same blocks.
+
+The index is enabled by ``NEAR_DUPLICATE_INDEX_PATH``; :func:`get_near_duplicate_index`
+returns ``None`` otherwise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from ingest.reader import clean_job_text
+from utils.env import env_float
+
+logger = logging.getLogger(__name__)
+
+
+NEAR_DUPLICATE_INDEX_PATH = os.getenv("NEAR_DUPLICATE_INDEX_PATH", "").strip()
+NEAR_DUPLICATE_THRESHOLD = env_float("NEAR_DUPLICATE_THRESHOLD", 0.8, positive=True, maximum=1.0)
+
+SHINGLE_SIZE = 3
+NUM_PERM = 256
+# 32 bands of 8 rows: postings above ~0.65 similarity share a bucket with high probability.
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_PRIME = np.uint64((1 << 31) - 1)
+_PERMUTATIONS = np.random.RandomState(20260301).randint(1, (1 << 31) - 1, size=(2, NUM_PERM)).astype(np.uint64)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_BLOCK_SPLIT_RE = re.compile(r"\n\s*\n")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def _digest(value: str, size: int = 8) -> str:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=size).hexdigest()
+
+
+def split_blocks(text: str) -> list[str]:
+    """Split cleaned posting text into paragraphs, or lines for single-paragraph text."""
+
+    cleaned = clean_job_text(text)
+    blocks = [block.strip() for block in _BLOCK_SPLIT_RE.split(cleaned) if block.strip()]
+    if len(blocks) <= 1:
+        blocks = [line.strip() for line in cleaned.splitlines() if line.strip()]
+    return blocks
+
+
+def _block_key(block: str) -> str:
+    return _digest(" ".join(_tokens(block)))
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Return the 32-bit hashes of the word ``size``-grams of ``text``."""
+
+    tokens = _tokens(clean_job_text(text))
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    grams = {" ".join(tokens[index : index + size]) for index in range(max(1, len(tokens) - size + 1))}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """Return the ``NUM_PERM`` MinHash signature of ``text``'s shingles."""
+
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, int(_PRIME), dtype=np.uint32)
+    permuted = (np.outer(hashes, _PERMUTATIONS[0]) + _PERMUTATIONS[1]) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Return the estimated Jaccard similarity of two signatures."""
+
+    return float(np.count_nonzero(left == right)) / NUM_PERM
+
+
+def _band_buckets(signature: np.ndarray) -> list[tuple[int, str]]:
+    return [
+        (band, hashlib.blake2b(signature[band * ROWS : (band + 1) * ROWS].tobytes(), digest_size=8).hexdigest())
+        for band in range(BANDS)
+    ]
+
+
+def _has_value(value: Any) -> bool:
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, Mapping):
+        return any(_has_value(item) for item in value.values())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return any(_has_value(item) for item in value)
+    return bool(value)
+
+
+def _list_key(item: Any) -> str:
+    if isinstance(item, str):
+        return item.strip().casefold()
+    return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _item_tokens(item: Any) -> set[str]:
+    if isinstance(item, str):
+        return set(_tokens(item))
+    return set(_tokens(json.dumps(item, ensure_ascii=False, default=str)))
+
+
+def _grounded(item: Any, retained: set[str]) -> bool:
+    """``True`` when most words of ``item`` still occur in the retained blocks."""
+
+    tokens = _item_tokens(item)
+    return not tokens or len(tokens & retained) * 2 >= len(tokens)
+
+
+def merge_seed_profile(
+    seed: Mapping[str, Any],
+    delta: Mapping[str, Any],
+    *,
+    retained_text: str | None = None,
+) -> dict[str, Any]:
+    """Merge a profile extracted from changed blocks into the ``seed`` profile.
+
+    Filled scalars of ``delta`` replace the seed's values. A list the delta
+    fills is replaced rather than extended, because its source block changed;
+    when ``retained_text`` (the unchanged blocks of the new posting) is given,
+    seed items whose words still occur there are kept in front of the delta's
+    items, and seed items of other lists are dropped once their words no longer
+    occur anywhere in it, as their block was removed.
+    """
+
+    retained = set(_tokens(retained_text)) if retained_text is not None else None
+    return _merge(seed, delta, retained)
+
+
+def _merge(seed: Mapping[str, Any], delta: Mapping[str, Any], retained: set[str] | None) -> dict[str, Any]:
+    merged: dict[str, Any] = dict(seed)
+    if retained is not None:
+        for key, current in seed.items():
+            if isinstance(current, Mapping) and key not in delta:
+                merged[key] = _merge(current, {}, retained)
+            elif isinstance(current, list):
+                merged[key] = [item for item in current if _grounded(item, retained)]
+    for key, value in delta.items():
+        current = merged.get(key)
+        if isinstance(value, Mapping) and isinstance(current, Mapping):
+            merged[key] = _merge(current, value, retained)
+        elif isinstance(value, list) and isinstance(current, list):
+            if not _has_value(value):
+                continue
+            items = list(current) if retained is not None else []
+            seen = {_list_key(item) for item in items}
+            for item in value:
+                if _has_value(item) and _list_key(item) not in seen:
+                    seen.add(_list_key(item))
+                    items.append(item)
+            merged[key] = items
+        elif _has_value(value) or key not in merged:
+            merged[key] = value
+    return merged
+
+
+@dataclass(frozen=True)
+class NearDuplicateMatch:
+    """An indexed posting similar to the one being extracted."""
+
+    posting_id: str
+    similarity: float
+    total_blocks: int
+    changed_blocks: tuple[str, ...]
+    profile: dict[str, Any] = field(repr=False, compare=False)
+    removed_blocks: int = 0
+    unchanged_blocks: tuple[str, ...] = field(default=(), repr=False, compare=False)
+
+    @property
+    def exact(self) -> bool:
+        """``True`` when both postings consist of the same blocks."""
+
+        return not self.changed_blocks and not self.removed_blocks
+
+    @property
+    def delta_text(self) -> str:
+        return "\n\n".join(self.changed_blocks)
+
+    @property
+    def retained_text(self) -> str:
+        return "\n\n".join(self.unchanged_blocks)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "posting_id": self.posting_id,
+            "similarity": round(self.similarity, 3),
+            "total_blocks": self.total_blocks,
+            "changed_blocks": len(self.changed_blocks),
+            "removed_blocks": self.removed_blocks,
+        }
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of extracted postings in a SQLite file shared by all workers."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        timeout: float = 5.0,
+    ) -> None:
+        self._path = os.fspath(path)
+        self.threshold = threshold
+        self._timeout = timeout
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "id TEXT PRIMARY KEY, signature BLOB NOT NULL, blocks TEXT NOT NULL, "
+                "profile TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket TEXT NOT NULL, posting_id TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=self._timeout)
+
+    def __len__(self) -> int:
+        connection = self._connect()
+        try:
+            return int(connection.execute("SELECT COUNT(*) FROM postings").fetchone()[0])
+        finally:
+            connection.close()
+
+    def add(self, text: str, profile: Mapping[str, Any]) -> str:
+        """Index ``text`` with its extracted ``profile``; return the posting id.
+
+        Re-adding the same text replaces the stored profile.
+        """
+
+        blocks = split_blocks(text)
+        block_keys = [_block_key(block) for block in blocks]
+        posting_id = _digest("\n".join(block_keys), size=16)
+        signature = minhash_signature(text)
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM buckets WHERE posting_id = ?", (posting_id,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?, ?)",
+                    (
+                        posting_id,
+                        signature.tobytes(),
+                        json.dumps(block_keys),
+                        json.dumps(profile, ensure_ascii=False, default=str),
+                        time.time(),
+                    ),
+                )
+                connection.executemany(
+                    "INSERT INTO buckets VALUES (?, ?, ?)",
+                    [(band, bucket, posting_id) for band, bucket in _band_buckets(signature)],
+                )
+        finally:
+            connection.close()
+        return posting_id
+
+    def find(self, text: str) -> NearDuplicateMatch | None:
+        """Return the most similar indexed posting at or above the threshold."""
+
+        signature = minhash_signature(text)
+        buckets = _band_buckets(signature)
+        clause = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+        params = [value for pair in buckets for value in pair]
+        connection = self._connect()
+        try:
+            candidates = connection.execute(
+                "SELECT id, signature, blocks, profile FROM postings WHERE id IN "
+                f"(SELECT DISTINCT posting_id FROM buckets WHERE {clause})",
+                params,
+            ).fetchall()
+        finally:
+            connection.close()
+
+        best: tuple[float, str, str, str] | None = None
+        for posting_id, raw_signature, raw_blocks, raw_profile in candidates:
+            similarity = estimate_similarity(signature, np.frombuffer(raw_signature, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[0]):
+                best = (similarity, posting_id, raw_blocks, raw_profile)
+        if best is None:
+            return None
+        similarity, posting_id, raw_blocks, raw_profile = best
+        known = set(json.loads(raw_blocks))
+        blocks = split_blocks(text)
+        keys = [_block_key(block) for block in blocks]
+        return NearDuplicateMatch(
+            posting_id=posting_id,
+            similarity=similarity,
+            total_blocks=len(blocks),
+            changed_blocks=tuple(block for block, key in zip(blocks, keys) if key not in known),
+            profile=json.loads(raw_profile),
+            removed_blocks=len(known - set(keys)),
+            unchanged_blocks=tuple(block for block, key in zip(blocks, keys) if key in known),
+        )
+
+
+_index: NearDuplicateIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex | None:
+    """Return the configured index, or ``None`` without ``NEAR_DUPLICATE_INDEX_PATH``."""
+
+    global _index
+    if not NEAR_DUPLICATE_INDEX_PATH:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex(NEAR_DUPLICATE_INDEX_PATH)
+        return _index
+
+
+__all__ = [
+    "NearDuplicateIndex",
+    "NearDuplicateMatch",
+    "estimate_similarity",
+    "get_near_duplicate_index",
+    "merge_seed_profile",
+    "minhash_signature",
+    "split_blocks",
+]
@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import copy
+import json
 import logging
 from typing import Any, Mapping
 
+from constants.keys import ProfilePaths
 from core.critical_fields import load_critical_fields
 
 from core.extraction import parse_structured_payload
-from llm.client import _extract_json_outcome
+from llm.client import _extract_json_outcome, _merge_locked_fields, _set_nested_value
+from utils.profiling import profiled
+
+from .near_duplicates import NearDuplicateIndex, NearDuplicateMatch, get_near_duplicate_index, merge_seed_profile
 
 __all__ = ["ExtractionResult", "extract_need_analysis_profile"]
 
@@ -70,8 +76,44 @@ class ExtractionResult:
     heuristic_critical_count: int = 0
     degraded: bool = False
     degraded_reasons: list[str] | None = None
+    near_duplicate: NearDuplicateMatch | None = None
+
+
+def _find_near_duplicate(index: NearDuplicateIndex | None, text: str) -> NearDuplicateMatch | None:
+    if index is None:
+        return None
+    try:
+        return index.find(text)
+    except Exception:  # the index only saves model calls
+        logger.warning("Near-duplicate lookup failed; extracting the full posting", exc_info=True)
+        return None
+
 
+def _index_posting(index: NearDuplicateIndex, text: str, data: Mapping[str, Any]) -> None:
+    try:
+        index.add(text, data)
+    except Exception:  # the index only saves model calls
+        logger.warning("Could not add the posting to the near-duplicate index", exc_info=True)
+
+
+def _apply_caller_fields(
+    data: dict[str, Any],
+    *,
+    title_hint: str | None,
+    company_hint: str | None,
+    locked_fields: Mapping[str, str] | None,
+) -> None:
+    """Give hints and locked fields the say they have in a model extraction over a reused profile."""
 
+    for path, hint in ((ProfilePaths.POSITION_JOB_TITLE, title_hint), (ProfilePaths.COMPANY_NAME, company_hint)):
+        section, _, name = path.value.partition(".")
+        current = data.get(section)
+        if hint and hint.strip() and not (isinstance(current, Mapping) and current.get(name)):
+            _set_nested_value(data, path.value, hint.strip())
+    _merge_locked_fields(data, locked_fields)
+
+
+@profiled("extract_need_analysis_profile")
 def extract_need_analysis_profile(
     text: str,
     *,
@@ -80,6 +122,7 @@ def extract_need_analysis_profile(
     url_hint: str | None = None,
     locked_fields: Mapping[str, str] | None = None,
     metadata: Mapping[str, Any] | None = None,
+    reuse_duplicates: bool = True,
 ) -> ExtractionResult:
     """Run LLM-based extraction and return structured results.
 
@@ -87,12 +130,21 @@ def extract_need_analysis_profile(
     JSON parsing from any UI concerns. Callers can handle caching, retries, and
     UI updates separately while reusing the same business logic.
 
+    When the near-duplicate index is enabled and ``text`` is similar to an
+    already extracted posting, that profile is reused as a seed: only the
+    blocks missing from the earlier posting are sent to the model and merged
+    into it. A posting without new blocks skips the model call; when it only
+    dropped blocks, seed values no longer found in its text are removed. Hints and
+    locked fields are applied to the reused profile as well. The match is
+    reported as :attr:`ExtractionResult.near_duplicate`.
+
     Args:
         text: Source text to analyse.
         title_hint: Optional job title hint for the prompt.
         company_hint: Optional company name hint for the prompt.
         url_hint: Optional source URL for context.
         locked_fields: Optional mapping of fields that should stay fixed.
+        reuse_duplicates: Look up near-duplicates in the configured index.
 
     Returns:
         An :class:`ExtractionResult` containing the raw JSON payload, the parsed
@@ -103,16 +155,52 @@ def extract_need_analysis_profile(
         InvalidExtractionPayload: When the payload cannot be parsed.
     """
 
+    index = get_near_duplicate_index() if reuse_duplicates else None
+    match = _find_near_duplicate(index, text)
+    if match is not None and not match.changed_blocks:
+        # No block is new, so there is nothing to send to the model.
+        data = copy.deepcopy(match.profile)
+        if match.exact:
+            logger.info("Reusing extraction of identical posting %s", match.posting_id)
+        else:
+            logger.info(
+                "Reusing extraction of posting %s without its %d removed blocks", match.posting_id, match.removed_blocks
+            )
+            data = merge_seed_profile(data, {}, retained_text=match.retained_text)
+            if index is not None:
+                _index_posting(index, text, data)
+        _apply_caller_fields(data, title_hint=title_hint, company_hint=company_hint, locked_fields=locked_fields)
+        return ExtractionResult(
+            raw_json=json.dumps(data, ensure_ascii=False),
+            data=data,
+            recovered=False,
+            issues=[],
+            missing_required_count=_count_missing_critical_fields(data),
+            heuristic_critical_count=_count_heuristic_critical_fields(metadata),
+            near_duplicate=match,
+        )
+
+    source_text = match.delta_text if match is not None else text
     outcome = _extract_json_outcome(
-        text,
+        source_text,
         title=title_hint,
         company=company_hint,
         url=url_hint,
         locked_fields=locked_fields or None,
     )
-    data, recovered, issues = parse_structured_payload(outcome.content, source_text=text)
+    data, recovered, issues = parse_structured_payload(outcome.content, source_text=source_text)
     if outcome.low_confidence:
         issues.append("extraction_fallback_active")
+    if match is not None:
+        logger.info(
+            "Re-extracted %d of %d blocks of near-duplicate posting %s (similarity %.2f)",
+            len(match.changed_blocks),
+            match.total_blocks,
+            match.posting_id,
+            match.similarity,
+        )
+        data = merge_seed_profile(match.profile, data, retained_text=match.retained_text)
+        _apply_caller_fields(data, title_hint=title_hint, company_hint=company_hint, locked_fields=locked_fields)
 
     missing_required_count = _count_missing_critical_fields(data)
     heuristic_critical_count = _count_heuristic_critical_fields(metadata)
@@ -128,8 +216,8 @@ def extract_need_analysis_profile(
             ",".join(degraded_reasons),
         )
 
-    return ExtractionResult(
-        raw_json=outcome.content,
+    result = ExtractionResult(
+        raw_json=outcome.content if match is None else json.dumps(data, ensure_ascii=False),
         data=data,
         recovered=recovered,
         issues=issues,
@@ -141,4 +229,9 @@ def extract_need_analysis_profile(
         heuristic_critical_count=heuristic_critical_count,
         degraded=degraded,
         degraded_reasons=degraded_reasons or None,
+        near_duplicate=match,
     )
+    # Missing optional-but-critical fields are common; only unreliable model output stays out of the index.
+    if index is not None and not outcome.low_confidence and outcome.repair_count <= 1:
+        _index_posting(index, text, data)
+    return result
@@ -0,0 +1,213 @@
+"""Speculative background precomputation of wizard suggestions.
+
+After extraction the user spends minutes on the first steps, while skill,
+benefit and responsibility suggestions and the salary estimate are only
+computed once the user clicks for them. :class:`PrefetchScheduler` runs such
+calls ahead of time in the ``BACKGROUND`` lane of the shared workflow
+executor, so interactive work always goes first.
+
+A prefetch is identified by its name and a revision: the digest of the
+function and the arguments it is called with. The arguments are derived from
+the profile, so editing a relevant field produces a new revision. Each
+session keeps at most one entry per name. Scheduling a new revision cancels
+or drops the old one, and :meth:`PrefetchScheduler.take` only returns a
+result whose revision matches the call the UI is about to make. Otherwise it
+calls the function inline, exactly as without prefetching.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import CancelledError, Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from pipelines.executor import SharedExecutor, get_shared_executor
+from pipelines.result_store import stable_digest
+from utils.env import env_float, env_int
+from utils.logging_context import get_session_id, wrap_with_current_context
+from utils.metrics import record_cache_lookup
+from utils.priority import Priority, bind_priority
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+# How long the UI waits for an in-flight prefetch before computing inline.
+PREFETCH_WAIT_SECONDS = env_float("PREFETCH_WAIT_SECONDS", 30.0)
+PREFETCH_MAX_SESSIONS = env_int("PREFETCH_MAX_SESSIONS", 256, minimum=1)
+
+
+def prefetch_revision(fn: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    """Return the revision of calling ``fn`` with ``args``/``kwargs``."""
+
+    name = getattr(fn, "__qualname__", type(fn).__qualname__)
+    return stable_digest([f"{fn.__module__}.{name}", list(args), kwargs])
+
+
+@dataclass
+class _Entry:
+    revision: str
+    future: Future[Any]
+
+
+def _run_in_background(fn: Callable[..., _T], args: tuple[Any, ...], kwargs: dict[str, Any]) -> _T:
+    with bind_priority(Priority.BACKGROUND):
+        return fn(*args, **kwargs)
+
+
+class PrefetchScheduler:
+    """Per-session speculative results keyed by call revision."""
+
+    def __init__(
+        self,
+        executor: SharedExecutor | None = None,
+        *,
+        max_sessions: int = PREFETCH_MAX_SESSIONS,
+        wait_seconds: float = PREFETCH_WAIT_SECONDS,
+    ) -> None:
+        self._executor = executor
+        self._max_sessions = max_sessions
+        self._wait_seconds = wait_seconds
+        self._sessions: OrderedDict[str, dict[str, _Entry]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def schedule(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        /,
+        *args: Any,
+        session: str | None = None,
+        **kwargs: Any,
+    ) -> bool:
+        """Start ``fn(*args, **kwargs)`` in the background unless it is already known.
+
+        Returns ``True`` when a new computation was queued. A pending entry
+        of an older revision is cancelled.
+        """
+
+        if not PREFETCH_ENABLED:
+            return False
+        session_id = session or get_session_id()
+        revision = prefetch_revision(fn, args, kwargs)
+        with self._lock:
+            entries = self._entries(session_id)
+            current = entries.get(name)
+            if current is not None and current.revision == revision and not _failed(current.future):
+                return False
+            if current is not None:
+                current.future.cancel()
+            executor = self._executor or get_shared_executor()
+            future = executor.submit(
+                wrap_with_current_context(_run_in_background, fn, args, kwargs),
+                priority=Priority.BACKGROUND,
+            )
+            entries[name] = _Entry(revision, future)
+        logger.debug("Prefetch %s scheduled for revision %s", name, revision[:12])
+        return True
+
+    def take(
+        self,
+        name: str,
+        fn: Callable[..., _T],
+        /,
+        *args: Any,
+        session: str | None = None,
+        **kwargs: Any,
+    ) -> _T:
+        """Return the prefetched result of ``fn(*args, **kwargs)`` or compute it now.
+
+        A running prefetch of the same revision is awaited for up to
+        ``PREFETCH_WAIT_SECONDS``; one that has not started yet is cancelled
+        and computed inline right away. Stale or failed entries are discarded.
+        """
+
+        session_id = session or get_session_id()
+        revision = prefetch_revision(fn, args, kwargs)
+        with self._lock:
+            entries = self._sessions.get(session_id, {})
+            entry = entries.pop(name, None)
+        # Cancelling only succeeds while the prefetch is still queued; waiting for it would not help then.
+        if entry is not None and not entry.future.cancel() and entry.revision == revision:
+            try:
+                result = entry.future.result(timeout=self._wait_seconds)
+            except (CancelledError, FutureTimeout):
+                pass
+            except Exception:
+                logger.debug("Prefetch %s failed; computing inline", name, exc_info=True)
+            else:
+                record_cache_lookup("prefetch", hit=True)
+                return result
+        record_cache_lookup("prefetch", hit=False)
+        return fn(*args, **kwargs)
+
+    def discard(self, session: str | None = None, name: str | None = None) -> None:
+        """Drop (and cancel) the entries of ``session``, or only the one called ``name``."""
+
+        session_id = session or get_session_id()
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            if entries is None:
+                return
+            if name is None:
+                dropped = list(self._sessions.pop(session_id).values())
+            else:
+                entry = entries.pop(name, None)
+                dropped = [entry] if entry is not None else []
+        for entry in dropped:
+            entry.future.cancel()
+
+    def _entries(self, session_id: str) -> dict[str, _Entry]:
+        entries = self._sessions.get(session_id)
+        if entries is None:
+            entries = self._sessions[session_id] = {}
+            while len(self._sessions) > self._max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                for entry in evicted.values():
+                    entry.future.cancel()
+        else:
+            self._sessions.move_to_end(session_id)
+        return entries
+
+
+def _failed(future: Future[Any]) -> bool:
+    return future.done() and (future.cancelled() or future.exception() is not None)
+
+
+_SCHEDULER: PrefetchScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Return the process-wide prefetch scheduler."""
+
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = PrefetchScheduler()
+        return _SCHEDULER
+
+
+def reset_prefetch_scheduler(scheduler: PrefetchScheduler | None = None) -> None:
+    """Replace the process-wide scheduler (used by tests)."""
+
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        _SCHEDULER = scheduler
+
+
+__all__ = [
+    "PREFETCH_ENABLED",
+    "PrefetchScheduler",
+    "get_prefetch_scheduler",
+    "prefetch_revision",
+    "reset_prefetch_scheduler",
+]
@@ -0,0 +1,189 @@
+"""Result stores for memoised workflow tasks.
+
+A :class:`~pipelines.workflow.Task` declaring a ``cache_key`` function is
+looked up in a :class:`ResultStore` before it runs. The runner derives the
+lookup key from the task name, the task's input key and the fingerprints of
+its upstream results, so a changed input re-runs exactly the affected sub-DAG.
+
+Three stores are provided:
+
+* :class:`MemoryResultStore` – bounded LRU shared by the whole process,
+* :class:`SessionResultStore` – a single entry kept in Streamlit session state,
+* :class:`DiskResultStore` – pickled results below a cache directory.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable, MutableMapping
+from pathlib import Path
+from threading import Lock
+from typing import Any, Protocol, cast
+
+logger = logging.getLogger(__name__)
+
+
+class ResultStore(Protocol):
+    """Key/value storage for memoised task results."""
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        """Return ``(True, value)`` for a hit and ``(False, None)`` otherwise."""
+
+    def save(self, key: str, value: Any) -> None:
+        """Persist ``value`` under ``key``."""
+
+
+def _json_default(value: Any) -> Any:
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    return repr(value)
+
+
+def stable_digest(value: Any) -> str:
+    """Return a deterministic SHA-256 digest for JSON-like ``value``.
+
+    Pydantic models, dataclasses and sets are normalised first; anything else
+    falls back to ``repr``.
+    """
+
+    if isinstance(value, str):
+        payload = value
+    else:
+        payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryResultStore:
+    """Thread-safe LRU store kept in process memory."""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def save(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SessionResultStore:
+    """Single-entry store in Streamlit session state.
+
+    The memo key and the result are kept in two session keys (e.g.
+    ``StateKeys.EXTRACTION_CACHE_KEY``/``EXTRACTION_CACHE_RESULT``) so existing
+    state resets keep invalidating the cache. ``accept`` can reject stale or
+    foreign values restored from older sessions.
+    """
+
+    def __init__(
+        self,
+        key_slot: str,
+        value_slot: str,
+        *,
+        accept: Callable[[Any], bool] | None = None,
+        state: MutableMapping[str, Any] | None = None,
+    ) -> None:
+        self._key_slot = key_slot
+        self._value_slot = value_slot
+        self._accept = accept
+        self._state = state
+
+    def _session(self) -> MutableMapping[str, Any]:
+        if self._state is not None:
+            return self._state
+        import streamlit as st
+
+        return cast(MutableMapping[str, Any], st.session_state)
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        state = self._session()
+        if state.get(self._key_slot) != key:
+            return False, None
+        value = state.get(self._value_slot)
+        if self._accept is not None and not self._accept(value):
+            return False, None
+        return True, value
+
+    def save(self, key: str, value: Any) -> None:
+        state = self._session()
+        state[self._key_slot] = key
+        state[self._value_slot] = value
+
+
+class DiskResultStore:
+    """Pickle results to ``directory`` (one file per key, atomic writes)."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self._directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.pkl"
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            with path.open("rb") as handle:
+                return True, pickle.load(handle)  # noqa: S301 - local cache written by this process
+        except FileNotFoundError:
+            return False, None
+        except Exception:  # noqa: BLE001 - corrupt entries count as misses
+            logger.warning("Discarding unreadable workflow cache entry %s", path, exc_info=True)
+            path.unlink(missing_ok=True)
+            return False, None
+
+    def save(self, key: str, value: Any) -> None:
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("wb", dir=self._directory, delete=False, suffix=".tmp") as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                temp_name = handle.name
+            os.replace(temp_name, self._path(key))
+        except Exception:  # noqa: BLE001 - caching must never fail a task
+            logger.warning("Could not persist workflow cache entry %s", key, exc_info=True)
+
+
+_PROCESS_STORE = MemoryResultStore()
+
+
+def get_process_store() -> MemoryResultStore:
+    """Return the default process-wide store used when a task names none."""
+
+    return _PROCESS_STORE
+
+
+__all__ = [
+    "DiskResultStore",
+    "MemoryResultStore",
+    "ResultStore",
+    "SessionResultStore",
+    "get_process_store",
+    "stable_digest",
+]
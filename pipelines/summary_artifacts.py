@@ -0,0 +1,217 @@
+"""Concurrent generation of the summary step artifacts.
+
+On the summary step the job ad, the interview guide, the Boolean search
+string and the profile JSON export used to be produced one after another as
+the user clicked through the tabs. :func:`start_summary_artifacts` starts all
+of them at once on the shared workflow executor and returns a
+:class:`SummaryArtifactRun` whose results the UI renders as they complete.
+
+The profile is prepared once: export decisions and ESCO references are
+applied in a single :func:`~generators.payload.prepare_generation_payloads`
+call and handed to both generators. Every artifact reports its own latency,
+both on the outcome and as the ``summary.artifact.duration`` metric.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import partial
+from typing import Any
+
+from generators.interview_guide import INTERVIEW_GUIDE_ARTIFACT_KEY, generate_interview_guide
+from generators.job_ad import JOB_AD_ARTIFACT_KEY, generate_job_ad
+from generators.payload import prepare_generation_payloads
+from utils import build_boolean_search
+from utils.export import prepare_clean_json
+from utils.llm_state import is_llm_available
+from utils.logging_context import wrap_with_current_context
+from utils.metrics import record_artifact_generation
+
+from .executor import Priority, SharedExecutor, get_shared_executor
+from .result_store import stable_digest
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryArtifact(StrEnum):
+    """Artifacts produced when the summary step is entered."""
+
+    JOB_AD = "job_ad"
+    INTERVIEW_GUIDE = "interview_guide"
+    BOOLEAN_SEARCH = "boolean_search"
+    PROFILE_JSON = "profile_json"
+
+
+_LLM_ARTIFACTS = frozenset({SummaryArtifact.JOB_AD, SummaryArtifact.INTERVIEW_GUIDE})
+
+
+@dataclass(frozen=True)
+class ArtifactOutcome:
+    """Result of one artifact generation and how long it took."""
+
+    artifact: SummaryArtifact
+    value: Any = None
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _structured_content(result: Any) -> Any:
+    """Return the parsed JSON content of a chat result, or its raw text."""
+
+    content = getattr(result, "content", result)
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return content
+    return content
+
+
+def _timed(artifact: SummaryArtifact, fn: Callable[[], Any]) -> ArtifactOutcome:
+    started = time.perf_counter()
+    try:
+        value = fn()
+    except Exception as exc:
+        seconds = time.perf_counter() - started
+        logger.warning("Summary artifact %s failed after %.2fs", artifact.value, seconds, exc_info=True)
+        record_artifact_generation(artifact.value, seconds, success=False)
+        return ArtifactOutcome(artifact, error=str(exc) or type(exc).__name__, seconds=seconds)
+    seconds = time.perf_counter() - started
+    logger.info("Summary artifact %s generated in %.2fs", artifact.value, seconds)
+    record_artifact_generation(artifact.value, seconds, success=True)
+    return ArtifactOutcome(artifact, value=value, seconds=seconds)
+
+
+def _completed(outcome: ArtifactOutcome) -> Future[ArtifactOutcome]:
+    future: Future[ArtifactOutcome] = Future()
+    future.set_result(outcome)
+    return future
+
+
+class SummaryArtifactRun:
+    """Artifact generations started together for one profile revision."""
+
+    def __init__(self, revision: str, futures: Mapping[SummaryArtifact, Future[ArtifactOutcome]]) -> None:
+        self.revision = revision
+        self._futures = dict(futures)
+
+    @property
+    def artifacts(self) -> tuple[SummaryArtifact, ...]:
+        return tuple(self._futures)
+
+    def done(self, artifact: SummaryArtifact) -> bool:
+        future = self._futures.get(artifact)
+        return future is not None and future.done()
+
+    def outcome(self, artifact: SummaryArtifact, timeout: float | None = None) -> ArtifactOutcome | None:
+        """Return the outcome of ``artifact``, waiting up to ``timeout`` seconds."""
+
+        future = self._futures.get(artifact)
+        if future is None:
+            return None
+        if timeout is not None and not future.done():
+            try:
+                return future.result(timeout=timeout)
+            except TimeoutError:
+                return None
+        return future.result()
+
+    def iter_completed(self, timeout: float | None = None) -> Iterator[ArtifactOutcome]:
+        """Yield outcomes in completion order until all are done or ``timeout`` expires."""
+
+        try:
+            for future in as_completed(self._futures.values(), timeout=timeout):
+                yield future.result()
+        except TimeoutError:
+            return
+
+    def latencies(self) -> dict[SummaryArtifact, float]:
+        """Return the generation time in seconds of every completed artifact."""
+
+        return {
+            artifact: future.result().seconds
+            for artifact, future in self._futures.items()
+            if future.done() and not future.cancelled()
+        }
+
+    def cancel(self) -> None:
+        """Cancel generations that have not started yet."""
+
+        for future in self._futures.values():
+            future.cancel()
+
+
+def summary_revision(
+    profile_payload: Mapping[str, Any],
+    *,
+    lang: str,
+    tone: str,
+    artifacts: Iterable[SummaryArtifact],
+) -> str:
+    """Return the digest identifying a run for these inputs."""
+
+    return stable_digest([profile_payload, lang, tone, sorted(artifact.value for artifact in artifacts)])
+
+
+def start_summary_artifacts(
+    profile_payload: Mapping[str, Any],
+    *,
+    lang: str,
+    tone: str = "professional",
+    artifacts: Iterable[SummaryArtifact] = tuple(SummaryArtifact),
+    executor: SharedExecutor | None = None,
+) -> SummaryArtifactRun:
+    """Start generating ``artifacts`` concurrently for ``profile_payload``.
+
+    LLM-backed artifacts complete immediately with an error outcome when the
+    LLM is unavailable; the local ones are always generated.
+    """
+
+    selected = list(dict.fromkeys(SummaryArtifact(artifact) for artifact in artifacts))
+    revision = summary_revision(profile_payload, lang=lang, tone=tone, artifacts=selected)
+    llm_available = is_llm_available()
+    prepared: dict[str, dict[str, Any]] = {}
+    if llm_available and _LLM_ARTIFACTS.intersection(selected):
+        prepared = prepare_generation_payloads(profile_payload, [JOB_AD_ARTIFACT_KEY, INTERVIEW_GUIDE_ARTIFACT_KEY])
+
+    tasks: dict[SummaryArtifact, Callable[[], Any]] = {
+        SummaryArtifact.JOB_AD: lambda: _structured_content(
+            generate_job_ad(profile_payload, lang, tone, prepared_payload=prepared.get(JOB_AD_ARTIFACT_KEY))
+        ),
+        SummaryArtifact.INTERVIEW_GUIDE: lambda: _structured_content(
+            generate_interview_guide(profile_payload, lang, prepared_payload=prepared.get(INTERVIEW_GUIDE_ARTIFACT_KEY))
+        ),
+        SummaryArtifact.BOOLEAN_SEARCH: partial(build_boolean_search, profile_payload),
+        SummaryArtifact.PROFILE_JSON: lambda: prepare_clean_json(dict(profile_payload))[0],
+    }
+
+    pool = executor or get_shared_executor()
+    futures: dict[SummaryArtifact, Future[ArtifactOutcome]] = {}
+    for artifact in selected:
+        if artifact in _LLM_ARTIFACTS and not llm_available:
+            futures[artifact] = _completed(ArtifactOutcome(artifact, error="LLM unavailable"))
+            continue
+        futures[artifact] = pool.submit(
+            wrap_with_current_context(_timed, artifact, tasks[artifact]),
+            priority=Priority.INTERACTIVE,
+        )
+    return SummaryArtifactRun(revision, futures)
+
+
+__all__ = [
+    "ArtifactOutcome",
+    "SummaryArtifact",
+    "SummaryArtifactRun",
+    "start_summary_artifacts",
+    "summary_revision",
+]
@@ -0,0 +1,612 @@
+"""Columnar vacancy store for cross-vacancy analytics.
+
+Profiles are flattened into one row per vacancy snapshot whose columns are
+canonical :class:`~constants.keys.ProfilePaths`. Rows are written as Parquet
+files under a Hive layout partitioned by capture month and country::
+
+    <root>/month=2026-10/country=DE/part-<uuid>.parquet
+
+Free-text categories (titles, occupations, currency, …) and the skill lists
+are dictionary-encoded. Every :meth:`VacancyStore.append` writes new files,
+so appends from concurrent sessions never conflict; :meth:`VacancyStore.compact`
+merges the files of a partition, and an append compacts its partition once it
+holds ``VACANCY_STORE_COMPACT_FILES`` files. Queries go through
+``pyarrow.dataset`` so partition and column predicates are pushed down and
+only the requested columns are read. By default only the latest snapshot of
+each vacancy counts.
+
+The store is enabled by ``VACANCY_STORE_DIR`` and requires the optional
+``pyarrow`` package; :func:`get_vacancy_store` returns ``None`` otherwise.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from constants.keys import ProfilePaths
+from utils.env import env_int
+from utils.normalization import country_to_iso2
+
+logger = logging.getLogger(__name__)
+
+VACANCY_STORE_DIR = os.getenv("VACANCY_STORE_DIR", "").strip()
+# Files a partition may collect before an append compacts it (0 disables).
+VACANCY_STORE_COMPACT_FILES = env_int("VACANCY_STORE_COMPACT_FILES", 32, minimum=0)
+# A compaction lock older than this is left over from a crashed writer.
+_COMPACT_LOCK_STALE_SECONDS = 600.0
+_COMPACT_LOCK = ".compact.lock"
+
+VACANCY_ID = "vacancy_id"
+RECORDED_AT = "recorded_at"
+ROLE = "role"
+MONTH = "month"
+COUNTRY = "country"
+UNKNOWN_COUNTRY = "unknown"
+
+# Columns stored as dictionary-encoded strings.
+CATEGORY_COLUMNS: tuple[ProfilePaths, ...] = (
+    ProfilePaths.POSITION_JOB_TITLE,
+    ProfilePaths.POSITION_OCCUPATION_LABEL,
+    ProfilePaths.POSITION_OCCUPATION_GROUP,
+    ProfilePaths.POSITION_OCCUPATION_URI,
+    ProfilePaths.POSITION_SENIORITY,
+    ProfilePaths.COMPANY_NAME,
+    ProfilePaths.COMPANY_INDUSTRY,
+    ProfilePaths.COMPANY_SIZE,
+    ProfilePaths.LOCATION_PRIMARY_CITY,
+    ProfilePaths.EMPLOYMENT_JOB_TYPE,
+    ProfilePaths.EMPLOYMENT_CONTRACT_TYPE,
+    ProfilePaths.EMPLOYMENT_WORK_POLICY,
+    ProfilePaths.COMPENSATION_CURRENCY,
+    ProfilePaths.COMPENSATION_PERIOD,
+    ProfilePaths.REQUIREMENTS_LANGUAGE_LEVEL_ENGLISH,
+)
+FLOAT_COLUMNS: tuple[ProfilePaths, ...] = (
+    ProfilePaths.COMPENSATION_SALARY_MIN,
+    ProfilePaths.COMPENSATION_SALARY_MAX,
+    ProfilePaths.COMPENSATION_BONUS_PERCENTAGE,
+    ProfilePaths.EMPLOYMENT_REMOTE_PERCENTAGE,
+)
+BOOL_COLUMNS: tuple[ProfilePaths, ...] = (
+    ProfilePaths.COMPENSATION_SALARY_PROVIDED,
+    ProfilePaths.EMPLOYMENT_VISA_SPONSORSHIP,
+    ProfilePaths.EMPLOYMENT_TRAVEL_REQUIRED,
+)
+# List columns with dictionary-encoded items.
+LIST_COLUMNS: tuple[ProfilePaths, ...] = (
+    ProfilePaths.REQUIREMENTS_HARD_SKILLS_REQUIRED,
+    ProfilePaths.REQUIREMENTS_HARD_SKILLS_OPTIONAL,
+    ProfilePaths.REQUIREMENTS_SOFT_SKILLS_REQUIRED,
+    ProfilePaths.REQUIREMENTS_SOFT_SKILLS_OPTIONAL,
+    ProfilePaths.REQUIREMENTS_TOOLS_AND_TECHNOLOGIES,
+    ProfilePaths.REQUIREMENTS_LANGUAGES_REQUIRED,
+    ProfilePaths.REQUIREMENTS_CERTIFICATIONS,
+    ProfilePaths.COMPENSATION_BENEFITS,
+)
+SKILL_COLUMNS: tuple[ProfilePaths, ...] = (
+    ProfilePaths.REQUIREMENTS_HARD_SKILLS_REQUIRED,
+    ProfilePaths.REQUIREMENTS_HARD_SKILLS_OPTIONAL,
+    ProfilePaths.REQUIREMENTS_TOOLS_AND_TECHNOLOGIES,
+)
+_SKILL_COLUMN_NAMES = tuple(path.value for path in SKILL_COLUMNS)
+
+_YEARLY_PERIODS = frozenset({"year", "yearly", "annual", "annually", "per year", "p.a.", "jährlich", "jahr"})
+_SPACES_RE = re.compile(r"\s+")
+
+Predicate = tuple[str, str, Any]
+
+
+def normalize_role(title: str | None) -> str | None:
+    """Return the grouping key for a job title (case and whitespace folded)."""
+
+    if not title:
+        return None
+    normalized = _SPACES_RE.sub(" ", str(title)).strip().casefold()
+    return normalized or None
+
+
+def _get_path(profile: Mapping[str, Any], path: str) -> Any:
+    current: Any = profile
+    for part in path.split("."):
+        if not isinstance(current, Mapping):
+            return None
+        current = current.get(part)
+    return current
+
+
+def _as_text(value: Any) -> str | None:
+    if value is None or isinstance(value, (Mapping, list)):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _as_float(value: Any) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_list(value: Any) -> list[str]:
+    if not isinstance(value, (list, tuple)):
+        return []
+    seen: set[str] = set()
+    items: list[str] = []
+    for raw in value:
+        text = _as_text(raw)
+        if text and text.casefold() not in seen:
+            seen.add(text.casefold())
+            items.append(text)
+    return items
+
+
+def profile_row(profile: Mapping[str, Any], *, vacancy_id: str, recorded_at: datetime) -> dict[str, Any]:
+    """Flatten ``profile`` into one store row (partition columns included)."""
+
+    row: dict[str, Any] = {VACANCY_ID: vacancy_id, RECORDED_AT: recorded_at}
+    for path in CATEGORY_COLUMNS:
+        row[path.value] = _as_text(_get_path(profile, path.value))
+    for path in FLOAT_COLUMNS:
+        row[path.value] = _as_float(_get_path(profile, path.value))
+    for path in BOOL_COLUMNS:
+        value = _get_path(profile, path.value)
+        row[path.value] = value if isinstance(value, bool) else None
+    for path in LIST_COLUMNS:
+        row[path.value] = _as_list(_get_path(profile, path.value))
+    row[ROLE] = normalize_role(row[ProfilePaths.POSITION_JOB_TITLE.value])
+    country = _as_text(_get_path(profile, ProfilePaths.LOCATION_COUNTRY.value))
+    row[COUNTRY] = country_to_iso2(country) or UNKNOWN_COUNTRY
+    row[MONTH] = recorded_at.strftime("%Y-%m")
+    return row
+
+
+def file_schema() -> Any:
+    """Return the Arrow schema of the data files (without partition columns)."""
+
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        pa.field(VACANCY_ID, pa.string()),
+        pa.field(RECORDED_AT, pa.timestamp("us", tz="UTC")),
+        pa.field(ROLE, category),
+    ]
+    fields += [pa.field(path.value, category) for path in CATEGORY_COLUMNS]
+    fields += [pa.field(path.value, pa.float64()) for path in FLOAT_COLUMNS]
+    fields += [pa.field(path.value, pa.bool_()) for path in BOOL_COLUMNS]
+    fields += [pa.field(path.value, pa.list_(category)) for path in LIST_COLUMNS]
+    return pa.schema(fields)
+
+
+def _partition_schema() -> Any:
+    import pyarrow as pa
+
+    return pa.schema([pa.field(MONTH, pa.string()), pa.field(COUNTRY, pa.string())])
+
+
+def _expression(predicates: Iterable[Predicate]) -> Any:
+    """AND-combine ``(column, op, value)`` tuples into a dataset filter."""
+
+    import pyarrow.compute as pc
+
+    expression = None
+    for column, op, value in predicates:
+        field = pc.field(column)
+        if op in {"=", "=="}:
+            term = field == value
+        elif op == "!=":
+            term = field != value
+        elif op == "<":
+            term = field < value
+        elif op == "<=":
+            term = field <= value
+        elif op == ">":
+            term = field > value
+        elif op == ">=":
+            term = field >= value
+        elif op == "in":
+            term = field.isin(list(value))
+        elif op == "not in":
+            term = ~field.isin(list(value))
+        else:
+            raise ValueError(f"Unsupported operator: {op!r}")
+        expression = term if expression is None else expression & term
+    return expression
+
+
+@dataclass(frozen=True)
+class SalarySummary:
+    """Median yearly salary range of matching vacancies in one currency."""
+
+    count: int
+    salary_min: float | None
+    salary_max: float | None
+    currency: str | None
+
+
+def _part_paths(directory: Path) -> tuple[Path, Path]:
+    """Return a new data file path and the temporary path it is written to first.
+
+    ``pyarrow.dataset`` skips names starting with ``.``, so readers never see a
+    file until it is renamed into place.
+    """
+
+    name = f"part-{uuid.uuid4().hex}.parquet"
+    return directory / name, directory / f".{name}.tmp"
+
+
+def _acquire_partition_lock(directory: Path) -> Path | None:
+    """Create the compaction lock of ``directory``; return ``None`` when another writer holds it."""
+
+    lock = directory / _COMPACT_LOCK
+    for _ in range(2):
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lock
+        except FileExistsError:
+            try:
+                stale = time.time() - lock.stat().st_mtime > _COMPACT_LOCK_STALE_SECONDS
+            except FileNotFoundError:
+                continue
+            if not stale:
+                return None
+            lock.unlink(missing_ok=True)
+    return None
+
+
+class VacancyStore:
+    """Append-only, partitioned Parquet store of vacancy profiles."""
+
+    def __init__(self, root: str | Path, *, compact_after: int = VACANCY_STORE_COMPACT_FILES) -> None:
+        self.root = Path(root)
+        self.compact_after = compact_after
+        self._newest_lock = threading.Lock()
+        self._newest_cache: tuple[tuple[str, ...], dict[str, Any]] | None = None
+
+    # -- writing -----------------------------------------------------------------
+
+    def append(
+        self,
+        profiles: Mapping[str, Mapping[str, Any]] | Iterable[tuple[str, Mapping[str, Any]]],
+        *,
+        recorded_at: datetime | None = None,
+    ) -> int:
+        """Append ``(vacancy_id, profile)`` pairs (or a mapping of them); return the row count."""
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        timestamp = recorded_at or datetime.now(UTC)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=UTC)
+        items = profiles.items() if isinstance(profiles, Mapping) else profiles
+        partitions: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for vacancy_id, profile in items:
+            row = profile_row(profile, vacancy_id=str(vacancy_id), recorded_at=timestamp)
+            partitions.setdefault((row.pop(MONTH), row.pop(COUNTRY)), []).append(row)
+
+        schema = file_schema()
+        written = 0
+        for (month, country), rows in partitions.items():
+            directory = self.root / f"{MONTH}={month}" / f"{COUNTRY}={country}"
+            directory.mkdir(parents=True, exist_ok=True)
+            target, temporary = _part_paths(directory)
+            pq.write_table(pa.Table.from_pylist(rows, schema=schema), temporary)
+            temporary.replace(target)
+            written += len(rows)
+            if self.compact_after and len(list(directory.glob("part-*.parquet"))) >= self.compact_after:
+                try:
+                    self._compact_partition(directory)
+                except Exception:  # noqa: BLE001 - the rows are stored; compaction can wait
+                    logger.warning("Compacting %s failed", directory, exc_info=True)
+        return written
+
+    def compact(self, *, month: str | None = None) -> int:
+        """Merge the files of each partition (optionally one month) into one; return files removed.
+
+        Partitions another writer is compacting at the same time are skipped.
+        """
+
+        pattern = f"{MONTH}={month}/{COUNTRY}=*" if month else f"{MONTH}=*/{COUNTRY}=*"
+        return sum(self._compact_partition(directory) for directory in sorted(self.root.glob(pattern)))
+
+    def _compact_partition(self, directory: Path) -> int:
+        """Merge the data files of one partition directory; return files removed."""
+
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        if len(list(directory.glob("part-*.parquet"))) < 2:
+            return 0
+        lock = _acquire_partition_lock(directory)
+        if lock is None:
+            return 0
+        try:
+            # List again under the lock: a concurrent compaction may have merged them.
+            files = sorted(directory.glob("part-*.parquet"))
+            if len(files) < 2:
+                return 0
+            table = ds.dataset([str(path) for path in files], format="parquet", schema=file_schema()).to_table()
+            target, temporary = _part_paths(directory)
+            pq.write_table(table, temporary)
+            temporary.replace(target)
+            for path in files:
+                path.unlink(missing_ok=True)
+            return len(files) - 1
+        finally:
+            lock.unlink(missing_ok=True)
+
+    # -- reading -----------------------------------------------------------------
+
+    def _dataset(self) -> Any:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        schema = pa.schema(list(file_schema()) + list(_partition_schema()))
+        partitioning = ds.partitioning(_partition_schema(), flavor="hive")
+        return ds.dataset(str(self.root), format="parquet", partitioning=partitioning, schema=schema)
+
+    def query(
+        self,
+        columns: Sequence[str] | None = None,
+        *,
+        where: Iterable[Predicate] | Any = (),
+        latest: bool = True,
+    ) -> Any:
+        """Return a ``pyarrow.Table`` of matching rows.
+
+        ``where`` is either ``(column, op, value)`` tuples combined with AND
+        (``=``, ``!=``, ``<``, ``<=``, ``>``, ``>=``, ``in``, ``not in``) or
+        a ``pyarrow.compute`` expression. Filters on ``month``/``country``
+        prune partitions; other filters use the Parquet statistics. With
+        ``latest`` only the newest snapshot of each vacancy is returned.
+        """
+
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if not self.root.exists():
+            names = list(columns) if columns is not None else [field.name for field in file_schema()]
+            return pa.Table.from_pylist([], schema=pa.schema([self._field(name) for name in names]))
+        expression = where if isinstance(where, pc.Expression) else _expression(where)
+        read_columns = list(columns) if columns is not None else None
+        if latest and read_columns is not None:
+            read_columns += [name for name in (VACANCY_ID, RECORDED_AT) if name not in read_columns]
+        dataset = self._dataset()
+        table = dataset.to_table(columns=read_columns, filter=expression)
+        if latest:
+            # Supersession is decided over all snapshots, so a vacancy whose newest
+            # snapshot no longer matches ``where`` does not fall back to an older one.
+            table = self._latest(table, self._cached_newest_snapshots(dataset))
+            if columns is not None:
+                table = table.select(list(columns))
+        return table
+
+    def _field(self, name: str) -> Any:
+        import pyarrow as pa
+
+        schema = pa.schema(list(file_schema()) + list(_partition_schema()))
+        return schema.field(name)
+
+    def _cached_newest_snapshots(self, dataset: Any) -> dict[str, Any]:
+        """Return :meth:`_newest_snapshots`, reused while the set of data files is unchanged.
+
+        Data files are written once under unique names, so their paths
+        identify the dataset contents.
+        """
+
+        files = tuple(sorted(dataset.files))
+        with self._newest_lock:
+            cached = self._newest_cache
+        if cached is not None and cached[0] == files:
+            return cached[1]
+        newest = self._newest_snapshots(dataset)
+        with self._newest_lock:
+            self._newest_cache = (files, newest)
+        return newest
+
+    @staticmethod
+    def _newest_snapshots(dataset: Any) -> dict[str, Any]:
+        """Return the newest ``recorded_at`` of every vacancy in ``dataset``."""
+
+        table = dataset.to_table(columns=[VACANCY_ID, RECORDED_AT])
+        newest = table.group_by(VACANCY_ID).aggregate([(RECORDED_AT, "max")])
+        return dict(zip(newest.column(VACANCY_ID).to_pylist(), newest.column(f"{RECORDED_AT}_max").to_pylist()))
+
+    @staticmethod
+    def _latest(table: Any, newest: Mapping[str, Any]) -> Any:
+        """Keep the rows of ``table`` that are the newest snapshot of their vacancy."""
+
+        if table.num_rows == 0:
+            return table
+        kept: dict[str, int] = {}
+        ids = table.column(VACANCY_ID).to_pylist()
+        timestamps = table.column(RECORDED_AT).to_pylist()
+        for index, (vacancy_id, timestamp) in enumerate(zip(ids, timestamps)):
+            if timestamp == newest.get(vacancy_id):
+                kept[vacancy_id] = index
+        if len(kept) == table.num_rows:
+            return table
+        return table.take(sorted(kept.values()))
+
+    def count(self, *, where: Iterable[Predicate] | Any = ()) -> int:
+        """Return the number of vacancies matching ``where``."""
+
+        return self.query([VACANCY_ID], where=where).num_rows
+
+    def value_counts(
+        self,
+        column: str,
+        *,
+        where: Iterable[Predicate] | Any = (),
+        limit: int | None = 20,
+    ) -> list[tuple[str, int]]:
+        """Return ``(value, vacancies)`` pairs for a category or list column, most frequent first.
+
+        Values are compared case-insensitively and reported in lower case.
+        """
+
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        table = self.query([column], where=where)
+        values = table.column(column).combine_chunks()
+        if pa.types.is_list(values.type):
+            rows = pc.list_parent_indices(values)
+            values = pc.list_flatten(values)
+        else:
+            rows = pa.array(range(len(values)), pa.int64())
+        lowered = pc.utf8_lower(values.cast(pa.string()))
+        pairs = pa.table({"value": lowered, "row": rows}).filter(pc.is_valid(lowered))
+        counts = (
+            pairs.group_by("value")
+            .aggregate([("row", "count_distinct")])
+            .sort_by([("row_count_distinct", "descending"), ("value", "ascending")])
+        )
+        result = list(zip(counts.column("value").to_pylist(), counts.column("row_count_distinct").to_pylist()))
+        return result[:limit] if limit is not None else result
+
+    def skill_demand(
+        self,
+        skills: Iterable[str],
+        *,
+        country: str | None = None,
+        columns: Sequence[str] = _SKILL_COLUMN_NAMES,
+    ) -> tuple[int, dict[str, float]]:
+        """Return the vacancy count and the share of vacancies asking for each skill."""
+
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        wanted = {skill.casefold(): skill for skill in skills if skill and skill.strip()}
+        where = [(COUNTRY, "=", country_to_iso2(country) or country)] if country else []
+        table = self.query(list(columns), where=where)
+        total = table.num_rows
+        if not total or not wanted:
+            return total, {}
+        values: list[Any] = []
+        rows: list[Any] = []
+        for column in columns:
+            lists = table.column(column).combine_chunks()
+            values.append(pc.utf8_lower(pc.list_flatten(lists).cast(pa.string())))
+            rows.append(pc.list_parent_indices(lists))
+        pairs = pa.table({"skill": pa.concat_arrays(values), "row": pa.concat_arrays(rows)})
+        pairs = pairs.filter(pc.is_in(pairs.column("skill"), value_set=pa.array(list(wanted))))
+        counts = pairs.group_by("skill").aggregate([("row", "count_distinct")])
+        shares = {
+            wanted[skill]: count / total
+            for skill, count in zip(counts.column("skill").to_pylist(), counts.column("row_count_distinct").to_pylist())
+        }
+        return total, shares
+
+    def salary_ranges(
+        self,
+        group_by: str = ProfilePaths.POSITION_OCCUPATION_GROUP.value,
+        *,
+        where: Iterable[Predicate] | Any = (),
+    ) -> list[dict[str, Any]]:
+        """Return median salary ranges per ``group_by`` value, currency and period."""
+
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        salary_min = ProfilePaths.COMPENSATION_SALARY_MIN.value
+        salary_max = ProfilePaths.COMPENSATION_SALARY_MAX.value
+        currency = ProfilePaths.COMPENSATION_CURRENCY.value
+        period = ProfilePaths.COMPENSATION_PERIOD.value
+        keys = list(dict.fromkeys([group_by, currency, period]))
+        table = self.query([*keys, salary_min, salary_max], where=where)
+        table = table.filter(pc.or_(pc.is_valid(table.column(salary_min)), pc.is_valid(table.column(salary_max))))
+        if table.num_rows == 0:
+            return []
+        table = pa.table(
+            {
+                **{key: table.column(key).cast(pa.string()) for key in keys},
+                salary_min: table.column(salary_min),
+                salary_max: table.column(salary_max),
+            }
+        )
+        grouped = table.group_by(keys).aggregate(
+            [
+                (salary_min, "approximate_median"),
+                (salary_max, "approximate_median"),
+                ([], "count_all"),
+            ]
+        )
+        return [
+            {
+                "group": row[group_by],
+                "currency": row[currency],
+                "period": row[period],
+                "count": row["count_all"],
+                "salary_min": row[f"{salary_min}_approximate_median"],
+                "salary_max": row[f"{salary_max}_approximate_median"],
+            }
+            for row in grouped.sort_by([("count_all", "descending")]).to_pylist()
+        ]
+
+    def salary_summary(self, *, role: str | None, country: str | None = None) -> SalarySummary | None:
+        """Return the yearly median range for ``role`` in its most common currency."""
+
+        key = normalize_role(role)
+        if not key:
+            return None
+        where: list[Predicate] = [(ROLE, "=", key)]
+        if country:
+            where.append((COUNTRY, "=", country_to_iso2(country) or country))
+        yearly = [
+            entry
+            for entry in self.salary_ranges(ROLE, where=where)
+            if entry["period"] is None or entry["period"].strip().casefold() in _YEARLY_PERIODS
+        ]
+        if not yearly:
+            return None
+        best = max(yearly, key=lambda entry: entry["count"])
+        return SalarySummary(best["count"], best["salary_min"], best["salary_max"], best["currency"])
+
+
+_store: VacancyStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_vacancy_store() -> VacancyStore | None:
+    """Return the configured store, or ``None`` without ``VACANCY_STORE_DIR`` or ``pyarrow``."""
+
+    global _store
+    if not VACANCY_STORE_DIR:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:  # pragma: no cover - optional dependency
+                logger.warning("VACANCY_STORE_DIR is set but pyarrow is not installed; vacancy store disabled")
+                return None
+            _store = VacancyStore(VACANCY_STORE_DIR)
+        return _store
+
+
+__all__ = [
+    "CATEGORY_COLUMNS",
+    "LIST_COLUMNS",
+    "SKILL_COLUMNS",
+    "SalarySummary",
+    "VacancyStore",
+    "file_schema",
+    "get_vacancy_store",
+    "normalize_role",
+    "profile_row",
+]
@@ -3,17 +3,12 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict, deque
-from concurrent.futures import (
-    FIRST_COMPLETED,
-    Future,
-    ThreadPoolExecutor,
-    TimeoutError as FuturesTimeoutError,
-    wait,
-)
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from dataclasses import dataclass, field
 from enum import StrEnum
-from threading import Lock
+from threading import Lock, current_thread
 from typing import Any, Callable, Iterable, Mapping
 
 try:
@@ -22,12 +17,25 @@ except (ModuleNotFoundError, RuntimeError):
     add_script_run_ctx = None
     get_script_run_ctx = None
 
+from utils.cancellation import (
+    DEADLINE_REASON,
+    CancellationToken,
+    DeadlineExceeded,
+    OperationCancelled,
+    bind_token,
+    current_token,
+)
 from utils.logging_context import (
     configure_logging,
     log_context,
     set_pipeline_task,
     wrap_with_current_context,
 )
+from utils.metrics import record_cache_lookup, record_queue_wait
+from utils.priority import bind_priority
+
+from .executor import Priority, SharedExecutor, get_shared_executor
+from .result_store import ResultStore, get_process_store, stable_digest
 
 configure_logging()
 
@@ -35,6 +43,8 @@ logger = logging.getLogger(__name__)
 
 WorkflowCallable = Callable[["WorkflowContext"], Any]
 
+_CANCELLATION_POLL_SECONDS = 0.1
+
 
 class TaskStatus(StrEnum):
     """Life-cycle status for workflow tasks."""
@@ -51,11 +61,18 @@ class SkipTask(RuntimeError):
 
 
 class WorkflowContext(dict[str, Any]):
-    """Mutable context shared between workflow tasks."""
+    """Mutable context shared between workflow tasks.
+
+    ``cancellation`` holds the run-level :class:`CancellationToken`. Each task
+    attempt additionally runs with a child token bound via
+    :func:`utils.cancellation.bind_token`; long running tasks should call
+    :meth:`raise_if_cancelled` between steps.
+    """
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: D401 - thin wrapper
         super().__init__(*args, **kwargs)
         self._lock = Lock()
+        self.cancellation = CancellationToken()
 
     def __setitem__(self, key: str, value: Any) -> None:
         with self._lock:
@@ -65,10 +82,34 @@ class WorkflowContext(dict[str, Any]):
         with self._lock:
             super().update(*args, **kwargs)
 
+    @property
+    def token(self) -> CancellationToken:
+        """Token of the current task attempt (falls back to the run token)."""
+
+        return current_token() or self.cancellation
+
+    def raise_if_cancelled(self) -> None:
+        """Raise when the current attempt was cancelled or timed out."""
+
+        self.token.raise_if_cancelled()
+
+    def remaining_time(self) -> float | None:
+        """Seconds left before the current attempt's deadline, if any."""
+
+        return self.token.remaining()
+
 
 @dataclass(frozen=True)
 class Task:
-    """Executable unit within a workflow graph."""
+    """Executable unit within a workflow graph.
+
+    Tasks declaring ``cache_key`` are memoised: the key function receives the
+    workflow context (including upstream results) and returns a JSON-like
+    description of the task's own inputs. Together with the fingerprints of
+    all dependencies it selects an entry in ``store`` (the process-wide
+    :class:`~pipelines.result_store.MemoryResultStore` by default); on a hit
+    the task is not executed.
+    """
 
     name: str
     func: WorkflowCallable
@@ -76,6 +117,8 @@ class Task:
     retries: int = 0
     timeout: float | None = None
     parallelizable: bool = True
+    cache_key: Callable[[WorkflowContext], Any] | None = None
+    store: ResultStore | None = None
 
     def __post_init__(self) -> None:
         if self.retries < 0:
@@ -92,6 +135,8 @@ class TaskResult:
     result: Any | None = None
     error: Exception | None = None
     attempts: int = 0
+    cached: bool = False
+    fingerprint: str | None = None
 
 
 @dataclass
@@ -110,6 +155,7 @@ class WorkflowRunResult:
                 "status": outcome.status.value,
                 "attempts": outcome.attempts,
                 "error": str(outcome.error) if outcome.error else None,
+                "cached": outcome.cached,
             }
         return serialised
 
@@ -117,8 +163,27 @@ class WorkflowRunResult:
         return self.results.get(name)
 
 
+@dataclass
+class _Attempt:
+    """Book-keeping for one scheduled execution of a task."""
+
+    task: Task
+    number: int
+    token: CancellationToken
+    memo_key: str | None = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
 class WorkflowRunner:
-    """Execute tasks in dependency order with retry/timeout handling."""
+    """Execute tasks in dependency order with retry/timeout handling.
+
+    Tasks run on the process-wide :func:`~pipelines.executor.get_shared_executor`
+    pool in the runner's ``priority`` lane; ``max_workers`` caps how many tasks
+    of a single run are in flight at once. Timeouts are enforced by cancelling
+    the attempt's :class:`CancellationToken` instead of abandoning helper
+    threads, so cooperative tasks (and :func:`openai_utils.api.call_chat_api`)
+    stop as soon as their deadline passes.
+    """
 
     def __init__(
         self,
@@ -126,33 +191,83 @@ class WorkflowRunner:
         *,
         logger_: logging.Logger | None = None,
         max_workers: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        executor: SharedExecutor | None = None,
     ):
         tasks_list = list(tasks)
         self._logger = logger_ or logger
         self._tasks: dict[str, Task] = {task.name: task for task in tasks_list}
         if len(self._tasks) != len(tasks_list):
             raise ValueError("Task names must be unique within a workflow")
+        self._dependants: dict[str, list[str]] = {name: [] for name in self._tasks}
+        for task in tasks_list:
+            for dependency in task.dependencies:
+                if dependency not in self._tasks:
+                    raise ValueError(f"Unknown dependency '{dependency}' for task '{task.name}'")
+                self._dependants[dependency].append(task.name)
         self._order = self._resolve_order()
         self._max_workers = max_workers
+        self._priority = priority
+        self._executor = executor
+
+    def run(
+        self,
+        context: Mapping[str, Any] | None = None,
+        *,
+        cancellation: CancellationToken | None = None,
+        timeout: float | None = None,
+    ) -> WorkflowRunResult:
+        """Execute the workflow and return the per-task outcomes.
+
+        Args:
+            context: Initial values for the shared :class:`WorkflowContext`.
+            cancellation: Optional token that aborts the run when cancelled.
+            timeout: Optional deadline in seconds for the whole run.
+        """
 
-    def run(self, context: Mapping[str, Any] | None = None) -> WorkflowRunResult:
         ctx = WorkflowContext(context or {})
+        run_token = CancellationToken.with_timeout(timeout, parent=cancellation)
+        ctx.cancellation = run_token
         results: dict[str, TaskResult] = {name: TaskResult() for name in self._tasks}
         script_run_ctx = get_script_run_ctx() if get_script_run_ctx else None
+        executor = self._executor or get_shared_executor()
+        inline = executor.in_worker()
+        limit = max(1, self._max_workers or len(self._tasks))
 
-        dependants: dict[str, list[str]] = defaultdict(list)
-        pending_dependencies: dict[str, int] = {}
-        for task in self._tasks.values():
-            pending_dependencies[task.name] = len(task.dependencies)
-            for dependency in task.dependencies:
-                dependants[dependency].append(task.name)
+        pending_dependencies: dict[str, int] = {name: len(task.dependencies) for name, task in self._tasks.items()}
+        ready: deque[str] = deque(name for name in self._order if pending_dependencies[name] == 0)
+        in_flight: dict[Future[Any], _Attempt] = {}
 
-        ready: deque[str] = deque([name for name, count in pending_dependencies.items() if count == 0])
-        in_flight: dict[Future[tuple[Any, int]], Task] = {}
+        def _release(name: str) -> None:
+            for child in self._dependants[name]:
+                pending_dependencies[child] -= 1
+                if pending_dependencies[child] == 0:
+                    ready.append(child)
 
-        with ThreadPoolExecutor(max_workers=self._max_workers or len(self._tasks)) as executor:
+        def _start(task: Task, number: int, memo_key: str | None = None) -> None:
+            attempt = _Attempt(task=task, number=number, token=run_token.child(task.timeout), memo_key=memo_key)
+            call = wrap_with_current_context(self._run_attempt, attempt, ctx, script_run_ctx)
+            future: Future[Any]
+            if inline:
+                # Nested run on a shared worker: execute in place so a bounded
+                # pool can never deadlock on its own children.
+                future = Future()
+                future.set_running_or_notify_cancel()
+                try:
+                    future.set_result(call())
+                except BaseException as exc:  # noqa: BLE001 - forwarded to the future
+                    future.set_exception(exc)
+            else:
+                future = executor.submit(call, priority=self._priority)
+            in_flight[future] = attempt
+
+        try:
             while ready or in_flight:
-                while ready:
+                if run_token.cancelled:
+                    self._abort(results, in_flight, run_token)
+                    break
+                exclusive = any(not attempt.task.parallelizable for attempt in in_flight.values())
+                while ready and not exclusive and len(in_flight) < limit:
                     candidate_name = ready.popleft()
                     candidate_task = self._tasks[candidate_name]
                     outcome = results[candidate_name]
@@ -161,146 +276,234 @@ class WorkflowRunner:
                         if self._should_skip(candidate_task, results):
                             outcome.status = TaskStatus.SKIPPED
                             self._logger.info("Skipping task %s due to failed dependencies", candidate_task.name)
-                            for child in dependants[candidate_name]:
-                                pending_dependencies[child] -= 1
-                                if pending_dependencies[child] == 0:
-                                    ready.append(child)
+                            _release(candidate_name)
                             continue
 
                     if not candidate_task.parallelizable and in_flight:
-                        done, _ = wait(in_flight.keys())
-                        self._collect_finished(done, in_flight, results, ctx, dependants, pending_dependencies, ready)
                         ready.appendleft(candidate_name)
+                        break
+
+                    memo_key = self._memo_key(candidate_task, ctx, results)
+                    if memo_key is not None and self._load_cached(candidate_task, memo_key, outcome, ctx):
+                        _release(candidate_name)
                         continue
 
                     with log_context(pipeline_task=candidate_task.name):
                         self._logger.info("Starting task %s", candidate_task.name)
                     outcome.status = TaskStatus.RUNNING
-                    future = executor.submit(
-                        wrap_with_current_context(self._execute, candidate_task, ctx, script_run_ctx)
-                    )
-                    if add_script_run_ctx and script_run_ctx:
-                        add_script_run_ctx(future, script_run_ctx)
-                    in_flight[future] = candidate_task
-
-                    if not candidate_task.parallelizable:
-                        break
+                    _start(candidate_task, 1, memo_key)
+                    exclusive = not candidate_task.parallelizable
 
                 if not in_flight:
                     continue
 
-                done, _ = wait(in_flight.keys(), return_when=FIRST_COMPLETED)
-                self._collect_finished(done, in_flight, results, ctx, dependants, pending_dependencies, ready)
+                done, _ = wait(
+                    in_flight.keys(), timeout=self._wait_timeout(in_flight, run_token), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    attempt = in_flight.pop(future)
+                    attempt.token.detach()
+                    outcome = results[attempt.task.name]
+                    if attempt.token.expired and not run_token.expired and not isinstance(future.exception(), SkipTask):
+                        # Results that arrive after the deadline count as timeouts.
+                        retry = self._record_timeout(attempt, outcome)
+                    else:
+                        retry = self._record_outcome(future, attempt, outcome, ctx, run_token)
+                    if retry:
+                        _start(attempt.task, attempt.number + 1, attempt.memo_key)
+                    else:
+                        _release(attempt.task.name)
+                for future, attempt in list(in_flight.items()):
+                    if not attempt.token.expired or run_token.expired:
+                        continue
+                    del in_flight[future]
+                    attempt.token.detach()
+                    if self._record_timeout(attempt, results[attempt.task.name]):
+                        _start(attempt.task, attempt.number + 1, attempt.memo_key)
+                    else:
+                        _release(attempt.task.name)
+        finally:
+            run_token.detach()
 
         return WorkflowRunResult(results=results, context=ctx)
 
-    def _collect_finished(
+    @staticmethod
+    def _wait_timeout(in_flight: Mapping[Future[Any], _Attempt], run_token: CancellationToken) -> float:
+        """Return how long the scheduler may block before re-checking deadlines."""
+
+        timeout = _CANCELLATION_POLL_SECONDS
+        for token in (run_token, *(attempt.token for attempt in in_flight.values())):
+            remaining = token.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+        return timeout
+
+    def _record_outcome(
         self,
-        finished: set[Future[tuple[Any, int]]],
-        in_flight: dict[Future[tuple[Any, int]], Task],
-        results: dict[str, TaskResult],
+        future: Future[Any],
+        attempt: _Attempt,
+        outcome: TaskResult,
         ctx: WorkflowContext,
-        dependants: Mapping[str, list[str]],
-        pending_dependencies: dict[str, int],
-        ready: deque[str],
-    ) -> None:
-        for future in finished:
-            task = in_flight.pop(future)
-            outcome = results[task.name]
-            try:
-                result, attempts_used = future.result()
-            except SkipTask as skip_exc:
-                outcome.status = TaskStatus.SKIPPED
-                outcome.error = skip_exc
-                outcome.attempts = getattr(skip_exc, "attempts", 1)
-                with log_context(pipeline_task=task.name):
-                    self._logger.info("Task %s marked as skipped: %s", task.name, skip_exc)
-            except Exception as exc:  # noqa: BLE001 - capture for status tracking
-                outcome.status = TaskStatus.FAILED
-                outcome.error = exc
-                outcome.attempts = getattr(exc, "attempts", 1)
-                with log_context(pipeline_task=task.name):
-                    self._logger.exception("Task %s failed", task.name)
-            else:
-                outcome.status = TaskStatus.SUCCESS
-                outcome.result = result
-                outcome.attempts = attempts_used
-                ctx[task.name] = result
-                with log_context(pipeline_task=task.name):
-                    self._logger.info("Completed task %s", task.name)
-
-            for child in dependants.get(task.name, []):
-                pending_dependencies[child] -= 1
-                if pending_dependencies[child] == 0:
-                    ready.append(child)
-
-    def _execute(self, task: Task, context: WorkflowContext, script_run_ctx: Any | None = None) -> tuple[Any, int]:
-        attempts = 0
-        last_error: Exception | None = None
-        with log_context(pipeline_task=task.name):
-            set_pipeline_task(task.name)
-            for attempt in range(task.retries + 1):
-                attempts = attempt + 1
-                try:
-                    if task.timeout is not None:
-                        with ThreadPoolExecutor(max_workers=1) as executor:
-                            future = executor.submit(wrap_with_current_context(task.func, context))
-                            if add_script_run_ctx and script_run_ctx:
-                                add_script_run_ctx(future, script_run_ctx)
-                            return future.result(timeout=task.timeout), attempts
-                    return task.func(context), attempts
-                except SkipTask as exc:
-                    setattr(exc, "attempts", attempts)
-                    raise
-                except FuturesTimeoutError as exc:
-                    last_error = exc
+        run_token: CancellationToken,
+    ) -> bool:
+        """Store the result of ``attempt``; return ``True`` when it should be retried."""
+
+        task = attempt.task
+        outcome.attempts = attempt.number
+        try:
+            result = future.result()
+        except SkipTask as skip_exc:
+            setattr(skip_exc, "attempts", attempt.number)
+            outcome.status = TaskStatus.SKIPPED
+            outcome.error = skip_exc
+            with log_context(pipeline_task=task.name):
+                self._logger.info("Task %s marked as skipped: %s", task.name, skip_exc)
+        except Exception as exc:  # noqa: BLE001 - capture for status tracking
+            with log_context(pipeline_task=task.name):
+                if attempt.number <= task.retries and not run_token.cancelled:
                     self._logger.warning(
-                        "Task %s exceeded timeout after %.2fs (attempt %s/%s)",
+                        "Task %s failed (attempt %s/%s); retrying",
                         task.name,
-                        task.timeout,
-                        attempts,
+                        attempt.number,
                         task.retries + 1,
+                        exc_info=exc,
                     )
-                except Exception as exc:  # noqa: BLE001 - propagate to retry handler
-                    last_error = exc
-                    if attempt < task.retries:
-                        self._logger.warning(
-                            "Task %s failed (attempt %s/%s); retrying",
-                            task.name,
-                            attempts,
-                            task.retries + 1,
-                            exc_info=exc,
-                        )
-                    else:
-                        self._logger.debug("Task %s failed on final attempt", task.name)
-                if last_error and attempt < task.retries:
-                    continue
-        if last_error:
-            if hasattr(last_error, "args"):
-                setattr(last_error, "attempts", attempts)
-            raise last_error
-        fallback_error = RuntimeError(f"Task {task.name} failed without raising an exception")
-        setattr(fallback_error, "attempts", attempts)
-        raise fallback_error
+                    return True
+                setattr(exc, "attempts", attempt.number)
+                outcome.status = TaskStatus.FAILED
+                outcome.error = exc
+                self._logger.exception("Task %s failed", task.name, exc_info=exc)
+        else:
+            outcome.status = TaskStatus.SUCCESS
+            outcome.result = result
+            outcome.fingerprint = attempt.memo_key
+            ctx[task.name] = result
+            if attempt.memo_key is not None:
+                self._store_for(task).save(attempt.memo_key, result)
+            with log_context(pipeline_task=task.name):
+                self._logger.info("Completed task %s", task.name)
+        return False
 
-    def _resolve_order(self) -> list[str]:
-        indegree: dict[str, int] = {name: 0 for name in self._tasks}
-        for task in self._tasks.values():
-            for dep in task.dependencies:
-                if dep not in self._tasks:
-                    raise ValueError(f"Unknown dependency '{dep}' for task '{task.name}'")
-                indegree[task.name] += 1
+    @staticmethod
+    def _store_for(task: Task) -> ResultStore:
+        return task.store if task.store is not None else get_process_store()
+
+    def _memo_key(self, task: Task, ctx: WorkflowContext, results: Mapping[str, TaskResult]) -> str | None:
+        """Return the memo key for ``task`` or ``None`` when it is not memoised."""
+
+        if task.cache_key is None:
+            return None
+        try:
+            inputs = task.cache_key(ctx)
+        except Exception:  # noqa: BLE001 - fall back to an uncached run
+            with log_context(pipeline_task=task.name):
+                self._logger.warning("Cache key for task %s failed; running uncached", task.name, exc_info=True)
+            return None
+        upstream: dict[str, str] = {}
+        for dependency in task.dependencies:
+            outcome = results[dependency]
+            if outcome.fingerprint is None:
+                outcome.fingerprint = stable_digest(outcome.result)
+            upstream[dependency] = outcome.fingerprint
+        return stable_digest({"task": task.name, "inputs": stable_digest(inputs), "upstream": upstream})
+
+    def _load_cached(self, task: Task, memo_key: str, outcome: TaskResult, ctx: WorkflowContext) -> bool:
+        """Serve ``task`` from its store; return ``True`` on a hit."""
+
+        try:
+            hit, value = self._store_for(task).load(memo_key)
+        except Exception:  # noqa: BLE001 - a broken store must not fail the run
+            with log_context(pipeline_task=task.name):
+                self._logger.warning("Result store lookup for task %s failed", task.name, exc_info=True)
+            return False
+        record_cache_lookup("workflow_result", hit=hit)
+        if not hit:
+            return False
+        outcome.status = TaskStatus.SUCCESS
+        outcome.result = value
+        outcome.cached = True
+        outcome.fingerprint = memo_key
+        ctx[task.name] = value
+        with log_context(pipeline_task=task.name):
+            self._logger.info("Reusing cached result for task %s", task.name)
+        return True
+
+    def _record_timeout(self, attempt: _Attempt, outcome: TaskResult) -> bool:
+        """Cancel a timed-out ``attempt``; return ``True`` when it should be retried."""
+
+        task = attempt.task
+        attempt.token.cancel(DEADLINE_REASON)
+        outcome.attempts = attempt.number
+        with log_context(pipeline_task=task.name):
+            self._logger.warning(
+                "Task %s exceeded timeout after %.2fs (attempt %s/%s)",
+                task.name,
+                task.timeout,
+                attempt.number,
+                task.retries + 1,
+            )
+            if attempt.number <= task.retries:
+                return True
+            error = DeadlineExceeded(f"Task {task.name} exceeded timeout of {task.timeout:.2f}s")
+            setattr(error, "attempts", attempt.number)
+            outcome.status = TaskStatus.FAILED
+            outcome.error = error
+            self._logger.error("Task %s failed", task.name)
+        return False
+
+    def _abort(
+        self,
+        results: Mapping[str, TaskResult],
+        in_flight: dict[Future[Any], _Attempt],
+        run_token: CancellationToken,
+    ) -> None:
+        """Fail running tasks and skip pending ones after the run was cancelled."""
+
+        reason = run_token.reason or "cancelled"
+        self._logger.warning("Workflow cancelled (%s)", reason)
+        error_type = DeadlineExceeded if run_token.expired or reason == DEADLINE_REASON else OperationCancelled
+        for attempt in in_flight.values():
+            attempt.token.cancel(reason)
+            error = error_type(f"Task {attempt.task.name} cancelled: {reason}")
+            setattr(error, "attempts", attempt.number)
+            outcome = results[attempt.task.name]
+            outcome.status = TaskStatus.FAILED
+            outcome.error = error
+            outcome.attempts = attempt.number
+        in_flight.clear()
+        for name, outcome in results.items():
+            if outcome.status is TaskStatus.PENDING:
+                outcome.status = TaskStatus.SKIPPED
+                outcome.error = error_type(f"Task {name} not started: {reason}")
+
+    def _run_attempt(self, attempt: _Attempt, context: WorkflowContext, script_run_ctx: Any | None = None) -> Any:
+        task = attempt.task
+        thread = current_thread()
+        previous_ctx = get_script_run_ctx() if get_script_run_ctx else None
+        if add_script_run_ctx and script_run_ctx:
+            add_script_run_ctx(thread, script_run_ctx)
+        try:
+            record_queue_wait(task.name, time.perf_counter() - attempt.submitted_at)
+            with log_context(pipeline_task=task.name), bind_token(attempt.token), bind_priority(self._priority):
+                set_pipeline_task(task.name)
+                attempt.token.raise_if_cancelled()
+                return task.func(context)
+        finally:
+            if add_script_run_ctx and script_run_ctx:
+                # Shared workers serve many sessions; never leak a script context.
+                add_script_run_ctx(thread, previous_ctx)
 
+    def _resolve_order(self) -> list[str]:
+        indegree: dict[str, int] = {name: len(task.dependencies) for name, task in self._tasks.items()}
         queue: deque[str] = deque([name for name, degree in indegree.items() if degree == 0])
         order: list[str] = []
         while queue:
             current = queue.popleft()
             order.append(current)
-            for candidate in self._tasks.values():
-                if current in candidate.dependencies:
-                    indegree[candidate.name] -= 1
-                    if indegree[candidate.name] == 0:
-                        queue.append(candidate.name)
+            for dependant in self._dependants[current]:
+                indegree[dependant] -= 1
+                if indegree[dependant] == 0:
+                    queue.append(dependant)
 
         if len(order) != len(self._tasks):
             raise ValueError("Workflow graph contains a cycle; cannot resolve execution order")
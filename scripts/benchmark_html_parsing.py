@@ -0,0 +1,127 @@
+"""Benchmark career-page HTML parsing: BeautifulSoup baseline vs. shared lxml tree.
+
+Usage::
+
+    python scripts/benchmark_html_parsing.py [--repeat 5] [--scale 40] [FILE_OR_DIR ...]
+
+Without arguments the bundled fixtures under ``tests/fixtures`` are inflated
+``--scale`` times to emulate large real-world career pages (inline scripts,
+navigation and repeated job sections). Pass saved pages (``.html``) to measure
+real postings. For each page the script reports the time for
+
+* ``bs4``: the previous pipeline (BeautifulSoup/lxml parse for blocks plus a
+  second ``html.parser`` parse for branding),
+* ``shared``: :func:`ingest.html_tree.parse_html` once, followed by block
+  extraction and branding detection on the same tree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ingest import branding, html_tree  # noqa: E402
+from ingest.extractors import _parse_html_blocks  # noqa: E402
+
+FIXTURE_PAGES: tuple[Path, ...] = (
+    PROJECT_ROOT / "tests" / "fixtures" / "html" / "rheinbahn_produktentwickler.html",
+    PROJECT_ROOT / "tests" / "fixtures" / "branding_page.html",
+)
+
+_NOISE = (
+    "<script>window.__STATE__ = {" + ", ".join(f'"k{i}": {i}' for i in range(200)) + "};</script>"
+    "<nav><ul>" + "".join(f"<li><a href='/p{i}'>Link {i}</a></li>" for i in range(60)) + "</ul></nav>"
+)
+
+
+def _inflate(html: str, scale: int) -> str:
+    """Return ``html`` with its body repeated ``scale`` times plus page noise."""
+
+    head, sep, rest = html.partition("<body")
+    if not sep:
+        return (_NOISE + html) * scale
+    open_end = rest.find(">") + 1
+    body_open, body = rest[:open_end], rest[open_end:]
+    inner, _, tail = body.rpartition("</body>")
+    return f"{head}<body{body_open}{(_NOISE + inner) * scale}</body>{tail}"
+
+
+def _bs4_pipeline(html: str, url: str | None) -> None:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    body = soup.find("main") or soup.find("article") or soup.body or soup
+    for element in body.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "table"]):
+        element.get_text(" ", strip=True)
+    BeautifulSoup(html, "html.parser").find_all(["meta", "link", "img"])
+
+
+def _shared_pipeline(html: str, url: str | None) -> None:
+    html_tree.clear_tree_cache()
+    tree = html_tree.parse_html(html)
+    _parse_html_blocks(html, source_url=url, tree=tree)
+    branding._select_logo_url(tree, url)
+    branding._extract_claim(tree)
+
+
+def _time(func: Callable[[str, str | None], None], html: str, url: str | None, repeat: int) -> float:
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(html, url)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _collect(paths: Iterable[str]) -> list[Path]:
+    pages: list[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            pages.extend(sorted(path.glob("*.htm*")))
+        elif path.exists():
+            pages.append(path)
+    return pages
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="HTML files or directories with saved career pages")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per page (median is reported)")
+    parser.add_argument("--scale", type=int, default=40, help="inflation factor for bundled fixtures")
+    parser.add_argument("--url", default=None, help="source URL to enable a domain fast-path")
+    args = parser.parse_args(argv)
+
+    pages = _collect(args.paths)
+    documents: list[tuple[str, str]] = []
+    if pages:
+        documents = [(page.name, page.read_text(encoding="utf-8", errors="ignore")) for page in pages]
+    else:
+        documents = [
+            (f"{page.name} x{args.scale}", _inflate(page.read_text(encoding="utf-8"), args.scale))
+            for page in FIXTURE_PAGES
+        ]
+
+    print(f"{'page':<45} {'size':>9} {'bs4 ms':>9} {'shared ms':>10} {'speedup':>8}")
+    for name, html in documents:
+        baseline = _time(_bs4_pipeline, html, args.url, args.repeat)
+        shared = _time(_shared_pipeline, html, args.url, args.repeat)
+        speedup = baseline / shared if shared else float("inf")
+        print(
+            f"{name[:45]:<45} {len(html) // 1024:>7}KB {baseline * 1000:>9.1f} {shared * 1000:>10.1f} {speedup:>7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
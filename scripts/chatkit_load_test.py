@@ -0,0 +1,217 @@
+"""Load-test the ChatKit server against a local fake model.
+
+Usage::
+
+    python scripts/chatkit_load_test.py [--conversations 20] [--messages 5] [--delay 0.02]
+
+The agent run is replaced by a fake streamed run that emits ``--tokens`` text
+deltas ``--delay`` seconds apart, so the numbers reflect the server's
+admission, ordering and streaming behaviour rather than model latency. The
+ASGI app is driven in-process; every request is a streamed ``user_message``.
+The script reports
+
+* ``ok``/``rejected``: answered requests and rejected runs (an ``error`` event),
+* ``first delta``: time until the first ``delta`` frame reached the client,
+* ``total``: time until the response body was complete,
+* ``peak runs``: highest number of concurrently executing fake runs,
+* ``order violations``: messages of one conversation that ran out of order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openai_utils import server
+
+
+@dataclass
+class LoadTestReport:
+    """Aggregated results of one load-test run."""
+
+    ok: int = 0
+    rejected: int = 0
+    first_delta: list[float] = field(default_factory=list)
+    total: list[float] = field(default_factory=list)
+    peak_runs: int = 0
+    order_violations: int = 0
+
+
+class _FakeModel:
+    """Stand-in for ``Runner.run_streamed`` that records concurrency and order."""
+
+    def __init__(self, tokens: int, delay: float) -> None:
+        self.tokens = tokens
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.seen: dict[str, int] = {}
+        self.violations = 0
+
+    def run_streamed(self, agent: Any, input: Any, *, conversation_id: str | None = None, **_: Any) -> Any:
+        index = int(input[0]["content"][0]["text"])
+        model = self
+
+        async def stream_events() -> AsyncIterator[Any]:
+            model.active += 1
+            model.peak = max(model.peak, model.active)
+            if index != model.seen.get(conversation_id or "", -1) + 1:
+                model.violations += 1
+            model.seen[conversation_id or ""] = index
+            try:
+                for token in range(model.tokens):
+                    await asyncio.sleep(model.delay)
+                    yield SimpleNamespace(
+                        type="raw_response_event",
+                        data=SimpleNamespace(type="response.output_text.delta", delta=f"t{token} "),
+                    )
+            finally:
+                model.active -= 1
+
+        return SimpleNamespace(stream_events=stream_events)
+
+
+async def _post(app: Any, body: dict[str, Any]) -> tuple[bool, float | None, float]:
+    """POST ``body`` to the ASGI app, report success and time the first delta and the full body."""
+
+    payload = json.dumps(body).encode()
+    started = time.perf_counter()
+    first_delta: float | None = None
+    status = 0
+    failed = False
+    finished = asyncio.Event()
+    sent = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status, first_delta, failed
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            failed = failed or b"event: error" in message.get("body", b"")
+            if first_delta is None and b"event: delta" in message.get("body", b""):
+                first_delta = time.perf_counter() - started
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/chatkit/respond",
+        "raw_path": b"/chatkit/respond",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"accept", b"text/event-stream")],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    await app(scope, receive, send)
+    return status == 200 and not failed, first_delta, time.perf_counter() - started
+
+
+async def run_load_test(
+    *,
+    conversations: int = 20,
+    messages: int = 5,
+    tokens: int = 10,
+    delay: float = 0.02,
+    scheduler: server.RunScheduler | None = None,
+) -> LoadTestReport:
+    """Send ``messages`` events for each of ``conversations`` concurrently."""
+
+    model = _FakeModel(tokens, delay)
+    original_run_streamed = server.Runner.run_streamed
+    original_get_agent = server._get_agent
+    original_scheduler = (server._scheduler, server._scheduler_loop)
+    server.Runner.run_streamed = model.run_streamed  # type: ignore[method-assign]
+    fake_agent: Any = "fake-agent"
+    server._get_agent = lambda: fake_agent
+    if scheduler is not None:
+        server._scheduler, server._scheduler_loop = scheduler, asyncio.get_running_loop()
+
+    report = LoadTestReport()
+
+    async def conversation(number: int) -> None:
+        pending = []
+        for index in range(messages):
+            body = {"type": "user_message", "text": str(index), "conversation_id": f"conv-{number}"}
+            pending.append(asyncio.create_task(_post(server.app, body)))
+            # Yield so events of one conversation arrive in send order.
+            await asyncio.sleep(0)
+        for ok, first_delta, total in await asyncio.gather(*pending):
+            if ok:
+                report.ok += 1
+                report.total.append(total)
+                if first_delta is not None:
+                    report.first_delta.append(first_delta)
+            else:
+                report.rejected += 1
+
+    try:
+        await asyncio.gather(*(conversation(number) for number in range(conversations)))
+    finally:
+        server.Runner.run_streamed = original_run_streamed  # type: ignore[method-assign]
+        server._get_agent = original_get_agent
+        server._scheduler, server._scheduler_loop = original_scheduler
+    report.peak_runs = model.peak
+    report.order_violations = model.violations
+    return report
+
+
+def _percentiles(samples: list[float]) -> str:
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=20, help="concurrent conversations")
+    parser.add_argument("--messages", type=int, default=5, help="messages sent per conversation at once")
+    parser.add_argument("--tokens", type=int, default=10, help="text deltas per fake model response")
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds between fake deltas")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_load_test(
+            conversations=args.conversations,
+            messages=args.messages,
+            tokens=args.tokens,
+            delay=args.delay,
+        )
+    )
+    print(f"ok {report.ok}, rejected {report.rejected}")
+    print(f"first delta: {_percentiles(report.first_delta)}")
+    print(f"total:       {_percentiles(report.total)}")
+    print(f"peak runs {report.peak_runs} (limit {server.CHATKIT_MAX_CONCURRENT_RUNS})")
+    print(f"order violations {report.order_violations}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1462,7 +1462,14 @@ def _render_salary_expectation(profile: Mapping[str, Any]) -> None:
     source_label = _salary_source_label(raw_source)
     if source_label:
         st.caption(tr("Quelle der Schätzung: {source}", "Estimate source: {source}").format(source=source_label))
-    if raw_source and raw_source != "model":
+    if raw_source == "vacancy_store":
+        st.info(
+            tr(
+                "KI-Schätzung derzeit nicht verfügbar – es wird der Median vergleichbarer Stellen angezeigt.",
+                "AI-generated salary estimate is unavailable right now – showing the median of comparable vacancies.",
+            )
+        )
+    elif raw_source and raw_source != "model":
         st.info(
             tr(
                 "KI-Schätzung derzeit nicht verfügbar – es wird eine Benchmark-Spanne angezeigt.",
@@ -1640,6 +1647,7 @@ def _salary_source_label(source: str) -> str:
     lookup = {
         "model": tr("KI-Modell", "AI model"),
         "fallback": tr("Benchmark-Fallback", "Benchmark fallback"),
+        "vacancy_store": tr("Vergleichbare Stellen", "Comparable vacancies"),
     }
     label = lookup.get(source)
     if label:
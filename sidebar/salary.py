@@ -5,20 +5,22 @@ import logging
 import math
 import re
 import unicodedata
+from collections.abc import Iterable
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from collections.abc import Iterable
 from typing import Any, Callable, Mapping, Sequence, TypedDict, cast
 
+import plotly.graph_objects as go
 import streamlit as st
 from pydantic import BaseModel, ConfigDict, Field
-import plotly.graph_objects as go
 
 from config.models import ModelTask, get_model_for
 from constants.keys import StateKeys, UIKeys
 from core.analysis_tools import get_salary_benchmark, resolve_salary_role
 from core.suggestions import get_static_benefit_shortlist
+from pipelines.prefetch import get_prefetch_scheduler
 from prompts import prompt_registry
+from utils.env import env_int
 from utils.i18n import tr
 from utils.normalization import country_to_iso2, normalize_country
 
@@ -40,6 +42,9 @@ logger = logging.getLogger(__name__)
 
 
 FUNCTION_NAME = "SalaryExpectationResponse"
+SALARY_PREFETCH = "salary_estimate"
+# Minimum number of stored vacancies before their median replaces the static benchmark.
+VACANCY_STORE_MIN_SAMPLES = env_int("VACANCY_STORE_MIN_SAMPLES", 5, minimum=1)
 
 
 class SalaryExpectationResponse(BaseModel):
@@ -192,6 +197,7 @@ def estimate_salary_expectation() -> None:
     """Calculate and persist the salary expectation for the current profile."""
 
     profile: Mapping[str, Any] = st.session_state.get(StateKeys.PROFILE, {})
+    lang = str(st.session_state.get("lang", "de"))
     inputs = _collect_inputs(profile)
 
     has_country = bool(inputs.country)
@@ -201,21 +207,52 @@ def estimate_salary_expectation() -> None:
         message = tr(
             "Bitte gib mindestens Jobtitel und entweder Land oder Standort an, um eine Schätzung zu erhalten.",
             "Please provide at least a job title plus either a country or a city/HQ location to generate an estimate.",
+            lang=lang,
         )
         st.session_state[UIKeys.SALARY_ESTIMATE] = None
         st.session_state[UIKeys.SALARY_EXPLANATION] = message
         st.session_state[UIKeys.SALARY_REFRESH] = _now_iso()
         return
 
+    result, explanation, source = get_prefetch_scheduler().take(
+        SALARY_PREFETCH,
+        compute_salary_estimate,
+        inputs,
+        use_model=not st.session_state.get("openai_api_key_missing"),
+        lang=lang,
+    )
+
+    if not result:
+        st.session_state[UIKeys.SALARY_ESTIMATE] = None
+        st.session_state[UIKeys.SALARY_EXPLANATION] = explanation
+        st.session_state[UIKeys.SALARY_REFRESH] = _now_iso()
+        return
+
+    if not result.get("currency"):
+        result["currency"] = inputs.current_currency or _guess_currency(inputs.country)
+
+    st.session_state[UIKeys.SALARY_ESTIMATE] = {**result, "source": source}
+    st.session_state[UIKeys.SALARY_EXPLANATION] = explanation
+    st.session_state[UIKeys.SALARY_REFRESH] = _now_iso()
+
+
+def compute_salary_estimate(
+    inputs: _SalaryInputs,
+    *,
+    use_model: bool = True,
+    lang: str | None = None,
+) -> tuple[dict[str, Any] | None, SalaryExplanation | str | None, str]:
+    """Return ``(result, explanation, source)`` for ``inputs`` without touching session state.
+
+    Safe to run off the main thread, which lets the wizard prefetch it. Pass
+    ``lang`` there: background threads cannot read the session language.
+    """
+
     result: dict[str, Any] | None = None
     explanation: SalaryExplanation | str | None = None
     source = "model"
 
-    if (
-        call_chat_api is not None
-        and build_extraction_tool is not None
-        and not st.session_state.get("openai_api_key_missing")
-    ):
+    if use_model and call_chat_api is not None and build_extraction_tool is not None:
         try:
             result, explanation = _call_salary_model(
                 inputs,
@@ -224,22 +261,32 @@ def estimate_salary_expectation() -> None:
             )
         except Exception as exc:  # noqa: BLE001
             logger.warning("Salary estimation via model failed, falling back: %s", exc)
+    if result is None:
+        result, explanation = _vacancy_store_salary(inputs, lang=lang)
+        source = "vacancy_store"
     if result is None:
         source = "fallback"
-        result, explanation = _fallback_salary(inputs)
+        result, explanation = _fallback_salary(inputs, lang=lang)
+    return result, explanation, source
 
-    if not result:
-        st.session_state[UIKeys.SALARY_ESTIMATE] = None
-        st.session_state[UIKeys.SALARY_EXPLANATION] = explanation
-        st.session_state[UIKeys.SALARY_REFRESH] = _now_iso()
-        return
 
-    if not result.get("currency"):
-        result["currency"] = inputs.current_currency or _guess_currency(inputs.country)
+def prefetch_salary_estimate(profile: Mapping[str, Any], *, lang: str) -> bool:
+    """Start computing the salary estimate for ``profile`` in the background.
 
-    st.session_state[UIKeys.SALARY_ESTIMATE] = {**result, "source": source}
-    st.session_state[UIKeys.SALARY_EXPLANATION] = explanation
-    st.session_state[UIKeys.SALARY_REFRESH] = _now_iso()
+    Returns ``True`` when a prefetch was scheduled; profiles without a job
+    title or location hint are skipped like in :func:`estimate_salary_expectation`.
+    """
+
+    inputs, _requirements, ready = build_salary_requirements(profile)
+    if not ready:
+        return False
+    return get_prefetch_scheduler().schedule(
+        SALARY_PREFETCH,
+        compute_salary_estimate,
+        inputs,
+        use_model=not st.session_state.get("openai_api_key_missing"),
+        lang=lang,
+    )
 
 
 def build_salary_requirements(profile: Mapping[str, Any]) -> tuple[_SalaryInputs, list[SalaryRequirementStatus], bool]:
@@ -1116,8 +1163,52 @@ def _apply_adjustment(value: float | None, multiplier: float) -> float | None:
     return round(adjusted, 2)
 
 
+def _vacancy_store_salary(
+    inputs: _SalaryInputs,
+    *,
+    lang: str | None = None,
+) -> tuple[dict[str, Any] | None, SalaryExplanation | str | None]:
+    """Return the median yearly range of comparable stored vacancies, if enough exist."""
+
+    from pipelines.vacancy_store import get_vacancy_store
+
+    store = get_vacancy_store()
+    if store is None:
+        return None, None
+    iso_country = country_to_iso2(inputs.country)
+    try:
+        summary = store.salary_summary(role=inputs.job_title, country=iso_country)
+    except Exception as exc:  # noqa: BLE001 - the store is optional, fall back to benchmarks
+        logger.warning("Vacancy store salary lookup failed: %s", exc)
+        return None, None
+    if summary is None or summary.count < VACANCY_STORE_MIN_SAMPLES:
+        return None, None
+
+    currency = summary.currency or _guess_currency(iso_country or inputs.country)
+    explanation: SalaryExplanation = [
+        {
+            "key": "source",
+            "value": tr(
+                "Median aus {count} vergleichbaren Stellen",
+                "Median of {count} comparable vacancies",
+                lang=lang,
+            ).format(count=summary.count),
+            "impact": None,
+        },
+        {"key": "benchmark_role", "value": inputs.job_title, "impact": None},
+    ]
+    if iso_country:
+        explanation.append({"key": "benchmark_country", "value": iso_country, "impact": None})
+    return (
+        {"salary_min": summary.salary_min, "salary_max": summary.salary_max, "currency": currency},
+        explanation,
+    )
+
+
 def _fallback_salary(
     inputs: _SalaryInputs,
+    *,
+    lang: str | None = None,
 ) -> tuple[dict[str, Any] | None, SalaryExplanation | str | None]:
     role_key = _canonical_salary_role(inputs.job_title)
     iso_country = country_to_iso2(inputs.country)
@@ -1132,6 +1223,7 @@ def _fallback_salary(
         message = tr(
             "Keine Vergleichsdaten gefunden – bitte trage eigene Werte ein.",
             "No benchmark data available – please enter your own range.",
+            lang=lang,
         )
         return None, message
 
@@ -1155,13 +1247,14 @@ def _fallback_salary(
         salary_min,
         salary_max,
         raw_range,
+        lang=lang,
     )
 
     structured_explanation.insert(
         1,
         {
             "key": "summary",
-            "value": tr(explanation_de, explanation_en),
+            "value": tr(explanation_de, explanation_en, lang=lang),
             "impact": None,
         },
     )
@@ -1172,7 +1265,7 @@ def _fallback_salary(
         structured_explanation.append(
             {
                 "key": "adjustments",
-                "value": tr(adjustments_value_de, adjustments_value_en),
+                "value": tr(adjustments_value_de, adjustments_value_en, lang=lang),
                 "impact": None,
             }
         )
@@ -1192,6 +1285,8 @@ def _build_fallback_explanation(
     salary_min: float | None,
     salary_max: float | None,
     raw_range: str,
+    *,
+    lang: str | None = None,
 ) -> SalaryExplanation:
     explanation: SalaryExplanation = [
         {
@@ -1199,6 +1294,7 @@ def _build_fallback_explanation(
             "value": tr(
                 "Fallback: Benchmark-Daten",
                 "Fallback: benchmark data",
+                lang=lang,
             ),
             "impact": {"note": "fallback_source"},
         }
@@ -60,3 +60,57 @@ def _stub_streamlit_session_state(monkeypatch: pytest.MonkeyPatch) -> None:
     session_state = _SessionDict()
     monkeypatch.setattr(st, "session_state", session_state, raising=False)
     yield
+
+
+@pytest.fixture(autouse=True)
+def _reset_pdf_page_cache() -> None:
+    """Keep PDF page results from leaking between tests that stub OCR."""
+
+    from ingest import extractors
+
+    extractors._PDF_PAGE_CACHE.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limiter() -> None:
+    """Start every test with empty OpenAI rate-limit buckets."""
+
+    from openai_utils.rate_limiter import reset_rate_limiter
+
+    reset_rate_limiter()
+    yield
+    reset_rate_limiter()
+
+
+@pytest.fixture(autouse=True)
+def _reset_circuit_breakers() -> None:
+    """Give every test closed, process-local service breakers."""
+
+    from utils.circuit_breaker import reset_breakers
+
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def _reset_usage_accountant() -> None:
+    """Account token usage in a fresh in-memory ledger without a flusher thread."""
+
+    from utils.usage_ledger import UsageAccountant, reset_usage_accountant
+
+    reset_usage_accountant(UsageAccountant(background=False))
+    yield
+    reset_usage_accountant()
+
+
+@pytest.fixture(autouse=True)
+def _reset_prefetch_scheduler() -> None:
+    """Start every test without prefetched suggestions from earlier tests."""
+
+    from pipelines.prefetch import reset_prefetch_scheduler
+
+    reset_prefetch_scheduler()
+    yield
+    reset_prefetch_scheduler()
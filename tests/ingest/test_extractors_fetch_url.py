@@ -156,3 +156,23 @@ def test_fetch_url_preserves_cookies_across_redirect(monkeypatch: pytest.MonkeyP
 
     assert _fetch_url("https://example.com/start") == "secret"
     assert call_count == 2
+
+
+def test_fetch_url_public_only_refuses_redirect_to_private_host(monkeypatch: pytest.MonkeyPatch) -> None:
+    """With ``public_only`` every redirect hop must resolve to a public address."""
+
+    import socket
+
+    calls: list[str] = []
+
+    def handler(session: DummySession, url: str, timeout: float, allow_redirects: bool) -> DummyResponse:
+        calls.append(url)
+        return DummyResponse(302, headers={"Location": "http://169.254.169.254/latest/meta-data"})
+
+    _patch_session(monkeypatch, handler)
+    monkeypatch.setattr(socket, "getaddrinfo", lambda *args: [(None, None, None, "", ("93.184.215.14", 443))])
+
+    with pytest.raises(ValueError, match="public host"):
+        _fetch_url("https://example.com/start", public_only=True)
+
+    assert calls == ["https://example.com/start"]
@@ -0,0 +1,90 @@
+"""Tests for the shared lxml parse tree used by ingestion."""
+
+from __future__ import annotations
+
+import sys
+import types
+
+import pytest
+from lxml import html as lxml_html
+
+from ingest import extractors, html_tree
+from ingest.branding import extract_brand_assets
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tree_cache() -> None:
+    html_tree.clear_tree_cache()
+    yield
+    html_tree.clear_tree_cache()
+
+
+def test_css_to_xpath_supports_domain_selectors() -> None:
+    assert html_tree.css_to_xpath("[data-at='job-ad-container']") == ".//*[@data-at='job-ad-container']"
+    assert html_tree.css_to_xpath("main#main") == ".//main[@id='main']"
+    assert html_tree.css_to_xpath("#content") == ".//*[@id='content']"
+    assert html_tree.css_to_xpath("div > p") is None
+
+
+def test_element_text_skips_scripts_and_comments_but_keeps_tails() -> None:
+    root = html_tree.parse_html("<p>Hello <b>bold</b><!-- hidden --><script>x()</script> world</p>")
+    assert root is not None
+    paragraph = next(root.iter("p"))
+    assert html_tree.element_text(paragraph) == "Hello bold world"
+
+
+def test_parse_html_returns_shared_tree() -> None:
+    markup = "<html><body><p>Shared</p></body></html>"
+    assert html_tree.parse_html(markup) is html_tree.parse_html(markup)
+    assert html_tree.parse_html("   ") is None
+
+
+def test_parse_html_blocks_does_not_mutate_tree() -> None:
+    markup = (
+        "<html><body><header><img src='/logo.svg' alt='Logo'></header>"
+        "<main><nav><p>Menu</p></nav><h1>Role</h1><p>Details</p><script>track()</script></main>"
+        "</body></html>"
+    )
+    tree = html_tree.parse_html(markup)
+    before = lxml_html.tostring(tree)
+
+    blocks = extractors._parse_html_blocks(markup, tree=tree)
+
+    assert [block.text for block in blocks] == ["Role", "Details"]
+    assert lxml_html.tostring(tree) == before
+
+
+def test_domain_fast_path_jumps_to_container() -> None:
+    markup = (
+        "<html><body><p>Outside</p><div data-at='job-ad-container'><h2>Inside</h2><p>Job body</p></div></body></html>"
+    )
+
+    blocks = extractors._parse_html_blocks(markup, source_url="https://www.stepstone.de/jobs/x")
+
+    assert [block.text for block in blocks] == ["Inside", "Job body"]
+
+
+def test_url_extraction_and_branding_share_one_parse(monkeypatch: pytest.MonkeyPatch) -> None:
+    page = (
+        "<html><head><meta name='theme-color' content='#112233'></head><body>"
+        "<header><img src='/logo.svg' alt='Company logo'></header>"
+        "<main><h1>Data Engineer</h1><p>" + "Build pipelines. " * 20 + "</p></main></body></html>"
+    )
+    parses: list[str] = []
+    original = html_tree._parse_uncached
+
+    def _counting_parse(markup: str):
+        parses.append(markup)
+        return original(markup)
+
+    monkeypatch.setattr(html_tree, "_parse_uncached", _counting_parse)
+    monkeypatch.setattr(extractors, "_fetch_url", lambda _url: page)
+    monkeypatch.setitem(sys.modules, "trafilatura", types.SimpleNamespace(extract=lambda *_a, **_k: ""))
+
+    doc = extractors.extract_text_from_url("https://example.com/job")
+    assets = extract_brand_assets(doc.raw_html or "", base_url="https://example.com/job")
+
+    assert "Data Engineer" in doc.text
+    assert assets.logo_url == "https://example.com/logo.svg"
+    assert assets.brand_color == "#112233"
+    assert len(parses) == 1
@@ -0,0 +1,105 @@
+"""Tests for the span-based :class:`StructuredDocument` representation."""
+
+from __future__ import annotations
+
+import gc
+import pickle
+
+from ingest import types as ingest_types
+from ingest.reader import clean_structured_document
+from ingest.types import ContentBlock, StructuredDocument, build_plain_text_document
+
+
+def _sample_blocks() -> list[ContentBlock]:
+    return [
+        ContentBlock(type="heading", text="Your tasks", level=2, metadata={"position": 0}),
+        ContentBlock(type="list_item", text="Build pipelines", level=0, metadata={"marker": "-", "ordered": False}),
+        ContentBlock(type="list_item", text="Review code", level=1, metadata={"marker": "2", "ordered": True}),
+        ContentBlock(type="paragraph", text="   "),
+        ContentBlock(type="paragraph", text="Join us."),
+    ]
+
+
+def test_from_blocks_records_spans_into_single_buffer() -> None:
+    doc = StructuredDocument.from_blocks(_sample_blocks(), source="s")
+
+    assert doc.text == "Your tasks\n\n- Build pipelines\n\n2. Review code\n\nJoin us."
+    assert [block.text for block in doc.blocks] == ["Your tasks", "Build pipelines", "Review code", "Join us."]
+    assert doc.blocks[2].level == 1
+    assert doc.blocks[0].metadata == {"position": 0}
+    assert doc.blocks[-1].level is None
+    assert not doc._detached
+
+
+def test_blocks_view_compares_like_a_list() -> None:
+    doc = StructuredDocument(text="Line A", blocks=[ContentBlock(type="paragraph", text="Line A")])
+
+    assert doc.blocks == [ContentBlock(type="paragraph", text="Line A")]
+    assert [ContentBlock(type="paragraph", text="Line A")] == doc.blocks
+    assert doc.blocks[:1] == [ContentBlock(type="paragraph", text="Line A")]
+
+
+def test_constructor_keeps_block_text_missing_from_buffer() -> None:
+    doc = StructuredDocument(text="first text", blocks=[ContentBlock(type="paragraph", text="first block")])
+
+    assert doc.blocks[0].text == "first block"
+    assert doc.text == "first text"
+
+
+def test_clean_document_shares_buffer_when_nothing_changes() -> None:
+    doc = build_plain_text_document("Senior Engineer\n\n- Python\n- SQL")
+
+    cleaned = clean_structured_document(doc)
+
+    assert cleaned.text is doc.text
+    assert cleaned._starts is doc._starts
+    assert cleaned.blocks == doc.blocks
+
+
+def test_clean_document_masks_boilerplate_blocks() -> None:
+    doc = build_plain_text_document("Home | Jobs | Kontakt\n\nBuild data products.\n\nJetzt bewerben")
+
+    cleaned = clean_structured_document(doc)
+
+    assert [block.text for block in cleaned.blocks] == ["Build data products."]
+    assert cleaned.text == "Build data products."
+
+
+def test_raw_html_is_kept_out_of_band_and_released() -> None:
+    doc = StructuredDocument.from_blocks(
+        [ContentBlock(type="paragraph", text="Body")],
+        raw_html="<p>Body</p>",
+    )
+    cleaned = clean_structured_document(doc)
+    key = doc._raw_html_key
+
+    assert all(getattr(doc, slot, None) != "<p>Body</p>" for slot in StructuredDocument.__slots__)
+    assert cleaned.raw_html == "<p>Body</p>"
+    assert ingest_types._RAW_HTML_STORE.get(key) == "<p>Body</p>"
+
+    del doc, cleaned
+    gc.collect()
+
+    assert ingest_types._RAW_HTML_STORE.get(key) is None
+
+
+def test_pickle_roundtrip_preserves_document() -> None:
+    doc = StructuredDocument.from_blocks(_sample_blocks(), source="s", raw_html="<li>x</li>")
+
+    restored = pickle.loads(pickle.dumps(doc))
+
+    assert restored == doc
+    assert restored.raw_html == "<li>x</li>"
+
+
+def test_raw_html_store_evicts_oldest_pages_beyond_cap() -> None:
+    store = ingest_types._RawHtmlStore(maxsize=2)
+    keys = []
+    for index in range(3):
+        keys.append(store.put(f"<p>{index}</p>"))
+        store.retain(keys[-1])
+
+    assert [store.get(key) for key in keys] == [None, "<p>1</p>", "<p>2</p>"]
+    assert len(store) == 2
+    store.release(keys[0])
+    assert len(store) == 2
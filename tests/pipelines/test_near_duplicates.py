@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from pipelines.near_duplicates import (
+    NearDuplicateIndex,
+    estimate_similarity,
+    merge_seed_profile,
+    minhash_signature,
+)
+from pipelines.need_analysis import extract_need_analysis_profile
+from wizard.services.intake_diagnostics import evaluate_intake_diagnostics
+
+POSTING = """Senior Data Engineer (m/w/d)
+
+Wir suchen eine erfahrene Person für unser Plattform-Team in Berlin. Du baust Datenpipelines mit Python, Spark und Airflow und arbeitest eng mit Analytics zusammen.
+
+Deine Aufgaben: Aufbau und Betrieb von Batch- und Streaming-Pipelines, Datenmodellierung im Data Warehouse, Code Reviews und Mentoring.
+
+Dein Profil: mehrere Jahre Erfahrung mit Python und SQL, Kenntnisse in Kubernetes und Terraform, sehr gute Deutsch- und Englischkenntnisse.
+
+Wir bieten: 30 Tage Urlaub, flexible Arbeitszeiten, Jobticket, Weiterbildungsbudget und ein Gehalt zwischen 70.000 und 85.000 Euro."""
+REPOST = POSTING.replace("30 Tage Urlaub", "28 Tage Urlaub")
+UNRELATED = (
+    "Koch in Vollzeit gesucht. Du bereitest Speisen zu und hältst die Küche sauber. Erfahrung in der Gastronomie."
+)
+
+SEED_PROFILE = {
+    "position": {"job_title": "Senior Data Engineer"},
+    "requirements": {"hard_skills_required": ["Python", "SQL"]},
+    "compensation": {"benefits": ["30 Tage Urlaub"]},
+}
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(tmp_path / "index" / "postings.sqlite3", threshold=0.8)
+    index.add(POSTING, SEED_PROFILE)
+    return index
+
+
+def test_minhash_similarity_separates_reposts_from_other_postings() -> None:
+    signature = minhash_signature(POSTING)
+
+    assert estimate_similarity(signature, minhash_signature(POSTING)) == 1.0
+    assert estimate_similarity(signature, minhash_signature(REPOST)) > 0.85
+    assert estimate_similarity(signature, minhash_signature(UNRELATED)) < 0.1
+
+
+def test_index_finds_reposts_and_reports_changed_blocks(index: NearDuplicateIndex) -> None:
+    exact = index.find(POSTING.replace("\n\n", "\n \n"))
+    repost = index.find(REPOST)
+
+    assert exact is not None and exact.exact and exact.similarity == 1.0
+    assert repost is not None
+    assert repost.changed_blocks == (REPOST.split("\n\n")[-1],)
+    assert repost.profile == SEED_PROFILE
+    assert repost.to_dict()["total_blocks"] == 5
+    assert index.find(UNRELATED) is None
+    assert len(index) == 1
+
+
+def test_index_reports_removed_blocks(tmp_path: Path) -> None:
+    index = NearDuplicateIndex(tmp_path / "postings.sqlite3", threshold=0.8)
+    index.add(POSTING + "\n\nStandort: Berlin-Mitte, zwei Tage pro Woche im Büro.", SEED_PROFILE)
+    shortened = index.find(POSTING)
+
+    assert shortened is not None
+    assert shortened.changed_blocks == ()
+    assert shortened.removed_blocks == 1
+    assert not shortened.exact
+
+
+def test_merge_seed_profile_replaces_lists_from_changed_blocks() -> None:
+    delta = {
+        "position": {"job_title": ""},
+        "requirements": {"hard_skills_required": ["Java", "SQL"]},
+        "compensation": {"benefits": ["28 Tage Urlaub"], "salary_min": 70000},
+    }
+
+    merged = merge_seed_profile(SEED_PROFILE, delta)
+
+    assert merged["position"]["job_title"] == "Senior Data Engineer"
+    assert merged["requirements"]["hard_skills_required"] == ["Java", "SQL"]
+    assert merged["compensation"] == {"benefits": ["28 Tage Urlaub"], "salary_min": 70000}
+
+
+def test_merge_seed_profile_keeps_only_items_grounded_in_unchanged_blocks() -> None:
+    seed = {
+        "requirements": {"hard_skills_required": ["Python", "SQL"], "languages_required": ["Deutsch", "Englisch"]},
+        "compensation": {"benefits": ["30 Tage Urlaub", "Jobticket"]},
+    }
+    delta = {"requirements": {"hard_skills_required": ["Java"]}}
+
+    merged = merge_seed_profile(seed, delta, retained_text="Erfahrung mit SQL.\n\nWir bieten ein Jobticket.")
+
+    assert merged["requirements"] == {"hard_skills_required": ["SQL", "Java"], "languages_required": []}
+    assert merged["compensation"] == {"benefits": ["Jobticket"]}
+
+
+def _fake_extraction(monkeypatch: pytest.MonkeyPatch, index: NearDuplicateIndex, payload: dict[str, Any]) -> list[str]:
+    from llm.client import StructuredExtractionOutcome
+
+    texts: list[str] = []
+
+    def _outcome(text: str, **_kwargs: Any) -> StructuredExtractionOutcome:
+        texts.append(text)
+        return StructuredExtractionOutcome(content=json.dumps(payload), source="responses")
+
+    monkeypatch.setattr("pipelines.need_analysis._extract_json_outcome", _outcome)
+    monkeypatch.setattr(
+        "pipelines.need_analysis.parse_structured_payload",
+        lambda raw, *, source_text=None: (json.loads(raw), False, []),
+    )
+    monkeypatch.setattr("pipelines.need_analysis.get_near_duplicate_index", lambda: index)
+    return texts
+
+
+def test_extraction_reextracts_only_changed_blocks(monkeypatch: pytest.MonkeyPatch, index: NearDuplicateIndex) -> None:
+    texts = _fake_extraction(monkeypatch, index, {"compensation": {"benefits": ["28 Tage Urlaub"]}})
+
+    result = extract_need_analysis_profile(REPOST)
+
+    assert texts == [REPOST.split("\n\n")[-1]]
+    assert result.near_duplicate is not None
+    assert result.data["position"]["job_title"] == "Senior Data Engineer"
+    assert result.data["compensation"]["benefits"] == ["28 Tage Urlaub"]
+    assert result.data["requirements"]["hard_skills_required"] == ["Python", "SQL"]
+    assert len(index) == 2
+
+    diagnostics = evaluate_intake_diagnostics({}, near_duplicate=result.near_duplicate)
+    assert diagnostics.near_duplicate_of == result.near_duplicate.posting_id
+    assert diagnostics.near_duplicate_similarity == pytest.approx(result.near_duplicate.similarity, abs=1e-3)
+    assert diagnostics.near_duplicate_changed_blocks == 1
+
+
+def test_extraction_reuses_identical_posting_without_model_call(
+    monkeypatch: pytest.MonkeyPatch, index: NearDuplicateIndex
+) -> None:
+    texts = _fake_extraction(monkeypatch, index, {})
+
+    result = extract_need_analysis_profile(POSTING)
+    fresh = extract_need_analysis_profile(UNRELATED, reuse_duplicates=False)
+
+    assert texts == [UNRELATED]
+    assert result.data == SEED_PROFILE
+    assert result.near_duplicate is not None and result.near_duplicate.exact
+    assert fresh.near_duplicate is None
+    assert evaluate_intake_diagnostics({}).near_duplicate_similarity is None
+
+
+def test_identical_posting_keeps_locked_fields_and_hints(
+    monkeypatch: pytest.MonkeyPatch, index: NearDuplicateIndex
+) -> None:
+    texts = _fake_extraction(monkeypatch, index, {})
+
+    result = extract_need_analysis_profile(
+        POSTING,
+        company_hint="Acme GmbH",
+        title_hint="Data Engineer",
+        locked_fields={"position.job_title": "Lead Data Engineer"},
+    )
+
+    assert texts == []
+    assert result.data["position"]["job_title"] == "Lead Data Engineer"
+    assert result.data["company"]["name"] == "Acme GmbH"
+
+
+def test_posting_with_only_removed_blocks_skips_the_model(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    location = "Standort: Berlin-Mitte, zwei Tage pro Woche im Büro."
+    index = NearDuplicateIndex(tmp_path / "postings.sqlite3", threshold=0.8)
+    seed = {**SEED_PROFILE, "location": {"primary_city": "Berlin-Mitte"}, "employment": {"travel_details": [location]}}
+    index.add(POSTING + "\n\n" + location, seed)
+    texts = _fake_extraction(monkeypatch, index, {"position": {"job_title": "Wrong"}})
+
+    result = extract_need_analysis_profile(POSTING)
+
+    assert texts == []
+    assert result.near_duplicate is not None and result.near_duplicate.removed_blocks == 1
+    assert result.data["position"]["job_title"] == "Senior Data Engineer"
+    assert result.data["requirements"]["hard_skills_required"] == ["Python", "SQL"]
+    assert result.data["employment"]["travel_details"] == []
+    assert len(index) == 2
@@ -0,0 +1,168 @@
+"""Tests for offline batch generation."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import config
+from openai_utils.batch import BatchRequest, BatchStatus, LocalBatchBackend, parse_batch_output, render_batch_line
+from pipelines.batch_generation import BatchArtifact, BatchGenerationJob
+
+_JOB_AD = {
+    "metadata": {"tone": "professional", "target_audience": "Engineers"},
+    "ad": {
+        "sections": {
+            "overview": "Join us.",
+            "responsibilities": ["Build things"],
+            "requirements": ["Python"],
+            "how_to_apply": "Apply online.",
+            "equal_opportunity_statement": "We welcome everyone.",
+        }
+    },
+}
+
+
+def _response(payload: Any) -> dict[str, Any]:
+    return {
+        "id": "resp_1",
+        "object": "response",
+        "output": [{"type": "message", "content": [{"type": "output_text", "text": json.dumps(payload)}]}],
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+
+
+class _Executor:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def __call__(self, endpoint: str, body: dict[str, Any]) -> dict[str, Any]:
+        rendered = json.dumps(body)
+        self.calls.append(endpoint)
+        if "JobAd" in rendered:
+            return _response(_JOB_AD)
+        if "InterviewGuide" in rendered:
+            return _response({"questions": []})
+        raise RuntimeError("model overloaded")
+
+
+class _CountingBackend(LocalBatchBackend):
+    def __init__(self, directory: Path, execute: Any) -> None:
+        super().__init__(directory, execute)
+        self.submissions = 0
+
+    def submit(self, path: Path, **kwargs: Any) -> str:
+        self.submissions += 1
+        return super().submit(path, **kwargs)
+
+
+PROFILES = {"vac-1": {"position": {"job_title": "Engineer"}}, "vac-2": {"position": {"job_title": "Designer"}}}
+
+
+def test_batch_job_renders_submits_and_streams_results(tmp_path: Path) -> None:
+    executor = _Executor()
+    job = BatchGenerationJob(tmp_path / "job", LocalBatchBackend(tmp_path / "backend", executor), sleep=lambda _s: None)
+
+    results = list(job.run(PROFILES, [BatchArtifact.JOB_AD, BatchArtifact.INTERVIEW_GUIDE], lang="en"))
+
+    lines = (tmp_path / "job" / "requests.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["custom_id"] for line in lines] == [
+        "job_ad:vac-1",
+        "job_ad:vac-2",
+        "interview_guide:vac-1",
+        "interview_guide:vac-2",
+    ]
+    assert len(executor.calls) == 4
+    by_key = {(result.artifact, result.vacancy_id): result for result in results}
+    assert by_key[(BatchArtifact.JOB_AD, "vac-1")].value == _JOB_AD
+    assert by_key[(BatchArtifact.INTERVIEW_GUIDE, "vac-2")].value == {"questions": []}
+    assert all(result.error is None for result in results)
+
+
+def test_batch_job_reports_failed_requests_per_vacancy(tmp_path: Path) -> None:
+    job = BatchGenerationJob(tmp_path / "job", LocalBatchBackend(tmp_path / "backend", _Executor()))
+
+    results = list(job.run({"vac-1": {}}, [BatchArtifact.FOLLOWUPS], lang="en"))
+
+    assert len(results) == 1
+    assert results[0].artifact is BatchArtifact.FOLLOWUPS
+    assert results[0].error == "model overloaded"
+
+
+def test_batch_job_resumes_after_crash_without_resubmitting(tmp_path: Path) -> None:
+    backend = _CountingBackend(tmp_path / "backend", _Executor())
+    job = BatchGenerationJob(tmp_path / "job", backend)
+    stream = job.run(PROFILES, [BatchArtifact.JOB_AD], lang="en")
+    first = next(stream)
+    next(stream)  # acknowledges the first result
+    stream.close()  # crash while the second result is being handled
+
+    resumed_backend = _CountingBackend(tmp_path / "backend", _Executor())
+    resumed = BatchGenerationJob(tmp_path / "job", resumed_backend)
+    remaining = list(resumed.run(PROFILES, [BatchArtifact.JOB_AD], lang="en"))
+
+    assert backend.submissions == 1
+    assert resumed_backend.submissions == 0
+    assert [result.vacancy_id for result in resumed.delivered()] == [first.vacancy_id, remaining[0].vacancy_id]
+    assert len(remaining) == 1 and remaining[0].vacancy_id != first.vacancy_id
+
+
+def test_batch_job_times_out_while_batch_is_pending(tmp_path: Path) -> None:
+    class _PendingBackend(LocalBatchBackend):
+        def status(self, batch_id: str) -> BatchStatus:
+            return BatchStatus(batch_id, "in_progress")
+
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    job = BatchGenerationJob(
+        tmp_path / "job",
+        _PendingBackend(tmp_path / "backend", _Executor()),
+        poll_interval=60,
+        sleep=sleep,
+        clock=lambda: now[0],
+    )
+
+    with pytest.raises(TimeoutError):
+        list(job.run(PROFILES, [BatchArtifact.JOB_AD], lang="en", timeout=120))
+
+
+def test_parse_batch_output_handles_http_errors_and_chat_bodies() -> None:
+    failed = parse_batch_output(
+        {"custom_id": "x", "response": {"status_code": 429, "body": {"error": {"message": "slow down"}}}}
+    )
+    assert failed.result is None and failed.error == "HTTP 429: slow down"
+
+    chat = parse_batch_output(
+        {
+            "custom_id": "y",
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "id": "chatcmpl-1",
+                    "choices": [{"message": {"content": "hi"}}],
+                    "usage": {"completion_tokens": 2},
+                },
+            },
+        }
+    )
+    assert chat.result is not None
+    assert chat.result.content == "hi"
+    assert chat.result.usage["output_tokens"] == 2
+
+
+def test_render_batch_line_omits_analysis_tools(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "RESPONSES_ALLOW_TOOLS", True, raising=False)
+    monkeypatch.setattr(
+        "core.analysis_tools.build_analysis_tools",
+        lambda: ([{"type": "function", "name": "analysis", "parameters": {"type": "object"}}], {"analysis": len}),
+    )
+
+    _endpoint, line = render_batch_line(BatchRequest("x", [{"role": "user", "content": "hi"}], {"model": "gpt-4o"}))
+
+    assert "analysis" not in json.dumps(line["body"].get("tools", []))
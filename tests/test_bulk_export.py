@@ -0,0 +1,110 @@
+"""Tests for the streaming bulk exporter."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from cli import bulk_export
+from exports.bulk import export_columns, iter_export_records, write_csv, write_ndjson, write_parquet
+
+
+def _snapshot(index: int) -> dict[str, Any]:
+    return {
+        "profile": {
+            "position": {"job_title": f"Engineer {index}"},
+            "company": {"name": "Acme"},
+            "requirements": {"hard_skills_required": ["Python", "SQL"]},
+        },
+        "wizard": {},
+        "meta": {"lang": "en"},
+    }
+
+
+def test_ndjson_consumes_items_lazily() -> None:
+    out = io.StringIO()
+    pulled: list[int] = []
+
+    def items() -> Iterator[dict[str, Any]]:
+        for index in range(3):
+            pulled.append(index)
+            # Every earlier item has already been written when the next one is pulled.
+            assert out.getvalue().count("\n") == index
+            yield _snapshot(index)
+
+    stats = write_ndjson(items(), out)
+
+    lines = out.getvalue().splitlines()
+    assert stats.written == 3
+    assert pulled == [0, 1, 2]
+    assert [json.loads(line)["role"]["title"] for line in lines] == ["Engineer 0", "Engineer 1", "Engineer 2"]
+    assert all(": " not in line for line in lines)
+
+
+def test_csv_uses_export_field_columns_and_json_lists() -> None:
+    out = io.StringIO()
+    write_csv([_snapshot(1), _snapshot(1)["profile"]], out, include_warnings=True)
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert list(rows[0]) == export_columns(include_warnings=True)
+    assert rows[0]["role.title"] == rows[1]["role.title"] == "Engineer 1"
+    assert json.loads(rows[0]["skills.must_have"]) == ["Python", "SQL"]
+    assert rows[0]["company.description"] == ""
+
+
+def test_invalid_items_are_skipped_or_raised() -> None:
+    items: list[Any] = [_snapshot(0), "not a profile", _snapshot(1)]
+
+    with pytest.raises(TypeError):
+        list(iter_export_records(items))
+
+    out = io.StringIO()
+    stats = write_ndjson(items, out, on_error="skip")
+    assert (stats.written, stats.skipped) == (2, 1)
+    assert stats.errors[0].startswith("item 1:")
+
+
+def test_unconfirmed_decision_warnings_are_exported() -> None:
+    profile = {
+        "position": {"job_title": "Engineer"},
+        "open_decisions": [
+            {"decision_id": "salary", "decision_state": "proposed", "blocking_exports": ["job_ad"]},
+        ],
+    }
+
+    (record,) = iter_export_records([profile], artifact_key="job_ad", include_warnings=True)
+
+    assert "salary" in record["warnings"][0]
+
+
+def test_parquet_writes_bounded_record_batches(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    destination = tmp_path / "profiles.parquet"
+
+    stats = write_parquet((_snapshot(index) for index in range(5)), destination, batch_size=2)
+
+    parquet = pq.ParquetFile(destination)
+    table = parquet.read()
+    assert stats.written == table.num_rows == 5
+    assert parquet.metadata.num_row_groups == 3
+    assert table.column("skills.must_have").to_pylist()[0] == ["Python", "SQL"]
+    assert table.column("role.title").to_pylist()[-1] == "Engineer 4"
+
+
+def test_cli_reads_json_and_ndjson_inputs(tmp_path: Path) -> None:
+    (tmp_path / "one.json").write_text(json.dumps(_snapshot(0)), encoding="utf-8")
+    (tmp_path / "many.jsonl").write_text(
+        "\n".join(json.dumps(_snapshot(index)) for index in (1, 2)) + "\n", encoding="utf-8"
+    )
+    destination = tmp_path / "out.ndjson"
+
+    assert bulk_export.main([str(tmp_path / "many.jsonl"), str(tmp_path / "one.json"), "--out", str(destination)]) == 0
+
+    titles = [json.loads(line)["role"]["title"] for line in destination.read_text(encoding="utf-8").splitlines()]
+    assert titles == ["Engineer 1", "Engineer 2", "Engineer 0"]
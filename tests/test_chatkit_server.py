@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from types import SimpleNamespace
 from typing import Any
 
+import pytest
 from fastapi.testclient import TestClient
 
 from openai_utils import server
+from scripts import chatkit_load_test
 
 
 def _fake_run_result(text: str) -> SimpleNamespace:
@@ -79,3 +82,110 @@ def test_unknown_event_returns_error(monkeypatch: Any) -> None:
     payload = response.json()
     assert payload["ok"] is False
     assert "Unsupported" in payload["error"]
+
+
+def _fake_streamed_run(*texts: str) -> SimpleNamespace:
+    async def stream_events() -> Any:
+        for text in texts:
+            yield SimpleNamespace(
+                type="raw_response_event", data=SimpleNamespace(type="response.output_text.delta", delta=text)
+            )
+
+    return SimpleNamespace(stream_events=stream_events)
+
+
+def test_streaming_response_emits_deltas_then_done(monkeypatch: Any) -> None:
+    monkeypatch.setattr(server, "_get_agent", lambda: "agent")
+    monkeypatch.setattr(server.Runner, "run_streamed", lambda agent, input, **_: _fake_streamed_run("Hel", "lo"))
+
+    client = TestClient(server.app)
+    response = client.post(
+        "/chatkit/respond",
+        json={"type": "user_message", "text": "Hi", "conversation_id": "conv-1"},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    events = [frame.split("\n")[0].removeprefix("event: ") for frame in frames]
+    assert events == ["delta", "delta", "done"]
+    assert '"text": "Hel"' in frames[0]
+    assert '"conversation_id": "conv-1"' in frames[-1]
+
+
+def test_scheduler_runs_one_conversation_in_order() -> None:
+    order: list[int] = []
+
+    async def scenario() -> dict[str, int]:
+        scheduler = server.RunScheduler(4, admission_timeout=1)
+
+        async def handle(index: int) -> None:
+            admission = await scheduler.acquire("conv")
+            try:
+                await asyncio.sleep(0.01 * (3 - index))
+                order.append(index)
+            finally:
+                admission.release()
+
+        await asyncio.gather(*(handle(index) for index in range(3)))
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert order == [0, 1, 2]
+    assert stats == {"active": 0, "waiting": 0, "limit": 4}
+
+
+def test_scheduler_rejects_when_saturated() -> None:
+    async def scenario() -> None:
+        scheduler = server.RunScheduler(1, max_queued_per_conversation=1, admission_timeout=0.01)
+        held = await scheduler.acquire("conv-a")
+
+        with pytest.raises(server.RunRejected) as busy:
+            await scheduler.acquire("conv-b")
+        assert busy.value.status_code == 503
+        with pytest.raises(server.RunRejected) as queue_full:
+            await scheduler.acquire("conv-a")
+        assert queue_full.value.status_code == 429
+
+        held.release()
+        (await scheduler.acquire("conv-b")).release()
+
+    asyncio.run(scenario())
+
+
+def test_load_harness_keeps_order_within_the_limit() -> None:
+    async def scenario() -> chatkit_load_test.LoadTestReport:
+        return await chatkit_load_test.run_load_test(
+            conversations=4, messages=3, tokens=2, delay=0.001, scheduler=server.RunScheduler(2, admission_timeout=5)
+        )
+
+    report = asyncio.run(scenario())
+
+    assert report.ok == 12
+    assert report.rejected == 0
+    assert report.order_violations == 0
+    assert report.peak_runs <= 2
+    assert len(report.first_delta) == 12
+
+
+def test_stream_holds_no_slot_until_it_starts_and_reports_rejections() -> None:
+    async def scenario() -> tuple[dict[str, int], list[str]]:
+        scheduler = server.RunScheduler(1, admission_timeout=0.01)
+        server._scheduler, server._scheduler_loop = scheduler, asyncio.get_running_loop()
+        stream = server._stream_run([], "conv-a")
+        # A client that disconnects before streaming starts never iterates the body.
+        await stream.aclose()
+        idle = scheduler.stats()
+
+        held = await scheduler.acquire("conv-b")
+        frames = [frame async for frame in server._stream_run([], "conv-a")]
+        held.release()
+        return idle, frames
+
+    idle, frames = asyncio.run(scenario())
+
+    assert idle == {"active": 0, "waiting": 0, "limit": 1}
+    assert len(frames) == 1 and frames[0].startswith("event: error")
+    assert '"error": "server_busy"' in frames[0]
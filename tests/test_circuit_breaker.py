@@ -1,8 +1,21 @@
 from __future__ import annotations
 
+import threading
 from typing import Any
 
-from utils.circuit_breaker import CircuitBreaker, CircuitState
+import pytest
+
+from utils.circuit_breaker import (
+    AdaptiveConcurrencyLimit,
+    CallOutcome,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    MemoryBreakerBackend,
+    ServiceBreaker,
+    SQLiteBreakerBackend,
+    get_breaker,
+)
 
 
 def _clock_generator(start: float = 0.0):
@@ -67,3 +80,180 @@ def test_breaker_closes_after_half_open_success() -> None:
     assert state.state is CircuitState.CLOSED
     assert state.failure_count == 0
     assert breaker.allow_request()
+
+
+def _service_breaker(backend: Any, clock: Any, **kwargs: Any) -> ServiceBreaker:
+    return ServiceBreaker(
+        "openai:gpt-test",
+        backend=backend,
+        failure_threshold=2,
+        recovery_timeout=5,
+        probe_lease=30,
+        clock=clock,
+        **kwargs,
+    )
+
+
+def test_service_breaker_state_is_shared_between_instances() -> None:
+    clock, _ = _clock_generator()
+    backend = MemoryBreakerBackend()
+    first = _service_breaker(backend, clock)
+    second = _service_breaker(backend, clock)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            with first.guard():
+                raise TimeoutError("upstream timeout")
+
+    assert second.current_state().state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        second.acquire()
+    assert excinfo.value.reason == "open"
+    assert excinfo.value.retry_after == pytest.approx(5)
+
+
+def test_service_breaker_admits_a_single_half_open_probe() -> None:
+    clock, advance = _clock_generator()
+    backend = MemoryBreakerBackend()
+    breaker = _service_breaker(backend, clock)
+    other = _service_breaker(backend, clock)
+    for _ in range(2):
+        breaker.acquire().failure()
+
+    advance(6)
+    probe = breaker.acquire()
+    assert probe.is_probe
+    with pytest.raises(CircuitOpenError) as excinfo:
+        other.acquire()
+    assert excinfo.value.reason == "probing"
+
+    probe.success()
+    assert other.current_state().state is CircuitState.CLOSED
+    permit = other.acquire()
+    assert not permit.is_probe
+    permit.success()
+
+
+def test_failed_probe_reopens_and_expired_lease_is_taken_over() -> None:
+    clock, advance = _clock_generator()
+    breaker = _service_breaker(
+        MemoryBreakerBackend(),
+        clock,
+        limiter=AdaptiveConcurrencyLimit(initial=2, minimum=2, maximum=2),
+    )
+    for _ in range(2):
+        breaker.acquire().failure()
+
+    advance(6)
+    breaker.acquire().failure()
+    assert breaker.current_state().state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    advance(6)
+    abandoned = breaker.acquire()
+    assert abandoned.is_probe
+    advance(31)
+    takeover = breaker.acquire()
+    assert takeover.is_probe
+    abandoned.success()
+    assert breaker.current_state().state is CircuitState.HALF_OPEN
+    takeover.success()
+    assert breaker.current_state().state is CircuitState.CLOSED
+
+
+def test_ignored_outcomes_do_not_count_as_failures() -> None:
+    clock, _ = _clock_generator()
+    breaker = _service_breaker(MemoryBreakerBackend(), clock)
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            with breaker.guard(classify=lambda exc: CallOutcome.IGNORED):
+                raise ValueError("bad input")
+
+    assert breaker.current_state().state is CircuitState.CLOSED
+    assert breaker.current_state().failure_count == 0
+
+
+def test_sqlite_backend_shares_state_across_backends(tmp_path: Any) -> None:
+    clock, advance = _clock_generator()
+    path = tmp_path / "breakers.sqlite"
+    worker_a = _service_breaker(SQLiteBreakerBackend(path), clock)
+    worker_b = _service_breaker(SQLiteBreakerBackend(path), clock)
+
+    for _ in range(2):
+        worker_a.acquire().failure()
+    with pytest.raises(CircuitOpenError):
+        worker_b.acquire()
+
+    advance(6)
+    probe = worker_b.acquire()
+    assert probe.is_probe
+    with pytest.raises(CircuitOpenError):
+        worker_a.acquire()
+    probe.success()
+    assert worker_a.current_state().state is CircuitState.CLOSED
+
+
+def test_adaptive_limit_grows_additively_and_halves_on_failure() -> None:
+    limit = AdaptiveConcurrencyLimit(initial=4, minimum=1, maximum=8)
+
+    for _ in range(4):
+        assert limit.acquire(0)
+        limit.release(CallOutcome.SUCCESS)
+    assert limit.limit == 4
+
+    for _ in range(8):
+        assert limit.acquire(0)
+        limit.release(CallOutcome.SUCCESS)
+    assert limit.limit == 6
+
+    assert limit.acquire(0)
+    limit.release(CallOutcome.FAILURE)
+    assert limit.limit == 3
+    assert limit.acquire(0)
+    limit.release(CallOutcome.OVERLOAD)
+    assert limit.limit == 1
+
+
+def test_saturated_breaker_rejects_after_waiting() -> None:
+    clock, _ = _clock_generator()
+    breaker = _service_breaker(
+        MemoryBreakerBackend(),
+        clock,
+        limiter=AdaptiveConcurrencyLimit(initial=1, maximum=1),
+    )
+    held = breaker.acquire()
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.acquire(timeout=0.01)
+    assert excinfo.value.reason == "saturated"
+
+    released = threading.Timer(0.05, held.success)
+    released.start()
+    breaker.acquire(timeout=2).success()
+    released.join()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_registry_returns_one_breaker_per_service() -> None:
+    assert get_breaker("esco") is get_breaker("esco")
+    assert get_breaker("openai:gpt-a") is not get_breaker("openai:gpt-b")
+    assert get_breaker("esco").limiter.limit == 4
+
+
+def test_registry_and_memory_backend_drop_least_recently_used_services(monkeypatch: pytest.MonkeyPatch) -> None:
+    from utils import circuit_breaker
+
+    monkeypatch.setattr(circuit_breaker, "MAX_SERVICES", 2)
+    first = get_breaker("url_fetch:a.example")
+    get_breaker("url_fetch:b.example")
+    assert get_breaker("url_fetch:a.example") is first
+    get_breaker("url_fetch:c.example")
+
+    assert set(circuit_breaker.breaker_metrics()) == {"url_fetch:a.example", "url_fetch:c.example"}
+
+    backend = MemoryBreakerBackend(max_services=2)
+    for service in ("a", "b", "c"):
+        backend.update(service, lambda state: state.update(failures=1))
+    assert backend.read("a") == {}
+    assert backend.read("c") == {"failures": 1}
@@ -0,0 +1,32 @@
+"""Tests for numeric settings read from environment variables."""
+
+from __future__ import annotations
+
+import pytest
+
+from utils.env import env_float, env_int
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [("", 2.5), ("0.5", 0.5), ("abc", 2.5), ("0", 2.5), ("-1", 2.5), ("3", 2.5)],
+)
+def test_env_float_falls_back_on_invalid_or_out_of_range_values(
+    monkeypatch: pytest.MonkeyPatch, raw: str, expected: float
+) -> None:
+    monkeypatch.setenv("TEST_SETTING", raw)
+
+    assert env_float("TEST_SETTING", 2.5, positive=True, maximum=2.5) == expected
+
+
+def test_env_float_accepts_any_number_without_bounds(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TEST_SETTING", " -1.5 ")
+
+    assert env_float("TEST_SETTING", 2.5) == -1.5
+
+
+@pytest.mark.parametrize(("raw", "expected"), [("", 4), ("0", 0), ("-1", 4), ("2.5", 4), ("16", 16)])
+def test_env_int_respects_minimum(monkeypatch: pytest.MonkeyPatch, raw: str, expected: int) -> None:
+    monkeypatch.setenv("TEST_SETTING", raw)
+
+    assert env_int("TEST_SETTING", 4, minimum=0) == expected
@@ -12,6 +12,7 @@ import pytest
 import requests
 
 from core import esco_utils as esco
+from utils.circuit_breaker import CircuitState, get_breaker
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
 
@@ -164,6 +165,30 @@ def test_fetch_json_retries_transient_errors(monkeypatch):
     assert sleeps == [esco.RETRY_BACKOFF_BASE_SECONDS, esco.RETRY_BACKOFF_BASE_SECONDS * 2]
 
 
+def test_fetch_json_fails_fast_while_esco_circuit_is_open(monkeypatch):
+    """Once ESCO keeps timing out, later lookups skip the network entirely."""
+
+    attempts = {"count": 0}
+
+    def fake_get(*_args: Any, **_kwargs: Any) -> Any:
+        attempts["count"] += 1
+        raise requests.ConnectionError("esco down")
+
+    monkeypatch.setattr(esco._SESSION, "get", fake_get)
+    monkeypatch.setattr(esco.time, "sleep", lambda _seconds: None)
+
+    breaker = get_breaker("esco")
+    while breaker.current_state().state is not CircuitState.OPEN:
+        with pytest.raises(esco.EscoServiceError):
+            esco._fetch_json("https://example.test/search", {"text": "x"})
+    calls_before = attempts["count"]
+
+    with pytest.raises(esco.EscoServiceError):
+        esco._fetch_json("https://example.test/search", {"text": "x"})
+
+    assert attempts["count"] == calls_before == breaker.failure_threshold
+
+
 def test_fallback_notice_flag_is_set_for_cached_offline_result(monkeypatch):
     """API failures should set a UI notice flag when local ESCO data is used."""
 
@@ -60,6 +60,102 @@ def test_extract_pdf_ocr_failure(monkeypatch) -> None:
     assert "tesseract missing" in str(exc.value)
 
 
+def _blank_pdf_pages(count: int) -> io.BytesIO:
+    writer = PdfWriter()
+    for _ in range(count):
+        writer.add_blank_page(width=10, height=10)
+    buf = io.BytesIO()
+    writer.write(buf)
+    buf.seek(0)
+    buf.name = "multi.pdf"
+    return buf
+
+
+def test_extract_pdf_ocr_renders_contiguous_pages_once(monkeypatch) -> None:
+    calls: list[dict] = []
+
+    def _convert(data, **kwargs):
+        calls.append(kwargs)
+        return [f"img-{page}" for page in range(kwargs["first_page"], kwargs["last_page"] + 1)]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_bytes=_convert))
+    monkeypatch.setitem(sys.modules, "pytesseract", types.SimpleNamespace(image_to_string=lambda img: f"text {img}"))
+    monkeypatch.setattr(extractors, "PDF_OCR_DPI", 150)
+
+    result = extract_text_from_file(_blank_pdf_pages(3))
+
+    assert len(calls) == 1
+    assert calls[0]["first_page"] == 1 and calls[0]["last_page"] == 3
+    assert calls[0]["dpi"] == 150
+    assert [block.metadata["page"] for block in result.blocks] == [1, 2, 3]
+    assert "text img-2" in result.text
+
+
+def test_extract_pdf_reuses_cached_pages(monkeypatch) -> None:
+    calls: list[int] = []
+
+    def _convert(data, **kwargs):
+        calls.append(kwargs["first_page"])
+        return [object()]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_bytes=_convert))
+    monkeypatch.setitem(sys.modules, "pytesseract", types.SimpleNamespace(image_to_string=lambda img: "OCR TEXT"))
+
+    first = extract_text_from_file(_blank_pdf())
+    second = extract_text_from_file(_blank_pdf())
+
+    assert first.text == second.text == "OCR TEXT"
+    assert calls == [1]
+
+
+def test_chunk_pages_and_worker_count(monkeypatch) -> None:
+    assert extractors._chunk_pages([1, 2, 3, 4, 5], 2) == [[1, 2, 3], [4, 5]]
+    assert extractors._contiguous_runs([5, 1, 2, 4]) == [(1, 2), (4, 5)]
+    monkeypatch.setattr(extractors, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(extractors, "PDF_EXTRACTION_WORKERS", 3)
+    assert extractors._pdf_worker_count(3) == 1
+    assert extractors._pdf_worker_count(10) == 3
+
+
+def test_extract_pdf_reads_text_layer_without_process_pool(monkeypatch) -> None:
+    import fitz
+
+    document = fitz.open()
+    for idx in range(4):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Page {idx + 1} content")
+    data = document.tobytes()
+
+    monkeypatch.setattr(extractors, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(extractors, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(extractors, "_ocr_pool", lambda: pytest.fail("text pages must not start the pool"))
+    result = extractors._extract_pdf(io.BytesIO(data), "text.pdf")
+
+    assert "Page 4 content" in result.text
+
+
+def test_extract_pdf_fans_out_only_scanned_pages(monkeypatch) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls: list[tuple[int, int]] = []
+
+    def _convert(data, **kwargs):
+        calls.append((kwargs["first_page"], kwargs["last_page"]))
+        return [f"img-{page}" for page in range(kwargs["first_page"], kwargs["last_page"] + 1)]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_bytes=_convert))
+    monkeypatch.setitem(sys.modules, "pytesseract", types.SimpleNamespace(image_to_string=lambda img: f"text {img}"))
+    monkeypatch.setattr(extractors, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(extractors, "PDF_EXTRACTION_WORKERS", 2)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(extractors, "_ocr_pool", lambda: pool)
+        result = extract_text_from_file(_blank_pdf_pages(4))
+
+    assert sorted(calls) == [(1, 2), (3, 4)]
+    assert [block.metadata["page"] for block in result.blocks] == [1, 2, 3, 4]
+    assert "text img-4" in result.text
+
+
 def test_extract_empty_file() -> None:
     f = io.BytesIO(b"")
     f.name = "d.txt"
@@ -7,6 +7,9 @@ from openai import OpenAIError
 import openai_utils.api as api
 from config import APIMode, ModelTask, resolve_api_mode, set_api_mode
 from models.need_analysis import NeedAnalysisProfile
+from openai_utils.errors import ExternalServiceError
+from openai_utils.rate_limiter import RateLimitQueueTimeout
+from utils.circuit_breaker import get_breaker
 
 
 class _ChatStub:
@@ -84,3 +87,39 @@ def test_classic_chat_alignment(monkeypatch: pytest.MonkeyPatch) -> None:
 
     parsed = json.loads(result.content or "{}")
     assert parsed == expected_profile
+
+
+def test_rate_limit_queue_timeout_surfaces_as_service_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _queue_timeout(*_: object, **__: object) -> None:
+        raise RateLimitQueueTimeout("no capacity")
+
+    monkeypatch.setattr(api, "_execute_response", _queue_timeout)
+
+    with pytest.raises(ExternalServiceError) as excinfo:
+        api.call_chat_api(_messages(), model="queued-model", task=ModelTask.EXTRACTION)
+
+    assert excinfo.value.details["reason"] == "rate_limited"
+
+
+def test_legacy_chat_fallback_respects_open_circuit(monkeypatch: pytest.MonkeyPatch) -> None:
+    chat_calls: list[dict[str, object]] = []
+    stub_client = _ClientStub("{}")
+    stub_client.chat.completions = SimpleNamespace(create=lambda **kwargs: chat_calls.append(kwargs))
+
+    def _trip_circuit_and_fail(_payload: object, model: str, **__: object) -> None:
+        breaker = get_breaker(f"openai:{model}")
+        for _ in range(breaker.failure_threshold):
+            breaker.acquire().failure()
+        raise OpenAIError("bad request")
+
+    monkeypatch.setattr(api, "get_client", lambda: stub_client)
+    monkeypatch.setattr(api, "_execute_response", _trip_circuit_and_fail)
+    previous_mode = resolve_api_mode()
+    set_api_mode(APIMode.RESPONSES)
+    try:
+        with pytest.raises((RuntimeError, ExternalServiceError)):
+            api.call_chat_api(_messages(), model="fallback-model", task=ModelTask.EXTRACTION)
+    finally:
+        set_api_mode(previous_mode)
+
+    assert chat_calls == []
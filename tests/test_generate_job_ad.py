@@ -225,3 +225,79 @@ def test_stream_job_ad_returns_stream(monkeypatch):
 
     assert list(stream) == ["Hello world"]
     assert fallback.startswith("#")
+
+
+def _fake_vector_store_search(monkeypatch, texts: list[str]) -> list[dict]:
+    from types import SimpleNamespace
+
+    from llm import rag_pipeline
+
+    searches: list[dict] = []
+
+    def search(vector_store_id, **kwargs):
+        searches.append({"vector_store_id": vector_store_id, **kwargs})
+        results = [
+            SimpleNamespace(
+                file_id="f1",
+                filename="benefits.md",
+                score=0.9,
+                attributes={},
+                content=[SimpleNamespace(type="text", text=text)],
+            )
+            for text in texts
+        ]
+        return SimpleNamespace(data=results)
+
+    client = SimpleNamespace(vector_stores=SimpleNamespace(search=search))
+    client.with_options = lambda **_options: client
+    rag_pipeline.clear_passage_cache()
+    monkeypatch.setattr(rag_pipeline, "get_client", lambda: client)
+    return searches
+
+
+def test_stream_job_ad_inlines_retrieved_passages(monkeypatch):
+    from llm import rag_pipeline
+
+    searches = _fake_vector_store_search(monkeypatch, ["We offer a 4-day week."])
+    streamed: dict[str, object] = {}
+
+    def fake_stream(messages, **kwargs):
+        streamed["messages"] = messages
+        streamed["kwargs"] = kwargs
+        return iter(["# Engineer"])
+
+    monkeypatch.setattr(openai_utils.api, "stream_chat_api", fake_stream)
+
+    session = {"position": {"job_title": "Engineer"}, "company": {"name": "Acme"}, "lang": "en"}
+    for _ in range(2):
+        stream, _fallback = openai_utils.stream_job_ad(
+            session,
+            selected_fields=["position.job_title", "company.name"],
+            target_audience="Builders",
+            lang="en",
+            vector_store_id="vs123",
+        )
+
+    assert list(stream) == ["# Engineer"]
+    assert len(searches) == 1
+    assert searches[0]["vector_store_id"] == "vs123"
+    assert searches[0]["max_num_results"] == 4
+    assert "tools" not in streamed["kwargs"]
+    assert "We offer a 4-day week." in _collect_prompt_text(streamed["messages"])
+    rag_pipeline.clear_passage_cache()
+
+
+def test_stream_job_ad_without_passages_defers_to_file_search(monkeypatch):
+    _fake_vector_store_search(monkeypatch, [])
+    monkeypatch.setattr(
+        openai_utils.api, "stream_chat_api", lambda *args, **kwargs: pytest.fail("streamed without passages")
+    )
+
+    with pytest.raises(RuntimeError):
+        openai_utils.stream_job_ad(
+            {"position": {"job_title": "Engineer"}, "lang": "en"},
+            selected_fields=["position.job_title"],
+            target_audience="Builders",
+            lang="en",
+            vector_store_id="vs123",
+        )
@@ -0,0 +1,222 @@
+"""Tests for the headless extraction/generation API and its job queue."""
+
+from __future__ import annotations
+
+import base64
+import socket
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from openai_utils import server, service
+from pipelines import need_analysis
+from pipelines.jobs import IdempotencyConflict, JobQueue, JobStatus
+
+
+@pytest.fixture
+def webhooks() -> list[tuple[str, dict[str, Any]]]:
+    return []
+
+
+@pytest.fixture
+def queue(monkeypatch: pytest.MonkeyPatch, webhooks: list[tuple[str, dict[str, Any]]]) -> Iterator[JobQueue]:
+    job_queue = JobQueue({"extract": 2, "generate": 2}, webhook_sender=lambda url, doc: webhooks.append((url, doc)))
+    monkeypatch.setattr(service, "_queue", job_queue)
+    yield job_queue
+    job_queue.shutdown()
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(service, "API_KEYS", ("secret-key",))
+    return TestClient(server.app, headers={"Authorization": "Bearer secret-key"})
+
+
+def test_queue_replays_idempotent_submissions_and_rejects_conflicts(queue: JobQueue) -> None:
+    release = threading.Event()
+
+    def slow(progress: Any) -> str:
+        progress("working")
+        release.wait(5)
+        return "done"
+
+    job, created = queue.submit("demo", slow, pool="generate", fingerprint="a", idempotency_key="key-1")
+    replay, replay_created = queue.submit("demo", slow, pool="generate", fingerprint="a", idempotency_key="key-1")
+    assert created and not replay_created
+    assert replay is job
+    with pytest.raises(IdempotencyConflict):
+        queue.submit("demo", slow, pool="generate", fingerprint="b", idempotency_key="key-1")
+
+    release.set()
+    finished = queue.wait(job.id, timeout=5)
+    assert finished is not None
+    assert finished.status is JobStatus.SUCCEEDED
+    assert finished.stage == "working"
+    assert finished.result == "done"
+
+
+def test_failed_job_reports_error_and_calls_webhook(
+    queue: JobQueue, webhooks: list[tuple[str, dict[str, Any]]]
+) -> None:
+    def failing(_progress: Any) -> None:
+        raise ValueError("bad input")
+
+    job, _ = queue.submit("demo", failing, pool="extract", fingerprint="x", webhook_url="https://ats.example/hook")
+    queue.wait(job.id, timeout=5)
+
+    assert job.status is JobStatus.FAILED
+    assert job.error == "bad input"
+    assert webhooks == [("https://ats.example/hook", job.to_dict())]
+
+
+def test_extract_endpoint_runs_pipeline_without_streamlit(
+    monkeypatch: pytest.MonkeyPatch, queue: JobQueue, client: TestClient
+) -> None:
+    captured: dict[str, Any] = {}
+
+    def fake_extract(text: str, **kwargs: Any) -> need_analysis.ExtractionResult:
+        captured.update(text=text, **kwargs)
+        return need_analysis.ExtractionResult(
+            raw_json="{}", data={"position": {"job_title": "Dev"}}, recovered=False, issues=[]
+        )
+
+    monkeypatch.setattr(need_analysis, "extract_need_analysis_profile", fake_extract)
+    content = base64.b64encode(b"Senior Developer\n\nWe build things.").decode()
+
+    response = client.post(
+        "/v1/extract?wait=5",
+        json={"file": {"name": "posting.txt", "content_base64": content}, "title": "Developer"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == "succeeded"
+    assert payload["result"]["profile"] == {"position": {"job_title": "Dev"}}
+    assert "Senior Developer" in captured["text"]
+    assert captured["title_hint"] == "Developer"
+    polled = client.get(response.headers["location"]).json()
+    assert polled == payload
+
+
+def test_submission_validation_and_idempotency_over_http(queue: JobQueue, client: TestClient) -> None:
+    body = {"profile": {"requirements": {"hard_skills_required": ["Python"]}}, "candidates": [{"skills": ["Python"]}]}
+
+    assert client.post("/v1/extract", json={"text": "a", "url": "https://example.com"}).status_code == 422
+    first = client.post("/v1/match?wait=5", json=body, headers={"Idempotency-Key": "m-1"})
+    replay = client.post("/v1/match", json=body, headers={"Idempotency-Key": "m-1"})
+    conflict = client.post("/v1/match", json={**body, "candidates": []}, headers={"Idempotency-Key": "m-1"})
+
+    assert first.status_code == 200
+    assert first.json()["result"]["candidates"][0]["highlighted_skills"] == ["Python"]
+    assert replay.json()["id"] == first.json()["id"]
+    assert replay.headers["idempotent-replay"] == "true"
+    assert conflict.status_code == 409
+    assert client.get("/v1/jobs/unknown").status_code == 404
+
+
+def test_event_stream_ends_with_result(queue: JobQueue, client: TestClient) -> None:
+    response = client.post(
+        "/v1/match",
+        json={"profile": {}, "candidates": []},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [frame.split("\n")[0] for frame in response.text.split("\n\n") if frame.startswith("event:")]
+    assert events[-1] == "event: result"
+
+
+def test_jobs_run_under_their_own_session(queue: JobQueue) -> None:
+    from utils.logging_context import get_session_id
+
+    first, _ = queue.submit("demo", lambda _progress: get_session_id(), pool="generate", fingerprint="1")
+    second, _ = queue.submit("demo", lambda _progress: get_session_id(), pool="generate", fingerprint="2")
+    queue.wait(first.id, timeout=5)
+    queue.wait(second.id, timeout=5)
+
+    assert first.result == first.id
+    assert second.result == second.id
+
+
+def test_api_requires_a_configured_key(monkeypatch: pytest.MonkeyPatch, queue: JobQueue) -> None:
+    body = {"profile": {}, "candidates": []}
+
+    monkeypatch.setattr(service, "API_KEYS", ())
+    assert TestClient(server.app).post("/v1/match", json=body).status_code == 503
+
+    monkeypatch.setattr(service, "API_KEYS", ("secret-key",))
+    anonymous = TestClient(server.app)
+    assert anonymous.post("/v1/match", json=body).status_code == 401
+    assert anonymous.get("/v1/health", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert anonymous.get("/v1/health", headers={"X-API-Key": "secret-key"}).status_code == 200
+
+
+def test_usage_is_billed_to_the_tenant_of_the_api_key(monkeypatch: pytest.MonkeyPatch, queue: JobQueue) -> None:
+    from utils.usage_ledger import current_tenant
+
+    tenants: list[str] = []
+    monkeypatch.setattr(service, "API_KEYS", ("acme:acme-key", "plain-key"))
+
+    def fake_match(request: Any, progress: Any) -> str:
+        tenants.append(current_tenant())
+        return "ok"
+
+    monkeypatch.setattr(service, "_match", fake_match)
+    body = {"profile": {}, "candidates": []}
+    for key in ("acme-key", "plain-key"):
+        response = TestClient(server.app, headers={"X-API-Key": key}).post(
+            "/v1/match?wait=5", json=body, headers={"Idempotency-Key": "same"}
+        )
+        assert response.status_code == 200
+
+    assert tenants[0] == "acme"
+    assert tenants[1].startswith("key-") and "plain-key" not in tenants[1]
+    assert TestClient(server.app, headers={"X-API-Key": "acme"}).get("/v1/health").status_code == 401
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://localhost:8080/admin",
+        "http://10.0.0.5/",
+        "http://169.254.169.254/latest/meta-data",
+        "file:///etc/passwd",
+    ],
+)
+def test_extract_rejects_urls_of_internal_hosts(queue: JobQueue, client: TestClient, url: str) -> None:
+    assert client.post("/v1/extract", json={"url": url}).status_code == 422
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://ats.example/hook",
+        "https://user:pw@ats.example/hook",
+        "https://localhost/hook",
+        "https://127.0.0.1/hook",
+        "https://169.254.169.254/latest/meta-data",
+        "https://[::1]/hook",
+        "https://metadata/hook",
+    ],
+)
+def test_webhook_urls_to_internal_hosts_are_rejected(queue: JobQueue, client: TestClient, url: str) -> None:
+    response = client.post("/v1/match", json={"profile": {}, "candidates": [], "webhook_url": url})
+
+    assert response.status_code == 422
+
+
+def test_webhook_allow_list_and_delivery_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    from pipelines import jobs
+
+    assert jobs.check_webhook_url("https://ats.example/hook") == "https://ats.example/hook"
+    monkeypatch.setattr(socket, "getaddrinfo", lambda *args: [(None, None, None, "", ("10.0.0.5", 443))])
+    with pytest.raises(ValueError):
+        jobs.check_webhook_url("https://ats.example/hook", resolve=True)
+
+    monkeypatch.setattr(jobs, "WEBHOOK_ALLOWED_HOSTS", ("ats.example",))
+    assert jobs.check_webhook_url("https://hooks.ats.example/a", resolve=True)
+    with pytest.raises(ValueError):
+        jobs.check_webhook_url("https://other.example/a")
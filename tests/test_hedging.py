@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from openai_utils import api, hedging
+from openai_utils.api import ChatCallResult
+from utils.cancellation import current_token
+
+
+@pytest.fixture(autouse=True)
+def _reset_hedging() -> None:
+    hedging.reset_hedging()
+    yield
+    hedging.reset_hedging()
+
+
+def _plan(delay: float = 0.05, hedge_model: str = "model-b") -> hedging.HedgePlan:
+    return hedging.HedgePlan(task="salary_estimate", primary_model="model-a", hedge_model=hedge_model, delay=delay)
+
+
+def test_hedge_wins_when_primary_is_slow_and_loser_is_cancelled() -> None:
+    release_primary = threading.Event()
+    tokens: dict[str, Any] = {}
+    discarded: list[tuple[str, str]] = []
+    discarded_event = threading.Event()
+
+    def attempt(model: str) -> str:
+        tokens[model] = current_token()
+        if model == "model-a":
+            release_primary.wait(5)
+        return f"answer from {model}"
+
+    def on_discarded(model: str, value: str) -> None:
+        discarded.append((model, value))
+        discarded_event.set()
+
+    outcome = hedging.run_hedged(_plan(), attempt, on_discarded=on_discarded)
+
+    assert outcome.value == "answer from model-b"
+    assert outcome.hedged and outcome.hedge_won
+    assert tokens["model-a"].cancelled
+    assert not tokens["model-b"].cancelled
+
+    release_primary.set()
+    assert discarded_event.wait(5)
+    assert discarded == [("model-a", "answer from model-a")]
+    assert hedging.hedge_stats() == {"calls": 1, "hedged": 1, "hedge_wins": 1, "budget_exhausted": 0}
+
+
+def test_fast_primary_is_not_hedged() -> None:
+    calls: list[str] = []
+
+    outcome = hedging.run_hedged(_plan(delay=1.0), lambda model: calls.append(model) or model)
+
+    assert outcome.value == "model-a"
+    assert not outcome.hedged
+    assert calls == ["model-a"]
+
+
+def test_primary_error_before_hedge_delay_is_raised() -> None:
+    def attempt(model: str) -> str:
+        raise RuntimeError(f"{model} failed")
+
+    with pytest.raises(RuntimeError, match="model-a failed"):
+        hedging.run_hedged(_plan(delay=1.0), attempt)
+
+
+def test_hedge_budget_limits_duplicate_requests() -> None:
+    started: list[str] = []
+    lock = threading.Lock()
+
+    def attempt(model: str) -> str:
+        with lock:
+            started.append(model)
+        if model == "model-a":
+            time.sleep(0.15)
+        return model
+
+    for _ in range(3):
+        hedging.run_hedged(_plan(), attempt)
+
+    # One initial credit plus 3 * 5% earned: only the first call may hedge.
+    assert started.count("model-b") == 1
+    assert hedging.hedge_stats()["budget_exhausted"] == 2
+
+
+def test_plan_uses_observed_tail_latency_and_fallback_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(hedging, "get_model_fallbacks_for", lambda _task: ["model-a", "model-b", "model-c"])
+
+    initial = hedging.plan_hedge("salary_estimate", "model-a", to_fallback=True)
+    assert initial is not None
+    assert initial.delay == hedging.HEDGE_INITIAL_DELAY
+    assert initial.hedge_model == "model-b"
+
+    for index in range(100):
+        hedging.record_latency("salary_estimate", "model-a", 1.0 + index / 100)
+    observed = hedging.plan_hedge("salary_estimate", "model-a", to_fallback=False)
+    assert observed is not None
+    assert observed.delay == pytest.approx(1.95)
+    assert observed.hedge_model == "model-a"
+
+
+def test_call_chat_api_hedges_and_records_discarded_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    release_primary = threading.Event()
+    discarded = threading.Event()
+    models: list[str | None] = []
+
+    def fake_single(messages: Any, **kwargs: Any) -> ChatCallResult:
+        models.append(kwargs.get("model"))
+        if kwargs.get("model") is None:
+            release_primary.wait(5)
+            return ChatCallResult("slow", [], {"input_tokens": 10, "output_tokens": 5})
+        return ChatCallResult("fast", [], {"input_tokens": 10, "output_tokens": 3})
+
+    original_record = api._record_hedge_usage
+
+    def record(usage: Any, *, task: Any) -> None:
+        original_record(usage, task=task)
+        discarded.set()
+
+    monkeypatch.setattr(api, "_call_chat_api_single", fake_single)
+    monkeypatch.setattr(api, "_record_hedge_usage", record)
+    monkeypatch.setattr(hedging, "HEDGE_INITIAL_DELAY", 0.05)
+    monkeypatch.setattr(hedging, "HEDGE_MIN_DELAY", 0.01)
+    monkeypatch.setattr(hedging, "HEDGE_TO_FALLBACK", True)
+    monkeypatch.setattr(hedging, "select_model", lambda _task: "model-a")
+    monkeypatch.setattr(hedging, "get_model_fallbacks_for", lambda _task: ["model-a", "model-b"])
+    before = api.get_hedge_usage()
+
+    result = api.call_chat_api([{"role": "user", "content": "hi"}], task="salary_estimate", hedge=True)
+
+    assert result.content == "fast"
+    assert models == [None, "model-b"]
+    release_primary.set()
+    assert discarded.wait(5)
+    after = api.get_hedge_usage()
+    assert after["discarded_requests"] == before["discarded_requests"] + 1
+    assert after["output_tokens"] == before["output_tokens"] + 5
+    assert after["by_task"]["salary_estimate"]["input"] >= 10
+
+
+def test_call_chat_api_does_not_hedge_tool_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(api, "_call_chat_api_single", lambda messages, **kwargs: ChatCallResult("ok", [], {}))
+    monkeypatch.setattr(api, "_call_chat_api_hedged", lambda *_a, **_k: pytest.fail("tool calls must not hedge"))
+
+    result = api.call_chat_api(
+        [{"role": "user", "content": "hi"}],
+        task="salary_estimate",
+        tools=[{"type": "function", "name": "noop"}],
+        hedge=True,
+    )
+
+    assert result.content == "ok"
@@ -16,6 +16,7 @@ from ingest.heuristics import (
 )
 from openai_utils.extraction import _prepare_job_ad_payload
 from models.need_analysis import NeedAnalysisProfile
+from utils import logging_context
 from utils.json_parse import parse_extraction
 
 
@@ -36,6 +37,15 @@ def _has_spacy_pipeline() -> bool:
 HAS_SPACY_PIPELINE = _has_spacy_pipeline()
 
 
+@pytest.fixture
+def unsampled_heuristics_log(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep every DEBUG record of the sampled heuristics logger."""
+
+    for flt in logging.getLogger("cognitive_needs.heuristics").filters:
+        if isinstance(flt, logging_context._DebugSampler):
+            monkeypatch.setattr(flt, "rate", 1.0)
+
+
 def test_guess_job_title_retains_gender_suffix() -> None:
     text = "Senior Data Scientist (m/w/d) – RAG, OpenAI & Recruiting Tech"
     assert guess_job_title(text) == "Senior Data Scientist (m/w/d)"
@@ -224,9 +234,10 @@ def test_language_extraction_handles_mandarin_optional() -> None:
     assert "Chinese" in profile.requirements.languages_optional
 
 
+@pytest.mark.usefixtures("unsampled_heuristics_log")
 def test_apply_basic_fallbacks_logs_city(caplog: pytest.LogCaptureFixture) -> None:
     text = "Standort: Stuttgart"
-    with caplog.at_level(logging.INFO, logger="cognitive_needs.heuristics"):
+    with caplog.at_level(logging.DEBUG, logger="cognitive_needs.heuristics"):
         profile = apply_basic_fallbacks(NeedAnalysisProfile(), text)
 
     assert profile.location.primary_city == "Stuttgart"
@@ -238,9 +249,10 @@ def test_apply_basic_fallbacks_logs_city(caplog: pytest.LogCaptureFixture) -> No
     assert record.heuristic_rule in {"city_regex", "city_entity", "city_regex_retry"}
 
 
+@pytest.mark.usefixtures("unsampled_heuristics_log")
 def test_apply_basic_fallbacks_logs_benefits(caplog: pytest.LogCaptureFixture) -> None:
     text = "Benefits:\n- Lunch subsidy\n- Gym membership"
-    with caplog.at_level(logging.INFO, logger="cognitive_needs.heuristics"):
+    with caplog.at_level(logging.DEBUG, logger="cognitive_needs.heuristics"):
         profile = apply_basic_fallbacks(NeedAnalysisProfile(), text)
 
     assert profile.compensation.benefits == ["Lunch subsidy", "Gym membership"]
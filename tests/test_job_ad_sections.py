@@ -0,0 +1,143 @@
+"""Tests for section-parallel job ad generation."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import openai_utils
+import pipelines.job_ad_sections as sections_module
+from openai_utils.api import ChatCallResult
+from pipelines.executor import SharedExecutor
+from pipelines.job_ad_sections import JobAdSection, generate_job_ad_sections, stream_job_ad_sections
+from pipelines.result_store import MemoryResultStore
+
+_FIELDS = [
+    "position.job_title",
+    "position.role_summary",
+    "company.name",
+    "responsibilities.items",
+    "requirements.hard_skills_required",
+    "compensation.benefits",
+]
+
+
+def _session(**overrides: Any) -> dict[str, Any]:
+    session: dict[str, Any] = {
+        "position": {"job_title": "Data Engineer", "role_summary": "Build pipelines."},
+        "company": {"name": "Acme"},
+        "responsibilities": {"items": ["Own the ETL stack"]},
+        "requirements": {"hard_skills_required": ["Python", "SQL"]},
+        "compensation": {"benefits": ["Remote work"]},
+        "lang": "en",
+    }
+    for group, values in overrides.items():
+        session[group] = {**session[group], **values}
+    return session
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    recorded: list[str] = []
+    lock = threading.Lock()
+
+    def fake_call(messages: list[dict[str, str]], **_: Any) -> ChatCallResult:
+        section = next(s for s in JobAdSection if f"[{s.value}]" in messages[-1]["content"])
+        with lock:
+            recorded.append(section.value)
+        return ChatCallResult(f"<{section.value}>", [], {})
+
+    monkeypatch.setattr(openai_utils.api, "call_chat_api", fake_call)
+    monkeypatch.setattr(sections_module, "is_llm_available", lambda: True)
+    monkeypatch.setattr(
+        sections_module,
+        "_section_messages",
+        lambda section, inputs, payload: [{"role": "user", "content": f"[{section.value}] {inputs}"}],
+    )
+    return recorded
+
+
+@pytest.fixture
+def executor() -> Iterator[SharedExecutor]:
+    pool = SharedExecutor(3, name="job-ad-test")
+    yield pool
+    pool.shutdown()
+
+
+def _generate(session: dict[str, Any], store: MemoryResultStore, executor: SharedExecutor, **kwargs: Any) -> str:
+    options: dict[str, Any] = {"target_audience": "Engineers", "tone": "casual", "lang": "en", "model": "test-model"}
+    return generate_job_ad_sections(session, _FIELDS, store=store, executor=executor, **{**options, **kwargs})
+
+
+def test_editing_one_field_regenerates_only_its_section(calls: list[str], executor: SharedExecutor) -> None:
+    store = MemoryResultStore(maxsize=32)
+
+    first = _generate(_session(), store, executor)
+    assert sorted(calls) == sorted(s.value for s in JobAdSection if s is not JobAdSection.PROCESS)
+    assert first.index("<intro>") < first.index("<requirements>") < first.index("<cta>")
+
+    calls.clear()
+    _generate(_session(compensation={"benefits": ["Remote work", "Gym"]}), store, executor)
+    assert calls == ["benefits"]
+
+    calls.clear()
+    _generate(_session(), store, executor, tone="formal")
+    assert len(calls) == len(JobAdSection) - 1
+
+
+def test_manual_sections_are_kept_verbatim_before_the_cta(calls: list[str], executor: SharedExecutor) -> None:
+    output = _generate(
+        _session(),
+        MemoryResultStore(maxsize=32),
+        executor,
+        manual_sections=[{"title": "Culture", "content": "We *celebrate* learning."}],
+    )
+
+    assert "## Culture\nWe *celebrate* learning." in output
+    assert output.index("<benefits>") < output.index("## Culture")
+    assert output.index("## Culture") < output.index("<cta>")
+    assert all("celebrate" not in call for call in calls)
+
+
+def test_stream_yields_progressive_drafts(calls: list[str], executor: SharedExecutor) -> None:
+    drafts = list(
+        stream_job_ad_sections(
+            _session(),
+            _FIELDS,
+            target_audience="Engineers",
+            lang="en",
+            model="test-model",
+            store=MemoryResultStore(maxsize=32),
+            executor=executor,
+        )
+    )
+
+    assert not drafts[0].completed
+    completed_counts = [len(draft.completed) for draft in drafts]
+    assert completed_counts == sorted(completed_counts)
+    assert drafts[-1].done
+    assert len(drafts) == len(drafts[-1].completed) + 1
+
+
+def test_failed_section_falls_back_and_is_not_cached(
+    monkeypatch: pytest.MonkeyPatch, calls: list[str], executor: SharedExecutor
+) -> None:
+    def failing_call(messages: list[dict[str, str]], **_: Any) -> ChatCallResult:
+        if "[requirements]" in messages[-1]["content"]:
+            raise RuntimeError("boom")
+        return ChatCallResult("ok", [], {})
+
+    monkeypatch.setattr(openai_utils.api, "call_chat_api", failing_call)
+    store = MemoryResultStore(maxsize=32)
+
+    output = _generate(_session(), store, executor)
+    assert "- Python" in output
+
+    monkeypatch.setattr(
+        openai_utils.api, "call_chat_api", lambda messages, **_: calls.append("retry") or ChatCallResult("ok", [], {})
+    )
+    _generate(_session(), store, executor)
+    assert calls == ["retry"]
@@ -36,3 +36,17 @@ def test_parse_json_failure() -> None:
     assert result.status is JsonRepairStatus.FAILED
     assert result.payload is None
     assert result.issues
+
+
+def test_parse_json_single_quoted_object_uses_repair_func() -> None:
+    calls: list[object] = []
+
+    def repair(payload: object, errors: object) -> dict[str, str]:
+        calls.append(errors)
+        return {"title": "Engineer"}
+
+    result = parse_json_with_repair("{'title': 'Engineer'}", repair_func=repair)
+
+    assert calls
+    assert result.payload == {"title": "Engineer"}
+    assert result.repair_confidence == 0.35
@@ -0,0 +1,67 @@
+"""Tests for the single-pass JSON salvage parser."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from utils.json_salvage import salvage_json_object
+
+
+def test_valid_json_is_returned_without_repairs() -> None:
+    result = salvage_json_object('{"a": [1, 2.5, true, null], "b": {"c": "x"}}')
+
+    assert result.value == {"a": [1, 2.5, True, None], "b": {"c": "x"}}
+    assert not result.repaired
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected", "repair"),
+    [
+        ('```json\n{"a": [1, 2,],}\n```', {"a": [1, 2]}, "trailing comma"),
+        ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}, "closed 3 unterminated"),
+        ('{"a": 1, "summary": "Great culture}', {"a": 1, "summary": "Great culture"}, "unterminated string"),
+        ('{"a": 1, "b":', {"a": 1}, "dropped key 'b'"),
+        ('{"a": 1 "b": 2}', {"a": 1, "b": 2}, "missing comma"),
+        ("{a: True}", {"a": True}, "bare key"),
+        ('{"a": "caf\\u00', {"a": "caf"}, "unterminated string"),
+    ],
+)
+def test_malformed_objects_are_repaired_with_diagnostics(raw: str, expected: dict, repair: str) -> None:
+    result = salvage_json_object(raw)
+
+    assert result.value == expected
+    assert any(repair in entry for entry in result.repairs), result.repairs
+
+
+@pytest.mark.parametrize("raw", ["{'a': 'b'}", '{"a": .5}', "Sorry {with that}"])
+def test_unparseable_objects_are_not_returned_as_empty(raw: str) -> None:
+    result = salvage_json_object(raw)
+
+    assert result.value is None
+    assert any("stopped at unexpected" in entry for entry in result.repairs), result.repairs
+
+
+def test_largest_object_wins_and_surrounding_text_is_reported() -> None:
+    raw = 'Noise {"a": 1} more {"b": {"c": [1, 2]}, "d": "e"} thanks'
+
+    result = salvage_json_object(raw)
+
+    assert result.value == {"b": {"c": [1, 2]}, "d": "e"}
+    assert raw[result.start : result.end].startswith('{"b"')
+    assert any("leading" in entry for entry in result.repairs)
+    assert any("trailing" in entry for entry in result.repairs)
+    assert salvage_json_object("no braces here").value is None
+
+
+def test_large_truncated_output_keeps_every_complete_item() -> None:
+    items = [{"name": f"skill-{index}", "weight": index / 1000} for index in range(5000)]
+    raw = json.dumps({"skills": items})[:-40]
+
+    result = salvage_json_object(raw)
+
+    assert result.value is not None
+    salvaged = result.value["skills"]
+    assert salvaged[: len(salvaged) - 1] == items[: len(salvaged) - 1]
+    assert len(salvaged) >= len(items) - 2
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import io
+import json
 import logging
 from typing import Any
 
 from pipelines.workflow import Task, WorkflowRunner
+from utils import logging_context
 from utils.logging_context import configure_logging, log_context, set_session_id
 
 
@@ -27,3 +30,45 @@ def test_workflow_logging_includes_context(caplog: Any) -> None:
     assert record.session_id == "session-123"
     assert record.wizard_step == "step_company"
     assert record.pipeline_task == "mock-task"
+
+
+def test_async_logging_formats_json_with_context_in_listener_thread() -> None:
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging_context.JsonFormatter())
+    logger = logging.getLogger("test.logging.async")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logging_context._start_async_logging(logger, handler)
+    payload = {"fields": ["company.name"]}
+    try:
+        with log_context(session_id="session-async", wizard_step="step_role"):
+            logger.info("event %s", payload, extra={"heuristic_rule": "city_regex"})
+            logger.info("flow_event %s", logging_context.LazyJson({"event": "next"}))
+        payload["fields"].append("mutated")
+    finally:
+        logging_context.stop_async_logging()
+        for queue_handler in list(logger.handlers):
+            logger.removeHandler(queue_handler)
+        logger.propagate = True
+
+    first, second = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert first["message"] == "event {'fields': ['company.name']}"
+    assert first["session_id"] == "session-async"
+    assert first["wizard_step"] == "step_role"
+    assert first["heuristic_rule"] == "city_regex"
+    assert second["message"] == 'flow_event {"event": "next"}'
+
+
+def test_debug_records_of_sampled_loggers_are_dropped_at_rate_zero(caplog: Any) -> None:
+    logger = logging.getLogger("test.logging.sampled")
+    sampler = logging_context._DebugSampler(0.0)
+    logger.addFilter(sampler)
+    try:
+        with caplog.at_level(logging.DEBUG, logger=logger.name):
+            logger.debug("optional field not found")
+            logger.info("heuristic filled")
+    finally:
+        logger.removeFilter(sampler)
+
+    assert [record.getMessage() for record in caplog.records] == ["heuristic filled"]
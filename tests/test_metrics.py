@@ -0,0 +1,101 @@
+"""Tests for the metric instruments and their bootstrap."""
+
+from __future__ import annotations
+
+import io
+from typing import Any, Iterator
+
+import pytest
+from opentelemetry import metrics as otel_metrics
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from ingest.extractors import extract_text_from_file
+from pipelines.result_store import MemoryResultStore
+from pipelines.workflow import Task, WorkflowRunner
+from utils import metrics, telemetry
+
+
+@pytest.fixture
+def reader() -> Iterator[InMemoryMetricReader]:
+    reader = InMemoryMetricReader()
+    metrics.configure_metrics(telemetry.build_meter_provider([reader]))
+    yield reader
+    metrics.configure_metrics(None)
+
+
+def _points(reader: InMemoryMetricReader) -> dict[str, list[Any]]:
+    collected: dict[str, list[Any]] = {}
+    data = reader.get_metrics_data()
+    for resource_metrics in data.resource_metrics if data else ():
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                collected.setdefault(metric.name, []).extend(metric.data.data_points)
+    return collected
+
+
+def test_llm_metrics_use_second_buckets_and_task_model_attributes(reader: InMemoryMetricReader) -> None:
+    metrics.record_llm_call("job_ad", "gpt-5-nano", latency=2.0, ttft=0.5, output_tokens=300)
+    metrics.record_llm_call("job_ad", "gpt-5-nano", latency=9.0, error=True)
+
+    points = _points(reader)
+    (duration,) = points["llm.request.duration"]
+    assert dict(duration.attributes) == {"task": "job_ad", "model": "gpt-5-nano"}
+    assert tuple(duration.explicit_bounds) == metrics.DURATION_BUCKETS
+    assert duration.sum == pytest.approx(2.0)
+    assert points["llm.request.time_to_first_token"][0].sum == pytest.approx(0.5)
+    assert points["llm.response.tokens_per_second"][0].sum == pytest.approx(200.0)
+    assert points["llm.request.errors"][0].value == 1
+
+
+def test_ingestion_and_pdf_cache_metrics(reader: InMemoryMetricReader) -> None:
+    upload = io.BytesIO(b"Senior Data Engineer in Berlin")
+    upload.name = "vacancy.txt"
+    extract_text_from_file(upload)
+
+    with pytest.raises(ValueError):
+        bad_upload = io.BytesIO(b"MZ")
+        bad_upload.name = "setup.exe"
+        extract_text_from_file(bad_upload)
+
+    points = _points(reader)
+    sizes = {
+        (point.attributes["source_type"], point.attributes["success"]): point.sum for point in points["ingestion.size"]
+    }
+    assert sizes == {("text", True): 30, ("other", False): 2}
+    assert len(points["ingestion.duration"]) == 2
+
+
+def test_workflow_records_queue_wait_and_result_cache_lookups(reader: InMemoryMetricReader) -> None:
+    runner = WorkflowRunner(
+        [Task("parse", lambda ctx: ctx["text"].upper(), cache_key=lambda ctx: ctx["text"], store=MemoryResultStore())]
+    )
+
+    runner.run({"text": "a"})
+    runner.run({"text": "a"})
+
+    points = _points(reader)
+    lookups = {point.attributes["result"]: point.value for point in points["cache.lookups"]}
+    assert lookups == {"miss": 1, "hit": 1}
+    (queue_wait,) = points["workflow.task.queue_wait"]
+    assert queue_wait.count == 1
+    assert dict(queue_wait.attributes) == {"task": "parse"}
+
+
+def test_metrics_are_no_ops_until_configured() -> None:
+    assert not metrics.metrics_enabled()
+    metrics.record_llm_call("job_ad", "gpt-5-nano", latency=1.0)
+    with metrics.measure_rerun("company"):
+        pass
+
+
+def test_setup_metrics_skips_without_exporter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_ENDPOINT", raising=False)
+    monkeypatch.setenv("OTEL_METRICS_EXPORTER", "otlp")
+    monkeypatch.setattr(telemetry, "_METRICS_INITIALISED", False)
+    calls: list[object] = []
+    monkeypatch.setattr(otel_metrics, "set_meter_provider", calls.append)
+
+    telemetry.setup_metrics(force=True)
+
+    assert calls == []
+    assert not metrics.metrics_enabled()
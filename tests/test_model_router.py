@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import sys
+import time
 from pathlib import Path
 from typing import Iterable, Sequence
 
@@ -45,11 +46,12 @@ class FakeOpenAIClient:
 
 
 @pytest.fixture(autouse=True)
-def clear_router_state(monkeypatch: pytest.MonkeyPatch) -> None:
+def clear_router_state(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     """Reset router caches and environment variables between tests."""
 
     monkeypatch.delenv(model_router.PREF_ENV, raising=False)
     monkeypatch.delenv(model_router.FB_ENV, raising=False)
+    monkeypatch.setenv(model_router.MODEL_CACHE_PATH_ENV, str(tmp_path / "models.json"))
     model_router._available_models.cache_clear()  # type: ignore[attr-defined]
 
 
@@ -130,3 +132,31 @@ def test_available_models_cached_for_same_client() -> None:
 
     assert first == second == model_config.GPT41_MINI
     assert client.models.list_calls == 1
+
+
+def test_available_models_persisted_for_new_workers() -> None:
+    """A fresh process reuses the model list persisted by an earlier worker."""
+
+    first_worker = FakeOpenAIClient([model_config.GPT41_MINI])
+    assert model_router._available_models(first_worker) == {model_config.GPT41_MINI}
+
+    model_router._MODEL_CACHE.clear()
+    second_worker = FakeOpenAIClient(["unused"])
+
+    assert model_router._available_models(second_worker) == {model_config.GPT41_MINI}
+    assert second_worker.models.list_calls == 0
+
+
+def test_prefetch_lists_models_once_in_background() -> None:
+    """Worker start prefetches the list so the first request does not block on it."""
+
+    client = FakeOpenAIClient([model_config.GPT51_MINI])
+
+    assert model_router.prefetch_available_models(lambda: client) is True
+    assert model_router.prefetch_available_models(lambda: client) is False
+    deadline = time.monotonic() + 5
+    while client.models.list_calls == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert model_router._available_models(client) == {model_config.GPT51_MINI}
+    assert client.models.list_calls == 1
@@ -0,0 +1,140 @@
+"""Tests for telemetry-driven model routing."""
+
+from __future__ import annotations
+
+import pytest
+
+import config.models as model_config
+import llm.cost_router as cost_router
+from llm import model_telemetry
+from llm.model_telemetry import ModelTelemetry, TelemetryRouter
+from utils.circuit_breaker import get_breaker
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _record(telemetry: ModelTelemetry, model: str, latency: float, *, count: int = 10, **kwargs: object) -> None:
+    for _ in range(count):
+        telemetry.record("salary_estimate", model, latency=latency, **kwargs)  # type: ignore[arg-type]
+
+
+@pytest.fixture(autouse=True)
+def _reset_telemetry() -> None:
+    model_telemetry.reset_model_telemetry()
+    yield
+    model_telemetry.reset_model_telemetry()
+
+
+def test_router_picks_cheapest_model_within_slo() -> None:
+    telemetry = ModelTelemetry()
+    router = TelemetryRouter(telemetry)
+    _record(telemetry, model_config.GPT51_NANO, 30.0)
+    _record(telemetry, model_config.GPT51_MINI, 4.0)
+    _record(telemetry, model_config.GPT51, 2.0)
+
+    chosen = router.choose(
+        "salary_estimate",
+        [model_config.GPT51, model_config.GPT51_MINI, model_config.GPT51_NANO],
+    )
+
+    # nano misses the 10s SLO; mini is the cheapest model that meets it.
+    assert chosen == model_config.GPT51_MINI
+
+
+def test_router_skips_error_prone_models_and_falls_back_to_fastest() -> None:
+    telemetry = ModelTelemetry()
+    router = TelemetryRouter(telemetry)
+    _record(telemetry, model_config.GPT51_NANO, 1.0, count=5)
+    _record(telemetry, model_config.GPT51_NANO, 1.0, count=5, error=True)
+    _record(telemetry, model_config.GPT51_MINI, 40.0)
+    _record(telemetry, model_config.GPT51, 25.0)
+
+    chosen = router.choose("salary_estimate", [model_config.GPT51_NANO, model_config.GPT51_MINI, model_config.GPT51])
+
+    # nano fails half its calls and nothing else meets the SLO: take the fastest.
+    assert chosen == model_config.GPT51
+
+
+def test_router_treats_unknown_models_optimistically() -> None:
+    telemetry = ModelTelemetry()
+    router = TelemetryRouter(telemetry)
+    _record(telemetry, model_config.GPT51_MINI, 2.0)
+
+    assert router.choose("salary_estimate", [model_config.GPT51_MINI, model_config.GPT51_NANO]) == (
+        model_config.GPT51_NANO
+    )
+
+
+def test_router_avoids_models_with_open_circuit() -> None:
+    telemetry = ModelTelemetry()
+    router = TelemetryRouter(telemetry)
+    breaker = get_breaker(f"openai:{model_config.GPT51_NANO}")
+    for _ in range(breaker.failure_threshold):
+        breaker.acquire().failure()
+
+    assert router.choose("salary_estimate", [model_config.GPT51_NANO, model_config.GPT51_MINI]) == (
+        model_config.GPT51_MINI
+    )
+
+
+def test_stats_track_ttft_and_throughput_and_age_out() -> None:
+    clock = _Clock()
+    telemetry = ModelTelemetry(max_age=60.0, clock=clock)
+    _record(telemetry, model_config.GPT51_MINI, 5.0, ttft=1.0, output_tokens=400)
+
+    stats = telemetry.stats("salary_estimate", model_config.GPT51_MINI)
+    assert stats.samples == 10
+    assert stats.ttft_p95 == pytest.approx(1.0)
+    assert stats.tokens_per_second == pytest.approx(100.0)
+    assert stats.predicted_latency(800) == pytest.approx(9.0)
+
+    clock.now += 120
+    assert telemetry.stats("salary_estimate", model_config.GPT51_MINI).samples == 0
+
+
+def test_sparse_task_stats_fall_back_to_model_wide_samples() -> None:
+    telemetry = ModelTelemetry()
+    for _ in range(10):
+        telemetry.record("job_ad", model_config.GPT51_MINI, latency=3.0)
+
+    stats = telemetry.stats("salary_estimate", model_config.GPT51_MINI)
+
+    assert stats.samples == 10
+    assert stats.latency_p95 == pytest.approx(3.0)
+
+
+def test_route_model_for_messages_uses_telemetry_when_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cost_router, "TELEMETRY_ROUTING_ENABLED", True)
+    monkeypatch.setattr(cost_router, "STRICT_NANO_ONLY", False)
+    monkeypatch.setattr(cost_router, "is_model_available", lambda _model: True)
+    monkeypatch.setattr(
+        cost_router,
+        "get_model_fallbacks_for",
+        lambda _task: [model_config.GPT51_NANO, model_config.GPT51_MINI],
+    )
+    for _ in range(10):
+        model_telemetry.record_model_call("salary_estimate", model_config.GPT51_NANO, latency=60.0)
+        model_telemetry.record_model_call("salary_estimate", model_config.GPT51_MINI, latency=3.0)
+
+    chosen, _ = cost_router.route_model_for_messages(
+        [{"role": "user", "content": "Estimate a salary band."}],
+        default_model=model_config.GPT51_NANO,
+        task=model_config.ModelTask.SALARY_ESTIMATE,
+    )
+
+    assert chosen == model_config.GPT51_MINI
+
+
+def test_price_overrides_require_an_input_output_pair(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_MODEL_PRICES", '{"gpt-a": [1, 2], "gpt-b": "12", "gpt-c": [1, 2, 3], "gpt-d": ["x", 1]}')
+
+    prices = model_telemetry._load_prices()
+
+    assert prices["gpt-a"] == (1.0, 2.0)
+    assert not {"gpt-b", "gpt-c", "gpt-d"} & prices.keys()
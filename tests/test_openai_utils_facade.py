@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Mapping
 
+import httpx
 import pytest
 from openai import APITimeoutError
 
@@ -11,6 +12,8 @@ import config.models as model_config
 from openai_utils.client import OpenAIClient
 from openai_utils.payloads import _prepare_payload
 from openai_utils.schemas import build_schema_format_bundle, sanitize_response_format_payload
+from utils.cancellation import DEADLINE_REASON, CancellationToken, DeadlineExceeded, bind_token
+from utils.circuit_breaker import CircuitOpenError, CircuitState, get_breaker
 
 
 def test_openai_client_retries_on_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -35,6 +38,55 @@ def test_openai_client_retries_on_timeout(monkeypatch: pytest.MonkeyPatch) -> No
     assert call_count["value"] == 2
 
 
+def test_openai_client_caps_timeout_at_active_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = OpenAIClient()
+    captured: dict[str, Any] = {}
+
+    class _Completions:
+        def create(self, *, timeout: float, **kwargs: Any) -> dict[str, str]:
+            captured["timeout"] = timeout
+            return {"status": "ok"}
+
+    fake_client = type("FakeClient", (), {"chat": type("Chat", (), {"completions": _Completions()})()})()
+    monkeypatch.setattr(client, "get_client", lambda: fake_client)
+    payload = {"model": model_config.GPT4O, "messages": [], "timeout": 120}
+
+    with bind_token(CancellationToken.with_timeout(5.0)):
+        client.execute_request(payload, model_config.GPT4O, api_mode="chat")
+    assert 0 < captured["timeout"] <= 5.0
+
+    captured.clear()
+    expired = CancellationToken()
+    expired.cancel(DEADLINE_REASON)
+    with bind_token(expired), pytest.raises(DeadlineExceeded):
+        client.execute_request(payload, model_config.GPT4O, api_mode="chat")
+    assert not captured
+
+
+def test_openai_client_fails_fast_once_model_circuit_opens(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = OpenAIClient()
+    calls = {"count": 0}
+
+    class _Completions:
+        def create(self, *, timeout: float, **kwargs: Any) -> dict[str, str]:
+            calls["count"] += 1
+            raise APITimeoutError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+    fake_client = type("FakeClient", (), {"chat": type("Chat", (), {"completions": _Completions()})()})()
+    monkeypatch.setattr(client, "get_client", lambda: fake_client)
+    breaker = get_breaker(f"openai:{model_config.GPT4O}")
+    payload = {"model": model_config.GPT4O, "messages": []}
+
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(APITimeoutError):
+            client._create_response_with_timeout(dict(payload), api_mode="chat")
+    assert breaker.current_state().state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        client.execute_request(payload, model_config.GPT4O, api_mode="chat")
+    assert calls["count"] == breaker.failure_threshold
+
+
 def test_schema_bundle_sanitises_response_format() -> None:
     schema_payload = {
         "name": "example_payload",
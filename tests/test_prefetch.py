@@ -0,0 +1,87 @@
+"""Tests for speculative suggestion prefetching."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from pipelines.executor import SharedExecutor
+from pipelines.prefetch import PrefetchScheduler
+from utils.priority import Priority, current_priority
+
+
+@pytest.fixture
+def executor() -> Iterator[SharedExecutor]:
+    pool = SharedExecutor(1, name="prefetch-test")
+    yield pool
+    pool.shutdown()
+
+
+class _Suggester:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Priority]] = []
+
+    def __call__(self, job_title: str, *, lang: str = "en") -> list[str]:
+        self.calls.append((job_title, current_priority()))
+        return [f"{job_title}:{lang}"]
+
+
+def test_take_returns_background_result_for_same_revision(executor: SharedExecutor) -> None:
+    scheduler = PrefetchScheduler(executor)
+    suggest = _Suggester()
+
+    assert scheduler.schedule("skills", suggest, "Data Engineer", lang="de", session="s1")
+    assert not scheduler.schedule("skills", suggest, "Data Engineer", lang="de", session="s1")
+    executor.submit(lambda: None, priority=Priority.BACKGROUND).result(timeout=5)
+
+    assert scheduler.take("skills", suggest, "Data Engineer", lang="de", session="s1") == ["Data Engineer:de"]
+    assert suggest.calls == [("Data Engineer", Priority.BACKGROUND)]
+
+
+def test_stale_revision_is_discarded_and_computed_inline(executor: SharedExecutor) -> None:
+    scheduler = PrefetchScheduler(executor)
+    suggest = _Suggester()
+
+    scheduler.schedule("skills", suggest, "Data Engineer", session="s1")
+    result = scheduler.take("skills", suggest, "Data Scientist", session="s1")
+
+    assert result == ["Data Scientist:en"]
+    assert ("Data Scientist", Priority.INTERACTIVE) in suggest.calls
+    # The stale entry is gone; a second take computes again.
+    scheduler.take("skills", suggest, "Data Engineer", session="s1")
+    assert suggest.calls.count(("Data Engineer", Priority.INTERACTIVE)) == 1
+
+
+def test_take_computes_queued_prefetch_inline_without_waiting(executor: SharedExecutor) -> None:
+    scheduler = PrefetchScheduler(executor, wait_seconds=5)
+    release = threading.Event()
+    executor.submit(release.wait, 5)
+    suggest = _Suggester()
+
+    scheduler.schedule("skills", suggest, "Data Engineer", session="s1")
+    started = time.monotonic()
+    result = scheduler.take("skills", suggest, "Data Engineer", session="s1")
+    release.set()
+
+    assert result == ["Data Engineer:en"]
+    assert time.monotonic() - started < 1
+    assert suggest.calls == [("Data Engineer", Priority.INTERACTIVE)]
+
+
+def test_new_revision_cancels_pending_prefetch_and_sessions_are_isolated(executor: SharedExecutor) -> None:
+    scheduler = PrefetchScheduler(executor)
+    release = threading.Event()
+    executor.submit(release.wait, 5)
+    suggest = _Suggester()
+
+    scheduler.schedule("benefits", suggest, "Nurse", session="s1")
+    scheduler.schedule("benefits", suggest, "Head Nurse", session="s1")
+    scheduler.schedule("benefits", suggest, "Nurse", session="s2")
+    release.set()
+
+    assert scheduler.take("benefits", suggest, "Head Nurse", session="s1") == ["Head Nurse:en"]
+    assert scheduler.take("benefits", suggest, "Nurse", session="s2") == ["Nurse:en"]
+    assert sorted(title for title, _ in suggest.calls) == ["Head Nurse", "Nurse"]
@@ -0,0 +1,67 @@
+"""Tests for the on-demand sampling profiler."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from utils import profiling
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def test_profile_stores_speedscope_flamegraph_and_memory(tmp_path: Path) -> None:
+    with profiling.profile("rerun:company", directory=tmp_path, interval=0.001) as handle:
+        _busy(0.1)
+        payload = [bytearray(1024) for _ in range(100)]
+
+    assert payload
+    run = handle.run
+    assert run is not None and run.samples > 0
+    document = json.loads(run.speedscope_path.read_text(encoding="utf-8"))
+    (sampled,) = document["profiles"]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    assert any(frame["name"] == "_busy" for frame in document["shared"]["frames"])
+    assert "_busy (test_profiling.py:" in run.folded_path.read_text(encoding="utf-8")
+    assert "test_profiling.py" in run.memory_path.read_text(encoding="utf-8")
+    assert profiling.list_profile_runs(tmp_path) == [run]
+
+
+def test_profiled_functions_only_record_when_requested(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+
+    @profiling.profiled("inner")
+    def inner() -> int:
+        return _busy(0.01)
+
+    @profiling.profiled("outer")
+    def outer() -> int:
+        return inner()
+
+    outer()
+    assert profiling.list_profile_runs(tmp_path) == []
+
+    with profiling.profiling_requested():
+        outer()
+
+    assert [run.label for run in profiling.list_profile_runs(tmp_path)] == ["outer"]
+
+
+def test_old_runs_are_pruned(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiling, "MAX_STORED_RUNS", 2)
+
+    for index in range(3):
+        with profiling.profile(f"run-{index}", directory=tmp_path):
+            time.sleep(0.01)
+
+    assert [run.label for run in profiling.list_profile_runs(tmp_path)] == ["run-2", "run-1"]
@@ -13,7 +13,9 @@ from llm.rag_pipeline import (
     FieldSpec,
     RAGPipeline,
     RetrievedChunk,
+    clear_passage_cache,
     collect_field_contexts,
+    retrieve_passages,
 )
 from openai_utils import ChatCallResult
 from openai_utils.extraction import extract_with_function
@@ -88,6 +90,23 @@ def test_collect_field_contexts_fallback(monkeypatch: pytest.MonkeyPatch) -> Non
     assert "Acme Corp" in chunk.text
 
 
+def test_retrieve_passages_gives_up_after_search_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A slow vector store search should yield no passages instead of blocking."""
+
+    options: dict[str, Any] = {}
+
+    def search(*_args: Any, **_kwargs: Any) -> Any:
+        raise TimeoutError("search timed out")
+
+    client = types.SimpleNamespace(vector_stores=types.SimpleNamespace(search=search))
+    client.with_options = lambda **kwargs: options.update(kwargs) or client
+    monkeypatch.setattr("llm.rag_pipeline.get_client", lambda: client)
+    clear_passage_cache()
+
+    assert retrieve_passages("benefits", vector_store_id="vs123") == []
+    assert options == {"timeout": pytest.approx(5.0), "max_retries": 0}
+
+
 def test_field_context_select_chunk_prefers_matching_value() -> None:
     """Chunk selection should favour snippets containing the extracted value."""
 
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from openai_utils import rate_limiter as rate_limiter_module
+from openai_utils.client import OpenAIClient
+from openai_utils.rate_limiter import (
+    RateLimiter,
+    RateLimitQueueTimeout,
+    estimate_request_tokens,
+    get_rate_limiter,
+    parse_reset_duration,
+)
+from utils.priority import Priority
+
+
+def _drained_limiter() -> RateLimiter:
+    limiter = RateLimiter(default_rpm=1, default_tpm=10_000)
+    limiter.acquire("gpt-test", 10)
+    return limiter
+
+
+def test_interactive_requests_are_admitted_before_background() -> None:
+    limiter = _drained_limiter()
+    order: list[str] = []
+
+    def _wait(label: str, priority: Priority) -> None:
+        limiter.acquire("gpt-test", 10, priority=priority, timeout=2.0)
+        order.append(label)
+
+    background = threading.Thread(target=_wait, args=("background", Priority.BACKGROUND))
+    interactive = threading.Thread(target=_wait, args=("interactive", Priority.INTERACTIVE))
+    background.start()
+    time.sleep(0.05)
+    interactive.start()
+    time.sleep(0.05)
+    assert limiter.queue_depth() == 2
+
+    limiter.observe_headers("gpt-test", {"x-ratelimit-remaining-requests": "1"})
+    interactive.join(1.0)
+    limiter.observe_headers("gpt-test", {"x-ratelimit-remaining-requests": "1"})
+    background.join(1.0)
+
+    assert order == ["interactive", "background"]
+
+
+def test_queued_request_times_out_and_is_counted() -> None:
+    limiter = _drained_limiter()
+
+    with pytest.raises(RateLimitQueueTimeout):
+        limiter.acquire("gpt-test", 10, timeout=0.05)
+
+    metrics = limiter.metrics()["gpt-test"]
+    assert metrics["timeouts"] == 1
+    assert metrics["queue_depth"] == 0
+    assert limiter.queue_depth() == 0
+
+
+def test_rate_limit_error_pauses_admissions() -> None:
+    limiter = RateLimiter(default_rpm=600, default_tpm=100_000)
+    limiter.penalize("gpt-test", {"retry-after-ms": "120"})
+
+    reservation = limiter.acquire("gpt-test", 10, timeout=1.0)
+
+    assert reservation.waited >= 0.1
+    assert limiter.metrics()["gpt-test"]["rate_limited"] == 1
+
+
+def test_headers_resize_buckets_and_settle_refunds_tokens() -> None:
+    limiter = RateLimiter(default_rpm=100, default_tpm=1_000)
+    reservation = limiter.acquire("gpt-test", 800)
+    reservation.settle(200)
+
+    assert limiter.metrics()["gpt-test"]["tokens_available"] == pytest.approx(800, abs=5)
+
+    limiter.observe_headers(
+        "gpt-test",
+        {"x-ratelimit-limit-tokens": "5000", "x-ratelimit-remaining-tokens": "4000"},
+    )
+    assert limiter.metrics()["gpt-test"]["tokens_available"] == pytest.approx(4000, abs=5)
+
+
+def test_parse_reset_duration_and_token_estimate() -> None:
+    assert parse_reset_duration("6m0s") == 360.0
+    assert parse_reset_duration("20ms") == pytest.approx(0.02)
+    assert parse_reset_duration("1.5") == 1.5
+    assert parse_reset_duration("soon") is None
+
+    payload = {"input": [{"role": "user", "content": "one two three"}], "max_output_tokens": 100}
+    assert estimate_request_tokens(payload) == 104
+
+
+def test_openai_client_admits_requests_through_shared_limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Completions:
+        def create(self, **_kwargs: Any) -> dict[str, Any]:
+            return {"usage": {"total_tokens": 42}}
+
+    fake_client = type("FakeClient", (), {"chat": type("Chat", (), {"completions": _Completions()})()})()
+    client = OpenAIClient()
+    monkeypatch.setattr(client, "get_client", lambda: fake_client)
+    monkeypatch.setattr(rate_limiter_module, "RATE_LIMITER_ENABLED", True)
+
+    client.execute_request({"model": "gpt-test", "messages": []}, "gpt-test", api_mode="chat")
+
+    metrics = get_rate_limiter().metrics()["gpt-test"]
+    assert metrics["admitted"] == 1
+
+
+def test_openai_client_queues_for_capacity_before_taking_breaker_permit(monkeypatch: pytest.MonkeyPatch) -> None:
+    from utils.circuit_breaker import CircuitOpenError
+
+    client_module = sys.modules[OpenAIClient.__module__]
+
+    order: list[str] = []
+
+    class _Breaker:
+        def guard(self, **_kwargs: Any) -> Any:
+            order.append("breaker")
+            raise CircuitOpenError("openai:gpt-test", reason="open")
+
+    admit = client_module.admit_request
+
+    def _admit(payload: Any, *, model: str | None = None) -> Any:
+        order.append("admit")
+        return admit(payload, model=model)
+
+    fake_client = type("FakeClient", (), {"chat": type("Chat", (), {"completions": object()})()})()
+    client = OpenAIClient()
+    monkeypatch.setattr(client, "get_client", lambda: fake_client)
+    monkeypatch.setattr(client_module, "admit_request", _admit)
+    monkeypatch.setattr(client_module, "get_breaker", lambda _service: _Breaker())
+    monkeypatch.setattr(rate_limiter_module, "RATE_LIMITER_ENABLED", True)
+    limiter = get_rate_limiter()
+    limiter.configure("gpt-test", rpm=100, tpm=100_000)
+    payload = {"model": "gpt-test", "messages": [{"role": "user", "content": "word " * 300}]}
+
+    with pytest.raises(CircuitOpenError):
+        client.execute_request(payload, "gpt-test", api_mode="chat")
+
+    assert order == ["admit", "breaker"]
+    limiter._state("gpt-test").tokens.refill(time.monotonic())
+    assert limiter._state("gpt-test").tokens.level == pytest.approx(100_000, abs=50)
@@ -323,3 +323,17 @@ def test_call_salary_model_handles_errors(monkeypatch) -> None:
 
     assert result is None
     assert explanation is None
+
+
+def test_compute_salary_estimate_uses_explicit_language(monkeypatch) -> None:
+    monkeypatch.setattr(salary, "get_salary_benchmark", lambda role, country="US": {"salary_range": "40000-50000"})
+    monkeypatch.setattr(salary, "_vacancy_store_salary", lambda inputs, *, lang=None: (None, None))
+    inputs = salary._collect_inputs(
+        {"position": {"job_title": "Software Developer"}, "location": {"country": "Germany"}}
+    )
+
+    result, explanation, source = salary.compute_salary_estimate(inputs, use_model=False, lang="en")
+
+    assert source == "fallback" and result is not None
+    assert isinstance(explanation, list)
+    assert explanation[0]["value"] == "Fallback: benchmark data"
@@ -0,0 +1,74 @@
+"""Tests for the local, schema-guided validation repair."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+import core.schema as schema_module
+from core.schema_repair import repair_validation_errors
+from models.need_analysis import NeedAnalysisProfile
+
+
+def _errors(payload: dict[str, Any]) -> list[Any]:
+    with pytest.raises(ValidationError) as excinfo:
+        NeedAnalysisProfile.model_validate(payload)
+    return excinfo.value.errors()
+
+
+def test_coerce_and_fill_repairs_mechanical_errors_without_llm(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _fail(*_: Any, **__: Any) -> None:
+        raise AssertionError("LLM repair must not be called")
+
+    monkeypatch.setattr(schema_module, "repair_profile_payload", _fail)
+
+    profile = schema_module.coerce_and_fill(
+        {
+            "company": {"name": 123, "size": ["50-100"]},
+            "position": {"job_title": ["Data Engineer"]},
+            "team": {"headcount_current": "zehn"},
+            "process": {"stakeholders": [{"name": "Anna"}], "phases": ["Phone screen", "Onsite"]},
+        }
+    )
+
+    assert profile.company.name == "123"
+    assert profile.company.size == "50-100"
+    assert profile.position.job_title == "Data Engineer"
+    assert profile.team.headcount_current is None
+    assert [phase.name for phase in profile.process.phases] == ["Phone screen", "Onsite"]
+    assert profile.process.stakeholders[0].name == "Anna"
+
+
+def test_typed_coercions_follow_the_schema() -> None:
+    payload = NeedAnalysisProfile().model_dump(mode="json")
+    payload["requirements"]["hard_skills_required"] = "- Python\n- SQL"
+    payload["requirements"]["skill_mappings"] = {"unknown": True}
+    payload["meta"]["field_metadata"] = {
+        "company.name": {"source": "LLM", "confidence": 85, "confirmed": "nein"},
+    }
+    payload["company"]["contact_email"] = "Kontakt: jobs@example.com"
+
+    result = repair_validation_errors(payload, _errors(payload), NeedAnalysisProfile.model_json_schema())
+
+    assert result.unresolved == []
+    profile = NeedAnalysisProfile.model_validate(result.payload)
+    assert profile.requirements.hard_skills_required == ["Python", "SQL"]
+    metadata = profile.meta.field_metadata["company.name"]
+    assert (metadata.source, metadata.confidence, metadata.confirmed) == ("llm", 0.85, False)
+    assert profile.company.contact_email == "jobs@example.com"
+
+
+def test_uncoercible_list_items_are_pruned_and_unknown_errors_kept() -> None:
+    payload = NeedAnalysisProfile().model_dump(mode="json")
+    payload["compensation"]["benefits"] = ["Gym", {"nested": ["x"]}, "Bike"]
+    errors = [
+        *_errors(payload),
+        {"type": "value_error", "loc": ("position", "job_title"), "msg": "custom check"},
+    ]
+
+    result = repair_validation_errors(payload, errors, NeedAnalysisProfile.model_json_schema())
+
+    assert result.payload["compensation"]["benefits"] == ["Gym", "Bike"]
+    assert [error["type"] for error in result.unresolved] == ["value_error"]
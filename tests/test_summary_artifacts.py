@@ -0,0 +1,97 @@
+"""Tests for the concurrent summary artifact orchestrator."""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import pipelines.summary_artifacts as summary_module
+from generators.payload import prepare_generation_payloads
+from openai_utils.api import ChatCallResult
+from pipelines.executor import SharedExecutor
+from pipelines.summary_artifacts import SummaryArtifact, start_summary_artifacts
+
+_PROFILE: dict[str, Any] = {
+    "position": {"job_title": "Data Engineer", "occupation_uri": "http://data.europa.eu/esco/occupation/1"},
+    "requirements": {"hard_skills_required": ["Python"]},
+}
+
+
+@pytest.fixture
+def executor() -> Iterator[SharedExecutor]:
+    pool = SharedExecutor(4, name="summary-test")
+    yield pool
+    pool.shutdown()
+
+
+def test_llm_artifacts_run_concurrently_on_one_prepared_payload(
+    monkeypatch: pytest.MonkeyPatch, executor: SharedExecutor
+) -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    prepare_calls: list[list[str]] = []
+    received: dict[str, Any] = {}
+
+    def counting_prepare(vacancy_json: Any, artifact_keys: Any) -> dict[str, dict[str, Any]]:
+        prepare_calls.append(list(artifact_keys))
+        return prepare_generation_payloads(vacancy_json, artifact_keys)
+
+    def fake_job_ad(profile: Any, lang: str, tone: str, *, prepared_payload: Any) -> ChatCallResult:
+        barrier.wait()
+        received["job_ad"] = prepared_payload
+        return ChatCallResult(json.dumps({"ad": {"title": "Data Engineer"}}), [], {})
+
+    def fake_guide(profile: Any, lang: str, *, prepared_payload: Any) -> ChatCallResult:
+        barrier.wait()
+        received["interview_guide"] = prepared_payload
+        return ChatCallResult(json.dumps({"questions": []}), [], {})
+
+    monkeypatch.setattr(summary_module, "is_llm_available", lambda: True)
+    monkeypatch.setattr(summary_module, "prepare_generation_payloads", counting_prepare)
+    monkeypatch.setattr(summary_module, "generate_job_ad", fake_job_ad)
+    monkeypatch.setattr(summary_module, "generate_interview_guide", fake_guide)
+
+    run = start_summary_artifacts(_PROFILE, lang="en", executor=executor)
+    outcomes = {outcome.artifact: outcome for outcome in run.iter_completed(timeout=10)}
+
+    assert set(outcomes) == set(SummaryArtifact)
+    assert all(outcome.ok for outcome in outcomes.values()), outcomes
+    assert outcomes[SummaryArtifact.JOB_AD].value == {"ad": {"title": "Data Engineer"}}
+    assert "Data Engineer" in outcomes[SummaryArtifact.BOOLEAN_SEARCH].value
+    assert json.loads(outcomes[SummaryArtifact.PROFILE_JSON].value)["position"]["job_title"] == "Data Engineer"
+    assert len(prepare_calls) == 1
+    for payload in received.values():
+        references = payload["meta"]["esco_references"]
+        assert references["occupation"]["uri"] == _PROFILE["position"]["occupation_uri"]
+    assert set(run.latencies()) == set(SummaryArtifact)
+
+
+def test_failures_and_disabled_llm_do_not_block_other_artifacts(
+    monkeypatch: pytest.MonkeyPatch, executor: SharedExecutor
+) -> None:
+    def failing_boolean(_profile: Any) -> str:
+        raise ValueError("no title")
+
+    monkeypatch.setattr(summary_module, "is_llm_available", lambda: False)
+    monkeypatch.setattr(summary_module, "build_boolean_search", failing_boolean)
+
+    run = start_summary_artifacts(_PROFILE, lang="de", executor=executor)
+    outcomes = {outcome.artifact: outcome for outcome in run.iter_completed(timeout=10)}
+
+    assert outcomes[SummaryArtifact.JOB_AD].error == "LLM unavailable"
+    assert outcomes[SummaryArtifact.INTERVIEW_GUIDE].error == "LLM unavailable"
+    assert outcomes[SummaryArtifact.BOOLEAN_SEARCH].error == "no title"
+    assert outcomes[SummaryArtifact.PROFILE_JSON].ok
+
+
+def test_revision_changes_with_the_profile() -> None:
+    artifacts = tuple(SummaryArtifact)
+    base = summary_module.summary_revision(_PROFILE, lang="en", tone="formal", artifacts=artifacts)
+    edited = {**_PROFILE, "position": {"job_title": "ML Engineer"}}
+
+    assert base == summary_module.summary_revision(_PROFILE, lang="en", tone="formal", artifacts=artifacts)
+    assert base != summary_module.summary_revision(edited, lang="en", tone="formal", artifacts=artifacts)
+    assert base != summary_module.summary_revision(_PROFILE, lang="en", tone="casual", artifacts=artifacts)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import gc
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from openai_utils import api
+from utils.logging_context import log_context
+from utils.usage_ledger import (
+    SQLiteUsageLedger,
+    UsageAccountant,
+    get_usage_accountant,
+    reset_usage_accountant,
+    tenant_scope,
+)
+
+
+def _in_thread(func: Any, *args: Any) -> Any:
+    outcome: dict[str, Any] = {}
+
+    def _run() -> None:
+        try:
+            outcome["value"] = func(*args)
+        except BaseException as exc:  # noqa: BLE001 - re-raised in the caller
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    thread.join(5)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+
+def test_threads_record_into_separate_shards_and_flush_to_ledger() -> None:
+    accountant = UsageAccountant(background=False, clock=lambda: 1_000.0)
+
+    def record(session: str, model: str) -> None:
+        for _ in range(50):
+            accountant.record(session=session, task="job_ad", model=model, input_tokens=3, output_tokens=1)
+
+    threads = [threading.Thread(target=record, args=(f"s{index}", f"model-{index % 2}")) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert accountant.session_total("s0") == 200
+    assert accountant.session_total("missing") == 0
+    assert accountant.flush() == 200
+    assert accountant.flush() == 0
+    assert accountant.session_total("s0") == 200
+
+    by_model = {row.key: (row.requests, row.total_tokens) for row in accountant.aggregate(("model",))}
+    assert by_model == {("model-0",): (100, 400), ("model-1",): (100, 400)}
+    with pytest.raises(ValueError):
+        accountant.aggregate(("prompt",))
+
+
+def test_shards_of_ended_threads_are_folded_and_idle_sessions_expire() -> None:
+    now = [1_000.0]
+    accountant = UsageAccountant(background=False, clock=lambda: now[0], session_ttl=60.0)
+
+    for index in range(3):
+        _in_thread(
+            lambda session: accountant.record(session=session, task="t", model="m", input_tokens=5, output_tokens=5),
+            f"s{index % 2}",
+        )
+    gc.collect()
+    accountant.mark_session_exceeded("s1")
+
+    assert accountant.flush() == 3
+    assert len(accountant._all_shards()) == 1
+    assert accountant.session_total("s0") == 20
+    assert accountant.session_exceeded("s1")
+
+    now[0] += 30
+    accountant.record(session="s0", task="t", model="m", input_tokens=1, output_tokens=0)
+    now[0] += 45
+    accountant.flush()
+
+    assert accountant.session_total("s0") == 21
+    assert accountant.session_total("s1") == 0
+    assert not accountant.session_exceeded("s1")
+
+
+def test_sqlite_ledger_shares_tenant_budget_between_workers(tmp_path: Path) -> None:
+    path = tmp_path / "usage.sqlite"
+    first = UsageAccountant(SQLiteUsageLedger(path), background=False, tenant_daily_limit=100)
+    second = UsageAccountant(SQLiteUsageLedger(path), background=False, tenant_daily_limit=100)
+
+    first.record(session="a", task="extraction", model="m", input_tokens=50, output_tokens=10, tenant="acme")
+    assert first.tenant_total("acme") == 60
+    assert second.tenant_total("acme") == 0
+
+    first.flush()
+    second.flush()
+    second.record(session="b", task="job_ad", model="m", input_tokens=30, output_tokens=10, tenant="acme")
+
+    assert second.tenant_total("acme") == 100
+    assert second.tenant_exceeded("acme")
+    assert not second.tenant_exceeded("other")
+    second.flush()
+    rows = SQLiteUsageLedger(path).aggregate(("tenant", "task"))
+    assert [(row.key, row.total_tokens) for row in rows] == [
+        (("acme", "extraction"), 60),
+        (("acme", "job_ad"), 40),
+    ]
+
+
+def test_budget_exceeded_in_one_session_does_not_block_another(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(api, "OPENAI_SESSION_TOKEN_LIMIT", 100)
+
+    def spend_and_check(session: str, tokens: int) -> bool:
+        with log_context(session_id=session):
+            api._update_usage_counters({"input_tokens": tokens, "output_tokens": 0}, task="job_ad", model="m")
+            try:
+                api._enforce_usage_budget_guard()
+            except RuntimeError:
+                return False
+            return True
+
+    assert _in_thread(spend_and_check, "heavy", 150) is False
+    assert _in_thread(spend_and_check, "light", 10) is True
+    assert get_usage_accountant().session_total("heavy") == 150
+
+
+def test_tenant_daily_budget_blocks_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    reset_usage_accountant(UsageAccountant(background=False, tenant_daily_limit=50))
+    monkeypatch.setattr(api, "_call_chat_api_single", lambda *_a, **_k: pytest.fail("budget must block the call"))
+
+    with tenant_scope("acme"):
+        api._update_usage_counters({"input_tokens": 40, "output_tokens": 20}, task="job_ad")
+        with pytest.raises(RuntimeError, match="Daily budget|Tages-Budget"):
+            api.call_chat_api([{"role": "user", "content": "hi"}])
+
+    assert get_usage_accountant().tenant_total("default") == 0
@@ -0,0 +1,162 @@
+"""Tests for the partitioned columnar vacancy store."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from constants.keys import ProfilePaths
+from pipelines import vacancy_store as vacancy_store_module
+from pipelines.vacancy_store import VacancyStore, file_schema, normalize_role
+
+pa = pytest.importorskip("pyarrow")
+
+SEPTEMBER = datetime(2026, 9, 1, tzinfo=UTC)
+OCTOBER = datetime(2026, 10, 1, tzinfo=UTC)
+
+
+def _profile(title: str, country: str, salary_min: float | None, skills: list[str]) -> dict[str, Any]:
+    return {
+        "position": {"job_title": title},
+        "location": {"country": country},
+        "compensation": {
+            "salary_min": salary_min,
+            "salary_max": None if salary_min is None else salary_min + 10000,
+            "currency": "EUR",
+            "period": "year",
+        },
+        "requirements": {"hard_skills_required": skills, "tools_and_technologies": ["Docker"]},
+    }
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> VacancyStore:
+    store = VacancyStore(tmp_path / "vacancies")
+    store.append(
+        {
+            "a": _profile("Data Engineer", "Deutschland", 60000, ["Python", "SQL"]),
+            "b": _profile("data  engineer", "DE", 70000, ["python"]),
+            "c": _profile("Chef", "France", 30000, []),
+            "d": _profile("Data Engineer", "", None, ["Python"]),
+        },
+        recorded_at=SEPTEMBER,
+    )
+    return store
+
+
+def test_append_writes_hive_partitions_with_dictionary_columns(store: VacancyStore) -> None:
+    partitions = sorted(path.parent.relative_to(store.root).as_posix() for path in store.root.rglob("*.parquet"))
+    assert partitions == ["month=2026-09/country=DE", "month=2026-09/country=FR", "month=2026-09/country=unknown"]
+
+    schema = file_schema()
+    assert pa.types.is_dictionary(schema.field(ProfilePaths.POSITION_JOB_TITLE.value).type)
+    skills = schema.field(ProfilePaths.REQUIREMENTS_HARD_SKILLS_REQUIRED.value).type
+    assert pa.types.is_list(skills) and pa.types.is_dictionary(skills.value_type)
+
+
+def test_query_pushes_down_filters_and_keeps_latest_snapshot(store: VacancyStore) -> None:
+    store.append({"a": _profile("Data Engineer", "DE", 80000, ["Python"])}, recorded_at=OCTOBER)
+
+    table = store.query(["vacancy_id", "month"], where=[("country", "=", "DE")])
+    assert sorted(zip(table.column("vacancy_id").to_pylist(), table.column("month").to_pylist())) == [
+        ("a", "2026-10"),
+        ("b", "2026-09"),
+    ]
+    assert store.count() == 4
+    assert store.query(["vacancy_id"], latest=False).num_rows == 5
+    assert store.count(where=[(ProfilePaths.COMPENSATION_SALARY_MIN.value, ">=", 65000)]) == 2
+
+
+def test_skill_demand_and_value_counts_are_case_insensitive(store: VacancyStore) -> None:
+    total, shares = store.skill_demand(["Python", "SQL", "Rust"], country="Deutschland")
+
+    assert total == 2
+    assert shares == {"Python": 1.0, "SQL": 0.5}
+    assert store.value_counts(ProfilePaths.REQUIREMENTS_HARD_SKILLS_REQUIRED.value) == [("python", 3), ("sql", 1)]
+    assert store.value_counts("role", limit=1) == [("data engineer", 3)]
+
+
+def test_salary_summary_uses_median_per_role_and_country(store: VacancyStore) -> None:
+    summary = store.salary_summary(role="DATA ENGINEER", country="DE")
+
+    assert summary is not None
+    assert summary.count == 2
+    assert summary.currency == "EUR"
+    assert 60000 <= summary.salary_min <= 70000
+    assert store.salary_summary(role="Astronaut") is None
+
+
+def test_compact_merges_partition_files(store: VacancyStore) -> None:
+    store.append({"e": _profile("Chef", "FR", 35000, [])}, recorded_at=SEPTEMBER)
+
+    assert store.compact() == 1
+    assert len(list((store.root / "month=2026-09" / "country=FR").glob("*.parquet"))) == 1
+    assert store.count(where=[("country", "=", "FR")]) == 2
+
+
+def test_missing_store_returns_empty_results(tmp_path: Path) -> None:
+    store = VacancyStore(tmp_path / "missing")
+
+    assert store.count() == 0
+    assert store.skill_demand(["Python"]) == (0, {})
+    assert normalize_role("  Senior   Engineer ") == "senior engineer"
+
+
+def test_store_is_disabled_without_directory(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(vacancy_store_module, "VACANCY_STORE_DIR", "")
+
+    assert vacancy_store_module.get_vacancy_store() is None
+
+
+def test_batch_prepare_appends_profiles(tmp_path: Path, store: VacancyStore) -> None:
+    from pipelines.batch_generation import BatchArtifact, BatchGenerationJob
+
+    job = BatchGenerationJob(tmp_path / "batch", backend=None)  # type: ignore[arg-type]
+    job.prepare(
+        {"z": _profile("Chef", "FR", 32000, [])},
+        [BatchArtifact.JOB_AD],
+        vacancy_store=store,
+    )
+
+    assert store.count(where=[("role", "=", "chef")]) == 2
+
+
+def test_latest_snapshot_is_chosen_before_filters(store: VacancyStore) -> None:
+    store.append({"a": _profile("ML Engineer", "DE", 90000, ["Python"])}, recorded_at=OCTOBER)
+
+    summary = store.salary_summary(role="Data Engineer", country="DE")
+    assert summary is not None and summary.count == 1
+    assert store.count(where=[("role", "=", "data engineer")]) == 2
+    assert store.count(where=[("month", "=", "2026-09")]) == 3
+    assert store.count(where=[("month", "=", "2026-10")]) == 1
+
+
+def test_partially_written_files_are_not_read(store: VacancyStore) -> None:
+    partition = store.root / "month=2026-09" / "country=FR"
+    (partition / ".part-pending.parquet.tmp").write_bytes(next(partition.glob("*.parquet")).read_bytes()[:64])
+
+    assert store.count() == 4
+    assert store.compact() == 0
+
+
+def test_append_compacts_partition_after_file_threshold(tmp_path: Path) -> None:
+    store = VacancyStore(tmp_path / "vacancies", compact_after=3)
+    partition = store.root / "month=2026-09" / "country=FR"
+
+    for index in range(3):
+        store.append({f"v{index}": _profile("Chef", "FR", 30000 + index, [])}, recorded_at=SEPTEMBER)
+
+    assert len(list(partition.glob("*.parquet"))) == 1
+    assert not (partition / ".compact.lock").exists()
+    assert store.count() == 3
+
+
+def test_compaction_skips_partition_locked_by_another_writer(store: VacancyStore) -> None:
+    store.append({"e": _profile("Chef", "FR", 35000, [])}, recorded_at=SEPTEMBER)
+    (store.root / "month=2026-09" / "country=FR" / ".compact.lock").touch()
+
+    assert store.compact() == 0
+    assert store.count(where=[("country", "=", "FR")]) == 2
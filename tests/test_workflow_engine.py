@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import threading
+import time
+
 import pytest
 
+from pipelines.executor import Priority, SharedExecutor
+from pipelines.result_store import DiskResultStore, MemoryResultStore, SessionResultStore
 from pipelines.workflow import SkipTask, Task, TaskStatus, WorkflowContext, WorkflowRunner
+from utils.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, remaining_time
 
 
 def test_workflow_executes_in_dependency_order() -> None:
@@ -92,3 +98,218 @@ def test_tasks_can_signal_skip_without_error() -> None:
 
     assert result.get("skip").status is TaskStatus.SKIPPED
     assert str(result.get("skip").error) == "disabled"
+
+
+def test_timeout_cancels_attempt_token_and_retries() -> None:
+    observed: list[bool] = []
+
+    def slow(context: WorkflowContext) -> str:
+        token = context.token
+        if len(observed) == 0:
+            observed.append(token.wait(2.0))
+            context.raise_if_cancelled()
+        observed.append(token.cancelled)
+        return "second attempt"
+
+    executor = SharedExecutor(1, name="test-retry")
+    runner = WorkflowRunner([Task(name="slow", func=slow, timeout=0.1, retries=1)], executor=executor)
+
+    started = time.perf_counter()
+    try:
+        result = runner.run()
+    finally:
+        executor.shutdown()
+
+    assert time.perf_counter() - started < 1.0
+    assert observed == [True, False]
+    assert result.get("slow").status is TaskStatus.SUCCESS
+    assert result.get("slow").attempts == 2
+
+
+def test_timeout_without_retries_fails_with_deadline_error() -> None:
+    def slow(context: WorkflowContext) -> str:
+        context.token.wait(2.0)
+        return "late"
+
+    runner = WorkflowRunner(
+        [
+            Task(name="slow", func=slow, timeout=0.05),
+            Task(name="child", func=lambda _: "never", dependencies=("slow",)),
+        ]
+    )
+
+    result = runner.run()
+
+    assert result.get("slow").status is TaskStatus.FAILED
+    assert isinstance(result.get("slow").error, DeadlineExceeded)
+    assert result.get("child").status is TaskStatus.SKIPPED
+
+
+def test_timeouts_do_not_spawn_helper_threads() -> None:
+    baseline = threading.active_count()
+    executor = SharedExecutor(4, name="test-timeouts")
+    runner = WorkflowRunner(
+        [Task(name=f"task-{index}", func=lambda ctx: ctx.token.wait(0.5), timeout=0.01) for index in range(4)],
+        executor=executor,
+    )
+    try:
+        for _ in range(5):
+            result = runner.run()
+            assert all(outcome.status is TaskStatus.FAILED for outcome in result.results.values())
+        assert threading.active_count() <= baseline + 4
+    finally:
+        executor.shutdown()
+
+
+def test_run_cancellation_skips_pending_tasks() -> None:
+    token = CancellationToken()
+
+    def first(_: WorkflowContext) -> str:
+        token.cancel("user navigated away")
+        return "done"
+
+    runner = WorkflowRunner(
+        [
+            Task(name="first", func=first),
+            Task(name="second", func=lambda _: "never", dependencies=("first",)),
+        ]
+    )
+
+    result = runner.run(cancellation=token)
+
+    assert result.get("first").status is TaskStatus.SUCCESS
+    assert result.get("second").status is TaskStatus.SKIPPED
+    assert isinstance(result.get("second").error, OperationCancelled)
+
+
+def test_run_deadline_propagates_to_tasks() -> None:
+    def check_deadline(_: WorkflowContext) -> float | None:
+        return remaining_time()
+
+    result = WorkflowRunner([Task(name="check", func=check_deadline)]).run(timeout=5.0)
+
+    remaining = result.get("check").result
+    assert remaining is not None and 0 < remaining <= 5.0
+
+
+def test_long_dependency_chain_resolves_quickly() -> None:
+    tasks = [Task(name="t0", func=lambda _: 0)]
+    tasks.extend(Task(name=f"t{index}", func=lambda _: 0, dependencies=(f"t{index - 1}",)) for index in range(1, 3000))
+
+    started = time.perf_counter()
+    runner = WorkflowRunner(reversed(tasks))
+
+    assert time.perf_counter() - started < 0.5
+    assert runner._order[:3] == ["t0", "t1", "t2"]
+
+
+def test_shared_executor_prefers_interactive_lane() -> None:
+    executor = SharedExecutor(1, name="test-lanes")
+    gate = threading.Event()
+    order: list[str] = []
+    try:
+        blocker = executor.submit(gate.wait, 2.0)
+        background = executor.submit(order.append, "background", priority=Priority.BACKGROUND)
+        interactive = executor.submit(order.append, "interactive", priority=Priority.INTERACTIVE)
+        gate.set()
+        for future in (blocker, background, interactive):
+            future.result(timeout=2.0)
+    finally:
+        executor.shutdown()
+
+    assert order == ["interactive", "background"]
+
+
+def test_nested_runs_inside_shared_worker_do_not_deadlock() -> None:
+    executor = SharedExecutor(1, name="test-nested")
+
+    def outer(_: WorkflowContext) -> str:
+        inner = WorkflowRunner([Task(name="inner", func=lambda _: "inner")], executor=executor).run()
+        return inner.get("inner").result
+
+    try:
+        result = WorkflowRunner([Task(name="outer", func=outer)], executor=executor).run(timeout=2.0)
+    finally:
+        executor.shutdown()
+
+    assert result.get("outer").result == "inner"
+
+
+def _counting_graph(calls: list[str], store: MemoryResultStore) -> WorkflowRunner:
+    def _make(name: str, *deps: str) -> Task:
+        def _run(context: WorkflowContext) -> str:
+            calls.append(name)
+            upstream = "+".join(str(context[dep]) for dep in deps)
+            return f"{name}({context.get(f'{name}_input', '')}{upstream})"
+
+        return Task(
+            name=name,
+            func=_run,
+            dependencies=deps,
+            cache_key=lambda context: context.get(f"{name}_input"),
+            store=store,
+        )
+
+    return WorkflowRunner(
+        [
+            _make("ingest"),
+            _make("extract", "ingest"),
+            _make("skills"),
+            _make("followups", "extract", "skills"),
+        ]
+    )
+
+
+def test_memoised_tasks_rerun_only_affected_subgraph() -> None:
+    calls: list[str] = []
+    runner = _counting_graph(calls, MemoryResultStore())
+
+    first = runner.run({"ingest_input": "a", "skills_input": "s"})
+    calls.clear()
+    second = runner.run({"ingest_input": "a", "skills_input": "s"})
+
+    assert calls == []
+    assert all(outcome.cached for outcome in second.results.values())
+    assert second.context["followups"] == first.context["followups"]
+
+    third = runner.run({"ingest_input": "a", "skills_input": "changed"})
+
+    assert sorted(calls) == ["followups", "skills"]
+    assert third.get("ingest").cached and third.get("extract").cached
+    assert not third.get("followups").cached
+
+
+def test_failed_tasks_are_not_memoised() -> None:
+    store = MemoryResultStore()
+    attempts = {"count": 0}
+
+    def flaky(_: WorkflowContext) -> str:
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    runner = WorkflowRunner([Task(name="flaky", func=flaky, cache_key=lambda _ctx: "same", store=store)])
+
+    assert runner.run().get("flaky").status is TaskStatus.FAILED
+    assert runner.run().get("flaky").cached is False
+    assert runner.run().get("flaky").cached is True
+    assert attempts["count"] == 2
+
+
+def test_session_and_disk_result_stores(tmp_path) -> None:
+    state: dict[str, object] = {}
+    session = SessionResultStore("cache.key", "cache.result", accept=lambda value: isinstance(value, dict), state=state)
+    session.save("k1", {"questions": []})
+
+    assert session.load("k1") == (True, {"questions": []})
+    assert session.load("k2") == (False, None)
+    state["cache.result"] = "stale"
+    assert session.load("k1") == (False, None)
+
+    disk = DiskResultStore(tmp_path / "cache")
+    disk.save("abc", {"value": 1})
+    assert DiskResultStore(tmp_path / "cache").load("abc") == (True, {"value": 1})
+    (tmp_path / "cache" / "broken.pkl").write_bytes(b"not a pickle")
+    assert disk.load("broken") == (False, None)
+    assert not (tmp_path / "cache" / "broken.pkl").exists()
@@ -0,0 +1,203 @@
+"""Cooperative cancellation tokens and deadline propagation.
+
+Workflow tasks run on shared worker threads that cannot be killed. Instead of
+abandoning timed-out threads, the workflow engine hands every attempt a
+:class:`CancellationToken` and binds it to a context variable. Long running
+helpers (most importantly :func:`openai_utils.api.call_chat_api`) read the
+active token via :func:`current_token`, cap their network timeouts with
+:func:`remaining_time` and stop early once the token is cancelled.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from threading import Event, Lock
+from typing import Iterator
+
+DEADLINE_REASON = "deadline exceeded"
+"""Cancellation reason recorded when a token's deadline passes."""
+
+
+class OperationCancelled(RuntimeError):
+    """Raised when work observes that its cancellation token was cancelled."""
+
+
+class DeadlineExceeded(OperationCancelled, TimeoutError):
+    """Raised when work observes that its deadline has passed."""
+
+
+class CancellationToken:
+    """Thread-safe, hierarchical cancellation signal with an optional deadline.
+
+    ``deadline`` is expressed in :func:`time.monotonic` seconds. Child tokens
+    inherit the earliest deadline of their parents and are cancelled together
+    with them.
+    """
+
+    __slots__ = ("_children", "_deadline", "_event", "_lock", "_parent", "_reason")
+
+    def __init__(self, *, deadline: float | None = None, parent: CancellationToken | None = None) -> None:
+        self._event = Event()
+        self._lock = Lock()
+        self._reason: str | None = None
+        self._children: list[CancellationToken] = []
+        self._parent = parent
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+        self._deadline = deadline
+        if parent is not None:
+            parent._adopt(self)
+
+    @classmethod
+    def with_timeout(cls, timeout: float | None, *, parent: CancellationToken | None = None) -> CancellationToken:
+        """Return a token whose deadline lies ``timeout`` seconds from now."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return cls(deadline=deadline, parent=parent)
+
+    def _adopt(self, child: CancellationToken) -> None:
+        with self._lock:
+            if not self._event.is_set():
+                self._children.append(child)
+                return
+            reason = self._reason
+        child.cancel(reason)
+
+    def child(self, timeout: float | None = None) -> CancellationToken:
+        """Return a child token, optionally with a tighter ``timeout``."""
+
+        return CancellationToken.with_timeout(timeout, parent=self)
+
+    def detach(self) -> None:
+        """Stop propagating parent cancellation to this token."""
+
+        parent = self._parent
+        if parent is None:
+            return
+        with parent._lock:
+            try:
+                parent._children.remove(self)
+            except ValueError:
+                pass
+        self._parent = None
+
+    def cancel(self, reason: str | None = None) -> None:
+        """Cancel the token and all of its children."""
+
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason or "cancelled"
+            self._event.set()
+            children, self._children = self._children, []
+        for child in children:
+            child.cancel(self._reason)
+
+    @property
+    def deadline(self) -> float | None:
+        """Monotonic deadline or ``None`` when the token never expires."""
+
+        return self._deadline
+
+    @property
+    def reason(self) -> str | None:
+        """Reason passed to :meth:`cancel` (``None`` while active)."""
+
+        if self._event.is_set():
+            return self._reason
+        if self.expired:
+            return DEADLINE_REASON
+        return None
+
+    @property
+    def expired(self) -> bool:
+        """Return ``True`` once the deadline has passed."""
+
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    @property
+    def cancelled(self) -> bool:
+        """Return ``True`` when cancelled explicitly or past the deadline."""
+
+        return self._event.is_set() or self.expired
+
+    def remaining(self) -> float | None:
+        """Seconds until the deadline (never negative) or ``None``."""
+
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        """Raise :class:`OperationCancelled`/:class:`DeadlineExceeded` if applicable."""
+
+        if self._event.is_set():
+            if self._reason == DEADLINE_REASON:
+                raise DeadlineExceeded(self._reason)
+            raise OperationCancelled(self._reason or "cancelled")
+        if self.expired:
+            raise DeadlineExceeded(DEADLINE_REASON)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until cancelled, the deadline passes or ``timeout`` elapses."""
+
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return self._event.wait(timeout) or self.expired
+
+
+_current_token: contextvars.ContextVar[CancellationToken | None] = contextvars.ContextVar(
+    "cancellation_token", default=None
+)
+
+
+def current_token() -> CancellationToken | None:
+    """Return the token bound to the current execution context, if any."""
+
+    return _current_token.get()
+
+
+@contextmanager
+def bind_token(token: CancellationToken | None) -> Iterator[CancellationToken | None]:
+    """Bind ``token`` as the active cancellation token inside the block."""
+
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def remaining_time(default: float | None = None) -> float | None:
+    """Return the time left before the active deadline, capped at ``default``."""
+
+    token = _current_token.get()
+    remaining = token.remaining() if token is not None else None
+    if remaining is None:
+        return default
+    if default is None:
+        return remaining
+    return min(default, remaining)
+
+
+def raise_if_cancelled() -> None:
+    """Raise when the active token was cancelled or its deadline passed."""
+
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+__all__ = [
+    "DEADLINE_REASON",
+    "CancellationToken",
+    "DeadlineExceeded",
+    "OperationCancelled",
+    "bind_token",
+    "current_token",
+    "raise_if_cancelled",
+    "remaining_time",
+]
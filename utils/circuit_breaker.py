@@ -1,11 +1,36 @@
+"""Circuit breakers for external services.
+
+:class:`CircuitBreaker` keeps its state in a per-session store and guards
+optional enrichment calls of a single user. :class:`ServiceBreaker` is the
+process-wide variant used for shared dependencies (OpenAI per model, ESCO,
+URL fetching): its state lives in a :class:`BreakerBackend` that is either
+process memory or a SQLite file shared by all workers on the host
+(``CIRCUIT_BREAKER_STATE_PATH``), so one session's failures let every other
+session fail fast. Only one caller at a time probes a half-open service.
+
+Each service also gets an :class:`AdaptiveConcurrencyLimit` that grows
+additively on success and shrinks multiplicatively on failures or overload
+(AIMD). The limit is per process; breaker state is what workers share.
+"""
+
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import StrEnum
+import json
 import logging
-from typing import Any, MutableMapping, Callable
+import os
+import sqlite3
+import threading
 import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, MutableMapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any, Protocol
 
+from utils.cancellation import remaining_time
+from utils.env import env_float, env_int
 
 logger = logging.getLogger(__name__)
 
@@ -122,3 +147,506 @@ class CircuitBreaker:
             "failure_count": state.failure_count,
             "last_failure_ts": state.last_failure_ts,
         }
+
+
+DEFAULT_FAILURE_THRESHOLD = env_int("CIRCUIT_BREAKER_FAILURE_THRESHOLD", 5, minimum=1)
+DEFAULT_RECOVERY_SECONDS = env_float("CIRCUIT_BREAKER_RECOVERY_SECONDS", 30.0, positive=True)
+DEFAULT_PROBE_LEASE_SECONDS = env_float("CIRCUIT_BREAKER_PROBE_LEASE", 90.0, positive=True)
+DEFAULT_MAX_WAIT_SECONDS = env_float("CIRCUIT_BREAKER_MAX_WAIT", 10.0, positive=True)
+STATE_PATH = os.getenv("CIRCUIT_BREAKER_STATE_PATH", "").strip()
+# Services are created on demand (URL fetching gets one per host), so the
+# registry and the in-memory state keep only the most recently used ones.
+MAX_SERVICES = env_int("CIRCUIT_BREAKER_MAX_SERVICES", 256, minimum=1)
+
+# (initial, maximum) concurrency per service family, keyed by the part of the
+# service name before the first ``:`` (``openai:gpt-4o`` -> ``openai``).
+_SERVICE_LIMITS: dict[str, tuple[float, float]] = {
+    "openai": (8.0, 64.0),
+    "esco": (4.0, 16.0),
+    "url_fetch": (4.0, 16.0),
+}
+_DEFAULT_LIMITS = (4.0, 32.0)
+
+
+class CallOutcome(StrEnum):
+    """How a guarded call ended, from the breaker's point of view."""
+
+    SUCCESS = "success"
+    FAILURE = "failure"
+    OVERLOAD = "overload"
+    IGNORED = "ignored"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a service breaker rejects a call without attempting it."""
+
+    def __init__(self, service: str, *, reason: str, retry_after: float | None = None) -> None:
+        detail = f"{service} unavailable ({reason})"
+        if retry_after is not None:
+            detail += f"; retry in {retry_after:.1f}s"
+        super().__init__(detail)
+        self.service = service
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD concurrency limit for one service within this process.
+
+    Every success raises the limit by ``increase / limit`` (about one slot
+    per window of successful calls); every failure or overload multiplies it
+    by ``backoff``. Callers beyond the current limit wait for a free slot.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: float = 4.0,
+        minimum: float = 1.0,
+        maximum: float = 32.0,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+    ) -> None:
+        if not 1.0 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        if not 0.0 < backoff < 1.0:
+            raise ValueError("backoff must be between 0 and 1")
+        self._limit = initial
+        self._minimum = minimum
+        self._maximum = maximum
+        self._increase = increase
+        self._backoff = backoff
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrent calls allowed."""
+
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Take a slot, waiting up to ``timeout`` seconds; return success."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self._in_flight += 1
+            return True
+
+    def release(self, outcome: CallOutcome) -> None:
+        """Return a slot and adapt the limit to ``outcome``."""
+
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            if outcome is CallOutcome.SUCCESS:
+                self._limit = min(self._maximum, self._limit + self._increase / self._limit)
+            elif outcome in {CallOutcome.FAILURE, CallOutcome.OVERLOAD}:
+                self._limit = max(self._minimum, self._limit * self._backoff)
+            self._condition.notify_all()
+
+
+class BreakerBackend(Protocol):
+    """Storage for shared breaker state (one JSON-like dict per service)."""
+
+    def read(self, service: str) -> dict[str, Any]:
+        """Return the stored state for ``service`` (empty when unknown)."""
+
+    def update(self, service: str, mutate: Callable[[dict[str, Any]], Any]) -> Any:
+        """Atomically apply ``mutate`` to the state of ``service``.
+
+        ``mutate`` edits the dict in place; its return value is passed through.
+        """
+
+
+class MemoryBreakerBackend:
+    """Breaker state shared by all sessions of this process.
+
+    Keeps the ``max_services`` most recently updated services; an evicted
+    service starts again from a closed circuit.
+    """
+
+    def __init__(self, *, max_services: int = MAX_SERVICES) -> None:
+        self._states: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._max_services = max_services
+        self._lock = threading.Lock()
+
+    def read(self, service: str) -> dict[str, Any]:
+        with self._lock:
+            return dict(self._states.get(service, {}))
+
+    def update(self, service: str, mutate: Callable[[dict[str, Any]], Any]) -> Any:
+        with self._lock:
+            state = dict(self._states.get(service, {}))
+            result = mutate(state)
+            self._states[service] = state
+            self._states.move_to_end(service)
+            while len(self._states) > self._max_services:
+                self._states.popitem(last=False)
+            return result
+
+
+class SQLiteBreakerBackend:
+    """Breaker state in a SQLite file shared by every worker on the host.
+
+    Updates run inside ``BEGIN IMMEDIATE`` transactions so concurrent
+    processes serialise their state changes, which is what makes the
+    single half-open probe hold across workers.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], *, timeout: float = 5.0) -> None:
+        self._path = os.fspath(path)
+        self._timeout = timeout
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS breakers (service TEXT PRIMARY KEY, state TEXT NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None)
+
+    @staticmethod
+    def _load(connection: sqlite3.Connection, service: str) -> dict[str, Any]:
+        row = connection.execute("SELECT state FROM breakers WHERE service = ?", (service,)).fetchone()
+        if row is None:
+            return {}
+        try:
+            state = json.loads(row[0])
+        except (TypeError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def read(self, service: str) -> dict[str, Any]:
+        connection = self._connect()
+        try:
+            return self._load(connection, service)
+        finally:
+            connection.close()
+
+    def update(self, service: str, mutate: Callable[[dict[str, Any]], Any]) -> Any:
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._load(connection, service)
+                result = mutate(state)
+                connection.execute(
+                    "INSERT OR REPLACE INTO breakers (service, state) VALUES (?, ?)",
+                    (service, json.dumps(state)),
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+        finally:
+            connection.close()
+
+
+class BreakerPermit:
+    """Admission for one guarded call; report its outcome exactly once."""
+
+    def __init__(self, breaker: ServiceBreaker, *, probe_id: str | None) -> None:
+        self._breaker = breaker
+        self.probe_id = probe_id
+        self.outcome: CallOutcome | None = None
+
+    @property
+    def service(self) -> str:
+        return self._breaker.service
+
+    @property
+    def is_probe(self) -> bool:
+        """``True`` when this call tests whether a half-open service recovered."""
+
+        return self.probe_id is not None
+
+    def record(self, outcome: CallOutcome) -> None:
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        self._breaker._settle(self, outcome)
+
+    def success(self) -> None:
+        self.record(CallOutcome.SUCCESS)
+
+    def failure(self) -> None:
+        self.record(CallOutcome.FAILURE)
+
+    def overload(self) -> None:
+        self.record(CallOutcome.OVERLOAD)
+
+
+class ServiceBreaker:
+    """Process-wide circuit breaker with an adaptive concurrency limit.
+
+    State transitions mirror :class:`CircuitBreaker`, but an open circuit
+    hands out a single probe lease once ``recovery_timeout`` has passed.
+    Other callers keep failing fast until the probe reports back or its lease
+    (``probe_lease`` seconds) expires.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        *,
+        backend: BreakerBackend,
+        limiter: AdaptiveConcurrencyLimit | None = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_SECONDS,
+        probe_lease: float = DEFAULT_PROBE_LEASE_SECONDS,
+        max_wait: float = DEFAULT_MAX_WAIT_SECONDS,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        if failure_threshold < 1:
+            msg = "failure_threshold must be >= 1"
+            raise ValueError(msg)
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_lease = probe_lease
+        self.max_wait = max_wait
+        self.limiter = limiter or AdaptiveConcurrencyLimit()
+        self._backend = backend
+        # Shared state may be read by other processes, so use wall-clock time.
+        self._clock = clock or time.time
+        self._rejected = 0
+
+    def current_state(self) -> CircuitBreakerState:
+        """Return the shared breaker state."""
+
+        raw = self._read()
+        return CircuitBreakerState(
+            state=_parse_state(raw.get("state")),
+            failure_count=int(raw.get("failure_count") or 0),
+            last_failure_ts=raw.get("opened_at"),
+        )
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            return self._backend.read(self.service)
+        except sqlite3.Error:
+            logger.warning("Circuit breaker state for %s unavailable; allowing call", self.service, exc_info=True)
+            return {}
+
+    def _update(self, mutate: Callable[[dict[str, Any]], Any]) -> Any:
+        try:
+            return self._backend.update(self.service, mutate)
+        except sqlite3.Error:
+            logger.warning("Could not update circuit breaker state for %s", self.service, exc_info=True)
+            return None
+
+    def _admit(self, state: dict[str, Any]) -> tuple[str | None, CircuitOpenError | None]:
+        now = self._clock()
+        current = _parse_state(state.get("state"))
+        if current is CircuitState.OPEN:
+            elapsed = now - float(state.get("opened_at") or 0.0)
+            if elapsed < self.recovery_timeout:
+                return None, CircuitOpenError(self.service, reason="open", retry_after=self.recovery_timeout - elapsed)
+        elif current is CircuitState.HALF_OPEN:
+            lease_until = float(state.get("probe_until") or 0.0)
+            if lease_until > now:
+                return None, CircuitOpenError(self.service, reason="probing", retry_after=lease_until - now)
+        else:
+            return None, None
+        probe_id = uuid.uuid4().hex
+        state.update(state=CircuitState.HALF_OPEN.value, probe_id=probe_id, probe_until=now + self.probe_lease)
+        return probe_id, None
+
+    def acquire(self, *, timeout: float | None = None) -> BreakerPermit:
+        """Admit one call or raise :class:`CircuitOpenError`.
+
+        Waiting for a concurrency slot is bounded by ``timeout`` (default
+        ``max_wait``) and by the active cancellation deadline.
+        """
+
+        probe_id: str | None = None
+        if _parse_state(self._read().get("state")) is not CircuitState.CLOSED:
+            admitted = self._update(self._admit)
+            if admitted is not None:
+                probe_id, error = admitted
+                if error is not None:
+                    self._rejected += 1
+                    raise error
+        permit = BreakerPermit(self, probe_id=probe_id)
+        wait = remaining_time(self.max_wait if timeout is None else timeout)
+        if not self.limiter.acquire(wait):
+            self._rejected += 1
+            if probe_id is not None:
+                self._update(lambda state: self._release_probe(state, probe_id, CallOutcome.IGNORED))
+            raise CircuitOpenError(self.service, reason="saturated")
+        return permit
+
+    @contextmanager
+    def guard(
+        self,
+        *,
+        classify: Callable[[BaseException], CallOutcome] | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[BreakerPermit]:
+        """Run the block under a permit; exceptions are classified as outcomes.
+
+        Without ``classify`` every :class:`Exception` counts as a failure and
+        other :class:`BaseException` subclasses (cancellation, interpreter
+        shutdown) are ignored. A block that finishes without recording an
+        outcome counts as a success.
+        """
+
+        permit = self.acquire(timeout=timeout)
+        try:
+            yield permit
+        except BaseException as exc:
+            if classify is not None:
+                outcome = classify(exc)
+            else:
+                outcome = CallOutcome.FAILURE if isinstance(exc, Exception) else CallOutcome.IGNORED
+            permit.record(outcome)
+            raise
+        permit.record(CallOutcome.SUCCESS)
+
+    def _release_probe(self, state: dict[str, Any], probe_id: str, outcome: CallOutcome) -> None:
+        if state.get("probe_id") != probe_id:
+            return
+        state.pop("probe_id", None)
+        state.pop("probe_until", None)
+        if outcome is CallOutcome.SUCCESS:
+            state.clear()
+            state.update(state=CircuitState.CLOSED.value, failure_count=0)
+        elif outcome is CallOutcome.IGNORED:
+            # The probe never reached the service; let the next caller try.
+            state["state"] = CircuitState.OPEN.value
+        else:
+            state.update(state=CircuitState.OPEN.value, opened_at=self._clock())
+
+    def _record(self, state: dict[str, Any], outcome: CallOutcome) -> None:
+        if _parse_state(state.get("state")) is not CircuitState.CLOSED:
+            return
+        if outcome is CallOutcome.SUCCESS:
+            state["failure_count"] = 0
+        elif outcome is CallOutcome.FAILURE:
+            failures = int(state.get("failure_count") or 0) + 1
+            state["failure_count"] = failures
+            if failures >= self.failure_threshold:
+                state.update(state=CircuitState.OPEN.value, opened_at=self._clock())
+                logger.warning("Circuit for %s opened after %s consecutive failures", self.service, failures)
+
+    def _settle(self, permit: BreakerPermit, outcome: CallOutcome) -> None:
+        self.limiter.release(outcome)
+        probe_id = permit.probe_id
+        if probe_id is not None:
+            self._update(lambda state: self._release_probe(state, probe_id, outcome))
+            if outcome is CallOutcome.SUCCESS:
+                logger.info("Circuit for %s closed after a successful probe", self.service)
+            return
+        if outcome is CallOutcome.FAILURE or (
+            outcome is CallOutcome.SUCCESS and int(self._read().get("failure_count") or 0) > 0
+        ):
+            self._update(lambda state: self._record(state, outcome))
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return breaker and concurrency metrics for dashboards and logs."""
+
+        state = self.current_state()
+        return {
+            "state": state.state.value,
+            "failure_count": state.failure_count,
+            "limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "rejected": self._rejected,
+        }
+
+
+def _parse_state(raw: Any) -> CircuitState:
+    if isinstance(raw, str):
+        try:
+            return CircuitState(raw)
+        except ValueError:
+            pass
+    return CircuitState.CLOSED
+
+
+def _default_backend() -> BreakerBackend:
+    if STATE_PATH:
+        try:
+            return SQLiteBreakerBackend(STATE_PATH)
+        except (OSError, sqlite3.Error):
+            logger.warning("Cannot open CIRCUIT_BREAKER_STATE_PATH=%r; using process memory", STATE_PATH, exc_info=True)
+    return MemoryBreakerBackend()
+
+
+_BREAKERS: OrderedDict[str, ServiceBreaker] = OrderedDict()
+_BACKEND: BreakerBackend | None = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_breaker(service: str) -> ServiceBreaker:
+    """Return the process-wide breaker for ``service`` (e.g. ``"openai:gpt-4o"``).
+
+    The registry holds at most ``CIRCUIT_BREAKER_MAX_SERVICES`` breakers and
+    drops the least recently used one beyond that. The circuit state of an
+    evicted breaker lives on in the backend; only its concurrency limit
+    starts over.
+    """
+
+    global _BACKEND
+    with _REGISTRY_LOCK:
+        breaker = _BREAKERS.get(service)
+        if breaker is not None:
+            _BREAKERS.move_to_end(service)
+        else:
+            if _BACKEND is None:
+                _BACKEND = _default_backend()
+            initial, maximum = _SERVICE_LIMITS.get(service.split(":", 1)[0], _DEFAULT_LIMITS)
+            breaker = ServiceBreaker(
+                service,
+                backend=_BACKEND,
+                limiter=AdaptiveConcurrencyLimit(initial=initial, maximum=maximum),
+            )
+            _BREAKERS[service] = breaker
+            while len(_BREAKERS) > MAX_SERVICES:
+                _BREAKERS.popitem(last=False)
+        return breaker
+
+
+def breaker_metrics() -> dict[str, dict[str, Any]]:
+    """Return :meth:`ServiceBreaker.snapshot` for every registered service."""
+
+    with _REGISTRY_LOCK:
+        breakers = list(_BREAKERS.values())
+    return {breaker.service: breaker.snapshot() for breaker in breakers}
+
+
+def reset_breakers(backend: BreakerBackend | None = None) -> None:
+    """Forget all registered breakers (used by tests and reloads).
+
+    ``backend`` replaces the shared state backend for breakers created later.
+    """
+
+    global _BACKEND
+    with _REGISTRY_LOCK:
+        _BREAKERS.clear()
+        _BACKEND = backend
+
+
+__all__ = [
+    "AdaptiveConcurrencyLimit",
+    "BreakerBackend",
+    "BreakerPermit",
+    "CallOutcome",
+    "CircuitBreaker",
+    "CircuitBreakerState",
+    "CircuitOpenError",
+    "CircuitState",
+    "MemoryBreakerBackend",
+    "SQLiteBreakerBackend",
+    "ServiceBreaker",
+    "breaker_metrics",
+    "get_breaker",
+    "reset_breakers",
+]
@@ -0,0 +1,67 @@
+"""Numeric settings read from environment variables.
+
+Tuning knobs are read once at import time. A missing or empty variable yields
+the default; a value that does not parse or falls outside the accepted range
+is logged and replaced by the default, so a typo in the deployment config
+never prevents the app from starting.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def env_float(
+    name: str,
+    default: float,
+    *,
+    positive: bool = False,
+    maximum: float | None = None,
+) -> float:
+    """Return the float stored in environment variable ``name``.
+
+    Args:
+        name: Environment variable to read.
+        default: Value used when the variable is unset, invalid or out of range.
+        positive: Reject zero and negative values.
+        maximum: Reject values above this bound.
+    """
+
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw, default)
+        return default
+    if (positive and value <= 0) or (maximum is not None and value > maximum):
+        logger.warning("Out of range %s=%r; using %s", name, raw, default)
+        return default
+    return value
+
+
+def env_int(name: str, default: int, *, minimum: int | None = None) -> int:
+    """Return the integer stored in environment variable ``name``.
+
+    Args:
+        name: Environment variable to read.
+        default: Value used when the variable is unset, invalid or out of range.
+        minimum: Reject values below this bound.
+    """
+
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw, default)
+        return default
+    if minimum is not None and value < minimum:
+        logger.warning("Out of range %s=%r; using %s", name, raw, default)
+        return default
+    return value
@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import json
 import logging
-import re
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Callable, Mapping, Sequence
 
+from utils.json_salvage import salvage_json_object
+
 logger = logging.getLogger(__name__)
 
 RepairFunction = Callable[[Mapping[str, Any], Sequence[Mapping[str, Any]] | None], Mapping[str, Any] | None]
@@ -38,61 +39,6 @@ class JsonRepairResult:
         return self.status is JsonRepairStatus.REPAIRED
 
 
-def _trim_noise(raw: str) -> str:
-    """Return ``raw`` limited to the outermost JSON object if present."""
-
-    start = raw.find("{")
-    end = raw.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return raw[start : end + 1]
-    return raw
-
-
-def _strip_trailing_commas(candidate: str) -> str:
-    """Remove trailing commas before closing braces/brackets."""
-
-    return re.sub(r",\s*([}\]])", r"\1", candidate)
-
-
-def _balance_braces(candidate: str) -> str:
-    """Append missing closing braces when clearly unbalanced."""
-
-    opens = candidate.count("{")
-    closes = candidate.count("}")
-    if opens > closes:
-        candidate = f"{candidate}{'}' * (opens - closes)}"
-    return candidate
-
-
-def _attempt_local_repair(raw: str) -> Mapping[str, Any] | None:
-    """Try lightweight, local fixes for malformed JSON strings."""
-
-    from utils import json_parse
-
-    parsed: Mapping[str, Any] | None
-    try:
-        parsed = json_parse._safe_json_loads(raw)
-    except Exception:
-        parsed = json_parse._decode_largest_object(raw)
-    if isinstance(parsed, Mapping):
-        return dict(parsed)
-
-    attempts: list[str] = []
-    trimmed = _trim_noise(raw)
-    attempts.append(trimmed)
-    attempts.append(_strip_trailing_commas(trimmed))
-    attempts.append(_balance_braces(_strip_trailing_commas(trimmed)))
-
-    for candidate in attempts:
-        try:
-            parsed = json.loads(candidate)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(parsed, Mapping):
-            return dict(parsed)
-    return None
-
-
 def parse_json_with_repair(
     raw: str,
     *,
@@ -115,11 +61,13 @@ def parse_json_with_repair(
     except json.JSONDecodeError as exc:
         message = f"JSON parsing error at line {exc.lineno}, column {exc.colno}: {exc.msg}"
         issues.append(message)
-        repaired: Mapping[str, Any] | None = _attempt_local_repair(raw)
-        if repaired is not None:
+        salvaged = salvage_json_object(raw, try_strict=False)
+        if salvaged.value is not None:
+            issues.extend(salvaged.repairs)
             return JsonRepairResult(
-                payload=repaired, status=JsonRepairStatus.REPAIRED, issues=issues, repair_confidence=0.55
+                payload=salvaged.value, status=JsonRepairStatus.REPAIRED, issues=issues, repair_confidence=0.55
             )
+        repaired: Mapping[str, Any] | None = None
         if repair_func is not None:
             repaired = repair_func({}, errors or [{"loc": ("<root>",), "msg": message}])
             if isinstance(repaired, Mapping):
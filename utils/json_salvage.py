@@ -0,0 +1,324 @@
+"""Single-pass, tolerant JSON object parser for LLM output.
+
+Model responses are usually valid JSON, but now and then they arrive wrapped
+in Markdown fences or prose, with trailing commas, cut off mid-string by the
+token limit, or with unclosed braces. :func:`salvage_json_object` recovers
+the largest JSON object from such text in one left-to-right scan. It keeps a
+stack of open containers instead of re-parsing transformed copies of the
+whole string, so a truncated 50 kB response costs one pass instead of
+several.
+
+Every deviation from strict JSON is recorded as a short diagnostic in
+:attr:`SalvageResult.repairs`; an empty tuple means the text was valid JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import json.decoder
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+# The stdlib string scanner (C-accelerated) is not part of typeshed's stubs.
+_scanstring: Callable[[str, int, bool], tuple[str, int]] = json.decoder.scanstring  # type: ignore[attr-defined]
+
+_WHITESPACE_RE = re.compile("[ \t\n\r\ufeff]*")
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_LITERAL_RE = re.compile(r"(true|false|null|True|False|None)\b")
+_BARE_KEY_RE = re.compile(r"[A-Za-z_][\w-]*")
+_UNTERMINATED_TAIL_RE = re.compile(r"[\s}\]]+$")
+_PARTIAL_ESCAPE_RE = re.compile(r"\\(?:u[0-9a-fA-F]{0,3})?$")
+
+_LITERALS: dict[str, Any] = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "True": True,
+    "False": False,
+    "None": None,
+}
+
+# Parser states of an open container.
+_KEY = 0  # object: expecting a key (or the closing brace)
+_COLON = 1  # object: key read, expecting ':'
+_VALUE = 2  # expecting a value (or, in arrays, the closing bracket)
+_AFTER = 3  # value read, expecting ',' or the closing bracket
+
+
+@dataclass(frozen=True)
+class SalvageResult:
+    """Best-effort object recovered from ``raw`` plus repair diagnostics."""
+
+    value: dict[str, Any] | None
+    repairs: tuple[str, ...] = ()
+    start: int = -1
+    end: int = -1
+
+    @property
+    def repaired(self) -> bool:
+        """Return ``True`` when the object needed any repair."""
+
+        return bool(self.repairs)
+
+
+@dataclass
+class _Frame:
+    container: dict[str, Any] | list[Any]
+    state: int
+    key: str | None = None
+    after_comma: bool = False
+
+
+@dataclass
+class _Scan:
+    value: dict[str, Any]
+    start: int
+    end: int
+    repairs: list[str] = field(default_factory=list)
+    stopped: bool = False
+
+    @property
+    def failed(self) -> bool:
+        """Return ``True`` when unexpected input ended the scan before any key was read."""
+
+        return self.stopped and not self.value
+
+
+def salvage_json_object(raw: str, *, try_strict: bool = True) -> SalvageResult:
+    """Return the largest JSON object in ``raw``, repairing it where needed.
+
+    Valid JSON objects are returned unchanged without diagnostics; callers
+    that already know ``json.loads`` fails pass ``try_strict=False``.
+    Otherwise every top-level ``{`` outside a previously scanned object
+    starts a scan, and the object spanning the most characters wins, so each
+    character is read once. A brace followed by something that is not JSON
+    (single quotes, prose) yields no object, so callers never mistake an
+    empty ``{}`` for a successful parse.
+    """
+
+    if not raw:
+        return SalvageResult(None, ("empty input",))
+    if try_strict:
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            pass
+        else:
+            if isinstance(parsed, dict):
+                return SalvageResult(parsed, (), 0, len(raw))
+
+    best: _Scan | None = None
+    rejected: _Scan | None = None
+    position = raw.find("{")
+    while position != -1:
+        scan = _scan_object(raw, position)
+        if scan.failed:
+            rejected = rejected or scan
+        elif best is None or scan.end - scan.start > best.end - best.start:
+            best = scan
+        position = raw.find("{", max(scan.end, position + 1))
+
+    if best is None:
+        if rejected is not None:
+            return SalvageResult(None, tuple(rejected.repairs), rejected.start, rejected.end)
+        return SalvageResult(None, ("no JSON object found",))
+    repairs: list[str] = []
+    if raw[: best.start].strip():
+        repairs.append(f"ignored {best.start} leading character(s)")
+    repairs.extend(best.repairs)
+    if raw[best.end :].strip():
+        repairs.append(f"ignored {len(raw) - best.end} trailing character(s)")
+    return SalvageResult(best.value, tuple(repairs), best.start, best.end)
+
+
+def _scan_object(text: str, start: int) -> _Scan:
+    """Parse the object opening at ``start`` until it closes or parsing stops."""
+
+    root: dict[str, Any] = {}
+    scan = _Scan(root, start, len(text))
+    stack = [_Frame(root, _KEY)]
+    length = len(text)
+    index = start + 1
+
+    while stack:
+        index = _WHITESPACE_RE.match(text, index).end()  # type: ignore[union-attr]
+        if index >= length:
+            scan.repairs.append(f"closed {len(stack)} unterminated container(s) at end of input")
+            _drop_pending_key(stack[-1], scan)
+            scan.end = length
+            break
+        frame = stack[-1]
+        char = text[index]
+
+        if char in "}]":
+            if frame.after_comma:
+                scan.repairs.append(f"removed trailing comma before offset {index}")
+            _drop_pending_key(frame, scan)
+            expected = "}" if isinstance(frame.container, dict) else "]"
+            if char != expected:
+                scan.repairs.append(f"replaced mismatched {char!r} at offset {index}")
+            stack.pop()
+            index += 1
+            if stack:
+                _finish_value(stack[-1])
+            else:
+                scan.end = index
+            continue
+
+        if char == ",":
+            if frame.state == _AFTER:
+                frame.state = _KEY if isinstance(frame.container, dict) else _VALUE
+                frame.after_comma = True
+            else:
+                if frame.key is not None:
+                    _drop_pending_key(frame, scan)
+                    frame.state = _KEY
+                else:
+                    scan.repairs.append(f"removed extra comma at offset {index}")
+            index += 1
+            continue
+
+        if frame.state == _AFTER:
+            scan.repairs.append(f"inserted missing comma at offset {index}")
+            frame.state = _KEY if isinstance(frame.container, dict) else _VALUE
+            continue
+
+        if frame.state == _KEY:
+            if char == '"':
+                key, index, closed = _scan_string(text, index)
+                if not closed:
+                    # A key cut off by the end of input has no value.
+                    scan.repairs.append("dropped truncated key at end of input")
+                    continue
+            else:
+                match = _BARE_KEY_RE.match(text, index)
+                if match is None:
+                    _stop(text, scan, stack, index)
+                    break
+                key, index = match.group(0), match.end()
+                scan.repairs.append(f"quoted bare key {key!r}")
+            frame.key = key
+            frame.state = _COLON
+            frame.after_comma = False
+            continue
+
+        if frame.state == _COLON:
+            if char == ":":
+                frame.state = _VALUE
+                index += 1
+                continue
+            scan.repairs.append(f"inserted missing colon at offset {index}")
+            frame.state = _VALUE
+
+        # _VALUE
+        frame.after_comma = False
+        if char == "{" or char == "[":
+            child: dict[str, Any] | list[Any] = {} if char == "{" else []
+            _attach(frame, child)
+            stack.append(_Frame(child, _KEY if char == "{" else _VALUE))
+            index += 1
+            continue
+        if char == '"':
+            value, index, closed = _scan_string(text, index)
+            if not closed:
+                scan.repairs.append("closed unterminated string at end of input")
+            _attach(frame, value)
+            _finish_value(frame)
+            continue
+        number = _NUMBER_RE.match(text, index)
+        if number is not None:
+            literal = number.group(0)
+            _attach(frame, float(literal) if any(c in literal for c in ".eE") else int(literal))
+            _finish_value(frame)
+            index = number.end()
+            continue
+        literal_match = _LITERAL_RE.match(text, index)
+        if literal_match is not None:
+            literal = literal_match.group(0)
+            if literal not in {"true", "false", "null"}:
+                scan.repairs.append(f"converted Python literal {literal}")
+            _attach(frame, _LITERALS[literal])
+            _finish_value(frame)
+            index = literal_match.end()
+            continue
+        _stop(text, scan, stack, index)
+        break
+
+    return scan
+
+
+def _scan_string(text: str, index: int) -> tuple[str, int, bool]:
+    """Return ``(value, end, closed)`` for the string literal opening at ``index``."""
+
+    try:
+        value, end = _scanstring(text, index + 1, False)
+    except json.JSONDecodeError:
+        lenient = _scan_lenient_string(text, index)
+        if lenient[2]:
+            return lenient
+        # Truncated output: closing brackets after the cut belong to the
+        # containers, not to the string.
+        content = _UNTERMINATED_TAIL_RE.sub("", text[index + 1 :])
+        content = _PARTIAL_ESCAPE_RE.sub("", content)
+        try:
+            value, _ = _scanstring(content + '"', 0, False)
+        except json.JSONDecodeError:
+            value = content
+        return value, len(text), False
+    return value, end, True
+
+
+def _scan_lenient_string(text: str, index: int) -> tuple[str, int, bool]:
+    """Read a string containing invalid escapes by taking backslashes literally."""
+
+    position = index + 1
+    parts: list[str] = []
+    length = len(text)
+    while position < length:
+        char = text[position]
+        if char == '"':
+            return "".join(parts), position + 1, True
+        if char == "\\" and position + 1 < length:
+            escaped = text[position : position + 2]
+            try:
+                parts.append(json.loads(f'"{escaped}"'))
+            except ValueError:
+                parts.append(escaped[1])
+            position += 2
+            continue
+        parts.append(char)
+        position += 1
+    return "".join(parts), length, False
+
+
+def _attach(frame: _Frame, value: Any) -> None:
+    if isinstance(frame.container, dict):
+        frame.container[frame.key or ""] = value
+        frame.key = None
+    else:
+        frame.container.append(value)
+
+
+def _finish_value(frame: _Frame) -> None:
+    frame.state = _AFTER
+    frame.after_comma = False
+
+
+def _drop_pending_key(frame: _Frame, scan: _Scan) -> None:
+    if frame.key is not None:
+        scan.repairs.append(f"dropped key {frame.key!r} without value")
+        frame.key = None
+
+
+def _stop(text: str, scan: _Scan, stack: list[_Frame], index: int) -> None:
+    """End the scan at unparseable input, keeping everything read so far."""
+
+    _drop_pending_key(stack[-1], scan)
+    scan.repairs.append(f"stopped at unexpected {text[index]!r} at offset {index} and closed {len(stack)} container(s)")
+    scan.end = index
+    scan.stopped = True
+
+
+__all__ = ["SalvageResult", "salvage_json_object"]
@@ -1,30 +1,156 @@
 from __future__ import annotations
 
+import atexit
 import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
 from contextlib import contextmanager
-from typing import Callable, Iterator, TypeVar
+from typing import Any, Callable, Iterator, NamedTuple, TypeVar
+
+from utils.env import env_float
 
 _DEFAULT_LOG_FORMAT = (
     "%(asctime)s %(levelname)s [session=%(session_id)s step=%(wizard_step)s "
     "pipeline=%(pipeline_task)s model=%(model)s] %(name)s: %(message)s"
 )
 
-_session_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("session_id", default="-")
-_wizard_step_var: contextvars.ContextVar[str] = contextvars.ContextVar("wizard_step", default="-")
-_pipeline_task_var: contextvars.ContextVar[str] = contextvars.ContextVar("pipeline_task", default="-")
-_model_var: contextvars.ContextVar[str] = contextvars.ContextVar("model", default="-")
+LOG_ASYNC = os.getenv("LOG_ASYNC", "1").strip().lower() not in {"0", "false", "no", "off"}
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower() or "text"
+LOG_DEBUG_SAMPLE_RATE = env_float("LOG_DEBUG_SAMPLE_RATE", 0.1, maximum=1.0)
+LOG_SAMPLED_LOGGERS: tuple[str, ...] = tuple(
+    name.strip()
+    for name in os.getenv("LOG_SAMPLED_LOGGERS", "cognitive_needs.heuristics,core.rules").split(",")
+    if name.strip()
+)
+
+
+class _LogContext(NamedTuple):
+    session_id: str = "-"
+    wizard_step: str = "-"
+    pipeline_task: str = "-"
+    model: str = "-"
+
+
+_EMPTY_CONTEXT = _LogContext()
+_CONTEXT_FIELDS = frozenset(_LogContext._fields)
+# One variable for all fields: a record captures the whole context with a single
+# lookup and the fields are only expanded when the record is formatted.
+_context_var: contextvars.ContextVar[_LogContext] = contextvars.ContextVar("log_context", default=_EMPTY_CONTEXT)
 _DEFAULT_RECORD_FACTORY = logging.getLogRecordFactory()
 _RECORD_FACTORY_INSTALLED = False
+_LISTENER: logging.handlers.QueueListener | None = None
 
 _T = TypeVar("_T")
 
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+_STANDARD_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "log_context"}
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, type(None), bytes)
+
+
+class _ContextLogRecord(logging.LogRecord):
+    """Log record that captures the logging context and resolves fields lazily."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.log_context = _context_var.get()
+
+    def __getattr__(self, name: str) -> str:
+        if name in _CONTEXT_FIELDS:
+            return getattr(self.__dict__.get("log_context", _EMPTY_CONTEXT), name)
+        raise AttributeError(name)
+
 
 def _apply_context(record: logging.LogRecord) -> None:
-    record.session_id = _session_id_var.get("-")
-    record.wizard_step = _wizard_step_var.get("-")
-    record.pipeline_task = _pipeline_task_var.get("-")
-    record.model = _model_var.get("-")
+    """Copy the captured context onto ``record`` so ``%``-style formats can use it."""
+
+    context = record.__dict__.get("log_context")
+    if context is None:
+        context = record.log_context = _context_var.get()
+    for field, value in zip(_LogContext._fields, context):
+        record.__dict__.setdefault(field, value)
+
+
+class LazyJson:
+    """Log argument serialised to JSON only when the record is formatted.
+
+    The payload must not be mutated after it was logged.
+    """
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any) -> None:
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _has_mutable_args(record: logging.LogRecord) -> bool:
+    args = record.args
+    if not args:
+        return False
+    values = args.values() if isinstance(args, dict) else args
+    return not all(isinstance(value, (*_IMMUTABLE_ARG_TYPES, LazyJson)) for value in values)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including context and ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        _apply_context(record)
+        document: dict[str, Any] = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in _LogContext._fields:
+            document[field] = record.__dict__[field]
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS and key not in document:
+                document[key] = value
+        if record.exc_info:
+            document["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            document["exc_info"] = record.exc_text
+        return json.dumps(document, ensure_ascii=False, default=str)
+
+
+class _AsyncQueueHandler(logging.handlers.QueueHandler):
+    """Hand records to the listener thread without formatting them on the caller's thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if _has_mutable_args(record):
+            # Freeze the message now; the arguments may change before the listener runs.
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class _ContextQueueListener(logging.handlers.QueueListener):
+    """Expand the captured context in the listener thread before handlers format it."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        _apply_context(record)
+        return record
+
+
+class _DebugSampler(logging.Filter):
+    """Let through only a fraction of DEBUG records of chatty loggers."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
 
 
 class _ExpectedBareModeFilter(logging.Filter):
@@ -58,59 +184,124 @@ def _coerce(value: str | None) -> str:
     return stripped or "-"
 
 
+def _build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(_DEFAULT_LOG_FORMAT)
+
+
+def _start_async_logging(root: logging.Logger, handler: logging.Handler) -> None:
+    """Route ``root`` through a queue drained by a background listener thread."""
+
+    global _LISTENER
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _LISTENER = _ContextQueueListener(log_queue, handler, respect_handler_level=True)
+    _LISTENER.start()
+    root.addHandler(_AsyncQueueHandler(log_queue))
+    atexit.register(stop_async_logging)
+
+
+def stop_async_logging() -> None:
+    """Flush queued records and stop the listener thread (no-op when logging is synchronous)."""
+
+    global _LISTENER
+    listener, _LISTENER = _LISTENER, None
+    if listener is not None:
+        listener.stop()
+
+
 def configure_logging(*, level: int = logging.INFO) -> None:
-    """Ensure the root logger formats records with contextual metadata."""
+    """Ensure the root logger formats records with contextual metadata.
+
+    When the root logger has no handlers yet, a stderr handler is installed
+    behind a :class:`~logging.handlers.QueueHandler` (``LOG_ASYNC``), so
+    formatting and I/O run on a listener thread instead of the request
+    thread. ``LOG_FORMAT=json`` switches to one JSON object per line.
+    Handlers configured by the host are kept and only get a context filter.
+    """
 
     root = logging.getLogger()
     if not root.handlers:
-        logging.basicConfig(level=level, format=_DEFAULT_LOG_FORMAT)
-        root = logging.getLogger()
+        root.setLevel(level)
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(_build_formatter())
+        if LOG_ASYNC:
+            _start_async_logging(root, stream_handler)
+        else:
+            stream_handler.addFilter(_ContextFilter())
+            root.addHandler(stream_handler)
     for handler in root.handlers:
-        formatter = handler.formatter or logging.Formatter(_DEFAULT_LOG_FORMAT)
-        handler.setFormatter(formatter)
-    has_filter = any(isinstance(flt, _ContextFilter) for flt in root.filters)
-    if not has_filter:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            continue
+        if handler.formatter is None:
+            handler.setFormatter(_build_formatter())
+        if not any(isinstance(flt, _ContextFilter) for flt in handler.filters):
+            handler.addFilter(_ContextFilter())
+    if not any(isinstance(flt, _ContextFilter) for flt in root.filters):
         root.addFilter(_ContextFilter())
     streamlit_logger = logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context")
     if not any(isinstance(flt, _ExpectedBareModeFilter) for flt in streamlit_logger.filters):
         streamlit_logger.addFilter(_ExpectedBareModeFilter())
+    for name in LOG_SAMPLED_LOGGERS:
+        sampled_logger = logging.getLogger(name)
+        if not any(isinstance(flt, _DebugSampler) for flt in sampled_logger.filters):
+            sampled_logger.addFilter(_DebugSampler(LOG_DEBUG_SAMPLE_RATE))
 
     global _RECORD_FACTORY_INSTALLED
     if not _RECORD_FACTORY_INSTALLED:
-        default_factory = _DEFAULT_RECORD_FACTORY
+        if _DEFAULT_RECORD_FACTORY is logging.LogRecord:
+            logging.setLogRecordFactory(_ContextLogRecord)
+        else:
+            default_factory = _DEFAULT_RECORD_FACTORY
 
-        def _record_factory(*args: object, **kwargs: object) -> logging.LogRecord:
-            record = default_factory(*args, **kwargs)
-            _apply_context(record)
-            return record
+            def _record_factory(*args: object, **kwargs: object) -> logging.LogRecord:
+                record = default_factory(*args, **kwargs)
+                _apply_context(record)
+                return record
 
-        logging.setLogRecordFactory(_record_factory)
+            logging.setLogRecordFactory(_record_factory)
         _RECORD_FACTORY_INSTALLED = True
 
 
+def _update_context(**changes: str) -> None:
+    _context_var.set(_context_var.get()._replace(**changes))
+
+
 def set_session_id(session_id: str | None) -> None:
     """Bind a session identifier for subsequent log records."""
 
     configure_logging()
-    _session_id_var.set(_coerce(session_id))
+    _update_context(session_id=_coerce(session_id))
+
+
+def get_session_id() -> str:
+    """Return the session identifier bound to the current context (``"-"`` if unset)."""
+
+    return _context_var.get().session_id
 
 
 def set_wizard_step(step: str | None) -> None:
     """Bind the current wizard step to the logging context."""
 
-    _wizard_step_var.set(_coerce(step))
+    _update_context(wizard_step=_coerce(step))
 
 
 def set_pipeline_task(task: str | None) -> None:
     """Bind the active pipeline or workflow task to the logging context."""
 
-    _pipeline_task_var.set(_coerce(task))
+    _update_context(pipeline_task=_coerce(task))
 
 
 def set_model(model: str | None) -> None:
     """Bind the active model identifier to the logging context."""
 
-    _model_var.set(_coerce(model))
+    _update_context(model=_coerce(model))
+
+
+def get_model() -> str:
+    """Return the model identifier bound to the current context (``"-"`` if unset)."""
+
+    return _context_var.get().model
 
 
 def wrap_with_current_context(func: Callable[..., _T], /, *args: object, **kwargs: object) -> Callable[[], _T]:
@@ -140,17 +331,18 @@ def log_context(
 ) -> Iterator[None]:
     """Temporarily override logging context variables."""
 
-    tokens: list[tuple[contextvars.ContextVar[str], contextvars.Token[str]]] = []
-    if session_id is not None:
-        tokens.append((_session_id_var, _session_id_var.set(_coerce(session_id))))
-    if wizard_step is not None:
-        tokens.append((_wizard_step_var, _wizard_step_var.set(_coerce(wizard_step))))
-    if pipeline_task is not None:
-        tokens.append((_pipeline_task_var, _pipeline_task_var.set(_coerce(pipeline_task))))
-    if model is not None:
-        tokens.append((_model_var, _model_var.set(_coerce(model))))
+    changes = {
+        field: _coerce(value)
+        for field, value in (
+            ("session_id", session_id),
+            ("wizard_step", wizard_step),
+            ("pipeline_task", pipeline_task),
+            ("model", model),
+        )
+        if value is not None
+    }
+    token = _context_var.set(_context_var.get()._replace(**changes))
     try:
         yield
     finally:
-        for var, token in reversed(tokens):
-            var.reset(token)
+        _context_var.reset(token)
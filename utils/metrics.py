@@ -0,0 +1,229 @@
+"""Metric instruments for capacity planning.
+
+All histograms and counters of the app live here. They start out bound to
+the OpenTelemetry no-op meter, and every ``record_*`` helper returns before
+building attributes while metrics are disabled, so instrumented hot paths
+pay for one flag check. :func:`utils.telemetry.setup_metrics` creates the
+``MeterProvider`` (OTLP push or Prometheus pull) and binds the instruments
+through :func:`configure_metrics`.
+
+Durations are recorded in seconds and sizes in bytes.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import ParamSpec, TypeVar
+
+from opentelemetry.metrics import Meter, MeterProvider, NoOpMeterProvider
+from opentelemetry.util.types import Attributes
+
+METER_NAME = "cognitive_needs"
+
+# Seconds: 5 ms .. 2 min, covering heuristics, retrieval, LLM calls and reruns.
+DURATION_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    60.0,
+    120.0,
+)
+# Bytes: 1 KiB .. 20 MiB (the upload limit).
+SIZE_BUCKETS: tuple[float, ...] = tuple(float(1024 * 4**exponent) for exponent in range(8)) + (20 * 1024 * 1024.0,)
+TOKENS_PER_SECOND_BUCKETS: tuple[float, ...] = (5.0, 10.0, 20.0, 40.0, 60.0, 80.0, 120.0, 160.0, 250.0, 400.0)
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+
+class _Instruments:
+    """The app's instruments created on one meter."""
+
+    def __init__(self, meter: Meter) -> None:
+        self.llm_duration = meter.create_histogram(
+            "llm.request.duration", unit="s", description="OpenAI call latency per task and model"
+        )
+        self.llm_ttft = meter.create_histogram(
+            "llm.request.time_to_first_token", unit="s", description="Time to the first streamed token"
+        )
+        self.llm_tokens_per_second = meter.create_histogram(
+            "llm.response.tokens_per_second", unit="{token}/s", description="Output tokens per generation second"
+        )
+        self.llm_errors = meter.create_counter(
+            "llm.request.errors", unit="{request}", description="Transient OpenAI failures"
+        )
+        self.cache_lookups = meter.create_counter(
+            "cache.lookups", unit="{lookup}", description="Cache lookups by cache and hit/miss"
+        )
+        self.heuristic_duration = meter.create_histogram(
+            "heuristics.stage.duration", unit="s", description="Duration of rule-based extraction stages"
+        )
+        self.retrieval_duration = meter.create_histogram(
+            "rag.retrieval.duration", unit="s", description="Vector-store retrieval per field"
+        )
+        self.ingestion_duration = meter.create_histogram(
+            "ingestion.duration", unit="s", description="Document extraction time per source type"
+        )
+        self.ingestion_size = meter.create_histogram(
+            "ingestion.size", unit="By", description="Size of ingested documents per source type"
+        )
+        self.workflow_queue_wait = meter.create_histogram(
+            "workflow.task.queue_wait", unit="s", description="Time a workflow task waited for a worker"
+        )
+        self.rerun_duration = meter.create_histogram(
+            "streamlit.rerun.duration", unit="s", description="Wizard step render time per Streamlit rerun"
+        )
+        self.artifact_duration = meter.create_histogram(
+            "summary.artifact.duration", unit="s", description="Generation time per summary step artifact"
+        )
+
+
+_ENABLED = False
+_INSTRUMENTS = _Instruments(NoOpMeterProvider().get_meter(METER_NAME))
+
+
+def configure_metrics(provider: MeterProvider | None) -> None:
+    """Bind all instruments to ``provider``; ``None`` disables recording."""
+
+    global _ENABLED, _INSTRUMENTS
+    if provider is None:
+        _ENABLED = False
+        _INSTRUMENTS = _Instruments(NoOpMeterProvider().get_meter(METER_NAME))
+        return
+    _INSTRUMENTS = _Instruments(provider.get_meter(METER_NAME))
+    _ENABLED = True
+
+
+def metrics_enabled() -> bool:
+    """Return ``True`` once :func:`configure_metrics` bound a real provider."""
+
+    return _ENABLED
+
+
+def record_llm_call(
+    task: str,
+    model: str,
+    *,
+    latency: float,
+    ttft: float | None = None,
+    output_tokens: int | None = None,
+    error: bool = False,
+) -> None:
+    """Record latency, time to first token, throughput and errors of one LLM call."""
+
+    if not _ENABLED:
+        return
+    attributes = {"task": task, "model": model}
+    if error:
+        _INSTRUMENTS.llm_errors.add(1, attributes)
+        return
+    _INSTRUMENTS.llm_duration.record(latency, attributes)
+    if ttft is not None:
+        _INSTRUMENTS.llm_ttft.record(ttft, attributes)
+    generation_time = latency - ttft if ttft is not None else latency
+    if output_tokens and generation_time > 0:
+        _INSTRUMENTS.llm_tokens_per_second.record(output_tokens / generation_time, attributes)
+
+
+def record_cache_lookup(cache: str, *, hit: bool) -> None:
+    """Count one lookup in ``cache``; hit ratios are derived in the backend."""
+
+    if _ENABLED:
+        _INSTRUMENTS.cache_lookups.add(1, {"cache": cache, "result": "hit" if hit else "miss"})
+
+
+def record_retrieval(seconds: float, *, fallback: bool) -> None:
+    """Record one vector-store retrieval."""
+
+    if _ENABLED:
+        _INSTRUMENTS.retrieval_duration.record(seconds, {"fallback": fallback})
+
+
+def record_ingestion(source_type: str, *, size_bytes: int, seconds: float, success: bool = True) -> None:
+    """Record size and extraction time of one ingested document."""
+
+    if not _ENABLED:
+        return
+    attributes: Attributes = {"source_type": source_type, "success": success}
+    _INSTRUMENTS.ingestion_duration.record(seconds, attributes)
+    _INSTRUMENTS.ingestion_size.record(size_bytes, attributes)
+
+
+def record_queue_wait(task: str, seconds: float) -> None:
+    """Record how long a workflow task waited between submission and start."""
+
+    if _ENABLED:
+        _INSTRUMENTS.workflow_queue_wait.record(max(0.0, seconds), {"task": task})
+
+
+def record_artifact_generation(artifact: str, seconds: float, *, success: bool) -> None:
+    """Record how long one summary artifact took to generate."""
+
+    if _ENABLED:
+        _INSTRUMENTS.artifact_duration.record(max(0.0, seconds), {"artifact": artifact, "success": success})
+
+
+@contextmanager
+def measure_rerun(step: str) -> Iterator[None]:
+    """Record the duration of the enclosed wizard step render."""
+
+    if not _ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _INSTRUMENTS.rerun_duration.record(time.perf_counter() - started, {"step": step})
+
+
+def timed_stage(stage: str) -> Callable[[Callable[_P, _T]], Callable[_P, _T]]:
+    """Decorate a heuristic stage so each call records its duration."""
+
+    def decorator(func: Callable[_P, _T]) -> Callable[_P, _T]:
+        attributes = {"stage": stage}
+
+        @functools.wraps(func)
+        def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _T:
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _INSTRUMENTS.heuristic_duration.record(time.perf_counter() - started, attributes)
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "DURATION_BUCKETS",
+    "METER_NAME",
+    "SIZE_BUCKETS",
+    "TOKENS_PER_SECOND_BUCKETS",
+    "configure_metrics",
+    "measure_rerun",
+    "metrics_enabled",
+    "record_artifact_generation",
+    "record_cache_lookup",
+    "record_ingestion",
+    "record_llm_call",
+    "record_queue_wait",
+    "record_retrieval",
+    "timed_stage",
+]
@@ -415,7 +415,7 @@ def _log_change(path: str, before: Any, after: Any, rule: str) -> None:
             return
         signatures.add(signature)
 
-    HEURISTICS_LOGGER.info(
+    HEURISTICS_LOGGER.debug(
         "Normalized %s via %s",
         path,
         rule,
@@ -0,0 +1,46 @@
+"""Request priority lanes shared by schedulers.
+
+The workflow executor and the OpenAI rate limiter both serve interactive
+work (a user waits on a Streamlit rerun) before background work such as
+prefetching or batch generation. The active lane is carried in a context
+variable so nested helpers inherit it without extra parameters.
+"""
+
+from __future__ import annotations
+
+import contextvars
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Scheduling lanes; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "request_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    """Return the priority lane of the current execution context."""
+
+    return _current_priority.get()
+
+
+@contextmanager
+def bind_priority(priority: Priority) -> Iterator[Priority]:
+    """Run the block in the given ``priority`` lane."""
+
+    reset = _current_priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _current_priority.reset(reset)
+
+
+__all__ = ["Priority", "bind_priority", "current_priority"]
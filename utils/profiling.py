@@ -0,0 +1,353 @@
+"""On-demand sampling profiles of single reruns and pipeline runs.
+
+:func:`profile` samples the calling thread's stack every
+``PROFILING_SAMPLE_INTERVAL`` seconds from a helper thread and records the
+top allocation sites with :mod:`tracemalloc`. Each run is stored below
+``PROFILING_OUTPUT_DIR/<run id>/``:
+
+* ``profile.speedscope.json`` – open in https://www.speedscope.app,
+* ``stacks.folded`` – collapsed stacks for ``flamegraph.pl``/inferno,
+* ``memory.txt`` – tracemalloc top-N allocation sites,
+* ``run.json`` – label, timing and sample count.
+
+Functions decorated with :func:`profiled` are only profiled inside a
+:func:`profiling_requested` block (the admin debug panel opens one); the
+flag is a context variable, so it follows work into pipeline threads and
+costs one lookup per call otherwise.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import FrameType
+from typing import ParamSpec, TypeVar
+
+from utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_DIR = Path(
+    os.getenv("PROFILING_OUTPUT_DIR", "").strip() or Path(tempfile.gettempdir()) / "cognitive_needs" / "profiles"
+)
+SAMPLE_INTERVAL_SECONDS = env_float("PROFILING_SAMPLE_INTERVAL", 0.005, positive=True)
+TRACEMALLOC_TOP_N = env_int("PROFILING_TRACEMALLOC_TOP", 25, minimum=1)
+MAX_STORED_RUNS = env_int("PROFILING_MAX_RUNS", 50, minimum=1)
+
+_MAX_STACK_DEPTH = 256
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+# (file name, function name, first line) – stable across samples of one function.
+_Frame = tuple[str, str, int]
+_Stack = tuple[_Frame, ...]
+
+_requested: contextvars.ContextVar[bool] = contextvars.ContextVar("profiling_requested", default=False)
+# Profiles sample one thread, so "already profiled" is tracked per thread.
+_active = threading.local()
+
+
+def _depth() -> int:
+    """Return how many profiles are open on the current thread."""
+
+    depth: int = getattr(_active, "depth", 0)
+    return depth
+
+
+@dataclass(frozen=True)
+class ProfileRun:
+    """Metadata of one stored profile."""
+
+    run_id: str
+    label: str
+    started_at: float
+    duration: float
+    samples: int
+    directory: str
+
+    @property
+    def speedscope_path(self) -> Path:
+        return Path(self.directory) / "profile.speedscope.json"
+
+    @property
+    def folded_path(self) -> Path:
+        return Path(self.directory) / "stacks.folded"
+
+    @property
+    def memory_path(self) -> Path:
+        return Path(self.directory) / "memory.txt"
+
+
+class SamplingProfiler:
+    """Sample one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int | None = None, *, interval: float = SAMPLE_INTERVAL_SECONDS) -> None:
+        self._thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self._interval = interval
+        self._stacks: Counter[_Stack] = Counter()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._sampler = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> Counter[_Stack]:
+        """Stop sampling and return how often each stack was seen."""
+
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        return self._stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._stacks[_walk(frame)] += 1
+
+
+def _walk(frame: FrameType | None) -> _Stack:
+    stack: list[_Frame] = []
+    while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _frame_name(frame: _Frame) -> str:
+    filename, name, line = frame
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def write_speedscope(path: Path, label: str, stacks: Counter[_Stack], interval: float) -> None:
+    """Write ``stacks`` as a speedscope "sampled" profile (weights in seconds)."""
+
+    frame_index: dict[_Frame, int] = {}
+    frames: list[dict[str, object]] = []
+    samples: list[list[int]] = []
+    weights: list[float] = []
+    for stack, count in stacks.most_common():
+        sample: list[int] = []
+        for frame in stack:
+            index = frame_index.get(frame)
+            if index is None:
+                index = frame_index[frame] = len(frames)
+                frames.append({"name": frame[1], "file": frame[0], "line": frame[2]})
+            sample.append(index)
+        samples.append(sample)
+        weights.append(count * interval)
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": label,
+        "exporter": "cognitive_needs.utils.profiling",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": label,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+    path.write_text(json.dumps(document), encoding="utf-8")
+
+
+def write_folded(path: Path, stacks: Counter[_Stack]) -> None:
+    """Write ``stacks`` in the collapsed ``frame;frame;frame count`` format."""
+
+    lines = [
+        ";".join(_frame_name(frame).replace(";", ":") for frame in stack) + f" {count}"
+        for stack, count in stacks.most_common()
+    ]
+    path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+
+
+_TRACEMALLOC_LOCK = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started_here = False
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_started_here
+    with _TRACEMALLOC_LOCK:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started_here = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc(top_n: int) -> list[str]:
+    global _tracemalloc_users, _tracemalloc_started_here
+    with _TRACEMALLOC_LOCK:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracemalloc_users = max(0, _tracemalloc_users - 1)
+        if _tracemalloc_users == 0 and _tracemalloc_started_here:
+            tracemalloc.stop()
+            _tracemalloc_started_here = False
+    if snapshot is None:
+        return []
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    )
+    return [str(stat) for stat in snapshot.statistics("lineno")[:top_n]]
+
+
+class ProfileHandle:
+    """Result slot of a :func:`profile` block; ``run`` is set when the block exits."""
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.run: ProfileRun | None = None
+
+
+@contextmanager
+def profile(
+    label: str,
+    *,
+    directory: Path | None = None,
+    interval: float = SAMPLE_INTERVAL_SECONDS,
+    top_n: int = TRACEMALLOC_TOP_N,
+) -> Iterator[ProfileHandle]:
+    """Profile the enclosed block of the current thread and store the result."""
+
+    handle = ProfileHandle(f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}")
+    base = Path(directory) if directory is not None else PROFILE_DIR
+    profiler = SamplingProfiler(interval=interval)
+    _active.depth = _depth() + 1
+    _start_tracemalloc()
+    started_at = time.time()
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        yield handle
+    finally:
+        stacks = profiler.stop()
+        duration = time.perf_counter() - started
+        memory = _stop_tracemalloc(top_n)
+        _active.depth -= 1
+        try:
+            handle.run = _store(base, handle.run_id, label, started_at, duration, stacks, interval, memory)
+        except OSError:
+            logger.warning("Could not store profile %s for %s", handle.run_id, label, exc_info=True)
+
+
+def _store(
+    base: Path,
+    run_id: str,
+    label: str,
+    started_at: float,
+    duration: float,
+    stacks: Counter[_Stack],
+    interval: float,
+    memory: list[str],
+) -> ProfileRun:
+    run_dir = base / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    run = ProfileRun(run_id, label, started_at, duration, sum(stacks.values()), str(run_dir))
+    write_speedscope(run.speedscope_path, label, stacks, interval)
+    write_folded(run.folded_path, stacks)
+    run.memory_path.write_text("\n".join(memory) + "\n", encoding="utf-8")
+    (run_dir / "run.json").write_text(json.dumps(asdict(run)), encoding="utf-8")
+    logger.info("Stored profile %s for %s (%.2fs, %d samples)", run_id, label, duration, run.samples)
+    _prune(base, MAX_STORED_RUNS)
+    return run
+
+
+def list_profile_runs(directory: Path | None = None, *, limit: int = 20) -> list[ProfileRun]:
+    """Return the most recent stored profiles, newest first."""
+
+    base = Path(directory) if directory is not None else PROFILE_DIR
+    runs: list[ProfileRun] = []
+    for manifest in base.glob("*/run.json"):
+        try:
+            runs.append(ProfileRun(**json.loads(manifest.read_text(encoding="utf-8"))))
+        except (OSError, ValueError, TypeError):
+            continue
+    runs.sort(key=lambda run: run.started_at, reverse=True)
+    return runs[:limit]
+
+
+def _prune(base: Path, keep: int) -> None:
+    for run in list_profile_runs(base, limit=sys.maxsize)[keep:]:
+        shutil.rmtree(run.directory, ignore_errors=True)
+
+
+@contextmanager
+def profiling_requested(enabled: bool = True) -> Iterator[None]:
+    """Let :func:`profiled` functions called inside the block record a profile."""
+
+    token = _requested.set(enabled)
+    try:
+        yield
+    finally:
+        _requested.reset(token)
+
+
+@contextmanager
+def profile_if_requested(label: str) -> Iterator[None]:
+    """Profile the enclosed block when profiling is requested.
+
+    Blocks nested in an active profile of the same thread are already covered
+    by that profile and are not profiled separately.
+    """
+
+    if not _requested.get() or _depth():
+        yield
+        return
+    with profile(label):
+        yield
+
+
+def profiled(label: str) -> Callable[[Callable[_P, _T]], Callable[_P, _T]]:
+    """Decorator form of :func:`profile_if_requested`."""
+
+    def decorator(func: Callable[_P, _T]) -> Callable[_P, _T]:
+        @functools.wraps(func)
+        def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _T:
+            if not _requested.get() or _depth():
+                return func(*args, **kwargs)
+            with profile(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "PROFILE_DIR",
+    "ProfileHandle",
+    "ProfileRun",
+    "SamplingProfiler",
+    "list_profile_runs",
+    "profile",
+    "profile_if_requested",
+    "profiled",
+    "profiling_requested",
+    "write_folded",
+    "write_speedscope",
+]
@@ -1,4 +1,4 @@
-"""Telemetry bootstrap helpers for OpenTelemetry tracing."""
+"""Telemetry bootstrap helpers for OpenTelemetry tracing and metrics."""
 
 from __future__ import annotations
 
@@ -8,7 +8,11 @@ from dataclasses import dataclass
 from importlib import import_module
 from typing import Any, Dict, Mapping, Optional, Sequence
 
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+from opentelemetry.metrics import Histogram
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import MetricReader, PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
@@ -20,9 +24,12 @@ from opentelemetry.sdk.trace.sampling import (
     TraceIdRatioBased,
 )
 
+from utils.metrics import DURATION_BUCKETS, SIZE_BUCKETS, TOKENS_PER_SECOND_BUCKETS, configure_metrics
+
 LOGGER = logging.getLogger("cognitive_needs.telemetry")
 
 _INITIALISED = False
+_METRICS_INITIALISED = False
 
 
 @dataclass(frozen=True)
@@ -240,4 +247,143 @@ def setup_tracing(*, force: bool = False) -> None:
     LOGGER.info("OpenTelemetry tracing initialised for service '%s'", service_name)
 
 
-__all__ = ["setup_tracing", "OtlpConfig"]
+def _metrics_endpoint(config: OtlpConfig) -> str:
+    """Return the OTLP metrics endpoint, honouring the signal-specific override."""
+
+    explicit = os.getenv("OTEL_EXPORTER_OTLP_METRICS_ENDPOINT", "").strip()
+    if explicit:
+        return explicit
+    if config.protocol in {"grpc", "grpc/protobuf"}:
+        return config.endpoint
+    base = config.endpoint.rstrip("/").removesuffix("/v1/traces")
+    return f"{base}/v1/metrics"
+
+
+def _create_otlp_metric_reader() -> MetricReader | None:
+    """Create a periodic OTLP metric reader based on environment settings."""
+
+    config = _build_otlp_config()
+    if config is None:
+        return None
+
+    endpoint = _metrics_endpoint(config)
+    if config.protocol in {"grpc", "grpc/protobuf"}:
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter as GrpcExporter
+
+        exporter: Any = GrpcExporter(
+            endpoint=endpoint,
+            headers=_format_grpc_headers(config.headers),
+            timeout=config.timeout,
+            insecure=config.insecure,
+            credentials=_build_grpc_credentials(config.certificate_file),
+        )
+    else:
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter as HttpExporter
+
+        exporter = HttpExporter(
+            endpoint=endpoint,
+            headers=_format_http_headers(config.headers),
+            timeout=config.timeout,
+            certificate_file=config.certificate_file,
+        )
+
+    interval_raw = os.getenv("OTEL_METRIC_EXPORT_INTERVAL", "").strip()
+    interval_ms: float | None = None
+    if interval_raw:
+        try:
+            interval_ms = float(interval_raw)
+        except ValueError:
+            LOGGER.warning("Invalid OTEL_METRIC_EXPORT_INTERVAL '%s'; using the SDK default", interval_raw)
+    return PeriodicExportingMetricReader(exporter, export_interval_millis=interval_ms)
+
+
+def _create_prometheus_reader() -> MetricReader | None:
+    """Serve metrics on a Prometheus scrape endpoint (optional dependency)."""
+
+    try:
+        prometheus_exporter = import_module("opentelemetry.exporter.prometheus")
+        prometheus_client = import_module("prometheus_client")
+    except ImportError:
+        LOGGER.warning(
+            "OTEL_METRICS_EXPORTER=prometheus requires opentelemetry-exporter-prometheus; metrics stay disabled."
+        )
+        return None
+
+    host = os.getenv("OTEL_EXPORTER_PROMETHEUS_HOST", "0.0.0.0").strip() or "0.0.0.0"
+    port_raw = os.getenv("OTEL_EXPORTER_PROMETHEUS_PORT", "9464").strip()
+    try:
+        port = int(port_raw)
+    except ValueError:
+        LOGGER.warning("Invalid OTEL_EXPORTER_PROMETHEUS_PORT '%s'; using 9464", port_raw)
+        port = 9464
+    try:
+        prometheus_client.start_http_server(port=port, addr=host)
+    except OSError as exc:
+        LOGGER.warning("Cannot serve Prometheus metrics on %s:%s: %s", host, port, exc)
+        return None
+    return prometheus_exporter.PrometheusMetricReader()
+
+
+def _metric_views() -> list[View]:
+    """Bucket boundaries matching the units recorded by :mod:`utils.metrics`."""
+
+    return [
+        View(
+            instrument_type=Histogram,
+            instrument_unit=unit,
+            aggregation=ExplicitBucketHistogramAggregation(boundaries=buckets),
+        )
+        for unit, buckets in (
+            ("s", DURATION_BUCKETS),
+            ("By", SIZE_BUCKETS),
+            ("{token}/s", TOKENS_PER_SECOND_BUCKETS),
+        )
+    ]
+
+
+def build_meter_provider(readers: Sequence[MetricReader]) -> MeterProvider:
+    """Create a meter provider with the app's resource and histogram buckets."""
+
+    service_name = os.getenv("OTEL_SERVICE_NAME", "cognitive-needs")
+    return MeterProvider(
+        metric_readers=list(readers),
+        resource=Resource.create({"service.name": service_name}),
+        views=_metric_views(),
+    )
+
+
+def setup_metrics(*, force: bool = False) -> None:
+    """Configure metric export and bind the instruments of :mod:`utils.metrics`.
+
+    ``OTEL_METRICS_EXPORTER`` selects ``otlp`` (default, pushes to the OTLP
+    endpoint), ``prometheus`` (scrape endpoint) or ``none``.
+    """
+
+    global _METRICS_INITIALISED
+    if _METRICS_INITIALISED and not force:
+        return
+
+    exporter_name = os.getenv("OTEL_METRICS_EXPORTER", "otlp").strip().lower()
+    if exporter_name in {"", "none", "0", "false", "off"}:
+        LOGGER.info("Metrics disabled via OTEL_METRICS_EXPORTER")
+        return
+
+    if exporter_name == "prometheus":
+        reader = _create_prometheus_reader()
+    else:
+        if exporter_name != "otlp":
+            LOGGER.warning("Unknown OTEL_METRICS_EXPORTER '%s'; defaulting to otlp", exporter_name)
+        reader = _create_otlp_metric_reader()
+    if reader is None:
+        LOGGER.debug("No metric reader configured; skipping metrics bootstrap")
+        return
+
+    provider = build_meter_provider([reader])
+    metrics.set_meter_provider(provider)
+    configure_metrics(provider)
+
+    _METRICS_INITIALISED = True
+    LOGGER.info("OpenTelemetry metrics initialised with the %s exporter", exporter_name or "otlp")
+
+
+__all__ = ["OtlpConfig", "build_meter_provider", "setup_metrics", "setup_tracing"]
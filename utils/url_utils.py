@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from html.parser import HTMLParser
 import importlib.util
+import ipaddress
 import logging
+import socket
 from typing import Any, Iterable
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit
 
 import requests
 
@@ -107,6 +109,47 @@ def is_supported_url(url: str) -> bool:
     return bool(parsed.netloc)
 
 
+def is_public_address(address: str) -> bool:
+    """Return ``True`` if ``address`` is a globally routable IP address."""
+
+    try:
+        return ipaddress.ip_address(address.split("%", 1)[0]).is_global
+    except ValueError:
+        return False
+
+
+def check_public_url(url: str, *, resolve: bool = False, name: str = "url") -> str:
+    """Return ``url`` if it is an HTTP(S) URL of a public host, else raise :class:`ValueError`.
+
+    Credentials, internal names (``localhost``, ``*.local``, ``*.internal``,
+    dotless hosts) and private, loopback or link-local addresses are rejected.
+    With ``resolve`` the host name is looked up and every address must be
+    public. ``name`` labels the URL in error messages.
+    """
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in {"http", "https"} or not host or parts.username or parts.password:
+        raise ValueError(f"{name} must be an http(s) URL without credentials")
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        if host == "localhost" or host.endswith((".localhost", ".local", ".internal")) or "." not in host:
+            raise ValueError(f"{name} must point to a public host") from None
+        if resolve:
+            default_port = 443 if parts.scheme == "https" else 80
+            try:
+                addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or default_port)}
+            except OSError as exc:
+                raise ValueError(f"{name} host does not resolve: {exc}") from exc
+            if not all(is_public_address(str(address)) for address in addresses):
+                raise ValueError(f"{name} must point to a public host")
+    else:
+        if not is_public_address(host):
+            raise ValueError(f"{name} must point to a public host")
+    return url
+
+
 def extract_text_from_url(url: str) -> str:
     """Fetch and clean textual content from a URL.
 
@@ -0,0 +1,529 @@
+"""Token usage accounting that keeps LLM calls off a shared lock.
+
+Every thread records usage into its own shard, guarded by a lock that only
+the owning thread and the flusher ever take, so concurrent sessions never
+contend with each other. Session and tenant totals are summed across shards
+when they are read.
+
+A background flusher drains the recorded events into an append-only
+:class:`UsageLedger` every ``USAGE_FLUSH_INTERVAL`` seconds. The ledger is
+either process memory or a SQLite file shared by all workers on the host
+(``USAGE_LEDGER_PATH``). It answers per-task, per-model, per-tenant and
+per-session aggregations.
+
+Budgets are checked against in-memory numbers only. Session totals live in
+the shards; shards of finished threads are folded into one shared shard on
+the next flush, and sessions idle for ``USAGE_SESSION_TTL`` seconds are
+forgotten. Tenant totals for the current UTC day are the ledger snapshot
+taken at the last flush plus the events that have not been flushed yet. The
+request path therefore never waits for disk I/O.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Protocol
+
+from utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+LEDGER_PATH = os.getenv("USAGE_LEDGER_PATH", "").strip()
+FLUSH_INTERVAL_SECONDS = env_float("USAGE_FLUSH_INTERVAL", 5.0, positive=True)
+TENANT_DAILY_TOKEN_LIMIT = env_int("USAGE_TENANT_DAILY_TOKEN_LIMIT", 0, minimum=0) or None
+DEFAULT_TENANT = os.getenv("USAGE_TENANT", "").strip() or "default"
+SESSION_TTL_SECONDS = env_float("USAGE_SESSION_TTL", 86400.0, positive=True)
+
+GROUP_COLUMNS = ("tenant", "session", "task", "model")
+
+_tenant_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("usage_tenant", default=None)
+
+
+def current_tenant() -> str:
+    """Return the tenant that usage of the current context is billed to."""
+
+    return _tenant_var.get() or DEFAULT_TENANT
+
+
+@contextmanager
+def tenant_scope(tenant: str | None) -> Iterator[None]:
+    """Bill usage recorded inside the block to ``tenant``."""
+
+    token = _tenant_var.set((tenant or "").strip() or None)
+    try:
+        yield
+    finally:
+        _tenant_var.reset(token)
+
+
+def _day_start(ts: float) -> float:
+    moment = datetime.fromtimestamp(ts, tz=UTC)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+@dataclass(frozen=True)
+class UsageEvent:
+    """Tokens consumed by one LLM call."""
+
+    ts: float
+    tenant: str
+    session: str
+    task: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@dataclass(frozen=True)
+class UsageAggregate:
+    """Summed usage for one group of a :meth:`UsageLedger.aggregate` query."""
+
+    key: tuple[str, ...]
+    requests: int
+    input_tokens: int
+    output_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+def _validate_group_by(by: Sequence[str]) -> tuple[str, ...]:
+    columns = tuple(by)
+    unknown = [column for column in columns if column not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"cannot group usage by {', '.join(unknown)}")
+    return columns
+
+
+class UsageLedger(Protocol):
+    """Append-only store of :class:`UsageEvent` records."""
+
+    def append(self, events: Sequence[UsageEvent]) -> None:
+        """Persist ``events``."""
+
+    def aggregate(self, by: Sequence[str], *, since: float | None = None) -> list[UsageAggregate]:
+        """Return usage grouped by ``by`` (a subset of :data:`GROUP_COLUMNS`)."""
+
+
+class MemoryUsageLedger:
+    """Ledger keeping the most recent ``max_events`` events in process memory."""
+
+    def __init__(self, *, max_events: int = 100_000) -> None:
+        self._events: deque[UsageEvent] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def append(self, events: Sequence[UsageEvent]) -> None:
+        with self._lock:
+            self._events.extend(events)
+
+    def aggregate(self, by: Sequence[str], *, since: float | None = None) -> list[UsageAggregate]:
+        columns = _validate_group_by(by)
+        with self._lock:
+            events = list(self._events)
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for event in events:
+            if since is not None and event.ts < since:
+                continue
+            totals = groups.setdefault(tuple(getattr(event, column) for column in columns), [0, 0, 0])
+            totals[0] += 1
+            totals[1] += event.input_tokens
+            totals[2] += event.output_tokens
+        return [UsageAggregate(key, *totals) for key, totals in sorted(groups.items())]
+
+
+class SQLiteUsageLedger:
+    """Ledger in a SQLite file; rows are only ever inserted."""
+
+    def __init__(self, path: str | os.PathLike[str], *, timeout: float = 5.0) -> None:
+        self._path = os.fspath(path)
+        self._timeout = timeout
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS usage_events ("
+                "ts REAL NOT NULL, tenant TEXT NOT NULL, session TEXT NOT NULL, task TEXT NOT NULL, "
+                "model TEXT NOT NULL, input_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS usage_events_ts ON usage_events (ts)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=self._timeout)
+
+    def append(self, events: Sequence[UsageEvent]) -> None:
+        if not events:
+            return
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO usage_events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(e.ts, e.tenant, e.session, e.task, e.model, e.input_tokens, e.output_tokens) for e in events],
+                )
+        finally:
+            connection.close()
+
+    def aggregate(self, by: Sequence[str], *, since: float | None = None) -> list[UsageAggregate]:
+        columns = _validate_group_by(by)
+        select = ", ".join(columns)
+        query = "SELECT " + (f"{select}, " if columns else "")
+        query += "COUNT(*), COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0) FROM usage_events"
+        params: tuple[float, ...] = ()
+        if since is not None:
+            query += " WHERE ts >= ?"
+            params = (since,)
+        if columns:
+            query += f" GROUP BY {select} ORDER BY {select}"
+        connection = self._connect()
+        try:
+            rows = connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
+        width = len(columns)
+        return [
+            UsageAggregate(tuple(row[:width]), int(row[width]), int(row[width + 1]), int(row[width + 2]))
+            for row in rows
+            if row[width]
+        ]
+
+
+@dataclass
+class _Shard:
+    """Usage recorded by one thread since the last flush."""
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    pending: list[UsageEvent] = field(default_factory=list)
+    session_totals: dict[str, int] = field(default_factory=dict)
+    session_seen: dict[str, float] = field(default_factory=dict)
+    pending_by_tenant: dict[str, int] = field(default_factory=dict)
+    retired: bool = False
+
+    def retire(self) -> None:
+        with self.lock:
+            self.retired = True
+
+
+class _ShardOwner:
+    """Kept in the owning thread's local storage; collected when that thread ends."""
+
+
+class UsageAccountant:
+    """Per-thread usage counters flushed periodically into a :class:`UsageLedger`."""
+
+    def __init__(
+        self,
+        ledger: UsageLedger | None = None,
+        *,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        tenant_daily_limit: int | None = TENANT_DAILY_TOKEN_LIMIT,
+        clock: Callable[[], float] = time.time,
+        background: bool = True,
+        session_ttl: float = SESSION_TTL_SECONDS,
+    ) -> None:
+        self.ledger: UsageLedger = ledger if ledger is not None else MemoryUsageLedger()
+        self.tenant_daily_limit = tenant_daily_limit
+        self._flush_interval = flush_interval
+        self._clock = clock
+        self._background = background
+        self._session_ttl = session_ttl
+        self._local = threading.local()
+        # Totals of threads that ended; never retired itself, so it stays in ``_shards``.
+        self._retired = _Shard()
+        self._shards: list[_Shard] = [self._retired]
+        self._shards_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._exceeded_sessions: dict[str, float] = {}
+        self._in_flight_by_tenant: dict[str, int] = {}
+        self._tenant_snapshot: tuple[float, dict[str, int]] = (float("-inf"), {})
+        self._stop = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            owner = _ShardOwner()
+            weakref.finalize(owner, shard.retire)
+            self._local.shard = shard
+            self._local.owner = owner
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _all_shards(self) -> list[_Shard]:
+        with self._shards_lock:
+            return list(self._shards)
+
+    def record(
+        self,
+        *,
+        session: str,
+        task: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        tenant: str | None = None,
+    ) -> UsageEvent:
+        """Add one call's usage to the calling thread's shard."""
+
+        event = UsageEvent(
+            ts=self._clock(),
+            tenant=tenant or current_tenant(),
+            session=session,
+            task=task,
+            model=model,
+            input_tokens=max(0, int(input_tokens)),
+            output_tokens=max(0, int(output_tokens)),
+        )
+        shard = self._shard()
+        with shard.lock:
+            shard.pending.append(event)
+            shard.session_totals[session] = shard.session_totals.get(session, 0) + event.total_tokens
+            shard.session_seen[session] = event.ts
+            shard.pending_by_tenant[event.tenant] = shard.pending_by_tenant.get(event.tenant, 0) + event.total_tokens
+        self._ensure_flusher()
+        return event
+
+    def session_total(self, session: str) -> int:
+        """Return all tokens recorded for ``session`` by this process."""
+
+        total = 0
+        for shard in self._all_shards():
+            with shard.lock:
+                total += shard.session_totals.get(session, 0)
+        return total
+
+    def tenant_total(self, tenant: str | None = None) -> int:
+        """Return the tokens ``tenant`` used today (UTC), across all workers of the ledger.
+
+        Usage other workers recorded after this worker's last flush is not
+        included; the ledger catches up with every flush.
+        """
+
+        tenant = tenant or current_tenant()
+        day_start, snapshot = self._tenant_snapshot
+        total = self._in_flight_by_tenant.get(tenant, 0)
+        if day_start == _day_start(self._clock()):
+            total += snapshot.get(tenant, 0)
+        for shard in self._all_shards():
+            with shard.lock:
+                total += shard.pending_by_tenant.get(tenant, 0)
+        return total
+
+    def tenant_exceeded(self, tenant: str | None = None) -> bool:
+        """Return ``True`` when ``tenant`` reached its daily token limit."""
+
+        limit = self.tenant_daily_limit
+        return limit is not None and self.tenant_total(tenant) >= limit
+
+    def mark_session_exceeded(self, session: str) -> None:
+        self._exceeded_sessions[session] = self._clock()
+
+    def session_exceeded(self, session: str) -> bool:
+        return session in self._exceeded_sessions
+
+    def forget_session(self, session: str) -> None:
+        """Drop the in-memory totals of a finished session (the ledger keeps its events)."""
+
+        self._exceeded_sessions.pop(session, None)
+        for shard in self._all_shards():
+            with shard.lock:
+                shard.session_totals.pop(session, None)
+                shard.session_seen.pop(session, None)
+
+    def _fold_retired_shards(self, shards: list[_Shard]) -> None:
+        """Merge the drained shards of ended threads into the shared retired shard."""
+
+        retired = [shard for shard in shards if shard.retired and shard is not self._retired]
+        if not retired:
+            return
+        for shard in retired:
+            with shard.lock, self._retired.lock:
+                # Events recorded after the drain go to the next flush.
+                self._retired.pending.extend(shard.pending)
+                for tenant, tokens in shard.pending_by_tenant.items():
+                    self._retired.pending_by_tenant[tenant] = self._retired.pending_by_tenant.get(tenant, 0) + tokens
+                totals, seen = self._retired.session_totals, self._retired.session_seen
+                for session, tokens in shard.session_totals.items():
+                    totals[session] = totals.get(session, 0) + tokens
+                for session, ts in shard.session_seen.items():
+                    seen[session] = max(ts, seen.get(session, ts))
+                shard.session_totals.clear()
+                shard.session_seen.clear()
+        with self._shards_lock:
+            self._shards = [shard for shard in self._shards if shard not in retired]
+
+    def _expire_sessions(self, shards: list[_Shard]) -> None:
+        """Forget sessions without usage for ``session_ttl`` seconds."""
+
+        last_seen = dict(self._exceeded_sessions)
+        for shard in shards:
+            with shard.lock:
+                for session, ts in shard.session_seen.items():
+                    last_seen[session] = max(ts, last_seen.get(session, ts))
+        cutoff = self._clock() - self._session_ttl
+        for session, ts in last_seen.items():
+            if ts < cutoff:
+                self.forget_session(session)
+
+    def flush(self) -> int:
+        """Write pending events to the ledger and return how many were written."""
+
+        with self._flush_lock:
+            drained: list[UsageEvent] = []
+            in_flight: dict[str, int] = {}
+            shards = self._all_shards()
+            for shard in shards:
+                with shard.lock:
+                    if not shard.pending:
+                        continue
+                    events, shard.pending = shard.pending, []
+                    by_tenant, shard.pending_by_tenant = shard.pending_by_tenant, {}
+                drained.extend(events)
+                for tenant, tokens in by_tenant.items():
+                    in_flight[tenant] = in_flight.get(tenant, 0) + tokens
+            self._in_flight_by_tenant = in_flight
+            self._fold_retired_shards(shards)
+            self._expire_sessions(self._all_shards())
+            try:
+                if drained:
+                    self.ledger.append(drained)
+                if drained or self._tenant_snapshot[0] != _day_start(self._clock()):
+                    self._refresh_tenant_snapshot()
+            except Exception:  # usage accounting must never break requests
+                logger.warning("Could not write %d usage events to the ledger", len(drained), exc_info=True)
+                self._requeue(drained)
+                return 0
+            finally:
+                self._in_flight_by_tenant = {}
+            return len(drained)
+
+    def _requeue(self, events: list[UsageEvent]) -> None:
+        if not events:
+            return
+        shard = self._shard()
+        with shard.lock:
+            shard.pending[:0] = events
+            for event in events:
+                shard.pending_by_tenant[event.tenant] = (
+                    shard.pending_by_tenant.get(event.tenant, 0) + event.total_tokens
+                )
+
+    def _refresh_tenant_snapshot(self) -> None:
+        day_start = _day_start(self._clock())
+        totals = {row.key[0]: row.total_tokens for row in self.ledger.aggregate(("tenant",), since=day_start)}
+        self._tenant_snapshot = (day_start, totals)
+
+    def aggregate(self, by: Sequence[str] = ("task",), *, since: float | None = None) -> list[UsageAggregate]:
+        """Flush pending events and return the ledger aggregation for ``by``."""
+
+        self.flush()
+        return self.ledger.aggregate(by, since=since)
+
+    def _ensure_flusher(self) -> None:
+        if not self._background or self._flusher is not None:
+            return
+        with self._shards_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="usage-ledger-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        self._refresh_tenant_snapshot_safely()
+        while not self._stop.wait(self._flush_interval):
+            self.flush()
+
+    def _refresh_tenant_snapshot_safely(self) -> None:
+        try:
+            self._refresh_tenant_snapshot()
+        except Exception:  # the next flush retries
+            logger.warning("Could not read tenant usage from the ledger", exc_info=True)
+
+    def close(self) -> None:
+        """Stop the flusher and write everything that is still pending."""
+
+        self._stop.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join(timeout=self._flush_interval + 1)
+        self.flush()
+
+
+def _default_ledger() -> UsageLedger:
+    if LEDGER_PATH:
+        try:
+            return SQLiteUsageLedger(LEDGER_PATH)
+        except (OSError, sqlite3.Error):
+            logger.warning("Cannot open USAGE_LEDGER_PATH=%r; keeping usage in memory", LEDGER_PATH, exc_info=True)
+    return MemoryUsageLedger()
+
+
+_ACCOUNTANT: UsageAccountant | None = None
+_ACCOUNTANT_LOCK = threading.Lock()
+
+
+def get_usage_accountant() -> UsageAccountant:
+    """Return the process-wide :class:`UsageAccountant`."""
+
+    global _ACCOUNTANT
+    accountant = _ACCOUNTANT
+    if accountant is not None:
+        return accountant
+    with _ACCOUNTANT_LOCK:
+        if _ACCOUNTANT is None:
+            _ACCOUNTANT = UsageAccountant(_default_ledger())
+        return _ACCOUNTANT
+
+
+def reset_usage_accountant(accountant: UsageAccountant | None = None) -> None:
+    """Replace the process-wide accountant (used by tests and reloads).
+
+    The previous accountant is closed so its pending events reach its ledger.
+    """
+
+    global _ACCOUNTANT
+    with _ACCOUNTANT_LOCK:
+        previous, _ACCOUNTANT = _ACCOUNTANT, accountant
+    if previous is not None:
+        previous.close()
+
+
+def _flush_at_exit() -> None:
+    accountant = _ACCOUNTANT
+    if accountant is not None:
+        accountant.close()
+
+
+atexit.register(_flush_at_exit)
+
+
+__all__ = [
+    "GROUP_COLUMNS",
+    "MemoryUsageLedger",
+    "SQLiteUsageLedger",
+    "UsageAccountant",
+    "UsageAggregate",
+    "UsageEvent",
+    "UsageLedger",
+    "current_tenant",
+    "get_usage_accountant",
+    "reset_usage_accountant",
+    "tenant_scope",
+]
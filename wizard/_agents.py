@@ -30,6 +30,31 @@ class InterviewGuideGenerationResult:
     chat_fallback_used: bool = False
 
 
+def _sectioned_job_ads_enabled() -> bool:
+    from pipelines.job_ad_sections import JOB_AD_SECTIONED
+
+    return JOB_AD_SECTIONED
+
+
+def _render_sectioned_job_ad(
+    placeholder: Any,
+    spinner_label: str,
+    profile: Mapping[str, Any],
+    selected_fields: list[str],
+    **kwargs: Any,
+) -> str:
+    """Render the job ad section by section as the parallel calls complete."""
+
+    from pipelines.job_ad_sections import stream_job_ad_sections
+
+    markdown = ""
+    with st.spinner(spinner_label):
+        for draft in stream_job_ad_sections(profile, selected_fields, **kwargs):
+            markdown = draft.markdown
+            placeholder.markdown(markdown)
+    return markdown
+
+
 def generate_job_ad_content(
     filtered_profile: Mapping[str, Any],
     selected_fields: Collection[str],
@@ -72,10 +97,20 @@ def generate_job_ad_content(
     placeholder = st.empty()
     spinner_label = tr("Anzeige wird generiert…", "Generating job ad…")
 
-    if vector_store_id:
+    if _sectioned_job_ads_enabled() and not vector_store_id:
         try:
-            job_ad_md = _generate_sync()
-            placeholder.markdown(job_ad_md)
+            job_ad_md = _render_sectioned_job_ad(
+                placeholder,
+                spinner_label,
+                filtered_profile,
+                list(selected_fields),
+                target_audience=target_value,
+                manual_sections=list(manual_entries),
+                style_reference=style_reference,
+                tone=st.session_state.get(UIKeys.TONE_SELECT),
+                lang=lang,
+                selected_values=st.session_state.get(StateKeys.JOB_AD_SELECTED_VALUES, {}),
+            )
         except Exception as exc:  # pragma: no cover - error path
             if show_error:
                 st.error(
@@ -97,8 +132,10 @@ def generate_job_ad_content(
                 tone=st.session_state.get(UIKeys.TONE_SELECT),
                 lang=lang,
                 selected_values=st.session_state.get(StateKeys.JOB_AD_SELECTED_VALUES, {}),
+                vector_store_id=vector_store_id or None,
             )
         except Exception:
+            # Also taken when the vector store returned no passages: the sync path runs file search itself.
             try:
                 job_ad_md = _generate_sync()
                 placeholder.markdown(job_ad_md)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+"""Admin debug controls for on-demand rerun and pipeline profiles."""
+
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+
+import streamlit as st
+
+from constants.keys import StateKeys, UIKeys
+from utils.admin_debug import is_admin_debug_panel_enabled
+from utils.i18n import tr
+from utils.profiling import list_profile_runs, profile, profiling_requested
+
+_RECENT_RUNS = 5
+
+
+def render_profiling_controls() -> None:
+    """Render the profiling buttons and download links of recent profiles."""
+
+    st.markdown(tr("**Profiling**", "**Profiling**"))
+    rerun_col, pipeline_col = st.columns(2)
+    rerun_col.button(
+        tr("Diesen Rerun profilen", "Profile this rerun"),
+        key=UIKeys.DEBUG_PROFILE_RERUN,
+        help=tr(
+            "Zeichnet Stack-Samples und Top-Allokationen des nächsten Wizard-Durchlaufs auf.",
+            "Records stack samples and top allocations of the next wizard run.",
+        ),
+    )
+    pipeline_col.checkbox(
+        tr("Pipeline-Läufe profilen", "Profile pipeline runs"),
+        key=UIKeys.DEBUG_PROFILE_PIPELINES,
+        help=tr(
+            "Profilt Extraktion und Heuristiken, solange die Option aktiv ist.",
+            "Profiles extraction and heuristics while the option is active.",
+        ),
+    )
+
+    runs = list_profile_runs(limit=_RECENT_RUNS)
+    if not runs:
+        st.caption(tr("Noch keine Profile aufgezeichnet.", "No profiles recorded yet."))
+        return
+    for run in runs:
+        st.caption(f"`{run.run_id}` · {run.label} · {run.duration:.2f}s · {run.samples} samples")
+        speedscope_col, folded_col, memory_col = st.columns(3)
+        for column, path, label, mime in (
+            (speedscope_col, run.speedscope_path, "speedscope", "application/json"),
+            (folded_col, run.folded_path, "flamegraph", "text/plain"),
+            (memory_col, run.memory_path, "tracemalloc", "text/plain"),
+        ):
+            if path.exists():
+                column.download_button(
+                    label,
+                    data=path.read_bytes(),
+                    file_name=f"{run.run_id}-{path.name}",
+                    mime=mime,
+                    key=f"ui.debug.profile.{run.run_id}.{path.name}",
+                )
+
+
+@contextmanager
+def profiled_rerun() -> Iterator[None]:
+    """Profile the enclosed wizard run when requested from the debug panel."""
+
+    if not is_admin_debug_panel_enabled():
+        yield
+        return
+    with ExitStack() as stack:
+        if st.session_state.get(UIKeys.DEBUG_PROFILE_PIPELINES):
+            stack.enter_context(profiling_requested())
+        handle = None
+        if st.session_state.get(UIKeys.DEBUG_PROFILE_RERUN):
+            step = st.session_state.get(StateKeys.WIZARD_LAST_STEP) or "wizard"
+            handle = stack.enter_context(profile(f"rerun:{step}"))
+        try:
+            yield
+        finally:
+            stack.close()
+            if handle is not None and handle.run is not None:
+                st.toast(
+                    tr("Profil {run_id} gespeichert.", "Profile {run_id} stored.").format(run_id=handle.run.run_id),
+                    icon="⏱️",
+                )
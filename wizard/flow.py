@@ -95,7 +95,7 @@ from utils.i18n import (
     POSITION_CUSTOMER_CONTACT_TOGGLE_HELP,
     tr,
 )
-from utils.logging_context import wrap_with_current_context
+from utils.logging_context import LazyJson, wrap_with_current_context
 import config as app_config
 from config import set_responses_allow_tools
 from i18n import t as translate_key
@@ -132,11 +132,14 @@ from utils.admin_debug import (
     is_admin_debug_session_active,
 )
 from wizard.debug.flow_diagram import build_mermaid_flowchart, validate_router_graph
+from wizard.debug.profiling import profiled_rerun, render_profiling_controls
 from utils.url_utils import is_supported_url
 from config import REASONING_EFFORT
 from config_loader import load_json
 from models.need_analysis import NeedAnalysisProfile
 from pipelines.need_analysis import ExtractionResult, extract_need_analysis_profile
+from pipelines.prefetch import get_prefetch_scheduler
+from pipelines.result_store import SessionResultStore
 from pipelines.workflow import SkipTask, Task, TaskStatus, WorkflowContext, WorkflowRunner
 from core.schema import coerce_and_fill, merge_profile_with_defaults
 from adapters.profile_to_envelope import create_shadow_mode_snapshot
@@ -148,6 +151,7 @@ from core.preview import build_prefilled_sections
 from wizard_pages import WizardPage, pages_for_version
 from wizard_router import StepRenderer, WizardContext, WizardRouter
 from wizard.interview_step import render_interview_guide_section
+from wizard.summary_artifacts import ensure_summary_artifacts, record_vacancy_profile, render_summary_artifacts
 from wizard.types import LangPair
 from wizard.navigation import prime_widget_state_from_profile
 from wizard.date_utils import (
@@ -159,6 +163,7 @@ from wizard.date_utils import (
 from wizard.sections.compensation_assistant import render_compensation_assistant
 from wizard.sections import followups as followup_sections
 from wizard.services.gaps import detect_missing_critical_fields
+from wizard.services.intake_diagnostics import evaluate_intake_diagnostics
 from wizard.ai_skip import render_skip_cta, render_skipped_banner
 from wizard.step_registry_runtime import (
     get_wizard_steps,
@@ -461,7 +466,7 @@ from .metadata import (
     resolve_section_for_field,
 )
 from .step_status import StepMissing, compute_step_missing, iter_step_missing_fields
-from sidebar.salary import format_salary_range
+from sidebar.salary import format_salary_range, prefetch_salary_estimate
 
 if TYPE_CHECKING:  # pragma: no cover - typing-only import path
     from streamlit.runtime.scriptrunner import (
@@ -494,8 +499,10 @@ _BRAND_URL_VALIDATOR = TypeAdapter(HttpUrl)
 def _log_flow_event(event: str, **payload: Any) -> None:
     """Emit a structured wizard.flow event as a JSON log line."""
 
+    if not logger.isEnabledFor(logging.INFO):
+        return
     event_payload: dict[str, Any] = {"event": event, "component": "wizard.flow", **payload}
-    logger.info("flow_event %s", json.dumps(event_payload, ensure_ascii=False, sort_keys=True, default=str))
+    logger.info("flow_event %s", LazyJson(event_payload))
 
 
 _RECOVERABLE_FLOW_ERRORS: tuple[type[Exception], ...] = (
@@ -719,6 +726,7 @@ from openai_utils import (
 )
 from core.suggestions import (
     get_benefit_suggestions,
+    get_missing_esco_skills_from_state,
     get_onboarding_suggestions,
     get_skill_suggestions,
     get_static_benefit_shortlist,
@@ -782,7 +790,10 @@ from core.job_ad import (
 )
 from constants.style_variants import STYLE_VARIANTS, STYLE_VARIANT_ORDER
 from sidebar.salary import resolve_sidebar_benefits
-from wizard.sections.responsibility_brainstormer import render_responsibility_brainstormer
+from wizard.sections.responsibility_brainstormer import (
+    prefetch_responsibility_suggestions,
+    render_responsibility_brainstormer,
+)
 
 ROOT = Path(__file__).parent
 # Onboarding visual reuses the colourful transparent logo that previously
@@ -1442,6 +1453,121 @@ def _apply_esco_skill_for_target(
     _recompute_missing_critical_status(data)
 
 
+SKILL_SUGGESTION_PREFETCH = "skill_suggestions"
+BENEFIT_SUGGESTION_PREFETCH = "benefit_suggestions"
+
+
+def _skill_suggestion_kwargs(profile: Mapping[str, Any], *, lang: str, focus_terms: Sequence[str]) -> dict[str, Any]:
+    """Return the ``get_skill_suggestions`` keyword arguments for ``profile``.
+
+    Shared by the UI and the prefetch so both produce the same revision.
+    """
+
+    requirements = profile.get("requirements", {}) or {}
+    return {
+        "lang": lang,
+        "focus_terms": list(focus_terms),
+        "missing_skills": get_missing_esco_skills_from_state(),
+        "tone_style": st.session_state.get(UIKeys.TONE_SELECT),
+        "existing_skills": _collect_existing_requirement_terms(requirements),
+        "responsibilities": [
+            str(item).strip()
+            for item in (profile.get("responsibilities", {}) or {}).get("items", [])
+            if isinstance(item, str) and str(item).strip()
+        ],
+    }
+
+
+def _benefit_suggestion_args(
+    profile: Mapping[str, Any], *, lang: str, focus_areas: Sequence[str]
+) -> tuple[tuple[str, str, str], dict[str, Any]]:
+    """Return the ``get_benefit_suggestions`` arguments for ``profile``."""
+
+    job_title = (profile.get("position", {}) or {}).get("job_title", "") or ""
+    industry = (profile.get("company", {}) or {}).get("industry", "") or ""
+    existing = "\n".join((profile.get("compensation", {}) or {}).get("benefits", []) or [])
+    kwargs = {
+        "lang": lang,
+        "focus_areas": list(focus_areas),
+        "tone_style": st.session_state.get(UIKeys.TONE_SELECT),
+    }
+    return (job_title, industry, existing), kwargs
+
+
+def _prefetch_skill_suggestions(profile: Mapping[str, Any], *, lang: str) -> None:
+    job_title = str((profile.get("position", {}) or {}).get("job_title") or "").strip()
+    if job_title and is_llm_available() and not is_step_ai_skipped("skills"):
+        focus = st.session_state.get(StateKeys.SKILL_SUGGESTION_HINTS) or []
+        get_prefetch_scheduler().schedule(
+            SKILL_SUGGESTION_PREFETCH,
+            get_skill_suggestions,
+            job_title,
+            **_skill_suggestion_kwargs(profile, lang=lang, focus_terms=focus),
+        )
+
+
+def _prefetch_benefit_suggestions(profile: Mapping[str, Any], *, lang: str) -> None:
+    if is_llm_available():
+        focus = st.session_state.get(StateKeys.BENEFIT_SUGGESTION_HINTS) or []
+        args, kwargs = _benefit_suggestion_args(profile, lang=lang, focus_areas=focus)
+        get_prefetch_scheduler().schedule(BENEFIT_SUGGESTION_PREFETCH, get_benefit_suggestions, *args, **kwargs)
+
+
+def _prefetch_responsibility_suggestions(profile: Mapping[str, Any], *, lang: str) -> None:
+    if is_llm_available():
+        prefetch_responsibility_suggestions(profile)
+
+
+def _prefetch_salary_estimate(profile: Mapping[str, Any], *, lang: str) -> None:
+    # Without a model the estimate is a cheap local fallback; nothing to gain.
+    if is_llm_available():
+        prefetch_salary_estimate(profile, lang=lang)
+
+
+# Suggestions each step asks for; prefetched when the user enters the step or the one before it.
+_STEP_PREFETCHES: dict[str, tuple[Callable[..., None], ...]] = {
+    "role_tasks": (_prefetch_responsibility_suggestions,),
+    "skills": (_prefetch_skill_suggestions,),
+    "benefits": (_prefetch_benefit_suggestions,),
+}
+
+
+def _schedule_prefetches(
+    profile: Mapping[str, Any],
+    prefetches: Iterable[Callable[..., None]],
+    *,
+    lang: str,
+) -> None:
+    """Queue speculative suggestion calls in the background lane; failures only get logged."""
+
+    for prefetch in prefetches:
+        try:
+            prefetch(profile, lang=lang)
+        except Exception:  # pragma: no cover - prefetching must never break the wizard
+            logger.debug("Prefetch %s could not be scheduled", prefetch.__name__, exc_info=True)
+
+
+def _prefetch_after_extraction(profile: Mapping[str, Any], *, lang: str) -> None:
+    """Start all suggestion calls the user will meet in the following steps."""
+
+    prefetches = [prefetch for step in _STEP_PREFETCHES.values() for prefetch in step]
+    _schedule_prefetches(profile, [*prefetches, _prefetch_salary_estimate], lang=lang)
+
+
+def _prefetch_for_step(step_keys: Sequence[str], current_key: str | None, profile: Mapping[str, Any]) -> None:
+    """Prefetch the current and the next step's suggestions once per step entry."""
+
+    if not current_key or st.session_state.get(StateKeys.WIZARD_PREFETCH_STEP) == current_key:
+        return
+    st.session_state[StateKeys.WIZARD_PREFETCH_STEP] = current_key
+    upcoming = [current_key]
+    if current_key in step_keys:
+        upcoming.extend(step_keys[step_keys.index(current_key) + 1 : step_keys.index(current_key) + 2])
+    prefetches = [prefetch for key in upcoming for prefetch in _STEP_PREFETCHES.get(key, ())]
+    if prefetches:
+        _schedule_prefetches(profile, prefetches, lang=str(st.session_state.get("lang", "de")))
+
+
 def _prepare_skill_expander_suggestions(
     profile: Mapping[str, Any],
     *,
@@ -1454,20 +1580,13 @@ def _prepare_skill_expander_suggestions(
     existing_terms = _collect_existing_requirement_terms(requirements)
     existing_markers = {item.casefold() for item in existing_terms}
     job_title = str(profile.get("position", {}).get("job_title") or "").strip()
-    responsibilities = [
-        str(item).strip()
-        for item in (profile.get("responsibilities", {}) or {}).get("items", [])
-        if isinstance(item, str) and str(item).strip()
-    ]
 
     suggestion_entries: list[SkillExpansionSuggestion] = []
-    fetched, error = get_skill_suggestions(
+    fetched, error = get_prefetch_scheduler().take(
+        SKILL_SUGGESTION_PREFETCH,
+        get_skill_suggestions,
         job_title,
-        lang=lang,
-        focus_terms=list(focus_terms),
-        tone_style=st.session_state.get(UIKeys.TONE_SELECT),
-        existing_skills=existing_terms,
-        responsibilities=responsibilities,
+        **_skill_suggestion_kwargs(profile, lang=lang, focus_terms=focus_terms),
     )
 
     lang_code = lang or "de"
@@ -4823,6 +4942,7 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
     extraction_issues: list[str] = []
     extracted_data: dict[str, Any] = {}
     recovered = False
+    near_duplicate = None
     locked_items = tuple(sorted(locked_hints.items()))
     effort_value = str(st.session_state.get(StateKeys.REASONING_EFFORT, REASONING_EFFORT) or REASONING_EFFORT)
     extraction_cache_key = _build_extraction_cache_key(
@@ -4833,18 +4953,10 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
         locked_items=locked_items,
         reasoning_effort=effort_value,
     )
-    extraction_cache_snapshot = {
-        "cache_key": st.session_state.get(StateKeys.EXTRACTION_CACHE_KEY),
-        "cache_result": st.session_state.get(StateKeys.EXTRACTION_CACHE_RESULT),
-    }
 
     def _structured_extraction_task(context: WorkflowContext) -> ExtractionResult:
         if not is_llm_available():
             raise SkipTask("llm_unavailable")
-        cached_key = context.get("cached_extraction_key")
-        cached_result = context.get("cached_extraction_result")
-        if cached_key == extraction_cache_key and isinstance(cached_result, ExtractionResult):
-            return cached_result
         start_time = time.perf_counter()
         _log_flow_event("structured_extraction.start", cache_key=extraction_cache_key)
         result = _cached_extract_profile(
@@ -4865,6 +4977,7 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
             heuristic_critical_count=result.heuristic_critical_count,
             degraded=result.degraded,
             degraded_reasons=result.degraded_reasons or [],
+            near_duplicate=result.near_duplicate.to_dict() if result.near_duplicate else None,
         )
         return result
 
@@ -4872,14 +4985,21 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
         progress.update("structured_extraction", "running")
 
     extraction_run = WorkflowRunner(
-        [Task(name="structured_extraction", func=_structured_extraction_task, retries=1)],
+        [
+            Task(
+                name="structured_extraction",
+                func=_structured_extraction_task,
+                retries=1,
+                cache_key=lambda _context: extraction_cache_key,
+                store=SessionResultStore(
+                    StateKeys.EXTRACTION_CACHE_KEY,
+                    StateKeys.EXTRACTION_CACHE_RESULT,
+                    accept=lambda value: isinstance(value, ExtractionResult),
+                ),
+            )
+        ],
         logger_=logger,
-    ).run(
-        {
-            "cached_extraction_key": extraction_cache_snapshot["cache_key"],
-            "cached_extraction_result": extraction_cache_snapshot["cache_result"],
-        }
-    )
+    ).run()
     workflow_status["extraction"] = extraction_run.as_dict()
     st.session_state[StateKeys.WORKFLOW_STATUS] = workflow_status
 
@@ -4893,8 +5013,7 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
         extraction_issues = extracted_payload.issues
         extraction_degraded = bool(extracted_payload.degraded)
         extraction_degraded_reasons = list(extracted_payload.degraded_reasons or [])
-        st.session_state[StateKeys.EXTRACTION_CACHE_KEY] = extraction_cache_key
-        st.session_state[StateKeys.EXTRACTION_CACHE_RESULT] = extracted_payload
+        near_duplicate = extracted_payload.near_duplicate
     else:
         if extraction_result and extraction_result.error:
             llm_error = extraction_result.error
@@ -5148,12 +5267,22 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
         soft_total = len(profile.requirements.soft_skills_required) + len(profile.requirements.soft_skills_optional)
         if soft_total:
             summary[tr("Soft Skills", "Soft skills")] = str(soft_total)
+        diagnostics = evaluate_intake_diagnostics(data, near_duplicate=near_duplicate)
+        if diagnostics.near_duplicate_of and diagnostics.near_duplicate_similarity is not None:
+            summary[tr("Ähnliche Anzeige", "Similar posting")] = tr(
+                "{similarity:.0%} ähnlich, {changed} Abschnitt(e) neu extrahiert",
+                "{similarity:.0%} similar, {changed} block(s) re-extracted",
+            ).format(
+                similarity=diagnostics.near_duplicate_similarity,
+                changed=diagnostics.near_duplicate_changed_blocks or 0,
+            )
         st.session_state[StateKeys.EXTRACTION_SUMMARY] = summary
     st.session_state[StateKeys.SKILL_BUCKETS] = {
         "must": unique_normalized(data.get("requirements", {}).get("hard_skills_required", [])),
         "nice": unique_normalized(data.get("requirements", {}).get("hard_skills_optional", [])),
     }
     missing = detect_missing_critical_fields(data if isinstance(data, Mapping) else {})
+    _prefetch_after_extraction(data, lang=str(lang))
 
     followup_candidates: list[Mapping[str, object]] = []
     followup_source = "llm"
@@ -5168,18 +5297,10 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
         vector_store_id=vector_store_id or None,
         plan_context=plan_context,
     )
-    followup_cache_snapshot = {
-        "cache_key": st.session_state.get(StateKeys.FOLLOWUPS_CACHE_KEY),
-        "cache_result": st.session_state.get(StateKeys.FOLLOWUPS_CACHE_RESULT),
-    }
 
     def _followup_generation_task(context: WorkflowContext) -> Mapping[str, Any]:
         if not is_llm_available():
             raise SkipTask("llm_unavailable")
-        cached_key = context.get("cached_followup_key")
-        cached_result = context.get("cached_followup_result")
-        if cached_key == followup_cache_key and isinstance(cached_result, Mapping):
-            return dict(cached_result)
         payload = context.get("profile_payload")
         if not isinstance(payload, Mapping):
             raise SkipTask("profile_payload_missing")
@@ -5203,12 +5324,22 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
         progress.update("followups", "running")
 
     followup_run = WorkflowRunner(
-        [Task(name="followup_generation", func=_followup_generation_task, retries=1)],
+        [
+            Task(
+                name="followup_generation",
+                func=_followup_generation_task,
+                retries=1,
+                cache_key=lambda _context: followup_cache_key,
+                store=SessionResultStore(
+                    StateKeys.FOLLOWUPS_CACHE_KEY,
+                    StateKeys.FOLLOWUPS_CACHE_RESULT,
+                    accept=lambda value: isinstance(value, Mapping),
+                ),
+            )
+        ],
         logger_=logger,
     ).run(
         {
-            "cached_followup_key": followup_cache_snapshot["cache_key"],
-            "cached_followup_result": followup_cache_snapshot["cache_result"],
             "profile_payload": profile.model_dump(),
             "lang": str(lang),
             "vector_store_id": vector_store_id or None,
@@ -5221,8 +5352,6 @@ def _extract_and_summarize(text: str, schema: dict, progress: _WizardProgressTra
     followup_result = followup_run.get("followup_generation")
     if followup_result and followup_result.status is TaskStatus.SUCCESS:
         if isinstance(followup_result.result, Mapping):
-            st.session_state[StateKeys.FOLLOWUPS_CACHE_KEY] = followup_cache_key
-            st.session_state[StateKeys.FOLLOWUPS_CACHE_RESULT] = dict(followup_result.result)
             raw_questions = followup_result.result.get("questions", [])
             if isinstance(raw_questions, list):
                 followup_candidates = [q for q in raw_questions if isinstance(q, Mapping)]
@@ -8889,25 +9018,17 @@ def _step_requirements() -> None:
             disabled=bool(disabled_hints) or skill_ai_skipped,
         ):
             focus_signature_local = tuple(sorted(focus_selection, key=str.casefold))
-            existing_terms = _collect_existing_requirement_terms(requirements)
-            responsibility_items = [
-                str(item).strip()
-                for item in (data.get("responsibilities", {}) or {}).get("items", [])
-                if isinstance(item, str) and str(item).strip()
-            ]
             spinner_label = tr(
                 "Generiere Skill-Vorschläge…",
                 "Generating skill suggestions…",
                 lang=lang,
             )
             with st.spinner(spinner_label):
-                fetched, error = get_skill_suggestions(
+                fetched, error = get_prefetch_scheduler().take(
+                    SKILL_SUGGESTION_PREFETCH,
+                    get_skill_suggestions,
                     job_title,
-                    lang=lang,
-                    focus_terms=list(focus_selection),
-                    tone_style=st.session_state.get(UIKeys.TONE_SELECT),
-                    existing_skills=existing_terms,
-                    responsibilities=responsibility_items,
+                    **_skill_suggestion_kwargs(data, lang=lang, focus_terms=focus_selection),
                 )
                 normalized_payload: dict[str, dict[str, list[str]]] = {}
                 for field, groups in fetched.items():
@@ -10196,9 +10317,7 @@ def _step_compensation() -> None:
         "💡 " + tr("Benefits vorschlagen", "Suggest Benefits", lang=lang),
         disabled=not llm_available,
     ):
-        job_title = data.get("position", {}).get("job_title", "")
-        industry = data.get("company", {}).get("industry", "")
-        existing = "\n".join(data["compensation"].get("benefits", []))
+        benefit_args, benefit_kwargs = _benefit_suggestion_args(data, lang=lang, focus_areas=selected_benefit_focus)
         local_benefits = _generate_local_benefits(profile, lang=lang)
         st.session_state[StateKeys.LOCAL_BENEFIT_SUGGESTIONS] = local_benefits
         spinner_label = tr(
@@ -10207,13 +10326,8 @@ def _step_compensation() -> None:
             lang=lang,
         )
         with st.spinner(spinner_label):
-            new_sugg, err, used_fallback = get_benefit_suggestions(
-                job_title,
-                industry,
-                existing,
-                lang=lang,
-                focus_areas=selected_benefit_focus,
-                tone_style=st.session_state.get(UIKeys.TONE_SELECT),
+            new_sugg, err, used_fallback = get_prefetch_scheduler().take(
+                BENEFIT_SUGGESTION_PREFETCH, get_benefit_suggestions, *benefit_args, **benefit_kwargs
             )
         if used_fallback:
             st.info(
@@ -13127,6 +13241,9 @@ def _step_summary(_schema: dict, _critical: list[str]) -> None:
 
     profile_payload = profile.model_dump(mode="json")
     profile_payload["lang"] = lang
+    # Start all summary artifacts before rendering so they generate in parallel.
+    summary_artifact_run = ensure_summary_artifacts(profile_payload, lang=lang)
+    record_vacancy_profile(profile_payload)
     ai_state = get_ai_contributions()
 
     profile_bytes, profile_mime, profile_ext = prepare_clean_json(profile_payload)
@@ -13720,6 +13837,10 @@ def _step_summary(_schema: dict, _critical: list[str]) -> None:
         )
         _render_summary_warnings(data)
 
+    # Rendered last: waits for pending artifacts and fills them in as they finish.
+    with export_tab:
+        render_summary_artifacts(summary_artifact_run, lang=lang)
+
 
 # --- Navigation helper ---
 
@@ -13963,6 +14084,11 @@ def _run_wizard_v2(schema: Mapping[str, object], critical: Sequence[str]) -> Non
             value_resolver=get_in,
         )
         router.run()
+        _prefetch_for_step(
+            [page.key for page in active_pages],
+            st.session_state.get(StateKeys.WIZARD_LAST_STEP),
+            profile if isinstance(profile, Mapping) else {},
+        )
     _apply_pending_scroll_reset()
 
 
@@ -14034,6 +14160,7 @@ def _render_admin_debug_panel() -> None:
                 "Requires an allow-listed Responses tenant – otherwise the client falls back to Chat automatically.",
             )
         )
+        render_profiling_controls()
 
 
 def _render_flow_diagram_panel() -> None:
@@ -14078,7 +14205,8 @@ def run_wizard() -> None:
         _render_admin_debug_panel()
     _render_flow_diagram_panel()
     try:
-        _run_wizard_v2(schema, critical)
+        with profiled_rerun():
+            _run_wizard_v2(schema, critical)
     except (RerunException, StopException):  # pragma: no cover - Streamlit control flow
         raise
     except _RECOVERABLE_FLOW_ERRORS as error:
@@ -8,12 +8,15 @@ import streamlit as st
 
 import config
 from components.chatkit_widget import render_chatkit_widget
-from constants.keys import StateKeys
+from constants.keys import StateKeys, UIKeys
 from core.suggestions import get_responsibility_suggestions
+from pipelines.prefetch import get_prefetch_scheduler
 from question_logic import tr
 from wizard._logic import mark_ai_list_item
 from utils.llm_state import llm_disabled_message
 
+RESPONSIBILITY_PREFETCH = "responsibility_suggestions"
+
 
 def _get_state() -> dict[str, Any]:
     state = st.session_state.setdefault(StateKeys.RESPONSIBILITY_BRAINSTORMER, {})
@@ -239,15 +242,17 @@ def _call_assistant(
     lang: str,
     focus_hints: Sequence[str] | None,
 ) -> None:
-    suggestions, error = get_responsibility_suggestions(
+    suggestions, error = get_prefetch_scheduler().take(
+        RESPONSIBILITY_PREFETCH,
+        get_responsibility_suggestions,
         job_title,
         lang=lang,
         tone_style=tone_style,
         company_name=company_name,
         team_structure=team_structure,
         industry=industry,
-        existing_items=responsibilities,
-        focus_hints=focus_hints,
+        existing_items=list(responsibilities),
+        focus_hints=list(focus_hints or []),
     )
     state = _get_state()
     state["error"] = error
@@ -273,6 +278,29 @@ def _call_assistant(
     _store_state(state)
 
 
+def prefetch_responsibility_suggestions(profile: Mapping[str, Any]) -> bool:
+    """Schedule the suggestions the "Fetch suggestions" button would request for ``profile``."""
+
+    position = profile.get("position") or {}
+    company = profile.get("company") or {}
+    job_title = str(position.get("job_title") or "").strip()
+    if not job_title or not config.CHATKIT_ENABLED:
+        return False
+    items = (profile.get("responsibilities") or {}).get("items") or []
+    return get_prefetch_scheduler().schedule(
+        RESPONSIBILITY_PREFETCH,
+        get_responsibility_suggestions,
+        job_title,
+        lang=st.session_state.get("lang", "de"),
+        tone_style=st.session_state.get(UIKeys.TONE_SELECT),
+        company_name=str(company.get("name") or "").strip(),
+        team_structure=str(position.get("team_structure") or "").strip(),
+        industry=str(company.get("industry") or "").strip(),
+        existing_items=[item.strip() for item in items if isinstance(item, str) and item.strip()],
+        focus_hints=[],
+    )
+
+
 def render_responsibility_brainstormer(
     *,
     cleaned_responsibilities: Sequence[str],
@@ -457,6 +457,125 @@ def _resolve_model(mode: str, cfg: FollowupModelConfig | None) -> str:
     return model_settings.get_model_for(model_settings.ModelTask.FOLLOW_UP_QUESTIONS)
 
 
+def _build_followup_user_payload(
+    profile: Mapping[str, Any],
+    *,
+    role_context: str | None,
+    plan_context: PlanContext | None,
+) -> dict[str, Any]:
+    user_payload: dict[str, Any] = {"profile": profile}
+    critical_fields = load_critical_fields()
+    heuristic_review = [
+        field for field in critical_fields if is_unconfirmed_low_confidence_heuristic(field, profile=profile)
+    ]
+    low_confidence_fields: list[dict[str, Any]] = []
+    for field in critical_fields:
+        score = compute_field_score(profile, field, is_critical=True)
+        if score.tier == "low":
+            low_confidence_fields.append(
+                {
+                    "field": field,
+                    "score": score.score,
+                    "tier": score.tier,
+                    "ui_behavior": score.ui_behavior,
+                    "reasons": list(score.reasons),
+                }
+            )
+    low_confidence_fields.sort(key=lambda item: float(item.get("score", 1.0)))
+    if heuristic_review:
+        user_payload["heuristic_review_fields"] = heuristic_review
+    if low_confidence_fields:
+        user_payload["low_confidence_fields"] = low_confidence_fields
+    if role_context:
+        user_payload["role_context"] = role_context
+    if plan_context is not None:
+        user_payload["plan_context"] = plan_context.model_dump(mode="json", exclude_none=True)
+    return user_payload
+
+
+def _finalize_followups(
+    parsed_result: FollowupParseResult,
+    *,
+    profile: Mapping[str, Any],
+    locale: str,
+    role_context: str | None,
+    plan_context: PlanContext | None,
+) -> dict[str, Any]:
+    parsed = parsed_result.payload
+    if parsed.get("questions"):
+        parsed["questions"] = _prioritize_heuristic_followups(
+            parsed.get("questions", []),
+            profile=profile,
+            locale=locale,
+            plan_context=plan_context,
+        )
+        parsed.setdefault("source", "llm")
+        return parsed
+    fallback_reason = parsed_result.fallback_reason or "empty_result"
+    error_reason = parsed_result.error_reason or fallback_reason
+    logger.info("Follow-up generation returned no questions; using fallback prompts.")
+    return _fallback_followups(
+        locale,
+        reason=fallback_reason,
+        error_reason=error_reason,
+        role_context=role_context,
+    )
+
+
+def build_followup_request(
+    profile: Mapping[str, Any],
+    *,
+    mode: str = "fast",
+    locale: str = "en",
+    model_config: FollowupModelConfig | None = None,
+    role_context: str | None = None,
+    plan_context: PlanContext | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Return the messages and ``call_chat_api`` options for a follow-up request.
+
+    Used for offline batch runs; the request carries no file-search tool and
+    no repair round-trip.
+    """
+
+    lang = _normalize_locale(locale)
+    system_prompt = prompt_registry.get("question_logic.followups.system", locale=lang)
+    user_payload = _build_followup_user_payload(profile, role_context=role_context, plan_context=plan_context)
+    config_override = model_config or FollowupModelConfig()
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
+    ]
+    options: dict[str, Any] = {
+        "model": _resolve_model(mode, config_override),
+        "temperature": config_override.temperature,
+        "json_schema": FOLLOWUP_JSON_SCHEMA,
+        "max_completion_tokens": config_override.max_completion_tokens,
+        "reasoning_effort": config_override.reasoning_effort,
+        "task": model_settings.ModelTask.FOLLOW_UP_QUESTIONS,
+        "verbosity": get_active_verbosity(),
+    }
+    return messages, options
+
+
+def finalize_followups(
+    response: Any,
+    *,
+    profile: Mapping[str, Any],
+    locale: str = "en",
+    role_context: str | None = None,
+    plan_context: PlanContext | None = None,
+) -> dict[str, Any]:
+    """Turn a follow-up response into prioritised questions (or fallbacks)."""
+
+    return _finalize_followups(
+        _parse_followup_response(response),
+        profile=profile,
+        locale=locale,
+        role_context=role_context,
+        plan_context=plan_context,
+    )
+
+
 def generate_followups(
     profile: Mapping[str, Any],
     *,
@@ -506,49 +625,27 @@ def generate_followups(
                 }
 
     lang = _normalize_locale(locale)
-    system_prompt = prompt_registry.get("question_logic.followups.system", locale=lang)
+    messages, options = build_followup_request(
+        profile,
+        mode=mode,
+        locale=lang,
+        model_config=model_config,
+        role_context=role_context,
+        plan_context=plan_context,
+    )
+    system_prompt = str(messages[0]["content"])
     strict_system_prompt = f"{system_prompt}\n\n" + (
         "Gib ausschließlich valides JSON gemäß dem Schema zurück. Keine Erklärungen, kein Markdown, keine Codeblöcke."
         if lang == "de"
         else "Return valid JSON only that matches the schema. No explanations, no Markdown, no code fences."
     )
-    user_payload: dict[str, Any] = {"profile": profile}
-    critical_fields = load_critical_fields()
-    heuristic_review = [
-        field for field in critical_fields if is_unconfirmed_low_confidence_heuristic(field, profile=profile)
-    ]
-    low_confidence_fields: list[dict[str, Any]] = []
-    for field in critical_fields:
-        score = compute_field_score(profile, field, is_critical=True)
-        if score.tier == "low":
-            low_confidence_fields.append(
-                {
-                    "field": field,
-                    "score": score.score,
-                    "tier": score.tier,
-                    "ui_behavior": score.ui_behavior,
-                    "reasons": list(score.reasons),
-                }
-            )
-    low_confidence_fields.sort(key=lambda item: float(item.get("score", 1.0)))
-    if heuristic_review:
-        user_payload["heuristic_review_fields"] = heuristic_review
-    if low_confidence_fields:
-        user_payload["low_confidence_fields"] = low_confidence_fields
-    if role_context:
-        user_payload["role_context"] = role_context
-    if plan_context is not None:
-        user_payload["plan_context"] = plan_context.model_dump(mode="json", exclude_none=True)
-
+    user_payload = json.loads(messages[1]["content"])
     tools: list[dict[str, Any]] = []
     tool_choice: str | None = None
     if vector_store_id and build_file_search_tool is not None:
         tools.append(build_file_search_tool(vector_store_id))
         tool_choice = "auto"
 
-    config_override = model_config or FollowupModelConfig()
-    model = _resolve_model(mode, config_override)
-
     try:
 
         def _call_and_parse(
@@ -557,16 +654,10 @@ def generate_followups(
             try:
                 response = call_llm(
                     prompt_messages,
-                    model=model,
-                    temperature=config_override.temperature,
-                    json_schema=FOLLOWUP_JSON_SCHEMA,
+                    **options,
                     tools=tools or None,
                     tool_choice=tool_choice,
-                    max_completion_tokens=config_override.max_completion_tokens,
-                    reasoning_effort=config_override.reasoning_effort,
-                    task=model_settings.ModelTask.FOLLOW_UP_QUESTIONS,
                     previous_response_id=previous_response_id,
-                    verbosity=get_active_verbosity(),
                 )
             except LLMResponseFormatError as exc:
                 logger.warning(
@@ -588,10 +679,6 @@ def generate_followups(
             response_id = getattr(response, "response_id", None)
             return parsed_result, response_id
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
-        ]
         parsed_result, response_id = _call_and_parse(messages)
         parsed = parsed_result.payload
         if response_id:
@@ -621,23 +708,12 @@ def generate_followups(
             parsed = parsed_result.payload
             if response_id:
                 parsed["response_id"] = response_id
-        if parsed.get("questions"):
-            parsed["questions"] = _prioritize_heuristic_followups(
-                parsed.get("questions", []),
-                profile=profile,
-                locale=locale,
-                plan_context=plan_context,
-            )
-            parsed.setdefault("source", "llm")
-            return parsed
-        fallback_reason = parsed_result.fallback_reason or "empty_result"
-        error_reason = parsed_result.error_reason or fallback_reason
-        logger.info("Follow-up generation returned no questions; using fallback prompts.")
-        return _fallback_followups(
-            locale,
-            reason=fallback_reason,
-            error_reason=error_reason,
+        return _finalize_followups(
+            parsed_result,
+            profile=profile,
+            locale=locale,
             role_context=role_context,
+            plan_context=plan_context,
         )
     except Exception as exc:  # pragma: no cover - defensive guard for UI fallback
         logger.warning("Follow-up generation failed; returning fallback questions.", exc_info=exc)
@@ -652,5 +728,7 @@ def generate_followups(
 __all__ = [
     "FOLLOWUP_JSON_SCHEMA",
     "FollowupModelConfig",
+    "build_followup_request",
+    "finalize_followups",
     "generate_followups",
 ]
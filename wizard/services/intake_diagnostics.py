@@ -5,6 +5,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Mapping
 
+from pipelines.near_duplicates import NearDuplicateMatch
+
 
 @dataclass(frozen=True)
 class IntakeDiagnosticsResult:
@@ -13,10 +15,21 @@ class IntakeDiagnosticsResult:
     contradictions: list[str]
     recommendation: str
     focus_fields: tuple[str, ...]
+    near_duplicate_of: str | None = None
+    near_duplicate_similarity: float | None = None
+    near_duplicate_changed_blocks: int | None = None
+
 
+def evaluate_intake_diagnostics(
+    profile: Mapping[str, object],
+    *,
+    near_duplicate: NearDuplicateMatch | None = None,
+) -> IntakeDiagnosticsResult:
+    """Assess intake quality and return a fast-path recommendation.
 
-def evaluate_intake_diagnostics(profile: Mapping[str, object]) -> IntakeDiagnosticsResult:
-    """Assess intake quality and return a fast-path recommendation."""
+    ``near_duplicate`` is the match reported by the extraction when the posting
+    was seeded from an already extracted one; its similarity is passed through.
+    """
 
     coverage_fields = (
         "intake.raw_input",
@@ -53,6 +66,9 @@ def evaluate_intake_diagnostics(profile: Mapping[str, object]) -> IntakeDiagnost
         contradictions=contradictions,
         recommendation=recommendation,
         focus_fields=focus_fields,
+        near_duplicate_of=near_duplicate.posting_id if near_duplicate else None,
+        near_duplicate_similarity=round(near_duplicate.similarity, 3) if near_duplicate else None,
+        near_duplicate_changed_blocks=len(near_duplicate.changed_blocks) if near_duplicate else None,
     )
 
 
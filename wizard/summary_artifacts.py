@@ -0,0 +1,140 @@
+"""Summary step panel for the concurrently generated artifacts."""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Mapping
+from typing import Any
+
+import streamlit as st
+
+from constants.keys import StateKeys, UIKeys
+from pipelines.executor import get_shared_executor
+from pipelines.result_store import stable_digest
+from pipelines.summary_artifacts import (
+    ArtifactOutcome,
+    SummaryArtifact,
+    SummaryArtifactRun,
+    start_summary_artifacts,
+    summary_revision,
+)
+from utils.env import env_float
+from utils.i18n import tr
+from utils.priority import Priority
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ensure_summary_artifacts", "record_vacancy_profile", "render_summary_artifacts"]
+
+SUMMARY_ARTIFACTS_ENABLED = os.getenv("SUMMARY_ARTIFACTS_ENABLED", "1").strip().lower() not in {
+    "0",
+    "false",
+    "no",
+    "off",
+}
+# How long one rerun waits for pending artifacts before the page finishes rendering.
+SUMMARY_ARTIFACT_WAIT_SECONDS = env_float("SUMMARY_ARTIFACT_WAIT_SECONDS", 90.0, positive=True)
+
+_LABELS: dict[SummaryArtifact, tuple[str, str]] = {
+    SummaryArtifact.JOB_AD: ("Stellenanzeige (JSON)", "Job ad (JSON)"),
+    SummaryArtifact.INTERVIEW_GUIDE: ("Interviewleitfaden (JSON)", "Interview guide (JSON)"),
+    SummaryArtifact.BOOLEAN_SEARCH: ("Boolean-String", "Boolean search"),
+    SummaryArtifact.PROFILE_JSON: ("Profil-Export (JSON)", "Profile export (JSON)"),
+}
+
+
+def _tone() -> str:
+    return str(st.session_state.get(UIKeys.TONE_SELECT) or "professional")
+
+
+def _append_to_store(store: Any, vacancy_id: str, profile: Mapping[str, Any]) -> None:
+    try:
+        store.append({vacancy_id: profile})
+    except Exception:  # pragma: no cover - analytics must never break the wizard
+        logger.warning("Profile could not be recorded in the vacancy store", exc_info=True)
+
+
+def record_vacancy_profile(profile_payload: Mapping[str, Any]) -> bool:
+    """Append the profile to the vacancy store in the background once per revision.
+
+    Returns ``True`` when a write was scheduled.
+    """
+
+    from pipelines.vacancy_store import get_vacancy_store
+
+    store = get_vacancy_store()
+    if store is None:
+        return False
+    revision = stable_digest(profile_payload)
+    if st.session_state.get(StateKeys.VACANCY_STORE_REVISION) == revision:
+        return False
+    st.session_state[StateKeys.VACANCY_STORE_REVISION] = revision
+    vacancy_id = str(st.session_state.get(StateKeys.SESSION_ID) or revision)
+    get_shared_executor().submit(
+        _append_to_store, store, vacancy_id, dict(profile_payload), priority=Priority.BACKGROUND
+    )
+    return True
+
+
+def ensure_summary_artifacts(profile_payload: Mapping[str, Any], *, lang: str) -> SummaryArtifactRun | None:
+    """Start the summary artifacts for the current profile unless already running.
+
+    A run for an older profile revision is cancelled and replaced.
+    """
+
+    if not SUMMARY_ARTIFACTS_ENABLED:
+        return None
+    tone = _tone()
+    current = st.session_state.get(StateKeys.SUMMARY_ARTIFACT_RUN)
+    revision = summary_revision(profile_payload, lang=lang, tone=tone, artifacts=tuple(SummaryArtifact))
+    if isinstance(current, SummaryArtifactRun):
+        if current.revision == revision:
+            return current
+        current.cancel()
+    try:
+        run = start_summary_artifacts(profile_payload, lang=lang, tone=tone)
+    except Exception:  # pragma: no cover - generation must never break the summary step
+        logger.warning("Summary artifacts could not be started", exc_info=True)
+        return None
+    st.session_state[StateKeys.SUMMARY_ARTIFACT_RUN] = run
+    return run
+
+
+def _render_outcome(placeholder: Any, outcome: ArtifactOutcome, lang: str) -> None:
+    label = tr(*_LABELS[outcome.artifact], lang=lang)
+    container = placeholder.container()
+    if not outcome.ok:
+        container.warning(f"{label}: {outcome.error}")
+        return
+    container.markdown(f"**{label}** · {outcome.seconds:.1f} s")
+    if outcome.artifact is SummaryArtifact.BOOLEAN_SEARCH:
+        container.code(str(outcome.value or ""), language="text")
+    elif outcome.artifact is SummaryArtifact.PROFILE_JSON:
+        container.download_button(
+            tr("Herunterladen", "Download", lang=lang),
+            data=outcome.value or b"",
+            file_name="profile.json",
+            mime="application/json",
+            key="summary_artifacts.profile_json",
+        )
+    elif isinstance(outcome.value, (Mapping, list)):
+        container.json(outcome.value, expanded=False)
+    else:
+        container.markdown(str(outcome.value or ""))
+
+
+def render_summary_artifacts(run: SummaryArtifactRun | None, *, lang: str) -> None:
+    """Render each artifact into its placeholder as soon as it completes."""
+
+    if run is None:
+        return
+    with st.expander(tr("Parallel erstellte Entwürfe", "Drafts generated in parallel", lang=lang)):
+        placeholders = {artifact: st.empty() for artifact in run.artifacts}
+        for artifact, placeholder in placeholders.items():
+            if not run.done(artifact):
+                placeholder.info(
+                    f"{tr(*_LABELS[artifact], lang=lang)} · {tr('wird erstellt…', 'generating…', lang=lang)}"
+                )
+        for outcome in run.iter_completed(timeout=SUMMARY_ARTIFACT_WAIT_SECONDS):
+            _render_outcome(placeholders[outcome.artifact], outcome, lang)
@@ -18,6 +18,7 @@ from openai_utils.errors import (
 )
 from utils.i18n import tr
 from utils.logging_context import log_context, set_wizard_step
+from utils.metrics import measure_rerun
 from state import diff_wizard_ui_state, snapshot_wizard_ui_state
 from wizard.validators.registry import PROFILE_VALIDATED_FIELDS, REQUIRED_FIELD_VALIDATORS
 from wizard.metadata import (
@@ -176,7 +177,11 @@ class WizardRouter:
         if enable_form_fade:
             st.markdown(_FORM_FADE_STYLE, unsafe_allow_html=True)
 
-        with log_context(wizard_step=page.key), self._step_panel_wrapper(enable_form_fade, page.key):
+        with (
+            measure_rerun(page.key),
+            log_context(wizard_step=page.key),
+            self._step_panel_wrapper(enable_form_fade, page.key),
+        ):
             set_wizard_step(page.key)
             logger.info("Entering wizard step %s", page.key)
             self._controller.apply_navigation_state(page.key, update_last_step=True)